@@ -24,7 +24,7 @@ import os
 import time
 import traceback
 from datetime import datetime
-import csv
+import numpy as np
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import threading
@@ -58,6 +58,10 @@ except Exception:
     # executables)
     pass
 
+from Instrument_Drivers import (AcquisitionEngine, ColumnStore, Keithley6221,
+                                Lakeshore350, LivePlot, RunFileWriter,
+                                get_resource_manager)
+
 
 def run_script_process(script_path):
     """
@@ -120,6 +124,14 @@ def launch_gpib_scanner():
 # --- BACKEND INSTRUMENT CONTROL ---
 # -------------------------------------------------------------------------------
 
+def interpolate_temperatures(reading_times, temp_history):
+    """Linearly interpolates (time, temperature) samples onto reading timestamps."""
+    if not temp_history:
+        return np.full(len(reading_times), np.nan)
+    temp_times, temps = zip(*temp_history)
+    return np.interp(reading_times, temp_times, temps)
+
+
 class Combined_Backend:
     """
     A dedicated class to handle backend instrument communication.
@@ -131,14 +143,12 @@ class Combined_Backend:
         self.params = {}
         self.keithley = None
         self.lakeshore = None
-        if pyvisa:
-            try:
-                self.rm = pyvisa.ResourceManager()
-            except Exception as e:
-                print(
-                    f"Could not initialize VISA resource manager. Error: {e}")
-                self.rm = None
-        else:
+        self.temp_history = []
+        try:
+            self.rm = get_resource_manager()
+        except Exception as e:
+            print(
+                f"Could not initialize VISA resource manager. Error: {e}")
             self.rm = None
 
     def initialize_instruments(self, parameters):
@@ -150,25 +160,30 @@ class Combined_Backend:
         try:
             # --- Initialize Keithley 6221 (Unaltered Logic) ---
             print("  Connecting to Keithley 6221...")
-            self.keithley = self.rm.open_resource(self.params['keithley_visa'])
-            self.keithley.timeout = 25000
-            print(f"    Connected to: {self.keithley.query('*IDN?').strip()}")
-            self.keithley.write("*rst; status:preset; *cls")
-            self.keithley.write(
-                f"SOUR:DELT:HIGH {self.params['apply_current']}")
-            # Set compliance voltage
-            self.keithley.write(
-                f"SOUR:DELT:PROT {self.params['compliance_v']}")
-            self.keithley.write("SOUR:DELT:ARM")
-            time.sleep(1)
-            self.keithley.write("INIT:IMM")
-            print("  Keithley 6221/2182 Configured and Armed for Delta Mode.")
+            self.keithley = Keithley6221(
+                self.params['keithley_visa'], resource_manager=self.rm)
+            print(f"    Connected to: {self.keithley.identify()}")
+            self.keithley.reset()
+            mode = self.params.get('delta_mode', Keithley6221.DELTA)
+            if mode == Keithley6221.PULSE_DELTA:
+                # Short pulses at a low duty cycle keep the sample from self-heating
+                self.keithley.configure_pulse_delta(
+                    self.params['apply_current'], self.params['compliance_v'])
+            else:
+                # Delta high current and compliance voltage
+                self.keithley.configure_delta(
+                    self.params['apply_current'], self.params['compliance_v'])
+            if self.params.get('buffered'):
+                self.arm_delta_buffer(self.params.get('binary', False), mode)
+            else:
+                self.keithley.arm_delta(mode)
+                print(f"  Keithley 6221/2182 Configured and Armed for {mode} Mode.")
 
             # --- Initialize Lakeshore 350 (Passive Mode) ---
             print("  Connecting to Lakeshore 350 for passive monitoring...")
-            self.lakeshore = self.rm.open_resource(
-                self.params['lakeshore_visa'])
-            print(f"    Connected to: {self.lakeshore.query('*IDN?').strip()}")
+            self.lakeshore = Lakeshore350(
+                self.params['lakeshore_visa'], resource_manager=self.rm)
+            print(f"    Connected to: {self.lakeshore.identify()}")
             print("  Lakeshore 350 connection is passive. No settings will be changed.")
 
             print("--- [Backend] Instrument Initialization Complete ---")
@@ -181,10 +196,9 @@ class Combined_Backend:
         if not self.keithley or not self.lakeshore:
             raise ConnectionError("One or more instruments are not connected.")
 
-        # Get data from Keithley
-        raw_data = self.keithley.query('SENSe:DATA:FRESh?')
-        data_points = raw_data.strip().split(',')
-        voltage = float(data_points[0])
+        # The Lakeshore is read while the 6221 returns its latest delta.
+        temp_future = self.lakeshore.get_temperature_async('A')
+        voltage = self.keithley.fetch_fresh_delta()
 
         # Avoid division by zero if current is zero
         if self.params['apply_current'] != 0:
@@ -192,20 +206,47 @@ class Combined_Backend:
         else:
             resistance = float('inf')
 
-        # Get data from Lakeshore
-        temp_str = self.lakeshore.query('KRDG? A').strip()
-        temperature = float(temp_str)
+        return resistance, voltage, temp_future.result()
+
+    def arm_delta_buffer(self, binary=False, mode=Keithley6221.DELTA):
+        """Arms Delta (or Pulse Delta) so that every reading is stored in the 6221 trace buffer."""
+        self.keithley.arm_delta_buffer(binary, mode)
+        print(
+            f"  Keithley 6221/2182 Armed for Buffered {mode} ({'binary' if binary else 'ASCII'} transfer).")
+
+    def drain_delta_buffer(self):
+        """
+        Returns (voltages, timestamps) for every delta reading stored since the
+        previous drain. See ``Keithley6221.drain_delta_buffer``.
+        """
+        return self.keithley.drain_delta_buffer()
+
+    def get_buffered_measurement(self):
+        """
+        Reads the temperature, drains the delta buffer and returns a list of
+        (resistance, voltage, temperature, timestamp) tuples, one per reading,
+        with temperatures interpolated onto the reading timestamps.
+        """
+        if not self.keithley or not self.lakeshore:
+            raise ConnectionError("One or more instruments are not connected.")
+
+        temperature = self.lakeshore.get_temperature('A')
+        self.temp_history.append((time.time(), temperature))
+        self.temp_history = self.temp_history[-5:]
 
-        return resistance, voltage, temperature
+        voltages, timestamps = self.drain_delta_buffer()
+        temps = interpolate_temperatures(timestamps, self.temp_history)
+        current = self.params['apply_current']
+        return [(voltage / current if current != 0 else float('inf'),
+                 voltage, float(t_k), t_read)
+                for voltage, t_k, t_read in zip(voltages, temps, timestamps)]
 
     def close_instruments(self):
         """Safely shuts down and disconnects from all instruments."""
         print("--- [Backend] Closing instrument connections. ---")
         if self.keithley:
             try:
-                self.keithley.write("SOUR:CLE")
-                self.keithley.write("*RST")
-                self.keithley.close()
+                self.keithley.shutdown()
                 print("  Keithley 6221 connection closed.")
             except pyvisa.errors.VisaIOError:
                 pass
@@ -256,6 +297,10 @@ class MeasurementAppGUI:
     FONT_SUB_LABEL = ('Segoe UI', FONT_SIZE_BASE - 2)
     FONT_TITLE = ('Segoe UI', FONT_SIZE_BASE + 2, 'bold')
     FONT_CONSOLE = ('Consolas', 10)
+    BUFFER_DRAIN_INTERVAL_S = 0.5
+    SAMPLE_INTERVAL_S = 1.0
+    DELTA_MODES = {"Delta": Keithley6221.DELTA,
+                   "Pulse Delta": Keithley6221.PULSE_DELTA}
 
     def __init__(self, root):
         self.root = root
@@ -268,16 +313,17 @@ class MeasurementAppGUI:
         self.start_time = None
         self.backend = Combined_Backend()
         self.file_location_path = ""
-        self.data_storage = {
-            'time': [],
-            'voltage': [],
-            'resistance': [],
-            'temperature': []}
+        self.data_storage = ColumnStore(
+            ['time', 'voltage', 'resistance', 'temperature'])
         self.logo_image = None  # Attribute to hold the logo image reference
-        self.data_queue = queue.Queue()
-        self.plot_backgrounds = None  # For blitting
+        self.live_plot = None  # Blits the live lines, see create_graph_frame
         self.visa_queue = queue.Queue()
-        self.measurement_thread = None
+        self.engine = None
+        self.data_writer = None
+        self.delta_mode_var = tk.StringVar(value="Delta")
+        self.buffered_var = tk.BooleanVar(value=False)
+        self.binary_var = tk.BooleanVar(value=False)
+        self.binary_run_var = tk.BooleanVar(value=False)
 
         self.setup_styles()
         self.create_widgets()
@@ -578,9 +624,47 @@ class MeasurementAppGUI:
             frame,
             text="Scan for Instruments",
             command=self.start_visa_scan)
-        self.scan_button.grid(
+        Label(
+            frame,
+            text="Delta Mode:").grid(
             row=6,
             column=0,
+            padx=10,
+            pady=pady_val,
+            sticky='w')
+        ttk.Combobox(
+            frame,
+            textvariable=self.delta_mode_var,
+            values=list(self.DELTA_MODES),
+            font=self.FONT_BASE,
+            state='readonly').grid(
+            row=6,
+            column=1,
+            padx=(5, 10),
+            pady=pady_val,
+            sticky='ew')
+        ttk.Checkbutton(
+            frame,
+            text="Buffered Delta (drain TRAC buffer)",
+            variable=self.buffered_var).grid(
+            row=7,
+            column=0,
+            padx=10,
+            pady=4,
+            sticky='w')
+        ttk.Checkbutton(
+            frame,
+            text="Binary Transfer",
+            variable=self.binary_var).grid(
+            row=7,
+            column=1,
+            padx=10,
+            pady=4,
+            sticky='w')
+
+        self.scan_button.grid(
+            row=8,
+            column=0,
             columnspan=2,
             padx=10,
             pady=4,
@@ -590,19 +674,29 @@ class MeasurementAppGUI:
             text="Browse Save Location...",
             command=self._browse_file_location)
         self.file_button.grid(
-            row=7,
+            row=9,
             column=0,
             columnspan=2,
             padx=10,
             pady=4,
             sticky='ew')
+        ttk.Checkbutton(
+            frame,
+            text="Also save binary run file (.pcrun)",
+            variable=self.binary_run_var).grid(
+            row=10,
+            column=0,
+            columnspan=2,
+            padx=10,
+            pady=4,
+            sticky='w')
         self.start_button = ttk.Button(
             frame,
             text="Start Measurement",
             command=self.start_measurement,
             style='Start.TButton')
         self.start_button.grid(
-            row=8, column=0, padx=(
+            row=11, column=0, padx=(
                 10, 5), pady=(
                 10, 10), sticky='ew')
         self.stop_button = ttk.Button(
@@ -612,7 +706,7 @@ class MeasurementAppGUI:
             style='Stop.TButton',
             state='disabled')
         self.stop_button.grid(
-            row=8, column=1, padx=(
+            row=11, column=1, padx=(
                 5, 10), pady=(
                 10, 10), sticky='ew')
 
@@ -664,7 +758,7 @@ class MeasurementAppGUI:
 
         # Main Plot: Resistance vs Temperature
         self.line_main, = self.ax_main.plot([], [], color=self.CLR_ACCENT_RED, marker='o',
-                                            markersize=3, linestyle='-', animated=True)
+                                            markersize=3, linestyle='-')
         self.ax_main.set_title("Resistance vs. Temperature", fontweight='bold')
         self.ax_main.set_xlabel("Temperature (K)")
         self.ax_main.set_ylabel("Resistance (Ω)")
@@ -672,14 +766,14 @@ class MeasurementAppGUI:
 
         # Sub Plot 1: Voltage vs Temperature
         self.line_sub1, = self.ax_sub1.plot([], [], color=self.CLR_ACCENT_GOLD, marker='.',
-                                            markersize=4, linestyle='-', animated=True)
+                                            markersize=4, linestyle='-')
         self.ax_sub1.set_xlabel("Temperature (K)")
         self.ax_sub1.set_ylabel("Voltage (V)")
         self.ax_sub1.grid(True, linestyle='--', alpha=0.6)
 
         # Sub Plot 2: Temperature vs Time
         self.line_sub2, = self.ax_sub2.plot([], [], color=self.CLR_ACCENT_GREEN, marker='.',
-                                            markersize=4, linestyle='-', animated=True)
+                                            markersize=4, linestyle='-')
         self.ax_sub2.set_xlabel("Time (s)")
         self.ax_sub2.set_ylabel("Temperature (K)")
         self.ax_sub2.grid(True, linestyle='--', alpha=0.6)
@@ -687,6 +781,14 @@ class MeasurementAppGUI:
         self.figure.tight_layout(pad=3.0)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
+        self.live_plot = LivePlot(self.canvas)
+        self.live_plot.add_line(self.line_main, self.data_storage['temperature'],
+                                self.data_storage['resistance'])
+        self.live_plot.add_line(self.line_sub1, self.data_storage['temperature'],
+                                self.data_storage['voltage'])
+        self.live_plot.add_line(self.line_sub2, self.data_storage['time'],
+                                self.data_storage['temperature'])
+
     def log(self, message):
         timestamp = datetime.now().strftime("%H:%M:%S")
         self.console_widget.config(state='normal')
@@ -708,6 +810,10 @@ class MeasurementAppGUI:
                 raise ValueError(
                     "All fields, VISA addresses, and a save location are required.")
 
+            params['buffered'] = self.buffered_var.get()
+            params['binary'] = self.binary_var.get()
+            params['delta_mode'] = self.DELTA_MODES[self.delta_mode_var.get()]
+            self.buffered_mode = params['buffered']
             self.backend.initialize_instruments(params)
             self.log(
                 f"Backend initialized for sample: {params['sample_name']}")
@@ -717,15 +823,24 @@ class MeasurementAppGUI:
             self.data_filepath = os.path.join(
                 self.file_location_path, file_name)
 
-            with open(self.data_filepath, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([f"# Sample: {params['sample_name']}",
-                                 f"Applied Current: {params['apply_current']:.4e} A"])
-                writer.writerow(["Timestamp",
-                                 "Elapsed Time (s)",
-                                 "Temperature (K)",
-                                 "Voltage (V)",
-                                 "Resistance (Ohm)"])
+            self.data_writer = RunFileWriter(self.data_filepath, header_rows=[
+                [f"# Sample: {params['sample_name']}",
+                 f"Applied Current: {params['apply_current']:.4e} A"],
+                ["Timestamp",
+                 "Elapsed Time (s)",
+                 "Temperature (K)",
+                 "Voltage (V)",
+                 "Resistance (Ohm)",
+                 "Timing Jitter (s)"]],
+                binary_columns=[
+                    "Timestamp (s since epoch)", "Elapsed Time (s)",
+                    "Temperature (K)", "Voltage (V)", "Resistance (Ohm)",
+                    "Timing Jitter (s)"]
+                if self.binary_run_var.get() else None,
+                metadata={'sample': params['sample_name'],
+                          'applied_current_a': params['apply_current'],
+                          'mode': ('buffered ' if params['buffered'] else '')
+                          + self.delta_mode_var.get().lower()})
 
             self.log(
                 f"Output file created: {os.path.basename(self.data_filepath)}")
@@ -741,23 +856,19 @@ class MeasurementAppGUI:
                 f"Sample: {params['sample_name']} | I = {params['apply_current']:.2e} A",
                 fontweight='bold')
 
-            # --- Performance Improvement: Full draw before starting loop ---
-            self.canvas.draw()
-            # Capture the background for blitting
-            self.plot_backgrounds = [
-                self.canvas.copy_from_bbox(
-                    ax.bbox) for ax in [
-                    self.ax_main,
-                    self.ax_sub1,
-                    self.ax_sub2]]
+            # --- Performance Improvement: Full draw, then blit the lines ---
+            self.live_plot.start()
             self.log("Blitting enabled for fast graph updates.")
 
             self.log("Measurement loop started.")
 
-            # Start the worker thread and the queue processor
-            self.measurement_thread = threading.Thread(
-                target=self._measurement_worker, daemon=True)
-            self.measurement_thread.start()
+            # Start the acquisition thread and the queue processor
+            self.engine = AcquisitionEngine(
+                self._acquire_measurement,
+                period_s=(self.BUFFER_DRAIN_INTERVAL_S if self.buffered_mode
+                          else self.SAMPLE_INTERVAL_S),
+                name="Delta-RT-Acquisition")
+            self.engine.start()
             self.root.after(100, self._process_data_queue)
 
         except Exception as e:
@@ -773,121 +884,104 @@ class MeasurementAppGUI:
             self.is_running = False
             self.log("Measurement loop stopped by user.")
             # --- Performance Improvement: Disable blitting on stop ---
-            for line in [self.line_main, self.line_sub1, self.line_sub2]:
-                line.set_animated(False)
-            self.plot_backgrounds = None
-            self.canvas.draw_idle()
+            self.live_plot.stop()
+            self.log(f"Plotting: {self.live_plot.summary()}")
             self.start_button.config(state='normal')
             self.stop_button.config(state='disabled')
+            if self.engine:
+                self.engine.stop()
+                self.log(f"Sampling: {self.engine.scheduler.summary()}")
+                self.engine = None
             self.backend.close_instruments()
+            if self.data_writer:
+                self.data_writer.close()
+                self.data_writer = None
             self.log("Instrument connections closed.")
             messagebox.showinfo(
                 "Info", "Measurement stopped and instruments disconnected.")
 
-    def _measurement_worker(self):
-        """Worker thread to perform measurements and put data into a queue."""
-        while self.is_running:
-            try:
-                res, volt, temp = self.backend.get_measurement()
-                elapsed = time.time() - self.start_time
-                # Put the acquired data into the queue for the main thread
-                self.data_queue.put((res, volt, temp, elapsed))
-                time.sleep(1)  # Control the measurement frequency
-            except Exception as e:
-                # If an error occurs, put it in the queue to be handled by the
-                # main thread
-                self.data_queue.put(e)
-                break
-        if not self.is_running:
-            # Signal that the thread is done
-            self.data_queue.put(None)
+    def _acquire_measurement(self):
+        """Acquisition thread: returns one data point or one drained buffer block."""
+        if self.buffered_mode:
+            # Every reading accumulated in the 6221 buffer is drained as one
+            # block; an empty drain queues nothing.
+            block = [(res, volt, temp, t_read - self.start_time)
+                     for res, volt, temp, t_read in
+                     self.backend.get_buffered_measurement()]
+            return block or None
+        res, volt, temp = self.backend.get_measurement()
+        # The sample's lateness against its planned start is saved per row
+        return (res, volt, temp, time.time() - self.start_time,
+                self.engine.scheduler.last_jitter_s)
 
     def _process_data_queue(self):
-        """Processes data from the queue. Refactored to reduce complexity."""
-        try:
-            while not self.data_queue.empty():
-                data = self.data_queue.get_nowait()
-                if isinstance(data, Exception):
-                    self.log(
-                        f"RUNTIME ERROR in worker thread: {traceback.format_exc()}")
-                    self.stop_measurement()
-                    messagebox.showerror(
-                        "Runtime Error",
-                        "A critical error occurred in the measurement thread.")
-                    return  # Stop processing
-                if data is None:  # Sentinel value
-                    return  # Stop processing
-
-                # Unpack and save data
+        """Consumes every queued point/block and redraws the plots once per batch."""
+        if not self.is_running or not self.engine:
+            return
+        new_data = False
+        for data in self.engine.drain():
+            if isinstance(data, Exception):
+                self.log("RUNTIME ERROR in acquisition thread: " + "".join(
+                    traceback.format_exception(type(data), data, data.__traceback__)))
+                self.stop_measurement()
+                messagebox.showerror(
+                    "Runtime Error",
+                    "A critical error occurred in the measurement thread.")
+                return  # Stop processing
+
+            # Unpack and save data
+            if isinstance(data, list):
+                self._handle_data_block(data)
+            else:
                 self._handle_new_data_point(data)
+            new_data = True
 
-            # Check if there is data to plot
-            if not self.data_storage['time']:
-                if self.is_running:
-                    self.root.after(100, self._process_data_queue)
-                return
-
+        if new_data:
             self._update_plots()
 
-        except queue.Empty:
-            pass
-
         # Schedule the next check if the measurement is still running
         if self.is_running:
             self.root.after(100, self._process_data_queue)
 
     def _handle_new_data_point(self, data):
         """Helper: Unpacks, logs, and saves a single data point."""
-        res, volt, temp, elapsed = data
+        res, volt, temp, elapsed, jitter = data
         self.log(f"T: {temp:.3f} K | R: {res:.4e} Ω | V: {volt:.4e} V")
-        with open(self.data_filepath, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                             f"{elapsed:.2f}", f"{temp:.4f}", f"{volt:.6e}", f"{res:.6e}"])
+        self.data_writer.write_row([datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                                    f"{elapsed:.2f}", f"{temp:.4f}", f"{volt:.6e}", f"{res:.6e}",
+                                    f"{jitter:.4f}"],
+                                   [self.start_time + elapsed, elapsed, temp, volt, res, jitter])
 
         self.data_storage['time'].append(elapsed)
         self.data_storage['temperature'].append(temp)
         self.data_storage['voltage'].append(volt)
         self.data_storage['resistance'].append(res)
 
+    def _handle_data_block(self, block):
+        """Helper: Saves a drained block of buffered delta readings in one write."""
+        # Buffered readings carry the 6221's own timestamps, not a planned
+        # start, so they have no timing jitter
+        rows, values = [], []
+        for res, volt, temp, elapsed in block:
+            rows.append([
+                datetime.fromtimestamp(self.start_time + elapsed).strftime(
+                    '%Y-%m-%d %H:%M:%S.%f')[:-3],
+                f"{elapsed:.3f}", f"{temp:.4f}", f"{volt:.6e}", f"{res:.6e}", "nan"])
+            values.append([self.start_time + elapsed, elapsed, temp, volt, res, np.nan])
+            self.data_storage['time'].append(elapsed)
+            self.data_storage['temperature'].append(temp)
+            self.data_storage['voltage'].append(volt)
+            self.data_storage['resistance'].append(res)
+        self.data_writer.write_rows(rows, values)
+        res, volt, temp, _ = block[-1]
+        self.log(
+            f"T: {temp:.3f} K | {len(block)} readings | R: {res:.4e} Ω | V: {volt:.4e} V")
+
     def _update_plots(self):
         """Helper: Updates the Matplotlib charts."""
-        # Set data for ALL plot lines
-        self.line_main.set_data(
-            self.data_storage['temperature'],
-            self.data_storage['resistance'])
-        self.line_sub1.set_data(
-            self.data_storage['temperature'],
-            self.data_storage['voltage'])
-        self.line_sub2.set_data(
-            self.data_storage['time'],
-            self.data_storage['temperature'])
-
-        if self.plot_backgrounds:
-            # Blitting optimization
-            for bg in self.plot_backgrounds:
-                self.canvas.restore_region(bg)
-
-            artists_to_update = [
-                (self.ax_main, self.line_main),
-                (self.ax_sub1, self.line_sub1),
-                (self.ax_sub2, self.line_sub2)
-            ]
-
-            for ax, line in artists_to_update:
-                ax.relim()
-                ax.autoscale_view()
-                ax.draw_artist(line)
-                self.canvas.blit(ax.bbox)
-
-            self.canvas.flush_events()
-        else:
-            # Full redraw fallback
-            for ax in [self.ax_main, self.ax_sub1, self.ax_sub2]:
-                ax.relim()
-                ax.autoscale_view()
-            self.figure.tight_layout(pad=3.0)
-            self.canvas.draw_idle()
+        # Blits the new points at the plot's frame rate; a full redraw only
+        # when the limits grow
+        self.live_plot.request_redraw()
 
     def start_visa_scan(self):
         """Starts the VISA scan in a separate thread to keep the GUI responsive."""
@@ -902,7 +996,7 @@ class MeasurementAppGUI:
             self.log("ERROR: PyVISA is not installed.")
             return
         try:
-            rm = pyvisa.ResourceManager()
+            rm = get_resource_manager()
             resources = rm.list_resources()
             self.visa_queue.put(resources)
         except Exception as e:
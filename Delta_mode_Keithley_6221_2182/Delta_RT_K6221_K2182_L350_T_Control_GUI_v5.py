@@ -23,7 +23,7 @@ import sys
 import time
 import traceback
 from datetime import datetime
-import csv
+import numpy as np
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.gridspec as gridspec
@@ -44,6 +44,19 @@ try:
 except ImportError:
     pyvisa = None
 
+try:
+    # Dynamically find the project root and add it to the path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+except Exception:
+    pass
+
+from Instrument_Drivers import (AcquisitionEngine, ColumnStore, Keithley6221,
+                                Lakeshore350, LivePlot, RunFileWriter,
+                                get_resource_manager)
+
 
 def run_script_process(script_path):
     """
@@ -115,20 +128,25 @@ def resource_path(relative_path):
 # --- BACKEND INSTRUMENT CONTROL ---
 # -------------------------------------------------------------------------------
 
+def interpolate_temperatures(reading_times, temp_history):
+    """Linearly interpolates (time, temperature) samples onto reading timestamps."""
+    if not temp_history:
+        return np.full(len(reading_times), np.nan)
+    temp_times, temps = zip(*temp_history)
+    return np.interp(reading_times, temp_times, temps)
+
+
 class Active_Delta_Backend:
     """ Manages both Keithley 6221 and Lakeshore 350 for active measurements. """
 
     def __init__(self):
         self.keithley = None
         self.lakeshore = None
-        if pyvisa:
-            try:
-                self.rm = pyvisa.ResourceManager()
-            except Exception as e:
-                print(
-                    f"Could not initialize VISA resource manager. Error: {e}")
-                self.rm = None
-        else:
+        try:
+            self.rm = get_resource_manager()
+        except Exception as e:
+            print(
+                f"Could not initialize VISA resource manager. Error: {e}")
             self.rm = None
 
     def initialize_instruments(self, keithley_visa, lakeshore_visa):
@@ -138,61 +156,77 @@ class Active_Delta_Backend:
             raise ConnectionError("VISA Resource Manager is not available.")
         # Connect to Keithley
         print(f"  Connecting to Keithley 6221 at {keithley_visa}...")
-        self.keithley = self.rm.open_resource(keithley_visa)
-        self.keithley.timeout = 25000
-        print(f"    Connected to: {self.keithley.query('*IDN?').strip()}")
+        self.keithley = Keithley6221(keithley_visa, resource_manager=self.rm)
+        print(f"    Connected to: {self.keithley.identify()}")
         # Connect to Lakeshore
         print(f"  Connecting to Lakeshore 350 at {lakeshore_visa}...")
-        self.lakeshore = self.rm.open_resource(lakeshore_visa)
-        self.lakeshore.write('*RST')
-        time.sleep(0.5)
-        self.lakeshore.write('*CLS')
-        print(f"    Connected to: {self.lakeshore.query('*IDN?').strip()}")
+        self.lakeshore = Lakeshore350(lakeshore_visa, resource_manager=self.rm)
+        self.lakeshore.reset()
+        print(f"    Connected to: {self.lakeshore.identify()}")
         print("--- [Backend] Instrument Initialization Complete ---")
 
-    def setup_keithley_delta(self, current, compliance):
-        """ Configures the Keithley for a Delta Mode measurement. """
+    def setup_keithley_delta(self, current, compliance, buffered=False,
+                             binary=False, mode=Keithley6221.DELTA):
+        """ Configures the Keithley for a Delta or Pulse Delta measurement. """
         if not self.keithley:
             return
-        print("  Configuring Keithley for Delta Mode...")
-        self.keithley.write("*rst; status:preset; *cls")
-        self.keithley.write(f"SOUR:DELT:HIGH {current}")
-        self.keithley.write(f"SOUR:DELT:PROT {compliance}")
-        self.keithley.write("SOUR:DELT:ARM")
-        time.sleep(1)
-        self.keithley.write("INIT:IMM")
-        print("  Keithley Armed for Delta Measurement.")
+        print(f"  Configuring Keithley for {mode} Mode...")
+        self.keithley.reset()
+        if mode == Keithley6221.PULSE_DELTA:
+            # Short pulses at a low duty cycle keep the sample from self-heating
+            self.keithley.configure_pulse_delta(current, compliance)
+        else:
+            self.keithley.configure_delta(current, compliance)
+        if buffered:
+            self.arm_delta_buffer(binary, mode)
+            return
+        self.keithley.arm_delta(mode)
+        print(f"  Keithley Armed for {mode} Measurement.")
+
+    def arm_delta_buffer(self, binary=False, mode=Keithley6221.DELTA):
+        """ Arms Delta (or Pulse Delta) so that every reading is stored in the 6221 trace buffer. """
+        self.keithley.arm_delta_buffer(binary, mode)
+        print(
+            f"  Keithley Armed for Buffered {mode} ({'binary' if binary else 'ASCII'} transfer).")
+
+    def drain_delta_buffer(self):
+        """
+        Returns (voltages, timestamps) for every delta reading stored since the
+        previous drain. See ``Keithley6221.drain_delta_buffer``.
+        """
+        if not self.keithley:
+            return [], []
+        return self.keithley.drain_delta_buffer()
 
     # --- NEW HELPER METHODS to support advanced GUI logic ---
     def set_heater_range(self, output, heater_range):
-        range_map = {'off': 0, 'low': 2, 'medium': 4, 'high': 5}
-        range_code = range_map.get(heater_range.lower())
-        if range_code is None:
-            raise ValueError("Invalid heater range.")
-        self.lakeshore.write(f'RANGE {output},{range_code}')
+        self.lakeshore.set_heater_range(output, heater_range)
 
     def set_setpoint(self, output, temperature_k):
-        self.lakeshore.write(f'SETP {output},{temperature_k}')
+        self.lakeshore.set_setpoint(output, temperature_k)
 
     def setup_ramp(self, output, rate_k_per_min, ramp_on=True):
-        self.lakeshore.write(
-            f'RAMP {output},{1 if ramp_on else 0},{rate_k_per_min}')
-        time.sleep(0.5)
+        self.lakeshore.set_ramp(output, rate_k_per_min, ramp_on)
 
     def get_heater_output(self, output):
-        return float(self.lakeshore.query(f'HTR? {output}').strip())
+        return self.lakeshore.get_heater_output(output)
 
     def get_temperature(self):
         if not self.lakeshore:
             return 0.0
-        return float(self.lakeshore.query('KRDG? A').strip())
+        return self.lakeshore.get_temperature('A')
+
+    def get_status(self):
+        """Returns (T, heater %) from one compound Lakeshore query."""
+        if not self.lakeshore:
+            return 0.0, 0.0
+        status = self.lakeshore.get_status(outputs=(1,), sensors=('A',))
+        return status.temperatures['A'], status.heater_outputs[1]
 
     def get_delta_measurement(self):
         if not self.keithley:
             return 0.0
-        raw_data = self.keithley.query('SENSe:DATA:FRESh?')
-        voltage = float(raw_data.strip().split(',')[0])
-        return voltage
+        return self.keithley.fetch_fresh_delta()
 
     def close_instruments(self):
         """ CRITICAL: Turns off heater and closes all connections. """
@@ -200,10 +234,10 @@ class Active_Delta_Backend:
         try:
             if self.lakeshore:
                 print("  SAFETY: Setting Lakeshore heater to OFF (Range 0).")
-                self.set_heater_range(1, 'off')
+                self.lakeshore.heater_off(1)
             if self.keithley:
                 print("  Clearing Keithley source.")
-                self.keithley.write("SOUR:CLE")
+                self.keithley.clear_source()
                 self.keithley.write("*RST")
         except Exception as e:
             print(
@@ -251,6 +285,9 @@ class Advanced_Delta_GUI:
     FONT_SUB_LABEL = ('Segoe UI', FONT_SIZE_BASE - 2)
     FONT_TITLE = ('Segoe UI', FONT_SIZE_BASE + 2, 'bold')
     FONT_CONSOLE = ('Consolas', 10)
+    SAMPLE_INTERVAL_S = 1.0
+    DELTA_MODES = {"Delta": Keithley6221.DELTA,
+                   "Pulse Delta": Keithley6221.PULSE_DELTA}
 
     def __init__(self, root):
         self.root = root
@@ -262,19 +299,22 @@ class Advanced_Delta_GUI:
         self.is_running = False
         self.is_stabilizing = False
         self.start_time = None
-        self.plot_backgrounds = None
-        self.data_file_handle = None
+        self.live_plot = None  # Blits the live lines, see create_graph_frame
+        self.data_writer = None
         self.backend = Active_Delta_Backend()
         self.file_location_path = ""
-        self.data_storage = {
-            'time': [],
-            'temperature': [],
-            'voltage': [],
-            'resistance': []}
+        self.data_storage = ColumnStore(
+            ['time', 'temperature', 'voltage', 'resistance'])
         self.log_scale_var = tk.BooleanVar(value=True)
+        self.delta_mode_var = tk.StringVar(value="Delta")
+        self.buffered_var = tk.BooleanVar(value=False)
+        self.binary_var = tk.BooleanVar(value=False)
+        self.binary_run_var = tk.BooleanVar(value=False)
+        self.temp_history = []
         self.current_heater_range = 'off'
         self.logo_image = None
         self.visa_queue = queue.Queue()
+        self.engine = None
 
         self.setup_styles()
         self.create_widgets()
@@ -642,13 +682,62 @@ class Advanced_Delta_GUI:
             pady=4,
             sticky='ew')
 
+        Label(
+            frame,
+            text="Delta Mode:").grid(
+            row=12,
+            column=0,
+            padx=padx_val,
+            pady=pady_val,
+            sticky='w')
+        ttk.Combobox(
+            frame,
+            textvariable=self.delta_mode_var,
+            values=list(self.DELTA_MODES),
+            font=self.FONT_BASE,
+            state='readonly').grid(
+            row=12,
+            column=1,
+            padx=(5, padx_val),
+            pady=pady_val,
+            sticky='ew')
+
+        ttk.Checkbutton(
+            frame,
+            text="Buffered Delta (drain TRAC buffer)",
+            variable=self.buffered_var).grid(
+            row=13,
+            column=0,
+            padx=padx_val,
+            pady=4,
+            sticky='w')
+        ttk.Checkbutton(
+            frame,
+            text="Binary Transfer",
+            variable=self.binary_var).grid(
+            row=13,
+            column=1,
+            padx=padx_val,
+            pady=4,
+            sticky='w')
+        ttk.Checkbutton(
+            frame,
+            text="Also save binary run file (.pcrun)",
+            variable=self.binary_run_var).grid(
+            row=14,
+            column=0,
+            columnspan=2,
+            padx=padx_val,
+            pady=4,
+            sticky='w')
+
         self.start_button = ttk.Button(
             frame,
             text="Start Measurement",
             command=self.start_measurement,
             style='Start.TButton')
         self.start_button.grid(
-            row=13, column=0, padx=padx_val, pady=(
+            row=15, column=0, padx=padx_val, pady=(
                 10, 10), sticky='ew')
 
         self.stop_button = ttk.Button(
@@ -658,7 +747,7 @@ class Advanced_Delta_GUI:
             style='Stop.TButton',
             state='disabled')
         self.stop_button.grid(
-            row=13, column=1, padx=padx_val, pady=(
+            row=15, column=1, padx=padx_val, pady=(
                 10, 10), sticky='ew')
 
     def create_console_frame(self, parent):
@@ -711,22 +800,21 @@ class Advanced_Delta_GUI:
         self.ax_sub1 = self.figure.add_subplot(gs[1, 0])
         self.ax_sub2 = self.figure.add_subplot(gs[1, 1])
 
-        # Set animated=True for blitting
         self.line_main, = self.ax_main.plot(
-            [], [], color=self.CLR_ACCENT_RED, marker='o', markersize=3, linestyle='-', animated=True)
+            [], [], color=self.CLR_ACCENT_RED, marker='o', markersize=3, linestyle='-')
         self.ax_main.set_title("Resistance vs. Temperature", fontweight='bold')
         self.ax_main.set_ylabel("Resistance (Ω)")
         self._update_y_scale()
         self.ax_main.grid(True, which="both", linestyle='--', alpha=0.6)
 
         self.line_sub1, = self.ax_sub1.plot(
-            [], [], color=self.CLR_ACCENT_GOLD, marker='.', markersize=3, linestyle='-', animated=True)
+            [], [], color=self.CLR_ACCENT_GOLD, marker='.', markersize=3, linestyle='-')
         self.ax_sub1.set_xlabel("Temperature (K)")
         self.ax_sub1.set_ylabel("Voltage (V)")
         self.ax_sub1.grid(True, linestyle='--', alpha=0.6)
 
         self.line_sub2, = self.ax_sub2.plot(
-            [], [], color=self.CLR_ACCENT_GREEN, marker='.', markersize=3, linestyle='-', animated=True)
+            [], [], color=self.CLR_ACCENT_GREEN, marker='.', markersize=3, linestyle='-')
         self.ax_sub2.set_xlabel("Time (s)")
         self.ax_sub2.set_ylabel("Temperature (K)")
         self.ax_sub2.grid(True, linestyle='--', alpha=0.6)
@@ -734,19 +822,21 @@ class Advanced_Delta_GUI:
         self.figure.tight_layout(pad=3.0)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
+        self.live_plot = LivePlot(self.canvas)
+        self.live_plot.add_line(self.line_main, self.data_storage['temperature'],
+                                self.data_storage['resistance'])
+        self.live_plot.add_line(self.line_sub1, self.data_storage['temperature'],
+                                self.data_storage['voltage'])
+        self.live_plot.add_line(self.line_sub2, self.data_storage['time'],
+                                self.data_storage['temperature'])
+
     def _update_y_scale(self):
         self.ax_main.set_yscale(
             'log' if self.log_scale_var.get() else 'linear')
-        # If the measurement is running, we need to redraw and recapture the
-        # background
-        if self.is_running and self.plot_backgrounds:
-            self.canvas.draw()
-            self.plot_backgrounds = [
-                self.canvas.copy_from_bbox(
-                    ax.bbox) for ax in [
-                    self.ax_main,
-                    self.ax_sub1,
-                    self.ax_sub2]]
+        # The limits are refitted for the new scale and, while the
+        # measurement is running, the blit background is re-captured
+        if self.live_plot:
+            self.live_plot.redraw()
 
     def log(self, message):
         ts = datetime.now().strftime("%H:%M:%S")
@@ -779,27 +869,39 @@ class Advanced_Delta_GUI:
             self.backend.initialize_instruments(
                 self.params['keithley_visa'],
                 self.params['lakeshore_visa'])
+            self.buffered_mode = self.buffered_var.get()
             self.backend.setup_keithley_delta(
-                self.params['current'], self.params['compliance'])
+                self.params['current'], self.params['compliance'],
+                buffered=self.buffered_mode, binary=self.binary_var.get(),
+                mode=self.DELTA_MODES[self.delta_mode_var.get()])
 
             ts = datetime.now().strftime("%Y%m%d_%H%M%S")
             file_name = f"{self.params['sample_name']}_{ts}_Delta_RT.dat"
             self.data_filepath = os.path.join(
                 self.file_location_path, file_name)
-            self.data_file_handle = open(self.data_filepath, 'w', newline='')
-            writer = csv.writer(self.data_file_handle)
-            writer.writerow(
-                [f"# Sample: {self.params['sample_name']}", f"Applied Current: {self.params['current']}A"])
-            writer.writerow(["Timestamp",
-                             "Elapsed Time (s)",
-                             "Temperature (K)",
-                             "Heater Output (%)",
-                             "Measured Voltage (V)",
-                             "Resistance (Ohm)"])
+            self.data_writer = RunFileWriter(self.data_filepath, header_rows=[
+                [f"# Sample: {self.params['sample_name']}", f"Applied Current: {self.params['current']}A"],
+                ["Timestamp",
+                 "Elapsed Time (s)",
+                 "Temperature (K)",
+                 "Heater Output (%)",
+                 "Measured Voltage (V)",
+                 "Resistance (Ohm)",
+                 "Timing Jitter (s)"]],
+                binary_columns=[
+                    "Timestamp (s since epoch)", "Elapsed Time (s)", "Temperature (K)",
+                    "Heater Output (%)", "Measured Voltage (V)", "Resistance (Ohm)",
+                    "Timing Jitter (s)"]
+                if self.binary_run_var.get() else None,
+                metadata={'sample': self.params['sample_name'],
+                          'applied_current_a': self.params['current'],
+                          'mode': ('buffered ' if self.buffered_mode else '')
+                          + self.delta_mode_var.get().lower()})
             self.log(
                 f"Output file created: {os.path.basename(self.data_filepath)}")
 
             self.is_stabilizing, self.is_running = True, False
+            self.temp_history = []
             self.start_button.config(state='disabled')
             self.stop_button.config(state='normal')
             for key in self.data_storage:
@@ -825,17 +927,19 @@ class Advanced_Delta_GUI:
         if self.is_running or self.is_stabilizing:
             self.is_running, self.is_stabilizing = False, False
             self.log("Measurement stopped by user.")
+            if self.engine:
+                self.engine.stop()
+                self.log(f"Sampling: {self.engine.scheduler.summary()}")
+                self.engine = None
             self.backend.close_instruments()
-            if self.data_file_handle:
-                self.data_file_handle.close()
-                self.data_file_handle = None
+            if self.data_writer:
+                self.data_writer.close()
+                self.data_writer = None
             self.start_button.config(state='normal')
             self.stop_button.config(state='disabled')
             # Turn off animation for any final redraws
-            for line in [self.line_main, self.line_sub1, self.line_sub2]:
-                line.set_animated(False)
-            self.plot_backgrounds = None
-            self.canvas.draw_idle()
+            self.live_plot.stop()
+            self.log(f"Plotting: {self.live_plot.summary()}")
             messagebox.showinfo(
                 "Info", "Measurement stopped and instruments disconnected.")
 
@@ -875,83 +979,113 @@ class Advanced_Delta_GUI:
             f"Hardware ramp started towards {self.params['end_temp']} K at {self.params['rate']} K/min.")
         self.is_running = True
         self.start_time = time.time()
-        self.root.after(1000, self._update_measurement_loop)
+        # Instrument reads run on the acquisition thread; the GUI consumes
+        # the queued samples in batches.
+        self.engine = AcquisitionEngine(
+            self._acquire_measurement, period_s=self.SAMPLE_INTERVAL_S,
+            name="Delta-RT-Acquisition")
+        self.engine.start()
+        self.root.after(1000, self._process_data_queue)
 
         # --- Performance Improvement: Capture static background for blitting ---
-        self.canvas.draw()
-        self.plot_backgrounds = [
-            self.canvas.copy_from_bbox(
-                ax.bbox) for ax in [
-                self.ax_main,
-                self.ax_sub1,
-                self.ax_sub2]]
+        self.live_plot.start()
         self.log("Blitting enabled for fast graph updates.")
 
-    def _update_measurement_loop(self):
-        if not self.is_running:
+    def _acquire_measurement(self):
+        """Acquisition thread: reads T, heater output and the delta voltage(s)."""
+        temp, htr = self.backend.get_status()
+        if self.buffered_mode:
+            t_temp = time.time()
+            voltages, timestamps = self.backend.drain_delta_buffer()
+            return t_temp, temp, htr, voltages, timestamps
+        voltage = self.backend.get_delta_measurement()
+        # The sample's lateness against its planned start is saved per row
+        return time.time(), temp, htr, voltage, self.engine.scheduler.last_jitter_s
+
+    def _process_data_queue(self):
+        """Consumes every queued sample, then redraws the plots once."""
+        if not self.is_running or not self.engine:
             return
-        try:
-            temp = self.backend.get_temperature()
-            htr = self.backend.get_heater_output(1)
-            voltage = self.backend.get_delta_measurement()
-            res = voltage / \
-                self.params['current'] if self.params['current'] != 0 else float('inf')
-            elapsed = time.time() - self.start_time
-
-            self.log(
-                f"T:{temp:.3f}K | R:{res:.3e}Ω | Htr:{htr:.1f}% ({self.current_heater_range})")
-            if self.data_file_handle:
-                csv.writer(self.data_file_handle).writerow([
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    f"{elapsed:.2f}", f"{temp:.4f}", f"{htr:.2f}", f"{voltage:.4e}", f"{res:.4e}"])
-
-            self.data_storage['time'].append(elapsed)
-            self.data_storage['temperature'].append(temp)
-            self.data_storage['voltage'].append(voltage)
-            self.data_storage['resistance'].append(res)
-
-            # --- Performance Improvement: Use blitting for fast graph updates if background is captured ---
-            if self.plot_backgrounds:
-                # Restore the clean background
-                self.canvas.restore_region(self.plot_backgrounds[0])
-                self.canvas.restore_region(self.plot_backgrounds[1])
-                self.canvas.restore_region(self.plot_backgrounds[2])
-
-                # Update data and redraw only the artists
-                self.line_main.set_data(
-                    self.data_storage['temperature'],
-                    self.data_storage['resistance'])
-                self.line_sub1.set_data(
-                    self.data_storage['temperature'],
-                    self.data_storage['voltage'])
-                self.line_sub2.set_data(
-                    self.data_storage['time'],
-                    self.data_storage['temperature'])
-
-                # Redraw the artists and blit the changes
-                for i, ax in enumerate(
-                        [self.ax_main, self.ax_sub1, self.ax_sub2]):
-                    ax.relim()
-                    ax.autoscale_view()
-                    ax.draw_artist(ax.get_lines()[0])
-
-                self.canvas.blit(self.figure.bbox)
+        items = self.engine.drain()
+        for item in items:
+            if isinstance(item, Exception):
+                self.log("RUNTIME ERROR: " + "".join(traceback.format_exception(
+                    type(item), item, item.__traceback__)))
+                self.stop_measurement()
+                return
+            if self.buffered_mode:
+                self._record_buffered_block(*item)
             else:
-                # Fallback to a full redraw if blitting isn't ready
-                self.canvas.draw_idle()
+                self._record_point(*item)
 
+            temp = item[1]
             if temp >= self.params['cutoff']:
                 self.log(f"!!! SAFETY CUTOFF REACHED at {temp:.4f} K !!!")
                 self.stop_measurement()
-            elif temp >= self.params['end_temp']:
+                return
+            if temp >= self.params['end_temp']:
                 self.log("Target temperature reached. Measurement complete.")
                 self.stop_measurement()
-            else:
-                # Slightly less than 1s to prevent drift
-                self.root.after(900, self._update_measurement_loop)
-        except Exception:
-            self.log(f"RUNTIME ERROR: {traceback.format_exc()}")
-            self.stop_measurement()
+                return
+
+        if items:
+            self._redraw_plots()
+        self.root.after(200, self._process_data_queue)
+
+    def _record_point(self, t_read, temp, htr, voltage, jitter=0.0):
+        """Stores and saves one (non-buffered) delta reading."""
+        res = voltage / \
+            self.params['current'] if self.params['current'] != 0 else float('inf')
+        elapsed = t_read - self.start_time
+
+        self.log(
+            f"T:{temp:.3f}K | R:{res:.3e}Ω | Htr:{htr:.1f}% ({self.current_heater_range})")
+        if self.data_writer:
+            self.data_writer.write_row([
+                datetime.fromtimestamp(t_read).strftime('%Y-%m-%d %H:%M:%S'),
+                f"{elapsed:.2f}", f"{temp:.4f}", f"{htr:.2f}", f"{voltage:.4e}", f"{res:.4e}",
+                f"{jitter:.4f}"],
+                [t_read, elapsed, temp, htr, voltage, res, jitter])
+
+        self.data_storage['time'].append(elapsed)
+        self.data_storage['temperature'].append(temp)
+        self.data_storage['voltage'].append(voltage)
+        self.data_storage['resistance'].append(res)
+
+    def _redraw_plots(self):
+        # --- Performance Improvement: Blit the new points; the limits only
+        # grow (with a full redraw) when a point falls outside them. Frames
+        # are capped, so a fast stream of points is drawn a batch at a time ---
+        self.live_plot.request_redraw()
+
+    def _record_buffered_block(self, t_temp, temp, htr, voltages, timestamps):
+        """
+        Stores each drained 6221 buffer reading with an interpolated
+        temperature. The readings carry the 6221's own timestamps, not a
+        planned start, so their timing jitter is saved as NaN.
+        """
+        self.temp_history.append((t_temp, temp))
+        self.temp_history = self.temp_history[-5:]
+        if not voltages:
+            return
+        temps = interpolate_temperatures(timestamps, self.temp_history)
+        current = self.params['current']
+        rows, values = [], []
+        for t_read, t_k, voltage in zip(timestamps, temps, voltages):
+            res = voltage / current if current != 0 else float('inf')
+            elapsed = t_read - self.start_time
+            rows.append([
+                datetime.fromtimestamp(t_read).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3],
+                f"{elapsed:.3f}", f"{t_k:.4f}", f"{htr:.2f}", f"{voltage:.4e}", f"{res:.4e}", "nan"])
+            values.append([t_read, elapsed, t_k, htr, voltage, res, np.nan])
+            self.data_storage['time'].append(elapsed)
+            self.data_storage['temperature'].append(t_k)
+            self.data_storage['voltage'].append(voltage)
+            self.data_storage['resistance'].append(res)
+        if self.data_writer:
+            self.data_writer.write_rows(rows, values)
+        self.log(
+            f"T:{temp:.3f}K | {len(voltages)} readings | R:{self.data_storage['resistance'][-1]:.3e}Ω | Htr:{htr:.1f}% ({self.current_heater_range})")
 
     def start_visa_scan(self):
         """Starts the VISA scan in a separate thread to keep the GUI responsive."""
@@ -966,7 +1100,7 @@ class Advanced_Delta_GUI:
             self.log("ERROR: PyVISA is not installed.")
             return
         try:
-            rm = pyvisa.ResourceManager()
+            rm = get_resource_manager()
             resources = rm.list_resources()
             self.visa_queue.put(resources)
         except Exception as e:
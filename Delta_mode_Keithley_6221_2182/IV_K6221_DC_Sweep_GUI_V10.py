@@ -38,7 +38,6 @@ import sys
 import time
 import traceback
 from datetime import datetime
-import csv
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.gridspec as gridspec
@@ -66,6 +65,9 @@ try:
 except Exception:
     pass # Path manipulation can fail in some environments (e.g., frozen executables)
 
+from Instrument_Drivers import (ColumnStore, Keithley6221, LivePlot,
+                                RunFileWriter, get_resource_manager)
+
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
     try:
@@ -122,60 +124,75 @@ class Backend_Passthrough:
     def __init__(self):
         self.visa_queue = queue.Queue()
         self.k6221 = None; self.rm = None
-        if pyvisa:
-            try: self.rm = pyvisa.ResourceManager()
-            except Exception as e: print(f"Could not initialize VISA: {e}")
+        try: self.rm = get_resource_manager()
+        except Exception as e: print(f"Could not initialize VISA: {e}")
 
     def connect(self, k6221_visa):
         if not self.rm: raise ConnectionError("VISA is not available.")
-        self.k6221 = self.rm.open_resource(k6221_visa); self.k6221.timeout=25000
-        print(f"  K6221 Connected: {self.k6221.query('*IDN?').strip()}")
+        self.k6221 = Keithley6221(k6221_visa, resource_manager=self.rm)
+        print(f"  K6221 Connected: {self.k6221.identify()}")
 
     def configure_instruments(self, compliance):
         print("\n--- [Backend] Configuring Instruments via Passthrough ---")
-        self.k6221.write("*RST"); self.k6221.write("SOUR:FUNC CURR"); self.k6221.write("SOUR:CURR:RANG:AUTO ON")
-        self.k6221.write(f"SOUR:CURR:COMP {compliance}"); print("  K6221 configured for DC source.")
+        self.k6221.reset(); self.k6221.configure_dc_source(compliance)
+        print("  K6221 configured for DC source.")
         print("  Sending commands to K2182 via K6221 RS-232 Port...")
-        self.k6221.write("SYST:COMM:SER:SEND '*RST'"); time.sleep(0.5)
-        self.k6221.write("SYST:COMM:SER:SEND 'FUNC \"VOLT\"'"); time.sleep(0.5)
-        self.k6221.write("SYST:COMM:SER:SEND 'SENS:VOLT:DC:RANG:AUTO ON'"); time.sleep(0.5)
-        # --- NEW: Put K2182 into continuous, free-running measurement mode ---
-        self.k6221.write("SYST:COMM:SER:SEND 'INIT:CONT ON'"); time.sleep(0.5)
+        # *RST, FUNC "VOLT", auto range, then continuous (free-running) measurement; each send is *OPC? confirmed
+        self.k6221.configure_2182_free_running()
         print("  K2182 configured and set to free-running measurement mode.")
 
     def set_current(self, current):
         """ Sets the current level on the K6221 and turns the output on. """
-        self.k6221.write(f"SOUR:CURR {current}"); time.sleep(0.5)
-        self.k6221.write("OUTP:STAT ON"); time.sleep(0.5)
+        self.k6221.set_current(current); self.k6221.output_on()
 
     def read_voltage(self):
-        """ Fetches the latest reading from the free-running K2182. """
-        # --- NEW: Use FETC? to get the latest reading instead of READ? ---
-        self.k6221.write("SYST:COMM:SER:SEND 'FETC?'")
-
-        timeout = 2.0; start_poll_time = time.time(); voltage_str = ""
-        while time.time() - start_poll_time < timeout:
-            response = self.k6221.query("SYST:COMM:SER:ENT?").strip()
-            if response: voltage_str = response; break
-            time.sleep(0.1)
-
-        if not voltage_str: raise TimeoutError("No response from K2182 via passthrough.")
-        last_line = voltage_str.strip().split('\n')[-1]
-        return float(last_line)
+        """ Fetches the latest reading from the free-running K2182 (FETC? via the serial passthrough). """
+        return self.k6221.read_2182_voltage()
+
+    def configure_buffered_sweep(self):
+        """ Sets the K2182 to buffer one reading per Trigger Link pulse of the K6221 built-in sweep. """
+        self.k6221.configure_2182_triggered_buffer()
+        print("  K2182 configured for triggered buffering.")
+
+    def sweep_segment(self, currents, delay):
+        """ Runs one K6221 list-sweep segment and returns the K2182 buffer, read in one transfer. """
+        return self.k6221.buffered_list_sweep(currents, delay)
+
+    def arm_pulse_delta_sweep(self, currents, compliance):
+        """ Arms a buffered Pulse Delta list sweep: one low duty-cycle pulse reading per current. """
+        self.k6221.output_off(); self.k6221.configure_pulse_delta_sweep(currents, compliance)
+        self.k6221.arm_delta_buffer(mode=Keithley6221.PULSE_DELTA, count=1)
+        print("  K6221 armed for a buffered Pulse Delta sweep.")
+
+    def arm_diff_conductance_sweep(self, start, stop, step, delta, compliance):
+        """ Arms a buffered differential conductance sweep; its readings are dV/dI in ohms. """
+        self.k6221.output_off(); self.k6221.configure_diff_conductance(start, stop, step, delta, compliance)
+        self.k6221.arm_delta_buffer(mode=Keithley6221.DIFF_CONDUCTANCE)
+        print("  K6221 armed for a buffered differential conductance sweep.")
+
+    def drain_readings(self):
+        """ Returns the Delta-family readings stored in the K6221 buffer since the previous drain. """
+        return self.k6221.drain_delta_buffer()[0]
+
+    def delta_reading_time_s(self):
+        """ Nominal time per reading of the armed Delta-family sweep. """
+        return self.k6221.delta_reading_time_s()
 
     def turn_off_output(self):
         if self.k6221:
-            try: self.k6221.write("OUTP:STAT OFF")
+            try: self.k6221.output_off()
             except: pass
             print("  K6221 source is OFF.")
 
     def close(self):
         if self.k6221:
             # Also tell the 2182 to stop continuous measurement
-            try: self.k6221.write("SYST:COMM:SER:SEND 'INIT:CONT OFF'")
+            try: self.k6221.serial_send('INIT:CONT OFF')
+            except: pass
+            try: self.k6221.clear_source()  # Aborts an unfinished Delta-family sweep
             except: pass
             self.turn_off_output()
-            self.k6221.close()
+            self.k6221.close(); self.k6221 = None
             print("  K6221 connection closed.")
 
 # -------------------------------------------------------------------------------
@@ -189,12 +206,15 @@ class Passthrough_IV_GUI:
     CLR_ACCENT_GOLD = '#FFC107'; CLR_ACCENT_GREEN = '#A7C957'; CLR_ACCENT_RED = '#E74C3C' # Accent colors
     CLR_CONSOLE_BG = '#1E2B38'; CLR_GRAPH_BG = '#FFFFFF' # Specific component colors
     FONT_BASE = ('Segoe UI', 11); FONT_TITLE = ('Segoe UI', 13, 'bold'); FONT_CONSOLE = ('Consolas', 10) # Fonts
+    ACQ_POINT = "Point-by-point"; ACQ_BUFFERED = "Built-in sweep (Trigger Link, buffered)" # Acquisition modes
+    ACQ_PULSE = "Pulse Delta sweep"; ACQ_DCON = "Differential conductance" # Delta-family modes, drained from the K6221 buffer
+    DRAIN_INTERVAL_S = 0.5; DELTA_SWEEP_GRACE_S = 5.0 # Slack on the expected Delta-family sweep time before it counts as stalled
 
     def __init__(self, root):
         self.root = root; self.root.title("K6221/2182 I-V Sweep")
         self.root.geometry("1600x950"); self.root.minsize(1300, 850); self.root.configure(bg=self.CLR_BG_DARK)
-        self.is_running = False; self.sweep_thread = None; self.logo_image = None
-        self.backend = Backend_Passthrough(); self.data_storage = {'current': [], 'voltage': [], 'resistance': []}
+        self.is_running = False; self.sweep_thread = None; self.logo_image = None; self.data_writer = None
+        self.backend = Backend_Passthrough(); self.data_storage = ColumnStore(['current', 'voltage', 'resistance'])
         self.setup_styles(); self.create_widgets(); self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
 
     def setup_styles(self):
@@ -276,18 +296,27 @@ class Passthrough_IV_GUI:
         Label(scale_frame, text="Sweep Scale:").pack(side='left', anchor='w')
         ttk.Radiobutton(scale_frame, text="Linear", variable=self.sweep_scale_var, value="Linear").pack(side='left', padx=(10,5))
         ttk.Radiobutton(scale_frame, text="Logarithmic", variable=self.sweep_scale_var, value="Logarithmic").pack(side='left')
+        self.acquisition_var = tk.StringVar(value=self.ACQ_POINT)
+        acq_frame = ttk.Frame(frame); acq_frame.grid(row=11, column=0, columnspan=2, padx=padx_val, pady=(5,0), sticky='w')
+        Label(acq_frame, text="Acquisition:").pack(side='left', anchor='w')
+        ttk.Radiobutton(acq_frame, text=self.ACQ_POINT, variable=self.acquisition_var, value=self.ACQ_POINT).pack(side='left', padx=(10,5))
+        ttk.Radiobutton(acq_frame, text=self.ACQ_BUFFERED, variable=self.acquisition_var, value=self.ACQ_BUFFERED).pack(side='left')
+        delta_frame = ttk.Frame(frame); delta_frame.grid(row=12, column=0, columnspan=2, padx=padx_val, pady=(5,0), sticky='w')
+        Label(delta_frame, text="Delta modes:").pack(side='left', anchor='w')
+        ttk.Radiobutton(delta_frame, text=self.ACQ_PULSE, variable=self.acquisition_var, value=self.ACQ_PULSE).pack(side='left', padx=(10,5))
+        ttk.Radiobutton(delta_frame, text=self.ACQ_DCON, variable=self.acquisition_var, value=self.ACQ_DCON).pack(side='left')
         
-        ttk.Button(frame, text="Browse Save Location...", command=self._browse_save).grid(row=11, column=0, columnspan=2, padx=padx_val, pady=4, sticky='ew')
-        self.start_button = ttk.Button(frame, text="Start Sweep", command=self.start_sweep, style='Start.TButton'); self.start_button.grid(row=12, column=0, padx=(padx_val, 5), pady=(10, 10), sticky='ew')
-        self.stop_button = ttk.Button(frame, text="Stop Sweep", command=self.stop_sweep, style='Stop.TButton', state='disabled'); self.stop_button.grid(row=12, column=1, padx=(5, padx_val), pady=(10, 10), sticky='ew')
+        ttk.Button(frame, text="Browse Save Location...", command=self._browse_save).grid(row=13, column=0, columnspan=2, padx=padx_val, pady=4, sticky='ew')
+        self.start_button = ttk.Button(frame, text="Start Sweep", command=self.start_sweep, style='Start.TButton'); self.start_button.grid(row=14, column=0, padx=(padx_val, 5), pady=(10, 10), sticky='ew')
+        self.stop_button = ttk.Button(frame, text="Stop Sweep", command=self.stop_sweep, style='Stop.TButton', state='disabled'); self.stop_button.grid(row=14, column=1, padx=(5, padx_val), pady=(10, 10), sticky='ew')
     def create_console_frame(self, parent): frame = LabelFrame(parent, text='Console Output', relief='groove', bg=self.CLR_BG_DARK, fg=self.CLR_FG_LIGHT, font=self.FONT_TITLE); self.console = scrolledtext.ScrolledText(frame, state='disabled', bg=self.CLR_CONSOLE_BG, fg=self.CLR_FG_LIGHT, font=self.FONT_CONSOLE, wrap='word', bd=0); self.console.pack(pady=5, padx=5, fill='both', expand=True); return frame
-    def create_graph_frame(self, parent): container = LabelFrame(parent, text='I-V Curve', relief='groove', bg=self.CLR_GRAPH_BG, fg=self.CLR_TEXT_DARK, font=self.FONT_TITLE); container.pack(fill='both', expand=True, padx=5, pady=5); self.figure = Figure(figsize=(8, 8), dpi=100, facecolor=self.CLR_GRAPH_BG); self.canvas = FigureCanvasTkAgg(self.figure, container); gs = gridspec.GridSpec(2, 1, figure=self.figure); self.ax_main = self.figure.add_subplot(gs[0]); self.ax_sub = self.figure.add_subplot(gs[1]); self.line_main, = self.ax_main.plot([], [], 'o-', c=self.CLR_ACCENT_RED, markersize=4); self.ax_main.set_title("I-V Curve", fontweight='bold'); self.ax_main.set_xlabel("Current (A)"); self.ax_main.set_ylabel("Voltage (V)"); self.line_sub, = self.ax_sub.plot([], [], 's:', c=self.CLR_ACCENT_GREEN, markersize=4); self.ax_sub.set_xlabel("Current (A)"); self.ax_sub.set_ylabel("Resistance (Ω)"); [ax.grid(True, ls='--', alpha=0.6) for ax in [self.ax_main, self.ax_sub]]; self.figure.tight_layout(pad=3.0); self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+    def create_graph_frame(self, parent): container = LabelFrame(parent, text='I-V Curve', relief='groove', bg=self.CLR_GRAPH_BG, fg=self.CLR_TEXT_DARK, font=self.FONT_TITLE); container.pack(fill='both', expand=True, padx=5, pady=5); self.figure = Figure(figsize=(8, 8), dpi=100, facecolor=self.CLR_GRAPH_BG); self.canvas = FigureCanvasTkAgg(self.figure, container); gs = gridspec.GridSpec(2, 1, figure=self.figure); self.ax_main = self.figure.add_subplot(gs[0]); self.ax_sub = self.figure.add_subplot(gs[1]); self.line_main, = self.ax_main.plot([], [], 'o-', c=self.CLR_ACCENT_RED, markersize=4); self.ax_main.set_title("I-V Curve", fontweight='bold'); self.ax_main.set_xlabel("Current (A)"); self.ax_main.set_ylabel("Voltage (V)"); self.line_sub, = self.ax_sub.plot([], [], 's:', c=self.CLR_ACCENT_GREEN, markersize=4); self.ax_sub.set_xlabel("Current (A)"); self.ax_sub.set_ylabel("Resistance (Ω)"); [ax.grid(True, ls='--', alpha=0.6) for ax in [self.ax_main, self.ax_sub]]; self.figure.tight_layout(pad=3.0); self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5); self.live_plot = LivePlot(self.canvas); self.live_plot.add_line(self.line_main, self.data_storage['current'], self.data_storage['voltage']); self.live_plot.add_line(self.line_sub, self.data_storage['current'], self.data_storage['resistance'])
     def log(self, message): ts = datetime.now().strftime("%H:%M:%S"); self.console.config(state='normal'); self.console.insert('end', f"[{ts}] {message}\n"); self.console.see('end'); self.console.config(state='disabled')
     def start_sweep(self):
         try:
-            self.params = { 'name': self.entries["Sample Name"].get(), 'start_i': float(self.entries["Start Current"].get()), 'stop_i': float(self.entries["Stop Current"].get()), 'points': int(self.entries["Num Points"].get()), 'delay': float(self.entries["Delay"].get()), 'initial_delay': float(self.entries["Initial Delay"].get()), 'compliance': float(self.entries["Compliance"].get()), 'k6221_visa': self.k6221_cb.get() }
-            if not all(p for k, p in self.params.items() if k != 'name') or not hasattr(self, 'save_path'): raise ValueError("All fields and a save location are required.")
-            self.start_button.config(state='disabled'); self.stop_button.config(state='normal'); self.is_running = True; [self.data_storage[key].clear() for key in self.data_storage]; [line.set_data([], []) for line in [self.line_main, self.line_sub]]; self.ax_main.set_title(f"I-V Curve: {self.params['name']}"); self.canvas.draw()
+            self.params = { 'name': self.entries["Sample Name"].get(), 'start_i': float(self.entries["Start Current"].get()), 'stop_i': float(self.entries["Stop Current"].get()), 'points': int(self.entries["Num Points"].get()), 'delay': float(self.entries["Delay"].get()), 'initial_delay': float(self.entries["Initial Delay"].get()), 'compliance': float(self.entries["Compliance"].get()), 'k6221_visa': self.k6221_cb.get(), 'buffered': self.acquisition_var.get() == self.ACQ_BUFFERED, 'acquisition': self.acquisition_var.get() }
+            if not all(p for k, p in self.params.items() if k not in ('name', 'buffered')) or not hasattr(self, 'save_path'): raise ValueError("All fields and a save location are required.")
+            self.start_button.config(state='disabled'); self.stop_button.config(state='normal'); self.is_running = True; [self.data_storage[key].clear() for key in self.data_storage]; [line.set_data([], []) for line in [self.line_main, self.line_sub]]; self.ax_main.set_title(f"I-V Curve: {self.params['name']}"); self.live_plot.start()
             self.sweep_thread = threading.Thread(target=self._sweep_worker, args=(self.params,), daemon=True); self.sweep_thread.start()
         except Exception as e:
             self.log(f"ERROR on startup: {traceback.format_exc()}"); messagebox.showerror("Input Error", f"{e}")
@@ -295,39 +324,85 @@ class Passthrough_IV_GUI:
         if self.is_running: self.is_running = False; self.log("Stop command received..."); self.stop_button.config(state='disabled')
     def _sweep_worker(self, params):
         try:
+            # Rejected sweeps return before anything is opened; finally restores the UI
+            linear = self.sweep_scale_var.get() == 'Linear'
+            if not linear and params['start_i'] * params['stop_i'] <= 0: self.log("ERROR: Log sweep cannot cross zero."); return
+            if params['acquisition'] == self.ACQ_DCON and not linear: self.log("ERROR: Differential conductance needs a linear sweep."); return
             self.backend.connect(params['k6221_visa']); self.backend.configure_instruments(params['compliance'])
-            if self.sweep_scale_var.get() == 'Linear': current_points = np.linspace(params['start_i'], params['stop_i'], params['points'])
+            if linear: current_points = np.linspace(params['start_i'], params['stop_i'], params['points'])
             else:
-                if params['start_i'] * params['stop_i'] <= 0: self.log("ERROR: Log sweep cannot cross zero."); self.root.after(0, self._sweep_cleanup_ui); return
                 start_log, stop_log = np.log10(abs(params['start_i'])), np.log10(abs(params['stop_i'])); log_sweep = np.logspace(start_log, stop_log, params['points']); current_points = log_sweep * np.sign(params['start_i'])
             ts = datetime.now().strftime("%Y%m%d_%H%M%S"); filename = f"{params['name']}_{ts}_IV.dat"
             self.data_filepath = os.path.join(self.save_path, filename)
-            with open(self.data_filepath, 'w', newline='') as f: csv.writer(f).writerow([f"# Sample: {params['name']}"]); csv.writer(f).writerow(["Set Current (A)", "Measured Voltage (V)", "Resistance (Ohm)"])
+            resistance_column = "dV/dI (Ohm)" if params['acquisition'] == self.ACQ_DCON else "Resistance (Ohm)"
+            self.data_writer = RunFileWriter(self.data_filepath, header_rows=[[f"# Sample: {params['name']}", f"Acquisition: {params['acquisition']}"], ["Set Current (A)", "Measured Voltage (V)", resistance_column]])
 
             self.log("Sweep process starting...")
             self.log(f"Applying dummy current (1e-13 A) for stabilization..."); self.backend.set_current(1e-13)
             self.log(f"Waiting for initial settle delay ({params['initial_delay']}s)..."); time.sleep(params['initial_delay'])
 
             self.log("Initial stabilization complete. Starting main sweep.")
-            for i, current in enumerate(current_points):
-                if not self.is_running: self.log("Sweep aborted by user."); break
-                self.log(f"Step {i+1}/{len(current_points)}: Setting current to {current:.4e} A...")
-                self.backend.set_current(current); time.sleep(params['delay'])
-                voltage = self.backend.read_voltage()
-                self.root.after(0, self._update_ui_with_point, current, voltage)
-            else: self.log("Sweep completed successfully.")
+            if params['buffered']: self._run_buffered_sweep(current_points, params['delay'])
+            elif params['acquisition'] in (self.ACQ_PULSE, self.ACQ_DCON): self._run_delta_sweep(current_points, params)
+            else:
+                for i, current in enumerate(current_points):
+                    if not self.is_running: self.log("Sweep aborted by user."); break
+                    self.log(f"Step {i+1}/{len(current_points)}: Setting current to {current:.4e} A...")
+                    self.backend.set_current(current); time.sleep(params['delay'])
+                    voltage = self.backend.read_voltage()
+                    self.root.after(0, self._update_ui_with_point, current, voltage)
+                else: self.log("Sweep completed successfully.")
         except Exception as e:
             self.log(f"RUNTIME ERROR: {traceback.format_exc()}")
         finally:
             self.is_running = False; self.backend.close(); self.root.after(0, self._sweep_cleanup_ui)
+    def _run_buffered_sweep(self, current_points, delay):
+        """ The K6221 steps through each segment on its own; the K2182 buffer is read once per segment. """
+        self.backend.configure_buffered_sweep(); segment = Keithley6221.SWEEP_SEGMENT_POINTS
+        for start in range(0, len(current_points), segment):
+            if not self.is_running: self.log("Sweep aborted by user."); break
+            chunk = [float(c) for c in current_points[start:start + segment]]
+            self.log(f"Segment {start // segment + 1}: {len(chunk)} points, {chunk[0]:.4e} A to {chunk[-1]:.4e} A...")
+            voltages = self.backend.sweep_segment(chunk, delay)
+            self.root.after(0, self._update_ui_with_segment, chunk, voltages)
+        else: self.log("Sweep completed successfully.")
+    def _run_delta_sweep(self, current_points, params):
+        """ The K6221 runs the whole Pulse Delta / differential conductance sweep; its buffer is drained as it fills. """
+        currents = [float(c) for c in current_points]
+        if params['acquisition'] == self.ACQ_PULSE: self.backend.arm_pulse_delta_sweep(currents, params['compliance'])
+        else:
+            step = (currents[-1] - currents[0]) / max(len(currents) - 1, 1)
+            # The delta alternation is half a step, so neighbouring steps do not overlap
+            self.backend.arm_diff_conductance_sweep(currents[0], currents[-1], step, abs(step) / 2, params['compliance'])
+        # The sweep has ended once it is well past its expected length, or once no reading has arrived for a while
+        reading_s = self.backend.delta_reading_time_s(); received, last_reading = 0, time.monotonic()
+        deadline = last_reading + 2 * reading_s * len(currents) + self.DELTA_SWEEP_GRACE_S; stall_s = self.DELTA_SWEEP_GRACE_S + 10 * reading_s
+        while received < len(currents):
+            if not self.is_running: self.log("Sweep aborted by user."); return
+            time.sleep(self.DRAIN_INTERVAL_S); readings = self.backend.drain_readings()[:len(currents) - received]; now = time.monotonic()
+            if readings: self.root.after(0, self._update_ui_with_segment, currents[received:received + len(readings)], readings, params['acquisition'] == self.ACQ_DCON); received += len(readings); last_reading = now
+            elif now > deadline or now - last_reading > stall_s: break
+        if received < len(currents): self.log(f"WARNING: The K6221 sweep ended with {received} of {len(currents)} readings.")
+        else: self.log("Sweep completed successfully.")
+    def _update_ui_with_segment(self, currents, voltages, differential=False):
+        """ Stores a block of readings; differential (dV/dI) readings go to the resistance column. """
+        rows = []
+        for current, voltage in zip(currents, voltages):
+            if differential: voltage, resistance = float('nan'), voltage
+            else: resistance = voltage/current if current != 0 else float('inf')
+            self.data_storage['current'].append(current); self.data_storage['voltage'].append(voltage); self.data_storage['resistance'].append(resistance)
+            rows.append([f"{current:.6e}", f"{voltage:.6e}", f"{resistance:.6e}"])
+        self.data_writer.write_rows(rows); self.log(f"  Read {len(rows)} points, last: {voltages[-1]:.6e} {'Ω' if differential else 'V'}")
+        self.live_plot.request_redraw()
     def _update_ui_with_point(self, current, voltage):
         resistance = voltage/current if current != 0 else float('inf'); self.log(f"  Read: {voltage:.6e} V, R: {resistance:.6e} Ω")
         self.data_storage['current'].append(current); self.data_storage['voltage'].append(voltage); self.data_storage['resistance'].append(resistance)
-        with open(self.data_filepath, 'a', newline='') as f: csv.writer(f).writerow([f"{current:.6e}", f"{voltage:.6e}", f"{resistance:.6e}"])
-        self.line_main.set_data(self.data_storage['current'], self.data_storage['voltage']); self.line_sub.set_data(self.data_storage['current'], self.data_storage['resistance'])
-        for ax in [self.ax_main, self.ax_sub]: ax.relim(); ax.autoscale_view(True)
-        self.figure.tight_layout(pad=3.0); self.canvas.draw_idle()
+        self.data_writer.write_row([f"{current:.6e}", f"{voltage:.6e}", f"{resistance:.6e}"])
+        self.live_plot.request_redraw()  # Blitted; a full redraw only when the limits grow
     def _sweep_cleanup_ui(self):
+        # Runs after every queued point has been written
+        if self.data_writer: self.data_writer.close(); self.data_writer = None
+        if self.live_plot.running: self.live_plot.stop(); self.log(f"Plotting: {self.live_plot.summary()}")
         self.start_button.config(state='normal'); self.stop_button.config(state='disabled'); self.log("Ready for next sweep.")
 
     def start_visa_scan(self):
@@ -341,7 +416,7 @@ class Passthrough_IV_GUI:
         """Worker function that performs the slow VISA scan."""
         if not pyvisa: self.log("ERROR: PyVISA is not installed."); return
         try:
-            rm = pyvisa.ResourceManager()
+            rm = get_resource_manager()
             resources = rm.list_resources()
             self.backend.visa_queue.put(resources) # Use a queue on the backend object
         except Exception as e:
@@ -0,0 +1,114 @@
+"""
+Module: Acquisition_Engine.py
+Purpose: Producer/consumer acquisition thread shared by the PICA measurement GUIs.
+"""
+
+# -------------------------------------------------------------------------------
+# Name:         PICA Acquisition Engine
+# Purpose:      Runs the instrument reads of a measurement loop on a dedicated
+#               thread and hands the results to the Tk main thread through a
+#               bounded queue, so instrument waits never block the GUI.
+# Author:       Prathamesh Deshmukh
+# Created:      17/10/2026
+# Version:      1.0
+# -------------------------------------------------------------------------------
+
+import queue
+import threading
+
+from .Sample_Scheduler import SampleScheduler
+
+
+class AcquisitionEngine:
+    """
+    Calls ``acquire()`` repeatedly on a worker thread and queues its results.
+
+    - Every value returned by ``acquire()`` (other than None) is put on a
+      bounded queue. When the queue is full the worker waits for the GUI to
+      catch up instead of dropping samples.
+    - ``acquire()`` raises StopIteration when there is nothing left to
+      measure; the engine then queues ``COMPLETE`` and exits.
+    - Any other exception is queued as well and ends the acquisition,
+      mirroring the worker/queue pattern of the 6517B R-T GUI.
+    - ``period_s`` / ``mode`` pace the calls with a ``SampleScheduler``
+      (fixed rate by default); with a period of 0 the sample rate is set by
+      the instrument reads alone. Timing statistics are kept on
+      ``engine.scheduler``.
+    The GUI calls ``drain()`` from ``root.after`` and handles the whole batch
+    in one pass. To stop without blocking Tk it calls ``request_stop()`` and
+    polls ``is_running`` from ``root.after`` until the read in progress has
+    returned.
+    """
+
+    COMPLETE = "COMPLETE"
+
+    def __init__(self, acquire, period_s=0.0, mode=SampleScheduler.FIXED_RATE,
+                 maxsize=1000, name="Acquisition"):
+        self.acquire = acquire
+        self.scheduler = SampleScheduler(period_s, mode)
+        self.name = name
+        self.data_queue = queue.Queue(maxsize=maxsize)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            raise RuntimeError(f"{self.name} thread is already running.")
+        self._stop_event.clear()
+        self.scheduler.reset()
+        self._thread = threading.Thread(
+            target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def request_stop(self):
+        """Asks the worker to finish after the read in progress, without waiting."""
+        self._stop_event.set()
+
+    def stop(self, timeout=5.0):
+        """
+        Asks the worker to finish and waits up to ``timeout`` seconds for the
+        read in progress to complete. Returns True if the thread has exited.
+        """
+        self.request_stop()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        return not self.is_running
+
+    def drain(self, max_items=None):
+        """Returns every queued item (or up to ``max_items``) without blocking."""
+        items = []
+        while max_items is None or len(items) < max_items:
+            try:
+                items.append(self.data_queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _put(self, item):
+        while not self._stop_event.is_set():
+            try:
+                self.data_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        while self.scheduler.wait(self._stop_event):
+            try:
+                item = self.acquire()
+            except StopIteration:
+                self._put(self.COMPLETE)
+                break
+            except Exception as e:
+                self._put(e)
+                break
+            finally:
+                self.scheduler.mark_done()
+            if item is not None and not self._put(item):
+                break
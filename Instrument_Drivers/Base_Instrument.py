@@ -0,0 +1,181 @@
+"""
+Module: Base_Instrument.py
+Purpose: Shared VISA instrument base class for the PICA instrument drivers.
+"""
+
+# -------------------------------------------------------------------------------
+# Name:         PICA Base Instrument Driver
+# Purpose:      One VISA session wrapper used by every PICA driver. Provides a
+#               shared ResourceManager, setting caching, batched writes,
+#               *OPC? synchronisation and a non-blocking query API.
+# Author:       Prathamesh Deshmukh
+# Created:      17/10/2026
+# Version:      1.0
+# -------------------------------------------------------------------------------
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import pyvisa
+except ImportError:
+    pyvisa = None
+
+_resource_manager = None
+_resource_manager_lock = threading.Lock()
+
+
+def get_resource_manager():
+    """
+    Returns the process-wide VISA ResourceManager, creating it on first use.
+    ``Simulated_Instruments.install()`` replaces it with a simulated one.
+    """
+    global _resource_manager
+    with _resource_manager_lock:
+        if _resource_manager is None:
+            if pyvisa is None:
+                raise ConnectionError(
+                    "PyVISA is not installed. Please run 'pip install pyvisa'.")
+            _resource_manager = pyvisa.ResourceManager()
+        return _resource_manager
+
+
+class VisaInstrument:
+    """
+    Thin wrapper around a pyvisa message-based resource.
+
+    - ``set()`` remembers the last value written for each setting header and
+      skips the bus transaction if the value has not changed.
+    - ``write_batch()`` joins several commands into one bus transfer.
+    - ``query_async()`` runs a query on a per-instrument worker thread and
+      returns a ``concurrent.futures.Future``.
+    - ``wait_for_completion()`` replaces fixed sleeps with an *OPC? handshake.
+    - ``extended_timeout()`` lengthens the bus timeout for one long
+      operation and restores it afterwards.
+    All I/O on one instrument is serialised by a lock, so synchronous and
+    asynchronous calls can be mixed freely.
+    """
+
+    NAME = "Instrument"
+    COMMAND_SEPARATOR = ';'
+    SETTING_SEPARATOR = ' '
+
+    def __init__(self, visa_address, timeout=10000, resource_manager=None,
+                 **resource_kwargs):
+        rm = resource_manager or get_resource_manager()
+        self.visa_address = visa_address
+        self.resource = rm.open_resource(visa_address, **resource_kwargs)
+        self.resource.timeout = timeout
+        self._io_lock = threading.RLock()
+        self._settings_cache = {}
+        self._executor = None
+
+    # --- Raw I/O ---
+    def write(self, command):
+        with self._io_lock:
+            self.resource.write(command)
+
+    def write_batch(self, commands):
+        """Sends several commands as a single bus transfer."""
+        commands = [c for c in commands if c]
+        if commands:
+            self.write(self.COMMAND_SEPARATOR.join(commands))
+
+    def query(self, command):
+        with self._io_lock:
+            return self.resource.query(command).strip()
+
+    def query_float(self, command):
+        """Returns the first numeric field of a query response."""
+        return float(self.query(command).split(',')[0])
+
+    def query_floats(self, command):
+        return [float(v) for v in self.query(command).split(',') if v.strip()]
+
+    def query_ascii_values(self, command):
+        with self._io_lock:
+            return self.resource.query_ascii_values(command)
+
+    def query_binary_values(self, command, datatype='f', is_big_endian=False):
+        with self._io_lock:
+            return self.resource.query_binary_values(
+                command, datatype=datatype, is_big_endian=is_big_endian)
+
+    # --- Non-blocking reads ---
+    def query_async(self, command, parser=None):
+        """
+        Queues a query on this instrument's worker thread and returns a Future.
+        ``parser`` (e.g. ``float``) is applied to the stripped response.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"{self.NAME}-io")
+
+        def _run():
+            response = self.query(command)
+            return parser(response) if parser else response
+        return self._executor.submit(_run)
+
+    # --- Cached settings ---
+    def set(self, header, value, force=False):
+        """
+        Writes ``header`` followed by ``value`` unless the same value was the
+        last one written for this header. ``force`` always writes, e.g. for
+        safety-critical settings such as turning an output off. Returns True
+        if a write was issued.
+        """
+        value = str(value)
+        if not force and self._settings_cache.get(header) == value:
+            return False
+        self.write(f"{header}{self.SETTING_SEPARATOR}{value}")
+        self._settings_cache[header] = value
+        return True
+
+    def cached(self, header):
+        """Returns the last value written with ``set()`` for a header, or None."""
+        return self._settings_cache.get(header)
+
+    def invalidate_cache(self):
+        self._settings_cache.clear()
+
+    # --- Common IEEE-488.2 helpers ---
+    def identify(self):
+        return self.query('*IDN?')
+
+    def wait_for_completion(self):
+        """Blocks until all pending operations have finished (*OPC?)."""
+        return self.query('*OPC?')
+
+    @contextmanager
+    def extended_timeout(self, duration_s):
+        """
+        Raises the bus timeout to twice ``duration_s`` (if it is shorter) for
+        the body of the ``with`` block, so that a read waiting on a long
+        instrument-side operation does not time out. The previous timeout is
+        restored on exit, so later reads still fail fast.
+        """
+        previous = self.resource.timeout
+        self.resource.timeout = max(previous, int(duration_s * 2000))
+        try:
+            yield
+        finally:
+            self.resource.timeout = previous
+
+    def reset(self):
+        """Resets and clears the instrument, then waits for it to settle."""
+        self.write('*RST')
+        self.write('*CLS')
+        self.invalidate_cache()
+        self.wait_for_completion()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self.resource is not None:
+            try:
+                self.resource.close()
+            finally:
+                self.resource = None
+                self.invalidate_cache()
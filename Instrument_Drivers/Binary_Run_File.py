@@ -0,0 +1,182 @@
+"""
+Module: Binary_Run_File.py
+Purpose: Append-only binary run file that the plotter and analysis scripts memory-map instead of parsing.
+"""
+
+# -------------------------------------------------------------------------------
+# Name:         PICA Binary Run File
+# Purpose:      Stores the numeric columns of a run as little-endian float64
+#               records behind a self-describing JSON header, so a multi-hour
+#               run opens with np.memmap in milliseconds instead of being
+#               re-parsed from text with np.genfromtxt.
+#
+#               Layout:  b'PICARUN1' | uint32 header length | JSON header
+#                        (space padded so the data starts on a 64 byte
+#                        boundary) | row 0 | row 1 | ...
+#
+#               Each row holds one float64 per column. Rows are only ever
+#               appended, so a run interrupted mid-write loses at most the
+#               last, partial row, which readers ignore.
+# Author:       Prathamesh Deshmukh
+# Created:      17/10/2026
+# Version:      1.0
+# -------------------------------------------------------------------------------
+
+import json
+import os
+import struct
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+MAGIC = b'PICARUN1'
+FORMAT_VERSION = 1
+EXTENSION = '.pcrun'
+DTYPE = np.dtype('<f8')
+_ALIGNMENT = 64
+_LENGTH = struct.Struct('<I')
+
+# data: (rows, columns) float64 array, a read-only memmap when mapped;
+# columns: column names; metadata: the dict given to the writer.
+BinaryRun = namedtuple('BinaryRun', ['data', 'columns', 'metadata'])
+
+
+def binary_run_path(filepath):
+    """Path of the binary run file written next to a text data file."""
+    return os.path.splitext(os.fspath(filepath))[0] + EXTENSION
+
+
+def is_binary_run(filepath):
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _read_header(f):
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"'{f.name}' is not a PICA binary run file.")
+    (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+    header = json.loads(f.read(length).decode('utf-8'))
+    if header.get('version') != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported binary run version {header.get('version')} in '{f.name}'.")
+    return header, len(MAGIC) + _LENGTH.size + length
+
+
+def read_binary_run(filepath, mmap=True):
+    """
+    Opens a binary run file. With ``mmap=True`` no data is read until it is
+    used; ``run.data[:, i]`` is column ``run.columns[i]``.
+    """
+    with open(filepath, 'rb') as f:
+        header, offset = _read_header(f)
+        size = os.fstat(f.fileno()).st_size
+    columns = header['columns']
+    row_bytes = DTYPE.itemsize * len(columns)
+    rows = (size - offset) // row_bytes if row_bytes else 0
+    if rows == 0:
+        data = np.empty((0, len(columns)), dtype=DTYPE)
+    elif mmap:
+        data = np.memmap(filepath, dtype=DTYPE, mode='r', offset=offset,
+                         shape=(rows, len(columns)))
+    else:
+        data = np.fromfile(filepath, dtype=DTYPE, count=rows * len(columns),
+                           offset=offset).reshape(rows, len(columns))
+    return BinaryRun(data, columns, header.get('metadata', {}))
+
+
+class BinaryRunWriter:
+    """
+    Appends float64 rows to a binary run file.
+
+    - ``columns`` names the values of every row; ``metadata`` is any
+      JSON-serialisable dict (sample name, applied current, ...).
+    - ``append=True`` continues an existing file with the same columns,
+      dropping a partial last row left by an interrupted run.
+    The writer does not buffer rows itself; call ``flush()`` as often as the
+    matching text file is flushed (``RunFileWriter`` does this).
+    """
+
+    def __init__(self, filepath, columns, metadata=None, append=False):
+        self.filepath = filepath
+        self.columns = list(columns)
+        self.rows_written = 0
+        if not self.columns:
+            raise ValueError("A binary run file needs at least one column.")
+        self._row_bytes = DTYPE.itemsize * len(self.columns)
+        if append and os.path.exists(filepath) and os.path.getsize(filepath):
+            self._file = open(filepath, 'r+b')
+            try:
+                self._resume()
+            except Exception:
+                self._file.close()
+                raise
+        else:
+            self._file = open(filepath, 'wb')
+            self._write_header(metadata or {})
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    def _write_header(self, metadata):
+        header = json.dumps({
+            'format': 'PICA binary run',
+            'version': FORMAT_VERSION,
+            'dtype': DTYPE.str,
+            'columns': self.columns,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'metadata': metadata,
+        }).encode('utf-8')
+        fixed = len(MAGIC) + _LENGTH.size
+        header += b' ' * (-(fixed + len(header)) % _ALIGNMENT)
+        self._file.write(MAGIC + _LENGTH.pack(len(header)) + header)
+        self._file.flush()
+
+    def _resume(self):
+        header, offset = _read_header(self._file)
+        if header['columns'] != self.columns:
+            raise ValueError(
+                f"'{self.filepath}' has columns {header['columns']}, "
+                f"not {self.columns}.")
+        size = os.fstat(self._file.fileno()).st_size
+        self._file.truncate(offset + (size - offset) // self._row_bytes * self._row_bytes)
+        self._file.seek(0, os.SEEK_END)
+
+    def write_row(self, values):
+        self.write_rows([values])
+
+    def write_rows(self, rows):
+        if self._file is None:
+            raise ValueError(f"Binary run file '{self.filepath}' is closed.")
+        block = np.asarray(rows, dtype=DTYPE)
+        if block.ndim != 2 or block.shape[1] != len(self.columns):
+            raise ValueError(
+                f"Expected rows of {len(self.columns)} values, got shape {block.shape}.")
+        self._file.write(block.tobytes())
+        self.rows_written += len(block)
+
+    def flush(self, fsync=False):
+        if self._file is None:
+            return
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is None:
+            return
+        try:
+            self.flush(fsync=True)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
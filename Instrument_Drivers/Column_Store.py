@@ -0,0 +1,197 @@
+"""
+Module: Column_Store.py
+Purpose: Growable NumPy columns for the live plot data of the PICA measurement GUIs.
+"""
+
+# -------------------------------------------------------------------------------
+# Name:         PICA Column Store
+# Purpose:      Replaces the per-GUI dict of Python lists that was converted
+#               to float arrays by matplotlib on every redraw (O(n) per
+#               point). Each column is a preallocated float64 (or other
+#               dtype) buffer that doubles when full, so appending is
+#               amortised O(1) and handing a column to Line2D.set_data
+#               costs one memcpy. Past ``max_rows`` every other point is
+#               dropped and only every 2nd (then 4th, ...) new point is kept,
+#               so the whole run stays visible at a uniform, lower density
+#               while memory stays bounded; the data file keeps every point.
+# Author:       Prathamesh Deshmukh
+# Created:      17/10/2026
+# Version:      1.0
+# -------------------------------------------------------------------------------
+
+from collections.abc import Mapping
+
+import numpy as np
+
+DEFAULT_CAPACITY = 1024
+DEFAULT_MAX_ROWS = 500_000
+
+
+class DataColumn:
+    """
+    One growable 1-D array with the list operations the GUIs use
+    (``append``, ``extend``, ``clear``, ``len``, ``[-1]``, iteration).
+
+    ``values`` is a view of the filled part. ``np.asarray(column)`` and
+    ``Line2D.set_data(column, ...)`` take the data without a Python-level
+    conversion; ``copy.copy`` (done by ``set_data``) returns an ndarray
+    snapshot, so later appends never change what is already drawn.
+
+    Once decimated, the last element is always the newest point (so
+    ``column[-1]`` stays current) and is replaced by the next one unless
+    it falls on the ``decimation`` stride.
+    """
+
+    def __init__(self, dtype=float, capacity=DEFAULT_CAPACITY,
+                 max_rows=DEFAULT_MAX_ROWS):
+        self.max_rows = max_rows
+        self.decimation = 1
+        self._buffer = np.empty(max(1, int(capacity)), dtype=dtype)
+        self._size = 0
+        self._count = 0  # points appended since clear()
+        self._tail_is_provisional = False
+
+    @property
+    def dtype(self):
+        return self._buffer.dtype
+
+    @property
+    def capacity(self):
+        return len(self._buffer)
+
+    @property
+    def nbytes(self):
+        """Memory held by the column, including its unused capacity."""
+        return self._buffer.nbytes
+
+    @property
+    def values(self):
+        return self._buffer[:self._size]
+
+    def append(self, value):
+        if not self._tail_is_provisional and self._size == len(self._buffer):
+            self._make_room(1)
+        if self._tail_is_provisional:
+            self._size -= 1
+        self._buffer[self._size] = value
+        self._size += 1
+        self._tail_is_provisional = self._count % self.decimation != 0
+        self._count += 1
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._buffer.dtype).ravel()
+        if (self.decimation > 1 or self.max_rows
+                and self._size + len(values) > self.max_rows):
+            for value in values:
+                self.append(value)
+            return
+        if self._size + len(values) > len(self._buffer):
+            self._make_room(len(values))
+        self._buffer[self._size:self._size + len(values)] = values
+        self._size += len(values)
+        self._count += len(values)
+
+    def truncate(self, size):
+        """Drops the points after the first ``size`` (undecimated columns only)."""
+        if self.decimation > 1:
+            raise ValueError("A decimated column cannot be truncated.")
+        self._size = self._count = max(0, min(size, self._size))
+
+    def clear(self):
+        self._size = 0
+        self._count = 0
+        self.decimation = 1
+        self._tail_is_provisional = False
+
+    def _make_room(self, count):
+        needed = self._size + count
+        if self.max_rows and needed > self.max_rows:
+            self._decimate()
+            needed = self._size + count
+        capacity = len(self._buffer)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        if self.max_rows:
+            capacity = min(capacity, self.max_rows)
+        buffer = np.empty(capacity, dtype=self._buffer.dtype)
+        buffer[:self._size] = self.values
+        self._buffer = buffer
+
+    def _decimate(self):
+        """Keeps the points on twice the current stride, plus the newest one."""
+        newest = self.values[-1]
+        on_stride = self.values[:-1] if self._tail_is_provisional else self.values
+        kept = on_stride[::2].copy()
+        self.decimation *= 2
+        self._buffer[:len(kept)] = kept
+        self._size = len(kept)
+        self._tail_is_provisional = (self._count - 1) % self.decimation != 0
+        if self._tail_is_provisional:
+            self._buffer[self._size] = newest
+            self._size += 1
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __array__(self, dtype=None, copy=None):
+        if copy:
+            return np.array(self.values, dtype=dtype)
+        return np.asarray(self.values, dtype=dtype)
+
+    def __copy__(self):
+        return self.values.copy()
+
+    def __repr__(self):
+        return f"DataColumn({self.values!r})"
+
+
+class ColumnStore(Mapping):
+    """
+    Named ``DataColumn``s for the live plots of one GUI, used in place of
+    ``{'time': [], 'temperature': [], ...}``:
+
+        self.data_storage = ColumnStore(['time', 'temperature'])
+        self.data_storage['time'].append(elapsed)
+        line.set_data(self.data_storage['time'], self.data_storage['temperature'])
+
+    ``dtypes`` overrides the float64 default per column (e.g. ``{'loop': int}``).
+    All columns should receive the same number of points so that they are
+    decimated at the same time once ``max_rows`` is reached.
+    """
+
+    def __init__(self, columns, dtypes=None, capacity=DEFAULT_CAPACITY,
+                 max_rows=DEFAULT_MAX_ROWS):
+        dtypes = dtypes or {}
+        self._columns = {
+            name: DataColumn(dtypes.get(name, float), capacity, max_rows)
+            for name in columns}
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self):
+        return len(self._columns)
+
+    @property
+    def rows(self):
+        return min((len(column) for column in self._columns.values()), default=0)
+
+    def append(self, **values):
+        """Appends one point to every named column."""
+        for name, value in values.items():
+            self._columns[name].append(value)
+
+    def clear(self):
+        for column in self._columns.values():
+            column.clear()
@@ -0,0 +1,91 @@
+"""
+Module: Keithley_2182.py
+Purpose: Shared driver for the Keithley 2182/2182A nanovoltmeter.
+"""
+
+from .Base_Instrument import VisaInstrument
+
+
+class Keithley2182(VisaInstrument):
+    """Keithley 2182 nanovoltmeter on its own GPIB address."""
+
+    NAME = "Keithley2182"
+
+    def __init__(self, visa_address, timeout=10000, **kwargs):
+        super().__init__(visa_address, timeout=timeout, **kwargs)
+
+    def reset(self):
+        self.write("*rst; status:preset; *cls")
+        self.invalidate_cache()
+        self.wait_for_completion()
+
+    def measure_bus_triggered(self, samples=2, trigger_delay=0.1,
+                              srq_timeout_ms=10000):
+        """
+        Takes ``samples`` bus-triggered readings into the trace buffer and
+        returns their mean. Completion is signalled by SRQ on the
+        buffer-full measurement event.
+        """
+        self.write_batch([
+            "status:measurement:enable 512; *sre 1",
+            f"sample:count {samples}",
+            "trigger:source bus",
+            f"trigger:delay {trigger_delay}",
+            f"trace:points {samples}",
+            "trace:feed sense1; feed:control next",
+            "initiate",
+        ])
+        with self._io_lock:
+            self.resource.assert_trigger()
+            self.resource.wait_for_srq(timeout=srq_timeout_ms)
+        voltages = self.query_ascii_values("trace:data?")
+        self.query("status:measurement?")
+        self.write("trace:clear; feed:control next")
+        return sum(voltages) / len(voltages) if voltages else float('nan')
+
+    # --- Configure-once triggered acquisition ---
+    def configure_triggered_trace(self, samples=2, trigger_delay=0.1,
+                                  external_trigger=False):
+        """
+        Programs the trigger model and trace buffer once for a run of
+        ``samples``-reading acquisitions, and arms the first one. Each
+        acquisition is then started by ``trigger()`` (bus) or, with
+        ``external_trigger``, by a Trigger Link pulse, and collected by
+        ``read_trace()``.
+        """
+        self.write_batch([
+            "status:measurement:enable 512; *sre 1",
+            f"sample:count {samples}",
+            f"trigger:source {'external' if external_trigger else 'bus'}",
+            f"trigger:delay {trigger_delay}",
+            f"trace:points {samples}",
+            "trace:clear; trace:feed sense1; feed:control next",
+            "initiate",
+        ])
+
+    def trigger(self):
+        """Starts the armed acquisition with a bus trigger (GET)."""
+        with self._io_lock:
+            self.resource.assert_trigger()
+
+    def read_trace(self, srq_timeout_ms=10000):
+        """
+        Waits (SRQ) for the triggered acquisition and returns its readings.
+        The data fetch, the status read that clears the SRQ and the re-arm
+        for the next acquisition go out as one transfer.
+        """
+        with self._io_lock:
+            self.resource.wait_for_srq(timeout=srq_timeout_ms)
+            reply = self.query("trace:data?; :status:measurement?; "
+                               ":trace:clear; :trace:feed:control next; :initiate")
+        return [float(v) for v in reply.split(';')[0].split(',') if v.strip()]
+
+    def fetch_voltage(self):
+        """Returns the latest reading of a free-running (INIT:CONT ON) meter."""
+        return self.query_float("FETC?")
+
+    def shutdown(self):
+        try:
+            self.write("*rst")
+        finally:
+            self.close()
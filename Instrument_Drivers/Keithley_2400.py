@@ -0,0 +1,139 @@
+"""
+Module: Keithley_2400.py
+Purpose: Shared driver for the Keithley 2400 SourceMeter (current source mode).
+"""
+
+import time
+
+import numpy as np
+
+from .Base_Instrument import VisaInstrument
+
+
+class Keithley2400(VisaInstrument):
+    """
+    Keithley 2400 configured as a current source with voltage readback.
+    The measure function and data format are configured once, so each
+    ``read_voltage()`` is a single :READ? round-trip.
+    """
+
+    NAME = "Keithley2400"
+    # The 2400 source memory list holds at most 100 points per :SOUR:LIST.
+    LIST_SWEEP_MAX_POINTS = 100
+
+    def __init__(self, visa_address, timeout=10000, **kwargs):
+        super().__init__(visa_address, timeout=timeout, **kwargs)
+
+    def reset(self):
+        self.write('*RST')
+        self.write(':STAT:PRES;*CLS')
+        self.invalidate_cache()
+        self.wait_for_completion()
+
+    def configure_current_source(self, compliance_v, current_range=None,
+                                 nplc=1, front_terminals=True):
+        """Sources current and measures voltage; auto source range if no range is given."""
+        range_cmd = (f":SOUR:CURR:RANG {current_range:g}" if current_range
+                     else ":SOUR:CURR:RANG:AUTO 1")
+        self.write_batch([
+            f":ROUT:TERM {'FRON' if front_terminals else 'REAR'}",
+            ":SOUR:FUNC CURR",
+            ":SOUR:CURR:MODE FIX",
+            range_cmd,
+            ':SENS:FUNC "VOLT"',
+            ":SENS:VOLT:RANG:AUTO 1",
+            f":SENS:VOLT:PROT {compliance_v:g}",
+            f":SENS:VOLT:NPLC {nplc:g}",
+            ":FORM:ELEM VOLT",
+        ])
+        self.set(":SOUR:CURR", "0")
+
+    def set_current(self, current_a):
+        self.set(":SOUR:CURR", f"{current_a:.6e}")
+
+    @property
+    def source_current(self):
+        cached = self.cached(":SOUR:CURR")
+        return float(cached) if cached is not None else 0.0
+
+    def ramp_to_current(self, target_a, steps=5, pause=0.01):
+        """Steps the source from the present level to ``target_a``."""
+        for current in np.linspace(self.source_current, target_a, steps):
+            self.set_current(current)
+            if pause:
+                time.sleep(pause)
+
+    def enable_output(self):
+        self.set(":OUTP", "ON")
+
+    def disable_output(self):
+        self.set(":OUTP", "OFF", force=True)
+
+    def read_voltage(self):
+        return self.query_float(":READ?")
+
+    # --- Trigger Link ---
+    def configure_trigger_link(self, output_line=2):
+        """
+        Pulses Trigger Link ``output_line`` after the source action of every
+        ``initiate()``, e.g. to trigger a 2182 set to external trigger once
+        the new current is applied.
+        """
+        self.write_batch([
+            f":TRIG:OLIN {output_line}",
+            ":TRIG:OUTP SOUR",
+            ":ARM:COUN 1",
+            ":TRIG:COUN 1",
+        ])
+
+    def initiate(self):
+        """Runs one source-measure cycle of the trigger model (no readback)."""
+        self.write(":INIT")
+
+    def read_voltage_async(self):
+        return self.query_async(":READ?", lambda r: float(r.split(',')[0]))
+
+    # --- Hardware source-list sweep ---
+    def list_sweep(self, currents, source_delay):
+        """
+        Runs ``currents`` through the source-list/trigger model and returns the
+        measured voltages from one :READ? of the output buffer.
+        """
+        currents = np.asarray(currents, dtype=float)
+        if currents.size == 0:
+            return np.array([])
+        if currents.size > self.LIST_SWEEP_MAX_POINTS:
+            raise ValueError(
+                f"Source list is limited to {self.LIST_SWEEP_MAX_POINTS} points per chunk.")
+
+        list_str = ",".join(f"{c:.6e}" for c in currents)
+        self.write_batch([
+            ":SOUR:CURR:MODE LIST",
+            f":SOUR:LIST:CURR {list_str}",
+            f":SOUR:DEL {source_delay:.4f}",
+            ":FORM:ELEM VOLT",
+            ":ARM:COUN 1",
+            f":TRIG:COUN {currents.size}",
+        ])
+        # Allow for the full chunk to complete before the :READ? times out.
+        expected_s = currents.size * (source_delay + 0.05)
+        with self.extended_timeout(expected_s):
+            voltages = np.array(self.query_floats(":READ?"))
+        if voltages.size != currents.size:
+            raise IOError(
+                f"Expected {currents.size} readings from the 2400 buffer, got {voltages.size}.")
+        return voltages
+
+    def end_list_sweep(self):
+        """Returns the source to fixed mode at 0 A after a list sweep."""
+        self.write_batch([":SOUR:CURR:MODE FIX", ":TRIG:COUN 1"])
+        self.invalidate_cache()
+        self.set_current(0)
+
+    def shutdown(self):
+        """Ramps the source to zero and turns the output off."""
+        try:
+            self.ramp_to_current(0.0)
+            self.disable_output()
+        finally:
+            self.close()
@@ -0,0 +1,300 @@
+"""
+Module: Keithley_6221.py
+Purpose: Shared driver for the Keithley 6221 current source (with a 2182A on
+         its RS-232/Trigger Link for Delta mode and passthrough readings).
+"""
+
+import time
+
+from .Base_Instrument import VisaInstrument
+
+
+class Keithley6221(VisaInstrument):
+    """Keithley 6221 AC/DC current source."""
+
+    NAME = "Keithley6221"
+    # Delta-family modes (SCPI subsystem of each)
+    DELTA = "DELT"
+    PULSE_DELTA = "PDEL"
+    DIFF_CONDUCTANCE = "DCON"
+    # The 6221 trace buffer stores up to 65,536 delta readings.
+    DELTA_BUFFER_POINTS = 65000
+    # Points per built-in sweep segment; the 2182A buffer holds 1024 readings.
+    SWEEP_SEGMENT_POINTS = 100
+    # Time allowed per sweep step for the 2182A reading and its handshake.
+    SWEEP_STEP_OVERHEAD_S = 0.2
+    LINE_FREQUENCY_HZ = 50
+
+    def __init__(self, visa_address, timeout=25000, **kwargs):
+        super().__init__(visa_address, timeout=timeout, **kwargs)
+        self.buffer_binary = False
+        self.buffer_mode = self.DELTA
+        self.buffer_count = self.DELTA_BUFFER_POINTS
+        self.buffer_cursor = 0
+        self.buffer_arm_time = None
+        self.pulse_timing = (5, 2)  # (interval in PLC, low measurements)
+        self.dcon_delay_s = 0.002
+
+    def reset(self):
+        self.write("*rst; status:preset; *cls")
+        self.invalidate_cache()
+        self.wait_for_completion()
+
+    # --- Delta mode ---
+    def configure_delta(self, high_current, compliance_v):
+        self.write_batch([
+            f"SOUR:DELT:HIGH {high_current}",
+            f"SOUR:DELT:PROT {compliance_v}",
+        ])
+
+    def configure_pulse_delta(self, high_current, compliance_v, width_s=110e-6,
+                              source_delay_s=16e-6, interval_plc=5,
+                              low_measurements=2):
+        """
+        Pulse Delta: ``width_s`` long pulses of ``high_current`` between
+        zero-current lows, one reading every ``interval_plc`` power-line
+        cycles. The low duty cycle keeps the sample from self-heating.
+        """
+        self.write_batch([
+            f"SOUR:CURR:COMP {compliance_v}",
+            f"SOUR:PDEL:HIGH {high_current}",
+            "SOUR:PDEL:LOW 0",
+            f"SOUR:PDEL:WIDT {width_s}",
+            f"SOUR:PDEL:SDEL {source_delay_s}",
+            f"SOUR:PDEL:INT {interval_plc}",
+            f"SOUR:PDEL:LME {low_measurements}",
+            "SOUR:PDEL:RANG BEST",
+            "SOUR:PDEL:SWE OFF",
+        ])
+        self.pulse_timing = (interval_plc, low_measurements)
+
+    def configure_pulse_delta_sweep(self, currents, compliance_v, **pulse_kwargs):
+        """Pulse Delta with one reading at each of ``currents`` (a list sweep)."""
+        self.configure_pulse_delta(currents[0], compliance_v, **pulse_kwargs)
+        self.write_batch([
+            "SOUR:SWE:SPAC LIST",
+            "SOUR:LIST:CURR " + ",".join(f"{c:.6e}" for c in currents),
+            "SOUR:SWE:COUN 1",
+            "SOUR:SWE:CAB OFF",
+            "SOUR:PDEL:SWE ON",
+        ])
+
+    def configure_diff_conductance(self, start, stop, step, delta, compliance_v,
+                                   delay_s=0.002):
+        """
+        Differential conductance sweep from ``start`` to ``stop`` in ``step``
+        steps with a ``delta`` current alternation at each step. Readings
+        are dV/dI in ohms.
+        """
+        self.write_batch([
+            f"SOUR:CURR:COMP {compliance_v}",
+            f"SOUR:DCON:STAR {start}",
+            f"SOUR:DCON:STEP {step}",
+            f"SOUR:DCON:STOP {stop}",
+            f"SOUR:DCON:DELT {delta}",
+            f"SOUR:DCON:DEL {delay_s}",
+            "SOUR:DCON:CAB OFF",
+            "UNIT OHMS",
+        ])
+        self.dcon_delay_s = delay_s
+
+    def delta_reading_time_s(self, mode=None):
+        """
+        Nominal time per reading of a Delta-family ``mode`` (the armed one
+        by default), from the configured pulse interval or step delay.
+        """
+        mode = mode or self.buffer_mode
+        if mode == self.PULSE_DELTA:
+            interval_plc, low_measurements = self.pulse_timing
+            return (low_measurements + 1) * interval_plc / self.LINE_FREQUENCY_HZ
+        if mode == self.DIFF_CONDUCTANCE:
+            return self.dcon_delay_s + self.SWEEP_STEP_OVERHEAD_S
+        return self.SWEEP_STEP_OVERHEAD_S
+
+    def arm_delta(self, mode=DELTA):
+        """Arms and starts a free-running Delta (or Pulse Delta) measurement."""
+        self.write(f"SOUR:{mode}:ARM")
+        self.wait_for_completion()
+        self.write("INIT:IMM")
+
+    def fetch_fresh_delta(self):
+        """Returns the newest delta reading (SENS:DATA:FRES?)."""
+        return self.query_float('SENSe:DATA:FRESh?')
+
+    def arm_delta_buffer(self, binary=False, mode=DELTA, count=None):
+        """
+        Arms a Delta-family ``mode`` so that every reading is stored in the
+        trace buffer. ``count`` is the number of readings (per sweep step
+        for swept Pulse Delta); it does not apply to differential
+        conductance, whose sweep sets the number of readings.
+        """
+        count = count or self.DELTA_BUFFER_POINTS
+        self.write_batch([
+            "SOUR:SWE:ABOR",
+            "TRAC:CLE",
+            f"TRAC:POIN {self.DELTA_BUFFER_POINTS}",
+            f"SOUR:{mode}:COUN {count}" if mode != self.DIFF_CONDUCTANCE else "",
+            "FORM:ELEM READ,TST",
+        ])
+        if binary:
+            self.write_batch(["FORM:DATA SRE", "FORM:BORD SWAP"])
+        else:
+            self.write("FORM:DATA ASC")
+        self.arm_delta(mode)
+        self.buffer_binary = binary
+        self.buffer_mode = mode
+        self.buffer_count = count
+        self.buffer_cursor = 0
+        self.buffer_arm_time = time.time()
+
+    def drain_delta_buffer(self):
+        """
+        Returns (voltages, timestamps) for every delta reading stored since the
+        previous drain. Timestamps are host epoch seconds derived from the
+        6221 buffer timestamps. The buffer is re-armed once it is full.
+        """
+        available = int(self.query_float("TRAC:POIN:ACT?"))
+        count = available - self.buffer_cursor
+        if count <= 0:
+            return [], []
+        cmd = f"TRAC:DATA:SEL? {self.buffer_cursor},{count}"
+        if self.buffer_binary:
+            values = self.query_binary_values(cmd, datatype='f',
+                                              is_big_endian=False)
+        else:
+            values = self.query_ascii_values(cmd)
+        voltages = list(values[0::2])
+        timestamps = [self.buffer_arm_time + t for t in values[1::2]]
+        self.buffer_cursor = available
+        if available >= self.DELTA_BUFFER_POINTS:
+            self.arm_delta_buffer(self.buffer_binary, self.buffer_mode,
+                                  self.buffer_count)
+        return voltages, timestamps
+
+    def clear_source(self):
+        self.write("SOUR:CLE")
+        self.invalidate_cache()
+
+    # --- DC current source ---
+    def configure_dc_source(self, compliance_v):
+        self.write_batch([
+            "SOUR:FUNC CURR",
+            "SOUR:CURR:RANG:AUTO ON",
+            f"SOUR:CURR:COMP {compliance_v}",
+        ])
+
+    def set_current(self, current_a):
+        self.set("SOUR:CURR", current_a)
+
+    def output_on(self):
+        self.set("OUTP:STAT", "ON")
+
+    def output_off(self):
+        self.set("OUTP:STAT", "OFF", force=True)
+
+    # --- Built-in sweep with 2182A buffering ---
+    def configure_2182_triggered_buffer(self):
+        """
+        Sets the 2182A on the RS-232 link to store one reading in its buffer
+        per Trigger Link pulse from the 6221.
+        """
+        for command in ("INIT:CONT OFF", "TRIG:SOUR EXT", "TRIG:DEL 0",
+                        "SAMP:COUN 1", "TRAC:FEED SENS1"):
+            self.serial_send(command)
+
+    def buffered_list_sweep(self, currents, step_delay):
+        """
+        Runs ``currents`` through the 6221 list sweep. After each step's
+        delay the 6221 triggers a 2182A reading over Trigger Link and waits
+        for its measurement-complete pulse before stepping on. The voltages
+        are returned from one bulk read of the 2182A buffer at the end.
+        """
+        currents = [float(c) for c in currents]
+        if not currents:
+            return []
+        if len(currents) > self.SWEEP_SEGMENT_POINTS:
+            raise ValueError(
+                f"Sweep segments are limited to {self.SWEEP_SEGMENT_POINTS} points.")
+        count = len(currents)
+        for command in ("TRAC:CLE", f"TRAC:POIN {count}", f"TRIG:COUN {count}",
+                        "TRAC:FEED:CONT NEXT", "INIT"):
+            self.serial_send(command)
+
+        self.write_batch([
+            "SOUR:SWE:SPAC LIST",
+            "SOUR:LIST:CURR " + ",".join(f"{c:.6e}" for c in currents),
+            "SOUR:LIST:DEL " + ",".join([f"{step_delay:.4f}"] * count),
+            "SOUR:SWE:RANG BEST",
+            "SOUR:SWE:COUN 1",
+            "SOUR:SWE:CAB OFF",
+            "TRIG:SOUR TLIN",
+            "TRIG:DIR SOUR",
+            "TRIG:ILIN 1",
+            "TRIG:OLIN 2",
+            "TRIG:OUTP DEL",
+            "SOUR:SWE:ARM",
+            "INIT:IMM",
+        ])
+        # Allow for the whole segment to complete before *OPC? times out;
+        # later reads get the normal timeout back.
+        expected_s = count * (step_delay + self.SWEEP_STEP_OVERHEAD_S)
+        with self.extended_timeout(expected_s):
+            self.wait_for_completion()
+            voltages = self.serial_query_values("TRAC:DATA?", count)
+        if len(voltages) != count:
+            raise IOError(
+                f"Expected {count} readings from the 2182A buffer, got {len(voltages)}.")
+        return voltages
+
+    # --- 2182A passthrough over the 6221 RS-232 port ---
+    def serial_send(self, command):
+        """Forwards a command to the 2182A and waits until it has been sent."""
+        self.write(f"SYST:COMM:SER:SEND '{command}'")
+        self.wait_for_completion()
+
+    def serial_query(self, command, timeout_s=2.0, poll_s=0.05):
+        """Sends a query to the 2182A and polls the 6221 serial buffer for the reply."""
+        self.write(f"SYST:COMM:SER:SEND '{command}'")
+        deadline = time.time() + timeout_s
+        while time.time() < deadline:
+            response = self.query("SYST:COMM:SER:ENT?")
+            if response:
+                return response.split('\n')[-1].strip()
+            time.sleep(poll_s)
+        raise TimeoutError("No response from K2182 via passthrough.")
+
+    def serial_query_values(self, command, count, timeout_s=5.0, poll_s=0.05):
+        """
+        Sends a query to the 2182A and collects its (possibly long) reply
+        from the 6221 serial buffer until ``count`` values have arrived and
+        the buffer has run empty.
+        """
+        self.write(f"SYST:COMM:SER:SEND '{command}'")
+        reply = ''
+        deadline = time.time() + timeout_s
+        while time.time() < deadline:
+            chunk = self.query("SYST:COMM:SER:ENT?")
+            if chunk:
+                reply += chunk
+                continue
+            values = [v for v in reply.split(',') if v.strip()]
+            if len(values) >= count:
+                return [float(v) for v in values]
+            time.sleep(poll_s)
+        raise TimeoutError("Incomplete response from K2182 via passthrough.")
+
+    def configure_2182_free_running(self):
+        for command in ("*RST", 'FUNC "VOLT"', "SENS:VOLT:DC:RANG:AUTO ON",
+                        "INIT:CONT ON"):
+            self.serial_send(command)
+
+    def read_2182_voltage(self):
+        """Fetches the latest reading from a free-running 2182A."""
+        return float(self.serial_query("FETC?"))
+
+    def shutdown(self):
+        try:
+            self.clear_source()
+            self.write("*RST")
+        finally:
+            self.close()
@@ -0,0 +1,204 @@
+"""
+Module: Keithley_6517B.py
+Purpose: Shared driver for the Keithley 6517B electrometer / high-resistance meter.
+"""
+
+import re
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from .Base_Instrument import VisaInstrument
+
+# Readings carry a four-letter unit suffix, e.g. '+1.234E+09NOHM'.
+_READING_RE = re.compile(r'([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)')
+
+# Reported for an out-of-range reading.
+OVERFLOW_READING = 9.9e37
+
+# mean and sample standard deviation of the n valid readings of one block.
+BlockStatistics = namedtuple('BlockStatistics', ['mean', 'std', 'n'])
+
+
+def parse_reading(response):
+    """Returns the numeric part of the first field of a 6517B reading."""
+    match = _READING_RE.match(response.split(',')[0].strip())
+    if not match:
+        raise ValueError(f"Unexpected 6517B reading: {response!r}")
+    return float(match.group(1))
+
+
+def block_statistics(readings):
+    """Statistics of a block of readings; overflow readings are left out."""
+    values = np.asarray(readings, dtype=float)
+    values = values[np.isfinite(values) & (np.abs(values) < OVERFLOW_READING)]
+    if not len(values):
+        return BlockStatistics(float('nan'), float('nan'), 0)
+    std = float(values.std(ddof=1)) if len(values) > 1 else 0.0
+    return BlockStatistics(float(values.mean()), std, len(values))
+
+
+class Keithley6517B(VisaInstrument):
+    """Keithley 6517B electrometer with its built-in voltage source."""
+
+    NAME = "Keithley6517B"
+    LINE_FREQUENCY_HZ = 50
+    # Per-reading trigger and storage time on top of the integration time
+    READING_OVERHEAD_S = 0.02
+
+    def __init__(self, visa_address, timeout=20000, **kwargs):
+        super().__init__(visa_address, timeout=timeout, **kwargs)
+        self.nplc = 1
+        self.alt_polarity = None
+
+    def reset(self):
+        self.write("*RST;:STAT:PRES;*CLS")
+        self.invalidate_cache()
+        self.wait_for_completion()
+
+    # --- Measurement function ---
+    def configure_resistance(self, nplc=1):
+        self.nplc = nplc
+        self.write_batch([
+            ":SENS:FUNC 'RES'",
+            f":SENS:RES:NPLC {nplc:g}",
+            ":SENS:RES:RANG:AUTO 1",
+            ":FORM:ELEM READ",
+        ])
+
+    def configure_current(self, nplc=1):
+        self.nplc = nplc
+        self.write_batch([
+            ":SENS:FUNC 'CURR'",
+            f":SENS:CURR:NPLC {nplc:g}",
+            ":SENS:CURR:RANG:AUTO 1",
+            ":FORM:ELEM READ",
+        ])
+
+    def zero_correct(self):
+        """
+        Zero-check / zero-correct sequence. Each step is synchronised with
+        *OPC? instead of a fixed settle delay.
+        """
+        self.write(':SYSTem:ZCHeck ON')
+        self.wait_for_completion()
+        self.write(':SYSTem:ZCORrect:ACQuire')
+        self.wait_for_completion()
+        self.write(':SYSTem:ZCHeck OFF')
+        self.write(':SYSTem:ZCORrect ON')
+        self.wait_for_completion()
+
+    # --- Voltage source ---
+    def set_source_voltage(self, voltage):
+        self.set(":SOUR:VOLT:LEV", f"{voltage:g}")
+
+    @property
+    def source_voltage(self):
+        cached = self.cached(":SOUR:VOLT:LEV")
+        return float(cached) if cached is not None else self.query_float(":SOUR:VOLT?")
+
+    def enable_source(self):
+        self.set(":OUTP", "ON")
+
+    def disable_source(self):
+        self.set(":OUTP", "OFF", force=True)
+
+    # --- Readings ---
+    def read(self):
+        """Triggers and returns one reading of the configured function."""
+        return parse_reading(self.query(":READ?"))
+
+    def read_async(self):
+        return self.query_async(":READ?", parse_reading)
+
+    # --- Trace buffer ---
+    def read_buffered_block(self, count):
+        """
+        Takes ``count`` readings of the configured function into the trace
+        buffer and returns them from one transfer.
+        """
+        self._allow_for(count * (self.nplc / self.LINE_FREQUENCY_HZ
+                                 + self.READING_OVERHEAD_S))
+        self.write_batch([
+            ":TRAC:CLE",
+            f":TRAC:POIN {count}",
+            ":TRAC:FEED SENS",
+            ":TRAC:FEED:CONT NEXT",
+            f":TRIG:COUN {count}",
+            ":INIT",
+        ])
+        self.wait_for_completion()
+        return self.fetch_buffer()
+
+    def fetch_buffer(self):
+        """Returns every reading stored in the trace buffer."""
+        return [parse_reading(field)
+                for field in self.query(":TRAC:DATA?").split(',') if field.strip()]
+
+    # --- Alternating-polarity resistance ---
+    def configure_alternating_polarity(self, alternating_v, offset_v=0.0,
+                                       measure_time_s=15.0, discard=3, readings=10):
+        """
+        Alternating-polarity test sequence: the source steps between
+        ``offset_v`` +/- ``alternating_v`` every ``measure_time_s`` and each
+        stored resistance is computed from the currents of successive
+        polarities, cancelling background currents of >1e12 ohm samples.
+        The first ``discard`` readings are not stored.
+        """
+        self.write_batch([
+            ":TSEQ:TYPE ALTP",
+            f":TSEQ:ALTP:OFSV {offset_v:g}",
+            f":TSEQ:ALTP:ALTV {alternating_v:g}",
+            f":TSEQ:ALTP:MTIM {measure_time_s:g}",
+            f":TSEQ:ALTP:DISC {discard}",
+            f":TSEQ:ALTP:READ {readings}",
+            ":TSEQ:TSO IMM",
+        ])
+        self.alt_polarity = (measure_time_s, discard, readings)
+
+    def alternating_polarity_time_s(self):
+        """Nominal duration of one configured alternating-polarity sequence."""
+        if self.alt_polarity is None:
+            raise RuntimeError("The alternating-polarity sequence is not configured.")
+        measure_time_s, discard, readings = self.alt_polarity
+        return (discard + readings + 1) * measure_time_s
+
+    def read_alternating_polarity(self):
+        """
+        Runs the configured sequence and returns its resistances from the
+        buffer. *OPC? can return once the sequence is armed, so the number
+        of stored readings is polled until the sequence has stored all of
+        them; an IOError is raised if it does not within twice its nominal
+        duration.
+        """
+        duration_s = self.alternating_polarity_time_s()
+        measure_time_s, _, readings = self.alt_polarity
+        self._allow_for(duration_s)
+        self.write_batch([":TRAC:CLE", ":TSEQ:ARM"])
+        deadline = time.monotonic() + 2 * duration_s
+        while True:
+            stored = int(self.query_float(":TRAC:POIN:ACT?"))
+            if stored >= readings:
+                break
+            if time.monotonic() > deadline:
+                raise IOError(
+                    f"Alternating-polarity sequence stored {stored} of {readings} readings.")
+            time.sleep(min(1.0, measure_time_s))
+        values = self.fetch_buffer()
+        if len(values) != readings:
+            raise IOError(
+                f"Expected {readings} alternating-polarity readings, got {len(values)}.")
+        return values
+
+    def _allow_for(self, duration_s):
+        """Extends the bus timeout so that *OPC? outlasts a ``duration_s`` acquisition."""
+        self.resource.timeout = max(self.resource.timeout, int(duration_s * 2000))
+
+    def shutdown(self):
+        """Sets the source to 0 V and turns it off."""
+        try:
+            self.set_source_voltage(0)
+            self.disable_source()
+        finally:
+            self.close()
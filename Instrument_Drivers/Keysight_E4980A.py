@@ -0,0 +1,129 @@
+"""
+Module: Keysight_E4980A.py
+Purpose: Shared driver for the Keysight/Agilent E4980A precision LCR meter.
+"""
+
+import numpy as np
+
+from .Base_Instrument import VisaInstrument
+
+
+class KeysightE4980A(VisaInstrument):
+    """Keysight E4980A LCR meter, bus-triggered single and list-sweep measurements."""
+
+    NAME = "KeysightE4980A"
+    # Nominal single-measurement times per :APER setting (>= 1 kHz, no
+    # averaging). Low test frequencies take longer; see the E4980A manual.
+    APERTURE_TIMES_S = {'SHOR': 0.01, 'MED': 0.1, 'LONG': 0.25}
+    # The list sweep table holds at most 201 points.
+    LIST_SWEEP_MAX_POINTS = 201
+    # :FETC? returns (data A, data B, status, bin number) per list point.
+    LIST_FIELDS_PER_POINT = 4
+
+    def __init__(self, visa_address, timeout=100000, **kwargs):
+        super().__init__(visa_address, timeout=timeout,
+                         read_termination='\n', write_termination='\n',
+                         **kwargs)
+        self.aperture = 'MED'
+
+    def configure(self, frequency_hz, ac_level_v, aperture='MED'):
+        """Sets up a bus-triggered, auto-ranged measurement with DC bias enabled."""
+        if aperture not in self.APERTURE_TIMES_S:
+            raise ValueError(f"Invalid aperture '{aperture}'.")
+        self.aperture = aperture
+        self.write('*RST;*CLS')
+        self.invalidate_cache()
+        self.write_batch([
+            ':DISP:ENAB',
+            ':INIT:CONT ON',
+            ':TRIG:SOUR BUS',
+            f':APER {aperture}',
+            ':FUNC:IMP:RANGE:AUTO ON',
+        ])
+        self.set(':FREQ', frequency_hz)
+        self.set(':VOLT:LEVEL', ac_level_v)
+        self.set(':BIAS:STATe', 'ON')
+        self.wait_for_completion()
+
+    def set_bias(self, voltage):
+        self.set(':BIAS:VOLTage:LEVel', voltage)
+
+    @property
+    def bias_voltage(self):
+        cached = self.cached(':BIAS:VOLTage:LEVel')
+        return float(cached) if cached is not None else self.query_float(':BIAS:VOLTage:LEVel?')
+
+    @property
+    def measurement_time_s(self):
+        """Nominal duration of one triggered measurement at the current aperture."""
+        return self.APERTURE_TIMES_S[self.aperture]
+
+    def trigger(self):
+        self.write(':TRIG:IMM')
+
+    def measure(self):
+        """
+        Triggers one measurement and returns its (primary, secondary, status)
+        result. The trigger is followed by *OPC?, so the call returns as soon
+        as the instrument has finished integrating.
+        """
+        self.trigger()
+        self.wait_for_completion()
+        return self.fetch_impedance()
+
+    def fetch_impedance(self):
+        """Returns the formatted (primary, secondary, status) result of the last measurement."""
+        return self.query_floats(':FETCh:IMPedance:FORMatted?')
+
+    def list_sweep(self, bias_values=None, frequencies=None, step_delay_s=0):
+        """
+        Runs one sequential list sweep of either DC bias levels or test
+        frequencies and returns (primary, secondary) arrays with one value per
+        point. The whole table is uploaded in one batch, started with a single
+        bus trigger and read back with one :FETC?. Call ``end_list_sweep()``
+        once the last table has run.
+        """
+        if (bias_values is None) == (frequencies is None):
+            raise ValueError("Pass either a bias list or a frequency list.")
+        header, values = ((':LIST:BIAS:VOLT', bias_values) if frequencies is None
+                          else (':LIST:FREQ', frequencies))
+        values = np.asarray(values, dtype=float)
+        size = values.size
+        if size == 0:
+            return np.array([]), np.array([])
+        if size > self.LIST_SWEEP_MAX_POINTS:
+            raise ValueError(
+                f"List sweep is limited to {self.LIST_SWEEP_MAX_POINTS} points per chunk.")
+
+        self.write_batch([':DISP:PAGE LIST', ':LIST:MODE SEQ',
+                          f':TRIG:TDEL {step_delay_s:g}',
+                          f"{header} " + ",".join(f"{v:.6g}" for v in values)])
+        self.trigger()
+        # Allow for the full table to complete before *OPC? times out.
+        expected_s = size * (self.measurement_time_s + step_delay_s + 0.05)
+        with self.extended_timeout(expected_s):
+            self.wait_for_completion()
+        results = np.array(self.query_ascii_values(':FETC?'))
+        if results.size != size * self.LIST_FIELDS_PER_POINT:
+            raise IOError(
+                f"Expected {size} list sweep results from the E4980A, "
+                f"got {results.size // self.LIST_FIELDS_PER_POINT}.")
+        fields = results.reshape(size, self.LIST_FIELDS_PER_POINT)
+        return fields[:, 0], fields[:, 1]
+
+    def end_list_sweep(self):
+        """
+        Returns to single-point measurements on the measurement page with no
+        trigger delay and the DC bias back at 0 V.
+        """
+        self.write_batch([':DISP:PAGE MEAS', ':TRIG:TDEL 0'])
+        # The list left the bias at its last level, whatever the cache holds
+        self.set(':BIAS:VOLTage:LEVel', 0, force=True)
+
+    def shutdown(self):
+        """Turns off the DC bias and returns the display to the measurement page."""
+        try:
+            self.set(':BIAS:STATe', 'OFF', force=True)
+            self.write(':DISP:PAGE MEAS')
+        finally:
+            self.close()
@@ -0,0 +1,107 @@
+"""
+Module: Lakeshore_350.py
+Purpose: Shared driver for the Lakeshore 350/340 temperature controllers.
+"""
+
+import time
+from collections import namedtuple
+
+from .Base_Instrument import VisaInstrument
+
+# temperatures: {input: K}; heater_outputs: {output: %}; timestamp: host
+# epoch seconds when the status query was sent.
+LakeshoreStatus = namedtuple(
+    'LakeshoreStatus', ['temperatures', 'heater_outputs', 'timestamp'])
+
+
+class Lakeshore350(VisaInstrument):
+    """
+    Lakeshore Model 350 temperature controller. The command subset used by
+    PICA is shared with the Model 340, so this class drives both.
+    """
+
+    NAME = "Lakeshore350"
+    # Parameters follow the channel number after a comma, e.g. 'SETP 1,300'.
+    SETTING_SEPARATOR = ''
+    HEATER_RANGES = {'off': 0, 'low': 2, 'medium': 4, 'high': 5}
+    # 'KRDG? 0' returns every input; eight values with the 3062 scanner option.
+    INPUTS = ('A', 'B', 'C', 'D')
+    SCANNER_INPUTS = ('A', 'B', 'C', 'D1', 'D2', 'D3', 'D4', 'D5')
+
+    def __init__(self, visa_address, timeout=10000, **kwargs):
+        super().__init__(visa_address, timeout=timeout, **kwargs)
+
+    # --- Configuration ---
+    def configure_heater(self, output=1, resistance_code=1,
+                         max_current_code=2, max_user_current=0, display=1):
+        """HTRSET; defaults are the 25 Ω / 1 A heater used across PICA."""
+        self.set(f'HTRSET {output},',
+                 f'{resistance_code},{max_current_code},{max_user_current},{display}')
+
+    def set_heater_range(self, output, heater_range, force=False):
+        """Accepts a range name ('off', 'low', 'medium', 'high') or a numeric code."""
+        if isinstance(heater_range, str):
+            range_code = self.HEATER_RANGES.get(heater_range.lower())
+            if range_code is None:
+                raise ValueError("Invalid heater range.")
+        else:
+            range_code = int(heater_range)
+        self.set(f'RANGE {output},', range_code, force=force)
+
+    def heater_off(self, output=1):
+        # Always sent: the heater may have been changed from the front panel.
+        self.set_heater_range(output, 'off', force=True)
+
+    def set_setpoint(self, output, temperature_k):
+        self.set(f'SETP {output},', temperature_k)
+
+    def set_ramp(self, output, rate_k_per_min, ramp_on=True):
+        self.set(f'RAMP {output},', f'{1 if ramp_on else 0},{rate_k_per_min}')
+
+    def stop_ramp(self, output=1):
+        self.set(f'RAMP {output},', '0,0', force=True)
+        self.heater_off(output)
+
+    # --- Readings ---
+    def get_temperature(self, sensor='A'):
+        return self.query_float(f'KRDG? {sensor}')
+
+    def get_heater_output(self, output=1):
+        return self.query_float(f'HTR? {output}')
+
+    def get_temperature_async(self, sensor='A'):
+        return self.query_async(f'KRDG? {sensor}', float)
+
+    def get_status(self, outputs=(1,), sensors=None):
+        """
+        Reads the sensor inputs and heater outputs in one compound query
+        (e.g. 'KRDG? 0;HTR? 1') and returns a LakeshoreStatus. With
+        ``sensors=None`` every input is read with 'KRDG? 0', which needs a
+        Model 350; pass the inputs explicitly (e.g. ``('A', 'B')``) for a 340.
+        """
+        queries = (['KRDG? 0'] if sensors is None
+                   else [f'KRDG? {sensor}' for sensor in sensors])
+        queries += [f'HTR? {output}' for output in outputs]
+        timestamp = time.time()
+        replies = self.query(self.COMMAND_SEPARATOR.join(queries)).split(
+            self.COMMAND_SEPARATOR)
+        if len(replies) != len(queries):
+            raise IOError(
+                f"Expected {len(queries)} Lakeshore replies, got {len(replies)}.")
+
+        heater_replies = replies[len(replies) - len(outputs):]
+        if sensors is None:
+            values = [float(v) for v in replies[0].split(',') if v.strip()]
+            names = (self.SCANNER_INPUTS if len(values) > len(self.INPUTS)
+                     else self.INPUTS)
+            temperatures = dict(zip(names, values))
+        else:
+            temperatures = {sensor: float(reply) for sensor, reply
+                            in zip(sensors, replies[:len(sensors)])}
+        heater_outputs = {output: float(reply) for output, reply
+                          in zip(outputs, heater_replies)}
+        return LakeshoreStatus(temperatures, heater_outputs, timestamp)
+
+
+# The Model 340 accepts the same commands used here.
+Lakeshore340 = Lakeshore350
@@ -0,0 +1,283 @@
+"""
+Module: Live_Plot.py
+Purpose: Constant-cost live plot updates for the PICA measurement GUIs.
+"""
+
+# -------------------------------------------------------------------------------
+# Name:         PICA Live Plot
+# Purpose:      The GUIs redrew after every point with ax.relim() +
+#               ax.autoscale_view(), which walks all line data (cost grows
+#               with the run), and the blitting GUIs never re-captured their
+#               background, so limit changes were drawn over a stale frame.
+#               LivePlot keeps running min/max bounds of each axis, updated
+#               from the new points only, and widens the limits with some
+#               headroom only when a point falls outside them. Lines are
+#               blitted onto a cached background; a full draw (which
+#               re-captures the background) happens only when the limits
+#               actually change.
+#               Redraw requests are merged and drawn at most max_fps times a
+#               second, however fast the points arrive, and long lines are
+#               drawn through the level-of-detail decimation. The time spent
+#               drawing is recorded (summary()) so it can be logged per run.
+# Author:       Prathamesh Deshmukh
+# Created:      17/10/2026
+# Version:      1.0
+# -------------------------------------------------------------------------------
+
+import time
+
+import numpy as np
+
+from .Plot_Decimation import LevelOfDetail
+
+DEFAULT_MARGIN = 0.05
+DEFAULT_HEADROOM = 0.25
+DEFAULT_MAX_FPS = 10
+
+
+class _Bounds:
+    """Running min/max (and smallest positive value, for log axes) of one axis."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.low = np.inf
+        self.high = -np.inf
+        self.low_positive = np.inf
+
+    def add(self, values):
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        self.low = min(self.low, values.min())
+        self.high = max(self.high, values.max())
+        positive = values[values > 0]
+        if len(positive):
+            self.low_positive = min(self.low_positive, positive.min())
+
+    def span(self, log):
+        """The (low, high) data range on a linear or log axis, or None."""
+        low = self.low_positive if log else self.low
+        if low > self.high:
+            return None
+        return low, self.high
+
+
+class _LiveLine:
+    def __init__(self, line, x, y):
+        self.line = line
+        self.x = x
+        self.y = y
+        self.seen = 0
+
+
+class LivePlot:
+    """
+    Live lines of one figure, redrawn without relim().
+
+        self.live_plot = LivePlot(self.canvas)
+        self.live_plot.add_line(self.line_main, self.data_storage['temperature'],
+                                self.data_storage['resistance'])
+        self.live_plot.start()    # new run: limits follow the new data
+        self.live_plot.request_redraw()   # after new points
+        self.live_plot.stop()     # run over: lines drawn normally again
+
+    ``x`` and ``y`` are the growing data (``DataColumn``s); they are read
+    again on every redraw. Limits are widened by ``headroom`` times the data
+    span when a point leaves them and never shrink during a run. An axis
+    the user has zoomed or panned (autoscaling off) is left alone.
+
+    ``request_redraw()`` may be called after every point: requests are
+    merged and drawn from the Tk event loop at most ``max_fps`` times a
+    second. ``redraw()`` draws at once.
+    """
+
+    def __init__(self, canvas, margin=DEFAULT_MARGIN, headroom=DEFAULT_HEADROOM,
+                 max_fps=DEFAULT_MAX_FPS):
+        self.canvas = canvas
+        self.figure = canvas.figure
+        self.margin = margin
+        self.headroom = headroom
+        self.max_fps = max_fps
+        self.running = False
+        self._lines = []
+        self._lod = {}
+        self._bounds = {}
+        self._limits = {}
+        self._scales = {}
+        self._background = None
+        self._cids = None
+        self._job = None
+        self._last_frame = -np.inf
+        self.clear_stats()
+
+    def add_line(self, line, x, y):
+        self._lines.append(_LiveLine(line, x, y))
+        self._lod.setdefault(line.axes, LevelOfDetail(line.axes))
+        for key in ((line.axes, 'x'), (line.axes, 'y')):
+            self._bounds.setdefault(key, _Bounds())
+            self._limits.setdefault(key, None)
+
+    def clear_stats(self):
+        self.requests = 0
+        self.frames = 0
+        self.full_draws = 0
+        self.render_s = 0.0
+        self.last_render_s = 0.0
+        self.max_render_s = 0.0
+
+    @property
+    def mean_render_s(self):
+        return self.render_s / self.frames if self.frames else 0.0
+
+    def summary(self):
+        return (f"{self.frames} frames for {self.requests} redraw requests "
+                f"({self.full_draws} full draws), render mean "
+                f"{self.mean_render_s * 1000:.1f} ms / max "
+                f"{self.max_render_s * 1000:.1f} ms")
+
+    def start(self):
+        """Starts blitting for a new run; the limits are fitted to its data."""
+        self.reset()
+        self.clear_stats()
+        self.running = True
+        for live in self._lines:
+            live.line.set_animated(True)
+        if self._cids is None:
+            self._cids = [self.canvas.mpl_connect('draw_event', self._on_draw),
+                          self.canvas.mpl_connect('resize_event', self._on_resize)]
+        self._scales_changed()
+        self.canvas.draw()
+
+    def stop(self):
+        """Ends the run; points still waiting for a frame are drawn."""
+        self._cancel_request()
+        self.running = False
+        for live in self._lines:
+            live.line.set_animated(False)
+        self._background = None
+        self.redraw()
+
+    def reset(self):
+        """Forgets the data bounds, e.g. when the data has been cleared."""
+        for live in self._lines:
+            live.seen = 0
+        for key in self._bounds:
+            self._bounds[key].clear()
+            self._limits[key] = None
+
+    def request_redraw(self):
+        """Redraws within 1 / max_fps s, merged with any other request."""
+        self.requests += 1
+        if self._job is not None:
+            return
+        widget = self._widget()
+        if widget is None:
+            self._redraw()
+            return
+        wait = self._last_frame + 1.0 / self.max_fps - time.perf_counter()
+        self._job = widget.after(int(max(0.0, wait) * 1000), self._flush)
+
+    def redraw(self):
+        """Shows the new points now; returns True if the limits had to change."""
+        self.requests += 1
+        self._cancel_request()
+        return self._redraw()
+
+    def _redraw(self):
+        started = time.perf_counter()
+        changed = self._update_limits()
+        rescaled = self._scales_changed()
+        for live in self._lines:
+            self._lod[live.line.axes].set_data(live.line, live.x, live.y)
+        if not self.running:
+            self.canvas.draw_idle()
+        elif changed or rescaled or self._background is None:
+            self.canvas.draw()  # _on_draw re-captures the background
+            self.full_draws += 1
+        else:
+            self.canvas.restore_region(self._background)
+            for live in self._lines:
+                self.figure.draw_artist(live.line)
+            self.canvas.blit(self.figure.bbox)
+        self._last_frame = time.perf_counter()
+        self.last_render_s = self._last_frame - started
+        self.max_render_s = max(self.max_render_s, self.last_render_s)
+        self.render_s += self.last_render_s
+        self.frames += 1
+        return changed
+
+    def _flush(self):
+        self._job = None
+        self._redraw()
+
+    def _widget(self):
+        get_tk_widget = getattr(self.canvas, 'get_tk_widget', None)
+        return get_tk_widget() if get_tk_widget is not None else None
+
+    def _cancel_request(self):
+        if self._job is not None:
+            self._widget().after_cancel(self._job)
+            self._job = None
+
+    def _scales_changed(self):
+        # A log toggle on a zoomed axis changes no limits but the background
+        scales = {ax: (ax.get_xscale(), ax.get_yscale()) for ax in self._lod}
+        changed = scales != self._scales
+        self._scales = scales
+        return changed
+
+    def _on_resize(self, event):
+        # The old background no longer fits; the resize draw captures a new one
+        self._background = None
+
+    def _on_draw(self, event):
+        if not self.running:
+            return
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        for live in self._lines:
+            self.figure.draw_artist(live.line)
+
+    def _update_limits(self):
+        for live in self._lines:
+            x, y = np.asarray(live.x), np.asarray(live.y)
+            count = min(len(x), len(y))
+            # Re-read the last known point too: a decimated DataColumn
+            # replaces it instead of growing, and a shorter column has been
+            # decimated or cleared (its bounds are still a superset).
+            start = max(0, min(live.seen, count) - 1)
+            self._bounds[(live.line.axes, 'x')].add(x[start:count])
+            self._bounds[(live.line.axes, 'y')].add(y[start:count])
+            live.seen = count
+        changed = False
+        for (ax, axis), bounds in self._bounds.items():
+            changed = self._fit_axis(ax, axis, bounds) or changed
+        return changed
+
+    def _fit_axis(self, ax, axis, bounds):
+        if not (ax.get_autoscalex_on() if axis == 'x' else ax.get_autoscaley_on()):
+            return False
+        log = (ax.get_xscale() if axis == 'x' else ax.get_yscale()) == 'log'
+        span = bounds.span(log)
+        if span is None:
+            return False
+        low, high = np.log10(span) if log else span
+        width = high - low or abs(high) or 1.0
+        limits = self._limits[(ax, axis)]
+        if limits is not None and limits[2] == log:
+            if limits[0] <= low and high <= limits[1]:
+                return False
+            low = min(limits[0], low - self.headroom * width)
+            high = max(limits[1], high + self.headroom * width)
+        else:
+            # First fit of the run, or the scale was changed
+            low, high = low - self.margin * width, high + self.margin * width
+        self._limits[(ax, axis)] = (low, high, log)
+        if log:
+            low, high = 10 ** low, 10 ** high
+        if axis == 'x':
+            ax.set_xlim(low, high, auto=None)
+        else:
+            ax.set_ylim(low, high, auto=None)
+        return True
@@ -0,0 +1,98 @@
+"""
+Module: Multi_Sampler.py
+Purpose: Concurrent, individually timestamped reads of several instruments per sample tick.
+"""
+
+# -------------------------------------------------------------------------------
+# Name:         PICA Multi-Instrument Sampler
+# Purpose:      Issues the reads of one sample to different GPIB devices at
+#               the same time, so a sample takes as long as the slowest
+#               instrument instead of the sum of all of them, and records
+#               when each reading was taken so the skew between e.g. T and R
+#               can be corrected in the data.
+# Author:       Prathamesh Deshmukh
+# Created:      17/10/2026
+# Version:      1.0
+# -------------------------------------------------------------------------------
+
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# value: the reading; timestamp: host epoch seconds at the middle of the
+# read; duration: how long the read took in seconds.
+Reading = namedtuple('Reading', ['value', 'timestamp', 'duration'])
+
+
+class MultiInstrumentSampler:
+    """
+    Reads a set of named channels concurrently.
+
+    - Each channel is a callable bound to one instrument, e.g.
+      ``add_channel('temperature', ls350, lambda: ls350.get_temperature('A'))``.
+    - Channels on the same instrument are read one after another, in the
+      order they were added, while holding that instrument's I/O lock.
+    - Different instruments are read in parallel on a thread pool.
+    ``sample()`` returns a dict of channel name -> ``Reading``.
+    """
+
+    def __init__(self):
+        self._groups = []
+        self._executor = None
+
+    def add_channel(self, name, instrument, read):
+        for group_instrument, channels in self._groups:
+            if group_instrument is instrument:
+                channels.append((name, read))
+                return
+        self._groups.append((instrument, [(name, read)]))
+
+    @property
+    def channels(self):
+        return [name for _, channels in self._groups for name, _ in channels]
+
+    def sample(self):
+        """Reads every channel once and returns {name: Reading}."""
+        if len(self._groups) <= 1:
+            results = [self._read_group(*group) for group in self._groups]
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=len(self._groups),
+                    thread_name_prefix="MultiSampler")
+            futures = [self._executor.submit(self._read_group, *group)
+                       for group in self._groups]
+            # result() re-raises the first failed read in the caller
+            results = [future.result() for future in futures]
+        readings = {}
+        for group_readings in results:
+            readings.update(group_readings)
+        return readings
+
+    @staticmethod
+    def skew_s(readings, first, second):
+        """Time between two readings of one sample (first - second), in seconds."""
+        return readings[first].timestamp - readings[second].timestamp
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    @staticmethod
+    def _read_group(instrument, channels):
+        lock = getattr(instrument, '_io_lock', None)
+        if lock is not None:
+            lock.acquire()
+        try:
+            readings = {}
+            for name, read in channels:
+                t_start = time.time()
+                value = read()
+                t_end = time.time()
+                readings[name] = Reading(
+                    value, (t_start + t_end) / 2, t_end - t_start)
+            return readings
+        finally:
+            if lock is not None:
+                lock.release()
@@ -0,0 +1,240 @@
+"""
+Module: Plot_Decimation.py
+Purpose: View-dependent level-of-detail decimation for matplotlib lines with millions of points.
+"""
+
+# -------------------------------------------------------------------------------
+# Name:         PICA Plot Decimation
+# Purpose:      Agg draws every vertex and marker of a line, so a 10^6 point
+#               run takes seconds per redraw. Lines drawn through
+#               LevelOfDetail keep their full data off the Axes and show only
+#               the points that can be told apart on screen: the visible
+#               points are split into one bucket per pixel column and each
+#               bucket keeps its first and last point and the points with
+#               the smallest and largest x and y. Peaks and sharp
+#               transitions (e.g. a superconducting drop in R-T) survive,
+#               and the decimation is redone whenever the view is zoomed,
+#               panned or resized. Buckets follow the order of the data, not
+#               x, so runs that sweep x up and down are handled too. While a
+#               line grows, completed buckets are kept and only the points
+#               added since the previous frame are decimated.
+# Author:       Prathamesh Deshmukh
+# Created:      17/10/2026
+# Version:      1.0
+# -------------------------------------------------------------------------------
+
+import numpy as np
+
+from .Column_Store import DataColumn
+
+MIN_BUCKETS = 200
+
+
+def _extreme_indices(values, size, pad, pick):
+    # Index of the extreme of every ``size`` long bucket of ``values``
+    buckets = -(-len(values) // size)
+    padded = np.full(buckets * size, pad)
+    padded[:len(values)] = values
+    return pick(padded.reshape(buckets, size), axis=1) + np.arange(buckets) * size
+
+
+def decimate_indices(x, y, buckets, x_range=None):
+    """
+    Indices (ascending) of the points of ``(x, y)`` to draw with at most
+    ``buckets`` buckets of up to 6 points each.
+
+    With ``x_range=(x0, x1)`` only the points inside it, and their direct
+    neighbours so that lines run on to the edges of the view, are used.
+    NaNs are treated as gaps and never selected.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    index = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if x_range is not None and len(index):
+        x0, x1 = sorted(x_range)
+        visible = (x[index] >= x0) & (x[index] <= x1)
+        visible[1:] |= visible[:-1].copy()
+        visible[:-1] |= visible[1:].copy()
+        index = index[visible]
+    buckets = max(1, int(buckets))
+    if len(index) <= 6 * buckets:
+        return index
+    return _bucket_picks(x, y, index, -(-len(index) // buckets))
+
+
+def _bucket_picks(x, y, index, size):
+    # First, last and extreme x / y points of every ``size`` long bucket of
+    # the (finite) points ``index``
+    if not len(index):
+        return index
+    xs, ys = x[index], y[index]
+    picks = [
+        _extreme_indices(xs, size, np.inf, np.argmin),
+        _extreme_indices(xs, size, -np.inf, np.argmax),
+        _extreme_indices(ys, size, np.inf, np.argmin),
+        _extreme_indices(ys, size, -np.inf, np.argmax),
+        np.arange(0, len(index), size),
+        np.minimum(np.arange(size - 1, len(index) + size - 1, size), len(index) - 1),
+    ]
+    return index[np.unique(np.concatenate(picks))]
+
+
+class _GrowingLine:
+    """
+    ``decimate_indices`` for one line that grows between calls.
+
+    The candidate points (finite and, with an ``x_range``, visible or next
+    to a visible point) and the picks of completed buckets are kept, so a
+    call only reads the points added since the previous one plus the open
+    bucket. The bucket size starts out as in ``decimate_indices``; once
+    there are twice ``buckets`` completed buckets it is recomputed and the
+    completed buckets are redone, so the work per call stays bounded as the
+    line grows. A line that got shorter or whose
+    settled points changed (a cleared or decimated DataColumn) is started
+    over.
+    """
+
+    def __init__(self, buckets, x_range=None):
+        self.buckets = max(1, int(buckets))
+        self.x_range = None if x_range is None else tuple(sorted(x_range))
+        self.settled = 0  # points whose candidacy can no longer change
+        self.candidates = DataColumn(int, max_rows=0)
+        self.size = None  # candidates per completed bucket
+        self.done = 0  # candidates in completed buckets
+        self.picks = DataColumn(int, max_rows=0)
+        self._anchor = None
+
+    def matches(self, buckets, x_range):
+        x_range = None if x_range is None else tuple(sorted(x_range))
+        return self.buckets == max(1, int(buckets)) and self.x_range == x_range
+
+    def indices(self, x, y):
+        count = min(len(x), len(y))
+        if count < self.settled or not self._same_line(x, y):
+            self.__init__(self.buckets, self.x_range)
+        # The last point of a decimated DataColumn may still be replaced, and
+        # whether a point is next to a visible one depends on the point after it.
+        settled = max(self.settled, count - 2)
+        self.candidates.extend(self._candidates(x, y, self.settled, settled, count))
+        self.settled = settled
+        if settled:
+            self._anchor = (np.array([x[0], y[0], x[settled - 1], y[settled - 1]]),
+                            settled)
+        tail = self._candidates(x, y, settled, count, count)
+        if len(self.candidates) + len(tail) <= 6 * self.buckets:
+            return np.concatenate([self.candidates.values, tail])
+        self._complete_buckets(x, y)
+        open_bucket = np.concatenate([self.candidates.values[self.done:], tail])
+        return np.concatenate([self.picks.values,
+                               _bucket_picks(x, y, open_bucket, max(1, len(open_bucket)))])
+
+    def _same_line(self, x, y):
+        if self._anchor is None:
+            return True
+        anchor, settled = self._anchor
+        now = np.array([x[0], y[0], x[settled - 1], y[settled - 1]])
+        return np.array_equal(anchor, now, equal_nan=True)
+
+    def _candidates(self, x, y, start, stop, count):
+        if stop <= start:
+            return np.array([], dtype=int)
+        low, high = max(0, start - 1), min(count, stop + 1)
+        xs, ys = x[low:high], y[low:high]
+        keep = np.isfinite(xs) & np.isfinite(ys)
+        if self.x_range is not None:
+            visible = keep & (xs >= self.x_range[0]) & (xs <= self.x_range[1])
+            near = visible.copy()
+            near[1:] |= visible[:-1]
+            near[:-1] |= visible[1:]
+            keep &= near
+        index = np.arange(low, high)
+        return index[keep & (index >= start) & (index < stop)]
+
+    def _complete_buckets(self, x, y):
+        available = len(self.candidates)
+        if self.size is None or available // self.size > 2 * self.buckets:
+            self.size = max(1, -(-available // self.buckets))
+            self.done = 0
+            self.picks.clear()
+        complete = available // self.size * self.size
+        if complete > self.done:
+            self.picks.extend(_bucket_picks(
+                x, y, self.candidates.values[self.done:complete], self.size))
+            self.done = complete
+
+
+class LevelOfDetail:
+    """
+    Draws lines on ``ax`` decimated to the current view.
+
+        lod = LevelOfDetail(ax)
+        lod.plot(temperature, resistance, marker='o')   # like ax.plot
+        lod.set_data(line, x, y)                        # like line.set_data
+
+    The full data stays with the helper; the Line2D only holds the
+    decimated points (``buckets_per_pixel`` buckets per pixel of the axes
+    width, at least MIN_BUCKETS). Lines are re-decimated on every x-limit change and window
+    resize; ``ax.clear()`` drops them. Between those, ``set_data`` with
+    the same, grown data only decimates the new points and the open bucket.
+    """
+
+    def __init__(self, ax, buckets_per_pixel=1.0):
+        self.ax = ax
+        self.buckets_per_pixel = buckets_per_pixel
+        self._full_data = {}
+        self._growing = {}
+        self._callbacks = None
+        self._resize_cid = None
+
+    def plot(self, x, y, *args, **kwargs):
+        (line,) = self.ax.plot([], [], *args, **kwargs)
+        self.set_data(line, x, y)
+        return line
+
+    def set_data(self, line, x, y):
+        """Gives ``line`` new full data and draws its decimated view."""
+        self._connect()
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self._full_data[line] = (x, y)
+        self._draw(line, x, y, self._buckets(), self._view())
+
+    def update(self, *_):
+        """Re-decimates every line for the current view."""
+        self._full_data = {line: data for line, data in self._full_data.items()
+                           if line.axes is self.ax}
+        self._growing = {}
+        buckets, view = self._buckets(), self._view()
+        for line, (x, y) in self._full_data.items():
+            self._draw(line, x, y, buckets, view)
+
+    def _draw(self, line, x, y, buckets, view):
+        growing = self._growing.get(line)
+        if growing is None or not growing.matches(buckets, view):
+            growing = self._growing[line] = _GrowingLine(buckets, view)
+        index = growing.indices(x, y)
+        line.set_data(x[index], y[index])
+
+    @property
+    def points_drawn(self):
+        return sum(len(line.get_xdata()) for line in self._full_data)
+
+    def _buckets(self):
+        width = self.ax.bbox.width if self.ax.figure is not None else 0
+        return max(MIN_BUCKETS, int(width * self.buckets_per_pixel))
+
+    def _view(self):
+        if self.ax.get_autoscalex_on():
+            return None  # The limits follow the data, which is all shown
+        return self.ax.get_xlim()
+
+    def _connect(self):
+        # ax.clear() replaces the callback registry
+        if self._callbacks is not self.ax.callbacks:
+            self._full_data = {}
+            self._growing = {}
+            self._callbacks = self.ax.callbacks
+            self._callbacks.connect('xlim_changed', self.update)
+        canvas = self.ax.figure.canvas
+        if self._resize_cid is None and canvas is not None:
+            self._resize_cid = canvas.mpl_connect('resize_event', self.update)
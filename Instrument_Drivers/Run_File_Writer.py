@@ -0,0 +1,159 @@
+"""
+Module: Run_File_Writer.py
+Purpose: Buffered, crash-safe data file writer shared by the PICA measurement GUIs.
+"""
+
+# -------------------------------------------------------------------------------
+# Name:         PICA Run File Writer
+# Purpose:      Keeps the data file of a run open for the whole measurement
+#               and writes rows through a buffer that is flushed every N rows
+#               or every T seconds, instead of reopening the file for every
+#               point. At most the rows of the last flush interval can be lost
+#               if the program dies; checkpoint() also fsyncs to disk.
+# Author:       Prathamesh Deshmukh
+# Created:      17/10/2026
+# Version:      1.0
+# -------------------------------------------------------------------------------
+
+import atexit
+import csv
+import math
+import os
+import threading
+import time
+import weakref
+
+from .Binary_Run_File import BinaryRunWriter, binary_run_path
+
+_open_writers = weakref.WeakSet()
+
+
+class RunFileWriter:
+    """
+    CSV writer for one measurement run.
+
+    - ``header_rows`` are written and flushed when the file is created.
+    - Rows are flushed once ``flush_rows`` are pending, or ``flush_interval_s``
+      after the first pending row (a timer flushes rows that arrive just
+      before the acquisition pauses or stops).
+    - ``fsync=True`` forces every flush to disk; otherwise only
+      ``checkpoint()`` and ``close()`` fsync.
+    - Extra keyword arguments (e.g. ``delimiter='\\t'``) go to ``csv.writer``.
+    - ``binary_columns`` also writes a ``.pcrun`` binary run file next to
+      the text file (see ``Binary_Run_File``), flushed together with it.
+      ``write_row(row, values)`` stores ``values`` there; without ``values``
+      the cells of ``row`` are stored, non-numeric ones as NaN.
+    Files left open at interpreter exit are flushed and closed.
+    """
+
+    def __init__(self, filepath, header_rows=(), flush_rows=20,
+                 flush_interval_s=2.0, fsync=False, append=False,
+                 binary_columns=None, metadata=None, **fmtparams):
+        self.filepath = filepath
+        self.binary_filepath = None
+        self._binary = None
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval_s = flush_interval_s
+        self.fsync = fsync
+        self.rows_written = 0
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._timer = None
+        self._lock = threading.RLock()
+        self._file = open(filepath, 'a' if append else 'w', newline='')
+        self._writer = csv.writer(self._file, **fmtparams)
+        if binary_columns:
+            self.binary_filepath = binary_run_path(filepath)
+            try:
+                self._binary = BinaryRunWriter(self.binary_filepath, binary_columns,
+                                               metadata=metadata, append=append)
+            except Exception:
+                self._file.close()
+                raise
+        _open_writers.add(self)
+        if header_rows:
+            self._writer.writerows(header_rows)
+            self.flush()
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    def write_row(self, row, values=None):
+        self.write_rows([row], None if values is None else [values])
+
+    def write_rows(self, rows, values=None):
+        with self._lock:
+            if self._file is None:
+                raise ValueError(f"Data file '{self.filepath}' is closed.")
+            if self._binary is not None:
+                self._binary.write_rows(
+                    [[_to_float(cell) for cell in row] for row in rows]
+                    if values is None else values)
+            for row in rows:
+                self._writer.writerow(row)
+                self._pending += 1
+                self.rows_written += 1
+            if (self._pending >= self.flush_rows
+                    or time.monotonic() - self._last_flush >= self.flush_interval_s):
+                self.flush()
+            elif self._pending and self._timer is None and self.flush_interval_s:
+                self._timer = threading.Timer(self.flush_interval_s, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self, fsync=None):
+        """Writes pending rows to the OS; ``fsync`` (default: the policy) forces them to disk."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._file is None:
+                return
+            self._file.flush()
+            fsync = self.fsync if fsync is None else fsync
+            if fsync:
+                os.fsync(self._file.fileno())
+            if self._binary is not None:
+                self._binary.flush(fsync)
+            self._pending = 0
+            self._last_flush = time.monotonic()
+
+    def checkpoint(self):
+        """Flushes and fsyncs, e.g. at the end of a sweep segment."""
+        self.flush(fsync=True)
+
+    def close(self):
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                self.checkpoint()
+            finally:
+                self._file.close()
+                self._file = None
+                if self._binary is not None:
+                    self._binary.close()
+                _open_writers.discard(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _to_float(cell):
+    try:
+        return float(cell)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+@atexit.register
+def _close_open_writers():
+    for writer in list(_open_writers):
+        try:
+            writer.close()
+        except Exception:
+            pass
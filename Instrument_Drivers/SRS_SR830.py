@@ -0,0 +1,51 @@
+"""
+Module: SRS_SR830.py
+Purpose: Shared driver for the Stanford Research Systems SR830 lock-in amplifier.
+"""
+
+from .Base_Instrument import VisaInstrument
+
+
+class SR830(VisaInstrument):
+    """SRS SR830 DSP lock-in amplifier."""
+
+    NAME = "SR830"
+    # SNAP? parameter codes
+    PARAMS = {'X': 1, 'Y': 2, 'R': 3, 'THETA': 4,
+              'AUX1': 5, 'AUX2': 6, 'AUX3': 7, 'AUX4': 8, 'FREQ': 9}
+
+    def __init__(self, visa_address, timeout=5000, **kwargs):
+        super().__init__(visa_address, timeout=timeout,
+                         read_termination='\n', write_termination='\n',
+                         **kwargs)
+
+    def snap(self, *names):
+        """Reads 2-6 parameters simultaneously, e.g. ``snap('R', 'THETA')``."""
+        codes = ",".join(str(self.PARAMS[n.upper()]) for n in names)
+        return self.query_floats(f'SNAP? {codes}')
+
+    def read_r_theta(self):
+        return tuple(self.snap('R', 'THETA'))
+
+    def read_xy(self):
+        return tuple(self.snap('X', 'Y'))
+
+    def snap_async(self, *names):
+        codes = ",".join(str(self.PARAMS[n.upper()]) for n in names)
+        return self.query_async(
+            f'SNAP? {codes}', lambda r: [float(v) for v in r.split(',')])
+
+    def get_sensitivity_code(self):
+        return int(self.query('SENS?'))
+
+    def set_sensitivity_code(self, code):
+        self.set('SENS', int(code))
+
+    def set_time_constant_code(self, code):
+        self.set('OFLT', int(code))
+
+    def set_reference(self, frequency_hz=None, amplitude_v=None):
+        if frequency_hz is not None:
+            self.set('FREQ', frequency_hz)
+        if amplitude_v is not None:
+            self.set('SLVL', amplitude_v)
@@ -0,0 +1,122 @@
+"""
+Module: Sample_Scheduler.py
+Purpose: Drift-free, monotonic-clock sample timing for PICA measurement loops.
+"""
+
+# -------------------------------------------------------------------------------
+# Name:         PICA Sample Scheduler
+# Purpose:      Replaces sleep(period) / root.after(period) pacing, where the
+#               real sample period is the nominal period plus the read time.
+#               Sample start times are planned on time.monotonic(), overruns
+#               are counted and the timing error of every sample is recorded.
+# Author:       Prathamesh Deshmukh
+# Created:      17/10/2026
+# Version:      1.0
+# -------------------------------------------------------------------------------
+
+import time
+from collections import deque
+
+
+class SampleScheduler:
+    """
+    Plans sample start times for a measurement loop.
+
+    - FIXED_RATE: sample k is due at t0 + k * period, however long each read
+      takes, so samples stay evenly spaced and the loop does not drift. Slots
+      missed while a read was still running are skipped.
+    - FIXED_DELAY: each sample is due one period after the previous one
+      finished (the old sleep(period) behaviour). ``mark_done()`` may also be
+      called before the first sample, e.g. to time a settle delay from the
+      moment a new source level was applied.
+    An overrun is a sample whose read took longer than one period. For every
+    sample the jitter (actual start - planned start) is recorded.
+
+    Thread loops call ``wait()`` then ``mark_done()``; Tk loops call
+    ``mark_start()`` / ``mark_done()`` and reschedule with
+    ``root.after(scheduler.delay_ms(), ...)``.
+    """
+
+    FIXED_RATE = "Fixed Rate"
+    FIXED_DELAY = "Fixed Delay"
+
+    def __init__(self, period_s, mode=FIXED_RATE, history=100000):
+        if mode not in (self.FIXED_RATE, self.FIXED_DELAY):
+            raise ValueError(f"Unknown scheduling mode '{mode}'.")
+        if period_s < 0:
+            raise ValueError("Sample period cannot be negative.")
+        self.period_s = period_s
+        self.mode = mode
+        self.jitter_s = deque(maxlen=history)
+        self.reset()
+
+    def reset(self):
+        self.samples = 0
+        self.overruns = 0
+        self.jitter_s.clear()
+        self.next_due = None
+        self.last_start = None
+        self.last_jitter_s = 0.0
+
+    # --- Timing ---
+    def time_until_next(self):
+        """Seconds until the next sample is due (0 if it is already due)."""
+        if self.next_due is None:
+            return 0.0
+        return max(0.0, self.next_due - time.monotonic())
+
+    def delay_ms(self):
+        """``time_until_next()`` in whole milliseconds, for ``root.after``."""
+        return int(round(self.time_until_next() * 1000))
+
+    def wait(self, stop_event=None):
+        """
+        Blocks until the next sample is due and marks its start. Returns False
+        (without marking a sample) if ``stop_event`` is set while waiting.
+        """
+        delay = self.time_until_next()
+        if stop_event is not None:
+            if stop_event.wait(delay):
+                return False
+        elif delay > 0:
+            time.sleep(delay)
+        self.mark_start()
+        return True
+
+    def mark_start(self):
+        """Records the start of a sample and returns its jitter in seconds."""
+        now = time.monotonic()
+        due = now if self.next_due is None else self.next_due
+        self.last_jitter_s = now - due
+        self.jitter_s.append(self.last_jitter_s)
+        self.samples += 1
+        self.last_start = now
+        if self.mode == self.FIXED_RATE:
+            self.next_due = due + self.period_s
+        return self.last_jitter_s
+
+    def mark_done(self):
+        """Records the end of a sample, counts overruns and plans the next one."""
+        now = time.monotonic()
+        if self.last_start is not None and now - self.last_start > self.period_s > 0:
+            self.overruns += 1
+        if self.mode == self.FIXED_DELAY:
+            self.next_due = now + self.period_s
+        elif self.last_start is not None and self.period_s > 0 and now > self.next_due:
+            missed = int((now - self.next_due) // self.period_s) + 1
+            self.next_due += missed * self.period_s
+
+    # --- Statistics ---
+    @property
+    def mean_jitter_s(self):
+        return sum(self.jitter_s) / len(self.jitter_s) if self.jitter_s else 0.0
+
+    @property
+    def max_jitter_s(self):
+        return max(self.jitter_s) if self.jitter_s else 0.0
+
+    def summary(self):
+        return (f"{self.samples} samples at {self.period_s:g} s ({self.mode}), "
+                f"{self.overruns} overruns, jitter mean "
+                f"{self.mean_jitter_s * 1000:.1f} ms / max "
+                f"{self.max_jitter_s * 1000:.1f} ms")
@@ -0,0 +1,982 @@
+"""
+Module: Simulated_Instruments.py
+Purpose: Simulated VISA instruments for running PICA without GPIB hardware.
+"""
+
+# -------------------------------------------------------------------------------
+# Name:         PICA Simulated Instruments
+# Purpose:      A drop-in replacement for pyvisa.ResourceManager whose
+#               resources answer the SCPI used by the PICA drivers the way
+#               the real Lakeshore 350, Keithley 2400/2182/6221/6517B,
+#               Keysight E4980A and SR830 do: with bus latency, measurement
+#               (integration) time, reading noise, and a sample whose
+#               resistance follows the temperature of a simulated cryostat.
+#               Used to benchmark and regression-test the acquisition loops
+#               on a machine with no GPIB.
+# Author:       Prathamesh Deshmukh
+# Created:      17/10/2026
+# Version:      1.0
+#
+# Usage:        PICA_SIMULATE=1 python PICA_v6.py
+#               or, in a test, ``manager = install(SimulatedLab(...))`` and
+#               ``uninstall()`` when done.
+# -------------------------------------------------------------------------------
+
+import math
+import random
+import threading
+import time
+
+from . import Base_Instrument
+from .Keysight_E4980A import KeysightE4980A
+
+try:
+    import pyvisa
+    from pyvisa import constants as visa_constants
+    from pyvisa.errors import VisaIOError
+except ImportError:
+    pyvisa = None
+
+# Typical addresses from the PICA instrument address guide.
+DEFAULT_ADDRESSES = {
+    'GPIB1::15::INSTR': 'Lakeshore350',
+    'GPIB1::4::INSTR': 'Keithley2400',
+    'GPIB0::13::INSTR': 'Keithley6221',
+    'GPIB1::27::INSTR': 'Keithley6517B',
+    'GPIB0::7::INSTR': 'Keithley2182',
+    'GPIB0::17::INSTR': 'KeysightE4980A',
+    'GPIB0::8::INSTR': 'SR830',
+}
+
+_VOWELS = set('AEIOU')
+
+
+def _short_form(node):
+    """SCPI short form of one mnemonic: 'VOLTage' -> 'VOLT', 'LEVel' -> 'LEV'."""
+    node = node.upper().rstrip('0123456789')
+    if len(node) <= 4:
+        return node
+    return node[:3] if node[3] in _VOWELS else node[:4]
+
+
+def _fmt(value):
+    return f"{value:+.6E}"
+
+
+def _timeout_error(message):
+    if pyvisa is not None:
+        return VisaIOError(visa_constants.StatusCode.error_timeout)
+    return TimeoutError(message)
+
+
+class SimulatedSample:
+    """
+    The device under test seen by every simulated instrument.
+
+    - Resistance is ``r_300k * (1 + alpha_per_k * (T - 300))`` unless a
+      ``resistance(T)`` callable is given.
+    - Capacitance follows a depletion (Mott-Schottky) curve,
+      ``c0_f / sqrt(1 + V / built_in_v)``, with a constant loss tangent.
+    """
+
+    def __init__(self, r_300k=100.0, alpha_per_k=0.004, resistance=None,
+                 c0_f=1e-9, built_in_v=0.7, loss_tangent=0.01):
+        self.r_300k = r_300k
+        self.alpha_per_k = alpha_per_k
+        self._resistance = resistance
+        self.c0_f = c0_f
+        self.built_in_v = built_in_v
+        self.loss_tangent = loss_tangent
+
+    def resistance_ohm(self, temperature_k):
+        if self._resistance is not None:
+            return self._resistance(temperature_k)
+        return max(self.r_300k * (1 + self.alpha_per_k * (temperature_k - 300)),
+                   1e-3 * self.r_300k)
+
+    def capacitance_f(self, bias_v):
+        # Clamp the forward-bias side so the curve stays finite.
+        return self.c0_f / math.sqrt(max(1 + bias_v / self.built_in_v, 0.05))
+
+
+class SimulatedLab:
+    """
+    A set of simulated instruments sharing one sample and one cryostat.
+
+    - ``latency_s``: bus latency added to every VISA transaction.
+    - ``noise``: relative RMS noise added to every reading.
+    - ``time_scale``: speeds up the thermal dynamics (e.g. 60 makes a
+      1 K/min ramp run at 1 K/s).
+    - ``addresses``: {VISA address: model name}; defaults to the addresses
+      of the PICA address guide.
+    - With the heater off the cryostat relaxes to ``bath_temperature_k``,
+      which defaults to the start temperature (a stable, idle stage).
+    """
+
+    def __init__(self, sample=None, latency_s=0.002, noise=1e-4,
+                 time_scale=1.0, addresses=None, seed=None,
+                 start_temperature_k=300.0, bath_temperature_k=None):
+        self.sample = sample or SimulatedSample()
+        self.latency_s = latency_s
+        self.noise = noise
+        self.time_scale = time_scale
+        self.start_temperature_k = start_temperature_k
+        self.bath_temperature_k = (start_temperature_k if bath_temperature_k is None
+                                   else bath_temperature_k)
+        self.random = random.Random(seed)
+        self.lock = threading.RLock()
+        self.instruments = {
+            address: MODELS[model](self)
+            for address, model in (addresses or DEFAULT_ADDRESSES).items()}
+
+    def find(self, model_class):
+        for instrument in self.instruments.values():
+            if isinstance(instrument, model_class):
+                return instrument
+        return None
+
+    def trigger_link(self, sender):
+        """Passes a Trigger Link output pulse of ``sender`` to the other instruments."""
+        for instrument in self.instruments.values():
+            if instrument is not sender:
+                instrument.link_trigger()
+
+    def temperature_k(self):
+        lakeshore = self.find(SimLakeshore350)
+        return lakeshore.temperature('A') if lakeshore else self.start_temperature_k
+
+    def source_current_a(self):
+        """Total DC current driven through the sample by the current sources."""
+        return sum(instrument.source_current_a()
+                   for instrument in self.instruments.values())
+
+    def sample_voltage(self):
+        return self.sample.resistance_ohm(self.temperature_k()) * self.source_current_a()
+
+    def noisy(self, value, floor=0.0):
+        """``value`` plus Gaussian noise; ``floor`` is an absolute noise floor."""
+        if not self.noise:
+            return value
+        with self.lock:
+            return value + self.random.gauss(0.0, abs(value) * self.noise + floor)
+
+
+class SimulatedInstrument:
+    """
+    Base class of the instrument models.
+
+    ``handle()`` runs each command of a ';'-separated message and joins the
+    replies of the queries with ';', as the real instruments do. Subclasses
+    implement ``command(header, args)``; SCPI headers arrive in upper-case
+    short form ('SOURce:CURRent' -> 'SOUR:CURR'). Measurement commands set
+    ``busy_until``, which *OPC? and data queries wait for.
+    """
+
+    IDN = "PICA,SIMULATED,0,1.0"
+    SCPI = True
+
+    def __init__(self, lab):
+        self.lab = lab
+        self.busy_until = 0.0
+        self.reset()
+
+    def reset(self):
+        pass
+
+    def source_current_a(self):
+        return 0.0
+
+    def trigger(self):
+        """Group Execute Trigger (``assert_trigger``)."""
+
+    def link_trigger(self):
+        """Trigger Link pulse from another instrument of the lab."""
+
+    def busy(self, seconds):
+        self.busy_until = max(self.busy_until, time.monotonic()) + seconds
+
+    def wait_until_idle(self, timeout_s=None):
+        remaining = self.busy_until - time.monotonic()
+        if timeout_s is not None and remaining > timeout_s:
+            time.sleep(timeout_s)
+            raise _timeout_error(f"{type(self).__name__} is still measuring.")
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def normalise(self, header):
+        if not self.SCPI or header.startswith('*'):
+            return header.upper()
+        query = header.endswith('?')
+        nodes = header.rstrip('?').lstrip(':').split(':')
+        return ':'.join(_short_form(n) for n in nodes) + ('?' if query else '')
+
+    def handle(self, message, timeout_s=None):
+        replies = []
+        for command in message.split(';'):
+            command = command.strip()
+            if not command:
+                continue
+            header, _, args = command.partition(' ')
+            header = self.normalise(header)
+            args = args.strip()
+            if header == '*IDN?':
+                reply = self.IDN
+            elif header in ('*OPC?', '*WAI'):
+                self.wait_until_idle(timeout_s)
+                reply = '1' if header == '*OPC?' else None
+            elif header == '*RST':
+                self.busy_until = 0.0
+                self.reset()
+                reply = None
+            elif header.startswith('*'):
+                reply = None  # *CLS, *SRE, *ESE: status reporting is not modelled
+            else:
+                reply = self.command(header, args)
+            if reply is not None:
+                replies.append(str(reply))
+        return ';'.join(replies) if replies else None
+
+    def command(self, header, args):
+        return None
+
+    @staticmethod
+    def floats(args):
+        return [float(v) for v in args.replace(' ', '').split(',') if v]
+
+
+class SimLakeshore350(SimulatedInstrument):
+    """
+    Cryostat with a first-order thermal response. With the heater on the
+    temperature follows the (optionally ramping) setpoint with time constant
+    ``TAU_HEAT_S``; with the heater off it relaxes to the bath temperature.
+    """
+
+    IDN = "LSCI,MODEL350,SIM350,2.0"
+    SCPI = False
+    TAU_HEAT_S = 20.0
+    TAU_COOL_S = 300.0
+    MAX_TEMPERATURE_K = 400.0
+    # Fixed offsets of the other sensor inputs from input A.
+    INPUT_OFFSETS_K = {'A': 0.0, 'B': 0.05, 'C': -0.05}
+
+    def reset(self):
+        self.temperature_a = getattr(self, 'temperature_a', self.lab.start_temperature_k)
+        self.target = {1: self.temperature_a, 2: self.temperature_a}
+        self.setpoint = dict(self.target)
+        self.ramp = {1: (0, 0.0), 2: (0, 0.0)}
+        self.range = {1: 0, 2: 0}
+        self.last_update = time.monotonic()
+
+    def _update(self):
+        with self.lab.lock:
+            now = time.monotonic()
+            dt = (now - self.last_update) * self.lab.time_scale
+            self.last_update = now
+            for output in self.setpoint:
+                ramp_on, rate = self.ramp[output]
+                if ramp_on and rate > 0:
+                    step = rate / 60.0 * dt
+                    gap = self.target[output] - self.setpoint[output]
+                    self.setpoint[output] += max(-step, min(step, gap))
+                else:
+                    self.setpoint[output] = self.target[output]
+            if self.range[1] > 0:
+                goal, tau = self.setpoint[1], self.TAU_HEAT_S
+            else:
+                goal, tau = self.lab.bath_temperature_k, self.TAU_COOL_S
+            self.temperature_a += (goal - self.temperature_a) * (1 - math.exp(-dt / tau))
+
+    def temperature(self, sensor):
+        self._update()
+        if sensor == 'D':
+            return self.lab.bath_temperature_k
+        return self.temperature_a + self.INPUT_OFFSETS_K.get(sensor, 0.0)
+
+    def heater_output(self, output):
+        self._update()
+        if self.range.get(output, 0) == 0:
+            return 0.0
+        bath = self.lab.bath_temperature_k
+        load = (self.setpoint[output] - bath) / (self.MAX_TEMPERATURE_K - bath)
+        return max(0.0, min(100.0, 100.0 * load))
+
+    def command(self, header, args):
+        fields = [f.strip() for f in args.split(',')] if args else []
+        if header == 'KRDG?':
+            sensors = ('A', 'B', 'C', 'D') if fields[0] == '0' else (fields[0].upper(),)
+            return ','.join(f"{self.lab.noisy(self.temperature(s), 1e-3):+.3f}"
+                            for s in sensors)
+        if header == 'HTR?':
+            return f"{self.heater_output(int(fields[0])):+.2f}"
+        if header == 'SETP':
+            self._update()
+            self.target[int(fields[0])] = float(fields[1])
+            if not self.ramp[int(fields[0])][0]:
+                self.setpoint[int(fields[0])] = float(fields[1])
+        elif header == 'SETP?':
+            self._update()
+            return f"{self.setpoint[int(fields[0])]:+.3f}"
+        elif header == 'RAMP':
+            self._update()
+            self.ramp[int(fields[0])] = (int(fields[1]), float(fields[2]))
+        elif header == 'RAMP?':
+            ramp_on, rate = self.ramp[int(fields[0])]
+            return f"{ramp_on},{rate:.1f}"
+        elif header == 'RANGE':
+            self._update()
+            self.range[int(fields[0])] = int(fields[1])
+        elif header == 'RANGE?':
+            return str(self.range[int(fields[0])])
+        return None
+
+
+class SimKeithley2400(SimulatedInstrument):
+    """SourceMeter sourcing current into the sample, fixed or source-list mode."""
+
+    IDN = "KEITHLEY INSTRUMENTS INC.,MODEL 2400,SIM2400,C32"
+
+    def reset(self):
+        self.current = 0.0
+        self.output = False
+        self.mode = 'FIX'
+        self.source_list = []
+        self.trigger_count = 1
+        self.trigger_output = 'NONE'
+        self.source_delay = 0.0
+        self.nplc = 1.0
+        self.compliance_v = 21.0
+
+    def source_current_a(self):
+        return self.current if self.output else 0.0
+
+    def _voltage(self, current):
+        voltage = self.lab.noisy(
+            current * self.lab.sample.resistance_ohm(self.lab.temperature_k()), 1e-7)
+        return max(-self.compliance_v, min(self.compliance_v, voltage))
+
+    def command(self, header, args):
+        if header == 'SOUR:CURR':
+            self.current = float(args)
+        elif header == 'SOUR:CURR:MODE':
+            self.mode = args.upper()[:4]
+        elif header == 'SOUR:LIST:CURR':
+            self.source_list = self.floats(args)
+        elif header == 'SOUR:DEL':
+            self.source_delay = float(args)
+        elif header == 'TRIG:COUN':
+            self.trigger_count = int(float(args))
+        elif header == 'TRIG:OUTP':
+            self.trigger_output = args.upper()
+        elif header == 'INIT':
+            self.output = True
+            if 'SOUR' in self.trigger_output:
+                self.lab.trigger_link(self)
+            self.busy(self.trigger_count * (self.nplc / 50.0 + self.source_delay))
+        elif header == 'SENS:VOLT:NPLC':
+            self.nplc = float(args)
+        elif header == 'SENS:VOLT:PROT':
+            self.compliance_v = float(args)
+        elif header == 'OUTP':
+            self.output = args.upper() in ('ON', '1')
+        elif header in ('READ?', 'MEAS?', 'MEAS:VOLT?'):
+            self.output = True
+            if self.mode == 'LIST':
+                currents = self.source_list[:self.trigger_count]
+            else:
+                currents = [self.current] * self.trigger_count
+            self.busy(len(currents) * (self.nplc / 50.0 + self.source_delay))
+            self.wait_until_idle()
+            voltages = [self._voltage(c) for c in currents]
+            if self.mode == 'LIST' and currents:
+                self.current = currents[-1]
+            return ','.join(_fmt(v) for v in voltages)
+        return None
+
+
+class SimKeithley2182(SimulatedInstrument):
+    """
+    Nanovoltmeter across the sample, free-running or triggered (bus or
+    Trigger Link) into its trace buffer. Each INIT accepts ``TRIG:COUN``
+    triggers of ``SAMP:COUN`` readings each.
+    """
+
+    IDN = "KEITHLEY INSTRUMENTS INC.,MODEL 2182A,SIM2182,C02"
+
+    def reset(self):
+        self.sample_count = 1
+        self.trigger_count = 1
+        self.triggers_left = 0
+        self.trigger_source = 'BUS'
+        self.trigger_delay = 0.0
+        self.nplc = 5.0
+        self.armed = False
+        self.trace = []
+
+    def reading(self):
+        return self.lab.noisy(self.lab.sample_voltage(), 1e-9)
+
+    def trigger(self):
+        if self.trigger_source.startswith('EXT'):
+            return
+        self._acquire()
+
+    def link_trigger(self):
+        if self.trigger_source.startswith('EXT'):
+            self._acquire()
+
+    def reading_time_s(self):
+        return self.sample_count * (self.trigger_delay + self.nplc / 50.0)
+
+    def _acquire(self):
+        if not self.armed:
+            return
+        self.triggers_left -= 1
+        self.armed = self.triggers_left > 0
+        self.busy(self.reading_time_s())
+        self.trace += [self.reading() for _ in range(self.sample_count)]
+
+    def command(self, header, args):
+        if header == 'SAMP:COUN':
+            self.sample_count = int(float(args))
+        elif header == 'TRIG:DEL':
+            self.trigger_delay = float(args)
+        elif header == 'TRIG:SOUR':
+            self.trigger_source = args.upper()
+        elif header == 'TRIG:COUN':
+            self.trigger_count = int(float(args))
+        elif header == 'SENS:VOLT:NPLC':
+            self.nplc = float(args)
+        elif header == 'INIT':
+            self.armed = True
+            self.triggers_left = self.trigger_count
+        elif header == 'TRAC:CLE':
+            self.trace = []
+        elif header == 'TRAC:DATA?':
+            self.wait_until_idle()
+            return ','.join(_fmt(v) for v in self.trace)
+        elif header == 'STAT:MEAS?':
+            return '512' if self.trace and time.monotonic() >= self.busy_until else '0'
+        elif header in ('FETC?', 'READ?', 'MEAS?', 'MEAS:VOLT?'):
+            if header != 'FETC?':
+                self.busy(self.nplc / 50.0)
+                self.wait_until_idle()
+            return _fmt(self.reading())
+        return None
+
+
+class SimKeithley6221(SimulatedInstrument):
+    """
+    Current source with Delta mode. A 2182A on its RS-232 link is modelled
+    for passthrough commands; Delta readings accumulate in the trace buffer
+    at one reading per ``DELTA_PERIOD_S`` (``PULSE_DELTA_PERIOD_S`` for
+    Pulse Delta). Swept Pulse Delta and differential conductance stop after
+    their last step. A list sweep triggers that 2182A over Trigger Link at
+    every step.
+    """
+
+    IDN = "KEITHLEY INSTRUMENTS INC.,MODEL 6221,SIM6221,A03"
+    DELTA_PERIOD_S = 0.1
+    PULSE_DELTA_PERIOD_S = 0.02
+    BUFFER_POINTS = 65536
+
+    def __init__(self, lab):
+        self.nanovoltmeter = SimKeithley2182(lab)
+        super().__init__(lab)
+
+    def reset(self):
+        self.current = 0.0
+        self.output = False
+        self.delta_high = 0.0
+        self.delta_mode = 'DELT'
+        self.delta_armed = False
+        self.delta_start = None
+        self.pulse_sweep = False
+        self.dcon = {'STAR': 0.0, 'STEP': 0.0, 'STOP': 0.0, 'DELT': 0.0}
+        self.unit = 'V'
+        self.buffer_points = self.BUFFER_POINTS
+        self.sweep_list = []
+        self.sweep_delays = []
+        self.sweep_armed = False
+        self.serial_reply = ''
+
+    def source_current_a(self):
+        # The alternating Delta current averages to zero at the 2182A.
+        return self.current if self.output and self.delta_start is None else 0.0
+
+    def _delta_steps(self):
+        """Number of readings a swept mode takes, or None when free-running."""
+        if self.delta_mode == 'DCON':
+            step = self.dcon['STEP'] or 1.0
+            return int(round((self.dcon['STOP'] - self.dcon['STAR']) / step)) + 1
+        if self.delta_mode == 'PDEL' and self.pulse_sweep:
+            return len(self.sweep_list)
+        return None
+
+    def _delta_period_s(self):
+        return self.PULSE_DELTA_PERIOD_S if self.delta_mode == 'PDEL' else self.DELTA_PERIOD_S
+
+    def _delta_reading(self, index=None):
+        resistance = self.lab.sample.resistance_ohm(self.lab.temperature_k())
+        if self.delta_mode == 'DCON':
+            # An ohmic sample has dV/dI = R at every bias.
+            if self.unit == 'OHMS':
+                return self.lab.noisy(resistance, 1e-6)
+            return self.lab.noisy(self.dcon['DELT'] * resistance, 1e-9)
+        current = self.delta_high
+        if self.delta_mode == 'PDEL' and self.pulse_sweep and self.sweep_list:
+            index = self._stored_points() - 1 if index is None else index
+            current = self.sweep_list[max(0, min(index, len(self.sweep_list) - 1))]
+        return self.lab.noisy(current * resistance, 1e-9)
+
+    def _run_sweep(self):
+        # The steps run at once; *OPC? waits out their modelled duration.
+        self.sweep_armed = False
+        bias, self.output = self.current, True
+        delays = self.sweep_delays or [0.0]
+        for index, current in enumerate(self.sweep_list):
+            self.current = current
+            self.nanovoltmeter.link_trigger()
+            self.busy(delays[min(index, len(delays) - 1)]
+                      + self.nanovoltmeter.reading_time_s())
+        self.current = bias
+
+    def _stored_points(self):
+        if self.delta_start is None:
+            return 0
+        elapsed = time.monotonic() - self.delta_start
+        points = min(self.buffer_points, int(elapsed / self._delta_period_s()))
+        steps = self._delta_steps()
+        return points if steps is None else min(points, steps)
+
+    # --- Command handlers, dispatched on the short-form header ---
+    def _set_current(self, header, args):
+        self.current = float(args)
+
+    def _set_output(self, header, args):
+        self.output = args.upper() in ('ON', '1')
+
+    def _set_delta_high(self, header, args):
+        self.delta_high = float(args)
+
+    def _set_pulse_sweep(self, header, args):
+        self.pulse_sweep = args.upper() in ('ON', '1')
+
+    def _set_dcon(self, header, args):
+        key = header.split(':')[2]
+        if key in self.dcon:
+            self.dcon[key] = float(args)
+
+    def _set_unit(self, header, args):
+        self.unit = _short_form(args)
+
+    def _arm_delta(self, header, args):
+        self.delta_mode = header.split(':')[1]
+        self.delta_armed = True
+
+    def _initiate(self, header, args):
+        if self.delta_armed:
+            self.delta_start = time.monotonic()
+        elif self.sweep_armed:
+            self._run_sweep()
+
+    def _set_sweep_list(self, header, args):
+        self.sweep_list = self.floats(args)
+
+    def _set_sweep_delays(self, header, args):
+        self.sweep_delays = self.floats(args)
+
+    def _arm_sweep(self, header, args):
+        self.sweep_armed = True
+
+    def _abort(self, header, args):
+        self.delta_armed = self.sweep_armed = False
+        self.delta_start = None
+        if header == 'SOUR:CLE':
+            self.output = False
+
+    def _set_buffer_points(self, header, args):
+        self.buffer_points = min(int(float(args)), self.BUFFER_POINTS)
+
+    def _fresh_reading(self, header, args):
+        if self.delta_start is None:
+            raise _timeout_error("Delta mode is not running.")
+        return _fmt(self._delta_reading())
+
+    def _buffer_count(self, header, args):
+        return str(self._stored_points())
+
+    def _buffer_data(self, header, args):
+        start, count = (int(v) for v in self.floats(args))
+        values = []
+        for index in range(start, min(start + count, self._stored_points())):
+            values += [self._delta_reading(index), index * self._delta_period_s()]
+        return ','.join(_fmt(v) for v in values)
+
+    def _serial_send(self, header, args):
+        reply = self.nanovoltmeter.handle(args.strip().strip('\'"'))
+        self.serial_reply = reply or ''
+
+    def _serial_enter(self, header, args):
+        reply, self.serial_reply = self.serial_reply, ''
+        return reply
+
+    COMMANDS = {
+        'SOUR:CURR': _set_current,
+        'OUTP': _set_output,
+        'OUTP:STAT': _set_output,
+        'SOUR:DELT:HIGH': _set_delta_high,
+        'SOUR:PDEL:HIGH': _set_delta_high,
+        'SOUR:PDEL:SWE': _set_pulse_sweep,
+        'UNIT': _set_unit,
+        'SOUR:DELT:ARM': _arm_delta,
+        'SOUR:PDEL:ARM': _arm_delta,
+        'SOUR:DCON:ARM': _arm_delta,
+        'INIT': _initiate,
+        'INIT:IMM': _initiate,
+        'SOUR:LIST:CURR': _set_sweep_list,
+        'SOUR:LIST:DEL': _set_sweep_delays,
+        'SOUR:SWE:ARM': _arm_sweep,
+        'SOUR:SWE:ABOR': _abort,
+        'SOUR:CLE': _abort,
+        'TRAC:POIN': _set_buffer_points,
+        'SENS:DATA:FRES?': _fresh_reading,
+        'TRAC:POIN:ACT?': _buffer_count,
+        'TRAC:DATA:SEL?': _buffer_data,
+        'SYST:COMM:SER:SEND': _serial_send,
+        'SYST:COMM:SER:ENT?': _serial_enter,
+    }
+
+    def command(self, header, args):
+        handler = self.COMMANDS.get(header)
+        if handler is None and header.startswith('SOUR:DCON:'):
+            handler = SimKeithley6221._set_dcon
+        return handler(self, header, args) if handler else None
+
+
+class SimKeithley6517B(SimulatedInstrument):
+    """
+    Electrometer measuring the sample with its built-in voltage source.
+    INIT stores TRIG:COUN readings in the trace buffer; the alternating-
+    polarity test sequence stores its resistances there too, one per
+    measure time after the discarded ones. As on the instrument, *OPC?
+    returns as soon as that sequence is armed.
+    """
+
+    IDN = "KEITHLEY INSTRUMENTS INC.,MODEL 6517B,SIM6517B,A13"
+    UNITS = {'RES': 'NOHM', 'CURR': 'NADC', 'VOLT': 'NVDC'}
+    OVERFLOW = 9.9e37
+
+    def reset(self):
+        self.function = 'VOLT'
+        self.source_v = 0.0
+        self.output = False
+        self.zero_check = False
+        self.nplc = 1.0
+        self.trigger_count = 1
+        self.trace = []  # (time the reading is stored, formatted reading)
+        self.alt_polarity = {'ALTV': 10.0, 'MTIM': 15.0, 'DISC': 3, 'READ': 10}
+
+    def _run_alt_polarity(self):
+        sequence, start = self.alt_polarity, time.monotonic()
+        for index in range(int(sequence['READ'])):
+            resistance = self.lab.sample.resistance_ohm(self.lab.temperature_k())
+            stored_at = start + (sequence['DISC'] + index + 1) * sequence['MTIM']
+            self.trace.append((stored_at, f"{self.lab.noisy(resistance, 1.0):+.6E}NOHM"))
+
+    def _stored_readings(self):
+        now = time.monotonic()
+        return [reading for stored_at, reading in self.trace if stored_at <= now]
+
+    def _buffer_command(self, header, args):
+        # Trace buffer and the test sequence that fills it
+        if header.startswith('TSEQ:ALTP:') and header.split(':')[2] in self.alt_polarity:
+            self.alt_polarity[header.split(':')[2]] = float(args)
+        elif header == 'TSEQ:ARM':
+            self._run_alt_polarity()
+        elif header == 'TRAC:CLE':
+            self.trace = []
+        elif header == 'TRAC:DATA?':
+            return ','.join(self._stored_readings())
+        elif header == 'TRAC:POIN:ACT?':
+            return str(len(self._stored_readings()))
+        return None
+
+    def _reading(self):
+        if self.function == 'VOLT':
+            return self.lab.noisy(self.source_v if self.output else 0.0, 1e-6)
+        resistance = self.lab.sample.resistance_ohm(self.lab.temperature_k())
+        current = (self.source_v / resistance
+                   if self.output and not self.zero_check else 0.0)
+        current = self.lab.noisy(current, 1e-15)
+        if self.function == 'CURR':
+            return current
+        if abs(current) < 1e-14:
+            return self.OVERFLOW
+        return self.source_v / current
+
+    def command(self, header, args):
+        if header == 'SENS:FUNC':
+            self.function = _short_form(args.strip('\'"'))
+        elif header.startswith('SENS:') and header.endswith(':NPLC'):
+            self.nplc = float(args)
+        elif header == 'SOUR:VOLT:LEV' or header == 'SOUR:VOLT':
+            self.source_v = float(args)
+        elif header in ('SOUR:VOLT?', 'SOUR:VOLT:LEV?'):
+            return f"{self.source_v:+.4E}"
+        elif header == 'OUTP':
+            self.output = args.upper() in ('ON', '1')
+        elif header == 'SYST:ZCH':
+            self.zero_check = args.upper() in ('ON', '1')
+        elif header == 'SYST:ZCOR:ACQ':
+            self.busy(0.1)
+        elif header == 'TRIG:COUN':
+            self.trigger_count = int(float(args))
+        elif header == 'INIT':
+            now = time.monotonic()
+            self.trace += [(now, f"{self._reading():+.6E}{self.UNITS[self.function]}")
+                           for _ in range(self.trigger_count)]
+            self.busy(self.trigger_count * self.nplc / 50.0)
+        elif header.startswith(('TRAC:', 'TSEQ:')):
+            return self._buffer_command(header, args)
+        elif header in ('READ?', 'MEAS?', 'FETC?'):
+            if header != 'FETC?':
+                self.busy(self.nplc / 50.0)
+                self.wait_until_idle()
+            return f"{self._reading():+.6E}{self.UNITS[self.function]}"
+        return None
+
+
+class SimKeysightE4980A(SimulatedInstrument):
+    """LCR meter measuring Cp-D of the sample, single point or list sweep."""
+
+    IDN = "Keysight Technologies,E4980A,SIM4980,A.02.20"
+
+    def reset(self):
+        self.frequency = 1000.0
+        self.ac_level = 1.0
+        self.bias_v = 0.0
+        self.bias_on = False
+        self.aperture = 'MED'
+        self.page = 'MEAS'
+        self.list_bias = []
+        self.list_frequency = []
+        self.trigger_delay = 0.0
+        self.results = []
+
+    def _point(self, bias_v):
+        capacitance = self.lab.noisy(self.lab.sample.capacitance_f(bias_v), 1e-15)
+        loss = self.lab.noisy(self.lab.sample.loss_tangent, 1e-5)
+        return capacitance, loss
+
+    def trigger(self):
+        measure_s = KeysightE4980A.APERTURE_TIMES_S[self.aperture] + self.trigger_delay
+        if self.page == 'LIST':
+            size = max(len(self.list_bias), len(self.list_frequency))
+            biases = self.list_bias or [self.bias_v] * size
+            self.results = [self._point(b) for b in biases]
+        else:
+            size = 1
+            self.results = [self._point(self.bias_v if self.bias_on else 0.0)]
+        self.busy(size * measure_s)
+
+    def command(self, header, args):
+        if header == 'FREQ':
+            self.frequency = float(args)
+        elif header == 'VOLT:LEV':
+            self.ac_level = float(args)
+        elif header == 'BIAS:VOLT:LEV':
+            self.bias_v = float(args)
+        elif header == 'BIAS:VOLT:LEV?':
+            return f"{self.bias_v:+.6E}"
+        elif header == 'BIAS:STAT':
+            self.bias_on = args.upper() in ('ON', '1')
+        elif header == 'APER':
+            self.aperture = _short_form(args.split(',')[0])
+        elif header == 'DISP:PAGE':
+            self.page = _short_form(args)
+        elif header == 'LIST:BIAS:VOLT':
+            self.list_bias = self.floats(args)
+        elif header == 'LIST:FREQ':
+            self.list_frequency = self.floats(args)
+        elif header == 'TRIG:TDEL':
+            self.trigger_delay = float(args)
+        elif header in ('TRIG', 'TRIG:IMM'):
+            self.trigger()
+        elif header == 'FETC:IMP:FORM?':
+            self.wait_until_idle()
+            capacitance, loss = self.results[-1] if self.results else (0.0, 0.0)
+            return f"{_fmt(capacitance)},{_fmt(loss)},+0"
+        elif header == 'FETC?':
+            self.wait_until_idle()
+            return ','.join(f"{_fmt(c)},{_fmt(d)},+0,+0" for c, d in self.results)
+        return None
+
+
+class SimSR830(SimulatedInstrument):
+    """
+    Lock-in reading the sample driven by its sine output through a 1 MΩ
+    series resistor, with a small fixed phase lag.
+    """
+
+    IDN = "Stanford_Research_Systems,SR830,s/n00000,ver1.07"
+    SCPI = False
+    SERIES_RESISTOR_OHM = 1e6
+    PHASE_DEG = 2.0
+
+    def reset(self):
+        self.frequency = 1000.0
+        self.amplitude = 1.0
+        self.sensitivity = 22
+        self.time_constant = 9
+
+    def _outputs(self):
+        current = self.amplitude / self.SERIES_RESISTOR_OHM
+        r = self.lab.noisy(
+            current * self.lab.sample.resistance_ohm(self.lab.temperature_k()), 1e-9)
+        theta = self.lab.noisy(self.PHASE_DEG, 0.01)
+        x = r * math.cos(math.radians(theta))
+        y = r * math.sin(math.radians(theta))
+        return {1: x, 2: y, 3: r, 4: theta, 5: 0.0, 6: 0.0, 7: 0.0, 8: 0.0,
+                9: self.frequency}
+
+    def command(self, header, args):
+        if header == 'SNAP?':
+            outputs = self._outputs()
+            return ','.join(f"{outputs[int(c)]:.6e}" for c in args.split(','))
+        if header == 'OUTP?':
+            return f"{self._outputs()[int(args)]:.6e}"
+        settings = {'FREQ': 'frequency', 'SLVL': 'amplitude',
+                    'SENS': 'sensitivity', 'OFLT': 'time_constant'}
+        name = settings.get(header.rstrip('?'))
+        if name is None:
+            return None
+        if header.endswith('?'):
+            return f"{getattr(self, name):g}"
+        value = float(args)
+        setattr(self, name, int(value) if name in ('sensitivity', 'time_constant') else value)
+        return None
+
+
+MODELS = {
+    'Lakeshore350': SimLakeshore350,
+    'Keithley2400': SimKeithley2400,
+    'Keithley2182': SimKeithley2182,
+    'Keithley6221': SimKeithley6221,
+    'Keithley6517B': SimKeithley6517B,
+    'KeysightE4980A': SimKeysightE4980A,
+    'SR830': SimSR830,
+}
+
+
+class SimulatedResource:
+    """The subset of a pyvisa MessageBasedResource used by PICA."""
+
+    def __init__(self, lab, resource_name, instrument, timeout=10000,
+                 read_termination=None, write_termination=None, **kwargs):
+        self.lab = lab
+        self.resource_name = resource_name
+        self.instrument = instrument
+        self.timeout = timeout
+        self.read_termination = read_termination
+        self.write_termination = write_termination
+        self._lock = threading.Lock()
+        self._reply = None
+
+    def _transact(self, message):
+        if self.lab.latency_s:
+            time.sleep(self.lab.latency_s)
+        timeout_s = self.timeout / 1000.0 if self.timeout else None
+        return self.instrument.handle(message, timeout_s)
+
+    def write(self, message):
+        with self._lock:
+            self._reply = self._transact(message)
+        return len(message)
+
+    def read(self):
+        with self._lock:
+            reply, self._reply = self._reply, None
+        if reply is None:
+            raise _timeout_error(f"No reply from {self.resource_name}.")
+        return reply + '\n'
+
+    def query(self, message, delay=None):
+        self.write(message)
+        return self.read()
+
+    def query_ascii_values(self, message, converter='f', separator=',',
+                           container=list, delay=None):
+        reply = self.query(message).strip()
+        return container(float(v) for v in reply.split(separator) if v.strip())
+
+    def query_binary_values(self, message, datatype='f', is_big_endian=False,
+                            container=list, **kwargs):
+        # The values are returned already decoded; the byte layout is not modelled.
+        return self.query_ascii_values(message, container=container)
+
+    def assert_trigger(self):
+        if self.lab.latency_s:
+            time.sleep(self.lab.latency_s)
+        self.instrument.trigger()
+
+    def wait_for_srq(self, timeout=25000):
+        self.instrument.wait_until_idle(timeout / 1000.0 if timeout else None)
+
+    def read_stb(self):
+        return 64 if time.monotonic() >= self.instrument.busy_until else 0
+
+    def clear(self):
+        with self._lock:
+            self._reply = None
+
+    def close(self):
+        pass
+
+
+class SimulatedResourceManager:
+    """Stands in for ``pyvisa.ResourceManager``; resources come from one SimulatedLab."""
+
+    def __init__(self, lab=None, *args, **kwargs):
+        self.lab = lab if isinstance(lab, SimulatedLab) else SimulatedLab()
+
+    def list_resources(self, query='?*::INSTR'):
+        return tuple(self.lab.instruments)
+
+    def open_resource(self, resource_name, **kwargs):
+        instrument = self.lab.instruments.get(resource_name)
+        if instrument is None:
+            raise ValueError(f"No simulated instrument at '{resource_name}'.")
+        return SimulatedResource(self.lab, resource_name, instrument, **kwargs)
+
+    def close(self):
+        pass
+
+
+_original_resource_manager = None
+
+
+def install(lab=None):
+    """
+    Routes every VISA connection in this process to a simulated lab: the
+    shared ``get_resource_manager()`` and direct ``pyvisa.ResourceManager()``
+    calls both return the same SimulatedResourceManager. Returns it.
+    """
+    global _original_resource_manager
+    manager = SimulatedResourceManager(lab)
+    with Base_Instrument._resource_manager_lock:
+        Base_Instrument._resource_manager = manager
+    if pyvisa is not None:
+        if _original_resource_manager is None:
+            _original_resource_manager = pyvisa.ResourceManager
+        pyvisa.ResourceManager = lambda *args, **kwargs: manager
+    return manager
+
+
+def uninstall():
+    """Undoes ``install()``."""
+    global _original_resource_manager
+    with Base_Instrument._resource_manager_lock:
+        Base_Instrument._resource_manager = None
+    if pyvisa is not None and _original_resource_manager is not None:
+        pyvisa.ResourceManager = _original_resource_manager
+        _original_resource_manager = None
@@ -0,0 +1,95 @@
+"""
+Module: Startup_Pipeline.py
+Purpose: Dependency-aware, concurrent instrument initialisation.
+"""
+
+# -------------------------------------------------------------------------------
+# Name:         PICA Startup Pipeline
+# Purpose:      Runs the set-up steps of a measurement (reset, configure,
+#               zero-correct, ...) on a thread pool as soon as the steps they
+#               depend on have finished, so independent instruments are
+#               prepared at the same time and the start-up takes as long as
+#               the slowest chain of steps instead of the sum of all of them.
+# Author:       Prathamesh Deshmukh
+# Created:      17/10/2026
+# Version:      1.0
+# -------------------------------------------------------------------------------
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class StartupPipeline:
+    """
+    Runs named start-up steps concurrently, respecting their dependencies.
+
+    - ``add_step(name, run, after=())`` adds a callable; ``after`` names the
+      steps that must have completed before it starts. Dependencies must be
+      added first, so the steps cannot form a cycle.
+    - ``run()`` blocks until every step has finished and returns
+      {name: return value}. If a step raises, no further steps are started,
+      the running ones are allowed to finish and the first error is
+      re-raised in the caller.
+    - ``timings`` holds (start offset, duration) in seconds per step and
+      ``summary()`` describes them for the GUI log.
+    """
+
+    def __init__(self, name="Startup"):
+        self.name = name
+        self._steps = {}
+        self.results = {}
+        self.timings = {}
+        self.elapsed_s = 0.0
+
+    def add_step(self, name, run, after=()):
+        if name in self._steps:
+            raise ValueError(f"Duplicate start-up step '{name}'.")
+        unknown = [step for step in after if step not in self._steps]
+        if unknown:
+            raise ValueError(
+                f"Start-up step '{name}' depends on unknown step(s) {unknown}.")
+        self._steps[name] = (run, tuple(after))
+
+    def run(self):
+        """Runs every step once and returns {name: return value}."""
+        t0 = time.monotonic()
+        self.results, self.timings = {}, {}
+        pending = dict(self._steps)
+        running = {}
+        error = None
+        with ThreadPoolExecutor(max_workers=max(1, len(pending)),
+                                thread_name_prefix=self.name) as executor:
+            while pending or running:
+                if error is not None:
+                    pending.clear()
+                for name, (step, after) in list(pending.items()):
+                    if all(dependency in self.results for dependency in after):
+                        del pending[name]
+                        future = executor.submit(self._timed, name, step, t0)
+                        running[future] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                    except Exception as e:
+                        error = error or e
+        self.elapsed_s = time.monotonic() - t0
+        if error is not None:
+            raise error
+        return self.results
+
+    def _timed(self, name, step, t0):
+        start = time.monotonic()
+        try:
+            return step()
+        finally:
+            self.timings[name] = (start - t0, time.monotonic() - start)
+
+    def summary(self):
+        steps = sorted(self.timings.items(), key=lambda item: item[1][0])
+        details = ", ".join(f"{name} {duration:.2f} s"
+                            for name, (_, duration) in steps)
+        return f"{self.name} took {self.elapsed_s:.2f} s ({details})"
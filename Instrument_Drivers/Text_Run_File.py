@@ -0,0 +1,187 @@
+"""
+Module: Text_Run_File.py
+Purpose: Fast loader for the delimited text data files written by the PICA measurement GUIs.
+"""
+
+# -------------------------------------------------------------------------------
+# Name:         PICA Text Run Loader
+# Purpose:      Loads .dat/.csv run files for the plotter and analysis
+#               scripts without np.genfromtxt's per-field Python parsing:
+#               the delimiter (',', tab or ';') and header row are sniffed,
+#               leading '#' lines are kept as metadata, and the data is read
+#               in byte chunks that are parsed in bulk by the pandas C engine
+#               (np.loadtxt when pandas is not installed). Fields that are
+#               not numbers (e.g. timestamps) load as NaN.
+# Author:       Prathamesh Deshmukh
+# Created:      17/10/2026
+# Version:      1.0
+# -------------------------------------------------------------------------------
+
+import csv
+import io
+import warnings
+from collections import namedtuple
+
+import numpy as np
+
+DELIMITERS = (',', '\t', ';')
+CHUNK_BYTES = 8 << 20
+
+# columns: header names; delimiter: the sniffed delimiter; metadata: the
+# lines above the header; data_offset: byte offset of the first data line;
+# numeric_columns: indices of the columns holding numbers in the first data
+# line (None if there is no data line yet).
+TextLayout = namedtuple(
+    'TextLayout', ['columns', 'delimiter', 'metadata', 'data_offset', 'numeric_columns'])
+
+# data: (rows, columns) float64 array; offset: byte offset just after the
+# last complete line, where a reader following a growing file resumes;
+# partial_line: an unterminated last line (still being written), not in data.
+TextRun = namedtuple(
+    'TextRun', ['data', 'columns', 'metadata', 'delimiter', 'offset',
+                'partial_line', 'numeric_columns'])
+
+
+def _pandas():
+    # Imported on first use so that the GUIs do not pay for it at start-up
+    try:
+        import pandas
+    except ImportError:
+        return None
+    return pandas
+
+
+def _is_number(field):
+    try:
+        float(field)
+    except ValueError:
+        return False
+    return True
+
+
+def _split(line, delimiter):
+    return [field.strip() for field in next(csv.reader([line], delimiter=delimiter))]
+
+
+def _column_names(fields):
+    names = []
+    for i, field in enumerate(fields):
+        name = field or f"Column {i + 1}"
+        while name in names:
+            name += "_"
+        names.append(name)
+    return names
+
+
+def sniff_text_layout(filepath):
+    """Finds the header row, delimiter and numeric columns of a text data file."""
+    metadata = []
+    layout = None
+    with open(filepath, 'rb') as f:
+        for raw in iter(f.readline, b''):
+            if not raw.endswith(b'\n'):
+                break  # an unterminated line may still be being written
+            line = raw.decode('utf-8-sig' if f.tell() == len(raw) else 'utf-8',
+                              errors='ignore').strip()
+            if layout is None:
+                delimiter = max(DELIMITERS, key=line.count)
+                if not line or line.startswith('#') or delimiter not in line:
+                    if line:
+                        metadata.append(line)
+                    continue
+                layout = TextLayout(_column_names(_split(line, delimiter)),
+                                    delimiter, metadata, f.tell(), None)
+            elif line and not line.startswith('#'):
+                fields = _split(line, layout.delimiter)
+                return layout._replace(numeric_columns=[
+                    i for i, field in enumerate(fields[:len(layout.columns)])
+                    if _is_number(field)] or None)
+    if layout is None:
+        raise ValueError(
+            "No valid data header row found. Ensure the file has a "
+            "non-commented header with comma, tab or semicolon-separated columns.")
+    return layout
+
+
+def _parse_block(block, num_columns, delimiter, usecols=None):
+    """Parses complete data lines (bytes) into a (rows, num_columns) float array."""
+    pandas = _pandas()
+    cols = list(usecols) if usecols else list(range(num_columns))
+    if pandas is not None:
+        try:
+            frame = pandas.read_csv(
+                io.BytesIO(block), sep=delimiter, header=None,
+                names=range(num_columns), usecols=cols, index_col=False,
+                comment='#', engine='c', on_bad_lines='skip',
+                skip_blank_lines=True, encoding_errors='ignore')
+        except pandas.errors.EmptyDataError:
+            return np.empty((0, num_columns))
+        values = frame[cols]
+        if not all(pandas.api.types.is_numeric_dtype(dtype) for dtype in values.dtypes):
+            values = values.apply(pandas.to_numeric, errors='coerce')
+        rows = values.to_numpy(dtype=float)
+        # Lines without any number (e.g. a repeated header) are not data
+        rows = rows[~np.isnan(rows).all(axis=1)]
+    else:
+        text = io.StringIO(block.decode('utf-8', errors='ignore'))
+        try:
+            rows = np.loadtxt(text, delimiter=delimiter, comments='#',
+                              usecols=cols, quotechar='"', ndmin=2)
+        except ValueError:
+            text.seek(0)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                rows = np.genfromtxt(text, delimiter=delimiter, comments='#',
+                                     usecols=cols, autostrip=True,
+                                     invalid_raise=False, ndmin=2)
+        if rows.shape[1:] != (len(cols),):
+            rows = np.empty((0, len(cols)))
+    if len(cols) == num_columns:
+        return rows
+    data = np.full((len(rows), num_columns), np.nan)
+    data[:, cols] = rows
+    return data
+
+
+def parse_text_rows(lines, num_columns, delimiter=',', usecols=None):
+    """Parses data lines (e.g. the new lines of a growing file) like ``load_text_run``."""
+    lines = [line for line in lines if line.strip()]
+    if not lines:
+        return np.empty((0, num_columns))
+    return _parse_block('\n'.join(lines).encode('utf-8'), num_columns,
+                        delimiter, usecols)
+
+
+def load_text_run(filepath, chunk_bytes=CHUNK_BYTES, progress=None):
+    """
+    Loads a delimited text data file into a ``TextRun``.
+
+    The data is read and parsed ``chunk_bytes`` at a time; ``progress`` is
+    called after every chunk with the fraction of the file read so far.
+    """
+    layout = sniff_text_layout(filepath)
+    num_columns = len(layout.columns)
+    blocks = []
+    pending = b''
+    offset = layout.data_offset
+    with open(filepath, 'rb') as f:
+        f.seek(0, io.SEEK_END)
+        size = f.tell()
+        f.seek(offset)
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                break
+            buffer = pending + chunk
+            end = buffer.rfind(b'\n') + 1
+            if end:
+                blocks.append(_parse_block(buffer[:end], num_columns,
+                                           layout.delimiter, layout.numeric_columns))
+                offset += end
+            pending = buffer[end:]
+            if progress is not None:
+                progress(f.tell() / size if size else 1.0)
+    data = np.concatenate(blocks) if blocks else np.empty((0, num_columns))
+    return TextRun(data, layout.columns, layout.metadata, layout.delimiter, offset,
+                   pending.decode('utf-8', errors='ignore').strip(),
+                   layout.numeric_columns)
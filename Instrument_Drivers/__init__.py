@@ -0,0 +1,87 @@
+"""
+Module: Instrument_Drivers
+Purpose: Shared instrument drivers used by all PICA measurement GUIs.
+
+Each class wraps one pyvisa session and provides setting caching, batched
+writes, *OPC? synchronisation and non-blocking (Future based) reads. See
+``Base_Instrument.VisaInstrument`` for the common API.
+``Acquisition_Engine.AcquisitionEngine`` runs measurement loops off the Tk
+main thread, paced by ``Sample_Scheduler.SampleScheduler``;
+``Multi_Sampler.MultiInstrumentSampler`` reads several instruments at once
+and ``Startup_Pipeline.StartupPipeline`` initialises them concurrently;
+``Run_File_Writer.RunFileWriter`` keeps the data file of a run open,
+optionally mirrored to a memory-mappable ``Binary_Run_File``;
+``Text_Run_File.load_text_run`` reads the text data files back in bulk.
+``Column_Store.ColumnStore`` holds the live plot data of a GUI as NumPy columns,
+``Plot_Decimation.LevelOfDetail`` draws large datasets decimated to the view
+and ``Live_Plot.LivePlot`` redraws live lines at a capped frame rate
+without rescanning their data.
+
+Set the environment variable ``PICA_SIMULATE=1`` to run against the
+simulated instruments of ``Simulated_Instruments`` instead of real hardware.
+"""
+
+import os
+
+from .Base_Instrument import VisaInstrument, get_resource_manager
+from .Lakeshore_350 import Lakeshore350, Lakeshore340, LakeshoreStatus
+from .Keithley_2400 import Keithley2400
+from .Keithley_2182 import Keithley2182
+from .Keithley_6221 import Keithley6221
+from .Keithley_6517B import BlockStatistics, Keithley6517B, block_statistics
+from .Keysight_E4980A import KeysightE4980A
+from .SRS_SR830 import SR830
+from .Sample_Scheduler import SampleScheduler
+from .Acquisition_Engine import AcquisitionEngine
+from .Multi_Sampler import MultiInstrumentSampler, Reading
+from .Startup_Pipeline import StartupPipeline
+from .Binary_Run_File import (BinaryRun, BinaryRunWriter, is_binary_run,
+                              read_binary_run)
+from .Run_File_Writer import RunFileWriter
+from .Text_Run_File import TextRun, load_text_run, parse_text_rows
+from .Column_Store import ColumnStore, DataColumn
+from .Plot_Decimation import LevelOfDetail, decimate_indices
+from .Live_Plot import LivePlot
+from . import Simulated_Instruments
+from .Simulated_Instruments import (SimulatedLab, SimulatedResourceManager,
+                                    SimulatedSample)
+
+if os.environ.get("PICA_SIMULATE"):
+    Simulated_Instruments.install()
+
+__all__ = [
+    "VisaInstrument",
+    "get_resource_manager",
+    "Lakeshore350",
+    "Lakeshore340",
+    "LakeshoreStatus",
+    "Keithley2400",
+    "Keithley2182",
+    "Keithley6221",
+    "Keithley6517B",
+    "BlockStatistics",
+    "block_statistics",
+    "KeysightE4980A",
+    "SR830",
+    "SampleScheduler",
+    "AcquisitionEngine",
+    "MultiInstrumentSampler",
+    "Reading",
+    "StartupPipeline",
+    "BinaryRun",
+    "BinaryRunWriter",
+    "is_binary_run",
+    "read_binary_run",
+    "RunFileWriter",
+    "TextRun",
+    "load_text_run",
+    "parse_text_rows",
+    "ColumnStore",
+    "DataColumn",
+    "LevelOfDetail",
+    "decimate_indices",
+    "LivePlot",
+    "SimulatedLab",
+    "SimulatedResourceManager",
+    "SimulatedSample",
+]
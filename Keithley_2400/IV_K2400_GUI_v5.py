@@ -16,8 +16,8 @@ Purpose: GUI module for IV K2400 GUI v5.
 import tkinter as tk
 from tkinter import ttk, Label, Entry, LabelFrame, filedialog, messagebox, scrolledtext, Canvas
 import numpy as np
-import csv
 import os
+import sys
 import time
 import traceback
 from datetime import datetime
@@ -33,18 +33,23 @@ except ImportError:
     PIL_AVAILABLE = False
 
 # --- Packages for Back end ---
-try:
-    from pymeasure.instruments.keithley import Keithley2400
-    PYMEASURE_AVAILABLE = True
-except ImportError:
-    Keithley2400 = None
-    PYMEASURE_AVAILABLE = False
-
 try:
     import pyvisa
 except ImportError:
     pyvisa = None
 
+try:
+    # Dynamically find the project root and add it to the path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+except Exception:
+    pass
+
+from Instrument_Drivers import (AcquisitionEngine, ColumnStore, Keithley2400,
+                                LivePlot, RunFileWriter, get_resource_manager)
+
 import runpy
 from multiprocessing import Process
 
@@ -100,28 +105,25 @@ def launch_gpib_scanner():
 class Keithley2400_IV_Backend:
     """A dedicated class to handle backend communication with the Keithley 2400 for I-V sweeps."""
 
+    # The 2400 source memory list holds at most 100 points per :SOUR:LIST.
+    HARDWARE_LIST_CHUNK = Keithley2400.LIST_SWEEP_MAX_POINTS
+
     def __init__(self):
         self.keithley = None
-        if pyvisa:
-            try:
-                self.rm = pyvisa.ResourceManager()
-            except Exception as e:
-                print(
-                    f"Could not initialize VISA resource manager. Error: {e}")
-                self.rm = None
-        else:
+        try:
+            self.rm = get_resource_manager()
+        except Exception as e:
+            print(
+                f"Could not initialize VISA resource manager. Error: {e}")
             self.rm = None
 
     def connect_and_configure(self, visa_address, params):
-        if not PYMEASURE_AVAILABLE:
-            raise ImportError(
-                "Pymeasure library is required. Please run 'pip install pymeasure'.")
+        if self.rm is None:
+            raise ConnectionError(
+                "PyVISA is required. Please run 'pip install pyvisa'.")
 
-        self.keithley = Keithley2400(visa_address)
+        self.keithley = Keithley2400(visa_address, resource_manager=self.rm)
         self.keithley.reset()
-        self.keithley.use_front_terminals()
-        self.keithley.apply_current()
-        self.keithley.source_current = 0
 
         max_abs_current = 0
         if params['sweep_type'] == 'Custom List':
@@ -137,12 +139,11 @@ class Keithley2400_IV_Backend:
         else:
             max_abs_current = abs(params['max_current'])
 
-        self.keithley.source_current_range = max_abs_current * \
-            1.05 if max_abs_current > 0 else 1e-5
-        self.keithley.compliance_voltage = params['compliance_v']
-        self.keithley.measure_voltage_nplc = 1
-
-        self.keithley.enable_source()
+        self.keithley.configure_current_source(
+            params['compliance_v'],
+            current_range=max_abs_current * 1.05 if max_abs_current > 0 else 1e-5,
+            nplc=1)
+        self.keithley.enable_output()
 
     def generate_sweep_points(self, params):
         sweep_type = params['sweep_type']
@@ -186,9 +187,21 @@ class Keithley2400_IV_Backend:
     def measure_at_current(self, current_setpoint, delay):
         self.keithley.ramp_to_current(current_setpoint, steps=5, pause=0.01)
         time.sleep(delay)
-        voltage_reading = self.keithley.voltage
-        return voltage_reading[0] if isinstance(
-            voltage_reading, list) else voltage_reading
+        return self.keithley.read_voltage()
+
+    def measure_list_chunk(self, currents, delay):
+        """Sources a chunk of currents with the 2400 source-list/trigger model.
+
+        The whole chunk runs on the instrument (source delay + NPLC per point)
+        and the readings are fetched from the output buffer in one :READ?.
+        Returns an array of measured voltages, one per current.
+        """
+        return self.keithley.list_sweep(currents, delay)
+
+    def end_list_sweep(self):
+        """Returns the source to fixed mode at 0 A after a hardware list sweep."""
+        if self.keithley:
+            self.keithley.end_list_sweep()
 
     def shutdown(self):
         if self.keithley:
@@ -217,6 +230,8 @@ class MeasurementAppGUI:
     except NameError:
         LOGO_FILE = "../assets/LOGO/UGC_DAE_CSR_NBG.jpeg"
     LOGO_SIZE = 120
+    SWEEP_MODE_SOFTWARE = "Software (Point-by-Point)"
+    SWEEP_MODE_HARDWARE = "Hardware List (Buffered)"
 
     def __init__(self, root):
         self.root = root
@@ -226,9 +241,13 @@ class MeasurementAppGUI:
         self.root.minsize(1300, 850)
 
         self.is_running = False
+        self.engine = None
+        self.hardware_sweep = False
+        self.close_requested = False
+        self.data_writer = None
         self.backend = Keithley2400_IV_Backend()
         self.file_location_path = ""
-        self.data_storage = {'current': [], 'voltage': [], 'resistance': []}
+        self.data_storage = ColumnStore(['current', 'voltage', 'resistance'])
         self.logo_image = None
         self.pre_init_logs = []
 
@@ -581,15 +600,42 @@ class MeasurementAppGUI:
 
         ttk.Label(
             grid,
-            text="Keithley 2400 VISA:").grid(
+            text="Sweep Mode:").grid(
             row=10,
             column=0,
             columnspan=3,
+            sticky='w',
+            pady=(
+                10,
+                0))
+        self.sweep_mode_var = tk.StringVar()
+        self.sweep_mode_cb = ttk.Combobox(
+            grid,
+            textvariable=self.sweep_mode_var,
+            state='readonly',
+            font=self.FONT_BASE,
+            values=[self.SWEEP_MODE_SOFTWARE, self.SWEEP_MODE_HARDWARE])
+        self.sweep_mode_cb.grid(
+            row=11,
+            column=0,
+            columnspan=3,
+            sticky='ew',
+            pady=(
+                0,
+                10))
+        self.sweep_mode_cb.set(self.SWEEP_MODE_SOFTWARE)
+
+        ttk.Label(
+            grid,
+            text="Keithley 2400 VISA:").grid(
+            row=12,
+            column=0,
+            columnspan=3,
             sticky='w')
         self.keithley_combobox = ttk.Combobox(
             grid, font=self.FONT_BASE, state='readonly', width=20)
         self.keithley_combobox.grid(
-            row=11,
+            row=13,
             column=0,
             columnspan=3,
             sticky='ew',
@@ -717,6 +763,11 @@ class MeasurementAppGUI:
 
         self.canvas = FigureCanvasTkAgg(self.figure, graph_container)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.live_plot = LivePlot(self.canvas)
+        self.live_plot.add_line(self.line_main, self.data_storage['current'],
+                                self.data_storage['voltage'])
+        self.live_plot.add_line(self.line_resistance, self.data_storage['current'],
+                                self.data_storage['resistance'])
 
     def log(self, message):
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -738,6 +789,7 @@ class MeasurementAppGUI:
                 'compliance_v': float(self.entries["Compliance"].get()),
                 'delay_s': float(self.entries["Delay"].get()),
                 'sweep_type': sweep_type,
+                'hardware_sweep': self.sweep_mode_var.get() == self.SWEEP_MODE_HARDWARE,
                 'max_current': 0, 'step_current': 0, 'custom_list_str': ''
             }
 
@@ -766,17 +818,18 @@ class MeasurementAppGUI:
             file_name = f"{params['sample_name']}_{ts}_IV.dat"
             self.data_filepath = os.path.join(
                 self.file_location_path, file_name)
-            with open(self.data_filepath, 'w', newline='') as f:
-                writer = csv.writer(f, delimiter='\t')
-                writer.writerow(
-                    [f"# Sample: {params['sample_name']}", f"Compliance: {params['compliance_v']} V"])
-                writer.writerow(
-                    ["Current (A)", "Voltage (V)", "Resistance (Ohm)"])
+            self.data_writer = RunFileWriter(
+                self.data_filepath, delimiter='\t', header_rows=[
+                    [f"# Sample: {params['sample_name']}", f"Compliance: {params['compliance_v']} V"],
+                    ["Current (A)", "Voltage (V)", "Resistance (Ohm)"]])
             self.log(
                 f"Output file created: {os.path.basename(self.data_filepath)}")
 
+            self.hardware_sweep = params['hardware_sweep']
+            self.sweep_delay_s = params['delay_s']
             self.is_running = True
             self.sweep_index = 0
+            self.points_done = 0
             self.start_button.config(state='disabled')
             self.stop_button.config(state='normal')
             for key in self.data_storage:
@@ -789,9 +842,15 @@ class MeasurementAppGUI:
             self.figure.suptitle(
                 f"Sample: {params['sample_name']}",
                 fontweight='bold')
-            self.canvas.draw()
-            self.log("Measurement sweep started.")
-            self.root.after(100, self._run_sweep_step)
+            self.live_plot.start()
+            self.log(
+                f"Measurement sweep started ({self.sweep_mode_var.get()}).")
+            # Instrument I/O runs on the acquisition thread; the GUI only
+            # consumes finished points from its queue.
+            self.engine = AcquisitionEngine(
+                self._acquire_sweep_step, name="K2400-IV-Acquisition")
+            self.engine.start()
+            self.root.after(100, self._process_data_queue)
         except Exception as e:
             self.log(f"ERROR during startup: {traceback.format_exc()}")
             messagebox.showerror(
@@ -803,58 +862,113 @@ class MeasurementAppGUI:
         if self.is_running:
             self.is_running = False
             self.log("Measurement sweep stopped by user.")
-        self.start_button.config(state='normal')
         self.stop_button.config(state='disabled')
+        if self.engine:
+            self.engine.request_stop()
+            if self.hardware_sweep and self.engine.is_running:
+                self.log("Waiting for the list-sweep chunk in progress to finish...")
+        self._finish_stop()
+
+    def _finish_stop(self):
+        """Releases the instrument once the acquisition thread has exited."""
+        # A pending list-sweep :READ? returns only when its whole chunk has
+        # run, so the thread is polled from Tk instead of joined.
+        if self.engine and self.engine.is_running:
+            self.root.after(100, self._finish_stop)
+            return
+        self.engine = None
+        if self.hardware_sweep:
+            try:
+                self.backend.end_list_sweep()
+            except Exception as e:
+                self.log(f"WARNING: Could not end the list sweep: {e}")
+            self.hardware_sweep = False
+        if self.live_plot.running:
+            self.live_plot.stop()
+            self.log(f"Plotting: {self.live_plot.summary()}")
+        if self.data_writer:
+            self.data_writer.close()
+            self.data_writer = None
+        self.start_button.config(state='normal')
         self.backend.shutdown()
         messagebox.showinfo(
             "Info", "Measurement stopped and instrument disconnected.")
+        if self.close_requested:
+            self.root.destroy()
 
-    def _run_sweep_step(self):
-        if not self.is_running or self.sweep_index >= len(self.sweep_points):
-            if self.is_running:
-                self.log("Sweep complete.")
-                self.stop_measurement()
+    def _acquire_sweep_step(self):
+        """Acquisition thread: measures the next point (or list chunk) of the sweep."""
+        if self.sweep_index >= len(self.sweep_points):
+            raise StopIteration
+        if self.hardware_sweep:
+            chunk = self.sweep_points[
+                self.sweep_index:self.sweep_index + self.backend.HARDWARE_LIST_CHUNK]
+            voltages = self.backend.measure_list_chunk(
+                chunk, self.sweep_delay_s)
+        else:
+            chunk = self.sweep_points[self.sweep_index:self.sweep_index + 1]
+            voltages = [self.backend.measure_at_current(
+                chunk[0], self.sweep_delay_s)]
+        self.sweep_index += len(chunk)
+        return chunk, voltages
+
+    def _process_data_queue(self):
+        """Consumes every block queued since the last call and plots them in one pass."""
+        if not self.is_running or not self.engine:
             return
-        try:
-            current = self.sweep_points[self.sweep_index]
-            voltage = self.backend.measure_at_current(
-                current, float(self.entries["Delay"].get()))
+        currents, voltages = [], []
+        finished, error = False, None
+        for item in self.engine.drain():
+            if isinstance(item, Exception):
+                error = item
+                break
+            if item == AcquisitionEngine.COMPLETE:
+                finished = True
+                break
+            chunk, chunk_voltages = item
+            currents.extend(chunk)
+            voltages.extend(chunk_voltages)
+
+        if currents:
+            self._record_points(currents, voltages)
+            self.points_done += len(currents)
+            self.progress_bar['value'] = self.points_done
+
+        if error is not None:
+            self.log("RUNTIME ERROR: " + "".join(traceback.format_exception(
+                type(error), error, error.__traceback__)))
+            messagebox.showerror(
+                "Runtime Error",
+                "An error occurred during the sweep. Check console.")
+            self.stop_measurement()
+        elif finished:
+            self.log("Sweep complete.")
+            self.stop_measurement()
+        else:
+            self.root.after(100, self._process_data_queue)
 
+    def _record_points(self, currents, voltages):
+        """Stores, saves and plots a block of (current, voltage) readings."""
+        rows = []
+        for current, voltage in zip(currents, voltages):
+            current, voltage = float(current), float(voltage)
             if abs(voltage) >= 9.9e37:
                 self.log(
                     "WARNING: Voltage compliance reached! Check sample connections.")
 
             resistance = voltage / current if current != 0 else np.nan
 
-            self.data_storage['current'].append(float(current))
+            self.data_storage['current'].append(current)
             self.data_storage['voltage'].append(voltage)
             self.data_storage['resistance'].append(resistance)
-            with open(self.data_filepath, 'a', newline='') as f:
-                csv.writer(f, delimiter='\t').writerow(
-                    [f"{current:.8e}", f"{voltage:.8e}", f"{resistance:.8e}"])
-
-            self.line_main.set_data(
-                self.data_storage['current'],
-                self.data_storage['voltage'])
-            self.line_resistance.set_data(
-                self.data_storage['current'],
-                self.data_storage['resistance'])
-
-            self.ax_vi.relim()
-            self.ax_vi.autoscale_view()
-            self.ax_ri.relim()
-            self.ax_ri.autoscale_view()
-            self.canvas.draw_idle()
-
-            self.progress_bar['value'] = self.sweep_index + 1
-            self.sweep_index += 1
-            self.root.after(10, self._run_sweep_step)
-        except Exception:
-            self.log(f"RUNTIME ERROR: {traceback.format_exc()}")
-            messagebox.showerror(
-                "Runtime Error",
-                "An error occurred during the sweep. Check console.")
-            self.stop_measurement()
+            rows.append(
+                [f"{current:.8e}", f"{voltage:.8e}", f"{resistance:.8e}"])
+
+        self.data_writer.write_rows(rows)
+
+        # Blitted at a capped frame rate; the limits grow (with a full
+        # redraw) only when a point falls outside them
+        self.live_plot.request_redraw()
 
     def _scan_for_visa_instruments(self):
         if pyvisa is None or self.backend.rm is None:
@@ -890,8 +1004,9 @@ class MeasurementAppGUI:
     def _on_closing(self):
         if self.is_running and messagebox.askyesno(
                 "Exit", "Measurement is running. Stop and exit?"):
+            # The window closes once the pending read has returned
+            self.close_requested = True
             self.stop_measurement()
-            self.root.destroy()
         elif not self.is_running:
             self.root.destroy()
 
@@ -20,7 +20,6 @@ import sys
 import time
 import traceback
 from datetime import datetime
-import csv
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib as mpl
@@ -33,11 +32,8 @@ except ImportError:
 
 try:
     import pyvisa
-    from pymeasure.instruments.keithley import Keithley2400
-    PYMEASURE_AVAILABLE = True
 except ImportError:
-    pyvisa, Keithley2400 = None, None
-    PYMEASURE_AVAILABLE = False
+    pyvisa = None
 
 try:
     # Dynamically find the project root and add it to the path
@@ -50,6 +46,10 @@ except Exception:
     # executables)
     pass
 
+from Instrument_Drivers import (ColumnStore, Keithley2400, Lakeshore350,
+                                LivePlot, RunFileWriter, SampleScheduler,
+                                get_resource_manager)
+
 import runpy
 from multiprocessing import Process
 
@@ -108,65 +108,53 @@ class RT_Backend_Active:
 
     def __init__(self):
         self.k2400, self.lakeshore = None, None
-        if pyvisa:
-            try:
-                self.rm = pyvisa.ResourceManager()
-            except Exception as e:
-                print(f"Could not initialize VISA: {e}")
-                self.rm = None
+        try:
+            self.rm = get_resource_manager()
+        except Exception as e:
+            print(f"Could not initialize VISA: {e}")
+            self.rm = None
 
     def connect(self, k2400_visa, ls_visa):
         if not self.rm:
             raise ConnectionError("PyVISA is not available.")
-        if not PYMEASURE_AVAILABLE:
-            raise ImportError("Pymeasure is not available.")
-        self.k2400 = Keithley2400(k2400_visa)
-        print(f"  K2400 Connected: {self.k2400.id}")
-        self.lakeshore = self.rm.open_resource(ls_visa)
-        print(
-            f"  Lakeshore Connected: {self.lakeshore.query('*IDN?').strip()}")
+        self.k2400 = Keithley2400(k2400_visa, resource_manager=self.rm)
+        print(f"  K2400 Connected: {self.k2400.identify()}")
+        self.lakeshore = Lakeshore350(ls_visa, resource_manager=self.rm)
+        print(f"  Lakeshore Connected: {self.lakeshore.identify()}")
 
     def configure_instruments(self, current_ma, compliance_v):
         # Lakeshore setup
-        self.lakeshore.write('*RST')
-        time.sleep(0.5)
-        self.lakeshore.write('*CLS')
-        self.lakeshore.write('HTRSET 1,1,2,0,1')  # 25Ω heater, 1A max
+        self.lakeshore.reset()
+        self.lakeshore.configure_heater(1)  # 25Ω heater, 1A max
 
         # Keithley 2400 setup
         self.k2400.reset()
-        self.k2400.use_front_terminals()
-        self.k2400.apply_current()
-        self.k2400.source_current_range = abs(current_ma * 1e-3) * 1.05
-        self.k2400.compliance_voltage = compliance_v
-        self.k2400.source_current = current_ma * 1e-3
-        self.k2400.measure_voltage()
-        self.k2400.enable_source()
+        self.k2400.configure_current_source(
+            compliance_v, current_range=abs(current_ma * 1e-3) * 1.05)
+        self.k2400.set_current(current_ma * 1e-3)
+        self.k2400.enable_output()
 
     def get_temperature(self):
         if not self.lakeshore:
             return 0.0
-        return float(self.lakeshore.query('KRDG? A').strip())
+        return self.lakeshore.get_temperature('A')
 
     def set_heater_range(self, output, heater_range):
-        range_map = {'off': 0, 'low': 2, 'medium': 4, 'high': 5}
-        range_code = range_map.get(heater_range.lower())
-        if range_code is None:
-            raise ValueError("Invalid heater range.")
-        self.lakeshore.write(f'RANGE {output},{range_code}')
+        self.lakeshore.set_heater_range(output, heater_range)
 
     def set_setpoint(self, output, temperature_k):
-        self.lakeshore.write(f'SETP {output},{temperature_k}')
+        self.lakeshore.set_setpoint(output, temperature_k)
 
     def start_ramp(self, end_temp, rate_k_min):
-        self.lakeshore.write(f'SETP 1,{end_temp}')
-        self.lakeshore.write(f'RAMP 1,1,{rate_k_min}')
-        self.lakeshore.write('RANGE 1,5')  # Heater High for ramp
+        self.lakeshore.set_setpoint(1, end_temp)
+        self.lakeshore.set_ramp(1, rate_k_min)
+        self.lakeshore.set_heater_range(1, 'high')  # Heater High for ramp
 
     def get_measurement(self):
-        voltage = self.k2400.voltage
-        temperature = float(self.lakeshore.query('KRDG? A').strip())
-        return temperature, voltage
+        # The Lakeshore query runs while the K2400 is busy with its :READ?.
+        temp_future = self.lakeshore.get_temperature_async('A')
+        voltage = self.k2400.read_voltage()
+        return temp_future.result(), voltage
 
     def shutdown(self):
         if self.k2400:
@@ -176,7 +164,7 @@ class RT_Backend_Active:
                 pass
         if self.lakeshore:
             try:
-                self.lakeshore.write("RANGE 1,0")
+                self.lakeshore.heater_off(1)
                 self.lakeshore.close()
             except BaseException:
                 pass
@@ -210,19 +198,16 @@ class RT_GUI_Active:
         self.root.configure(bg=self.CLR_BG)
         self.experiment_state = 'idle'
         self.logo_image = None
+        self.sample_scheduler = None
+        self.data_writer = None
         self.backend = RT_Backend_Active()
-        self.data_storage = {
-            'temperature': [],
-            'voltage': [],
-            'resistance': []}
+        self.data_storage = ColumnStore(
+            ['temperature', 'voltage', 'resistance'])
         # --- NEW: Blitting optimization ---
-        self.plot_bg = None
-        self.is_resizing = False
-        self.resize_timer = None
+        self.live_plot = None  # Set up with the plots
         self.setup_styles()
         self.create_widgets()
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
-        self.root.bind('<Configure>', self._on_resize)
 
     def setup_styles(self):
         style = ttk.Style(self.root)
@@ -463,7 +448,7 @@ class RT_GUI_Active:
 
         # Top plot: Resistance vs. Temperature
         self.line_main, = self.ax_main.plot(
-            [], [], color=self.CLR_ACCENT_RED, marker='o', markersize=4, linestyle='-', animated=True)
+            [], [], color=self.CLR_ACCENT_RED, marker='o', markersize=4, linestyle='-')
         self.ax_main.set_title("Live R-T and V-T Curves", fontweight='bold')
         self.ax_main.set_ylabel("Resistance (Ω)")
         self.ax_main.set_yscale('log')
@@ -471,14 +456,19 @@ class RT_GUI_Active:
 
         # Bottom plot: Voltage vs. Temperature
         self.line_sub, = self.ax_sub.plot(
-            [], [], color=self.CLR_ACCENT_BLUE, marker='o', markersize=4, linestyle='-', animated=True)
+            [], [], color=self.CLR_ACCENT_BLUE, marker='o', markersize=4, linestyle='-')
         self.ax_sub.set_xlabel("Temperature (K)")
         self.ax_sub.set_ylabel("Voltage (V)")
         self.ax_sub.grid(True, linestyle='--', alpha=0.6)
 
         self.canvas = FigureCanvasTkAgg(self.figure, container)
         self.canvas.get_tk_widget().pack(fill='both', expand=True, padx=5, pady=5)
-        self.canvas.mpl_connect('draw_event', self._on_draw)
+        # Re-captures the blit background after every full draw (e.g. a resize)
+        self.live_plot = LivePlot(self.canvas)
+        self.live_plot.add_line(self.line_main, self.data_storage['temperature'],
+                                self.data_storage['resistance'])
+        self.live_plot.add_line(self.line_sub, self.data_storage['temperature'],
+                                self.data_storage['voltage'])
 
     def _create_params_panel(self, parent):
         container = ttk.Frame(parent)
@@ -570,10 +560,8 @@ class RT_GUI_Active:
             filename = f"{self.params['name']}_{ts}_RT_Active.csv"
             self.data_filepath = os.path.join(
                 self.params['save_path'], filename)
-            with open(self.data_filepath, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(["Temperature (K)", "Voltage (V)",
-                                "Resistance (Ohm)", "Elapsed Time (s)"])
+            self.data_writer = RunFileWriter(self.data_filepath, header_rows=[
+                ["Temperature (K)", "Voltage (V)", "Resistance (Ohm)", "Elapsed Time (s)", "Timing Jitter (s)"]])
 
             self.set_ui_state(running=True)
             self.experiment_state = 'stabilizing'
@@ -581,15 +569,10 @@ class RT_GUI_Active:
                 self.data_storage[key].clear()
             # --- MODIFIED: Plot setup for blitting ---
             self.line_main.set_data([], [])
+            self.line_sub.set_data([], [])
             self.ax_main.set_title(f"R-T Curve: {self.params['name']}")
             self.ax_main.set_yscale('log')
-            self.ax_main.relim()
-            self.ax_main.autoscale_view()
-            self.canvas.draw()  # Full draw to prepare background
-            self.plot_bg = self.canvas.copy_from_bbox(
-                self.ax_main.bbox)  # Cache background
-            # Set line to animated for blitting
-            self.line_main.set_animated(True)
+            self.live_plot.start()  # Full draw to prepare background
 
             self.log(
                 f"Starting stabilization at {self.params['start_temp']} K...")
@@ -606,14 +589,18 @@ class RT_GUI_Active:
         self.log(
             f"Stopping... {reason}" if reason else "Stopping by user request.")
         self.experiment_state = 'idle'
+        if self.sample_scheduler:
+            self.log(f"Sampling: {self.sample_scheduler.summary()}")
+            self.sample_scheduler = None
         self.backend.shutdown()
+        if self.data_writer:
+            self.data_writer.close()
+            self.data_writer = None
         self.set_ui_state(running=False)
         # --- MODIFIED: Disable animation for final draw (both plots) ---
-        self.line_main.set_animated(False)
-        self.line_sub.set_animated(False)
-        self.plot_bg = None
         self.ax_main.set_title("Experiment stopped.")
-        self.canvas.draw()
+        self.live_plot.stop()
+        self.log(f"Plotting: {self.live_plot.summary()}")
         if reason:
             messagebox.showinfo("Experiment Finished", f"Reason: {reason}")
 
@@ -662,12 +649,18 @@ class RT_GUI_Active:
                 self.log(f"Ramp started towards {self.params['end_temp']} K.")
                 self.experiment_state = 'ramping'
                 self.start_time = time.time()
+                # Samples are due every delay_s on the monotonic clock, so the
+                # read and plotting time does not add to the logging period.
+                self.sample_scheduler = SampleScheduler(self.params['delay_s'])
                 # Transition to measurement
                 self.root.after(100, self._experiment_loop)
                 return
 
             elif self.experiment_state == 'ramping':
+                # Lateness of this sample against its planned start, saved per row
+                jitter = self.sample_scheduler.mark_start()
                 temp, voltage = self.backend.get_measurement()
+                self.sample_scheduler.mark_done()
                 resistance = voltage / \
                     (self.params['current_ma'] * 1e-3) if self.params['current_ma'] != 0 else float('inf')
                 elapsed = time.time() - self.start_time
@@ -676,39 +669,13 @@ class RT_GUI_Active:
                 self.data_storage['temperature'].append(temp)
                 self.data_storage['voltage'].append(voltage)
                 self.data_storage['resistance'].append(resistance)
-                with open(self.data_filepath, 'a', newline='') as f:
-                    csv.writer(f).writerow(
-                        [f"{temp:.4f}", f"{voltage:.6e}", f"{resistance:.6e}", f"{elapsed:.2f}"])
+                self.data_writer.write_row(
+                    [f"{temp:.4f}", f"{voltage:.6e}", f"{resistance:.6e}", f"{elapsed:.2f}", f"{jitter:.4f}"])
 
                 # --- MODIFIED: Use blitting for efficient plotting ---
-                if self.plot_bg:
-                    # Restore entire figure background
-                    self.canvas.restore_region(self.plot_bg)
-                    # Update data for both lines
-                    self.line_main.set_data(
-                        self.data_storage['temperature'],
-                        self.data_storage['resistance'])
-                    self.line_sub.set_data(
-                        self.data_storage['temperature'],
-                        self.data_storage['voltage'])
-                    # Autoscale and draw artists
-                    self.ax_main.relim()
-                    self.ax_main.autoscale_view()
-                    self.ax_sub.relim()
-                    self.ax_sub.autoscale_view()
-                    self.ax_main.draw_artist(self.line_main)
-                    self.ax_sub.draw_artist(self.line_sub)
-                    # Blit the entire figure
-                    self.canvas.blit(self.figure.bbox)
-                    self.canvas.flush_events()
-                else:  # Fallback to full redraw if blitting isn't ready
-                    self.line_main.set_data(
-                        self.data_storage['temperature'],
-                        self.data_storage['resistance'])
-                    self.line_sub.set_data(
-                        self.data_storage['temperature'],
-                        self.data_storage['voltage'])
-                    self.canvas.draw_idle()
+                # (a full redraw only when the limits have to grow, and at
+                # most one frame per 1 / max_fps s)
+                self.live_plot.request_redraw()
 
                 # Check end conditions
                 if temp >= self.params['cutoff']:
@@ -719,7 +686,7 @@ class RT_GUI_Active:
                     self.stop_experiment("End temperature reached.")
                 else:
                     self.root.after(
-                        int(self.params['delay_s'] * 1000), self._experiment_loop)
+                        self.sample_scheduler.delay_ms(), self._experiment_loop)
 
         except Exception as e:
             self.log(f"CRITICAL ERROR: {traceback.format_exc()}")
@@ -849,28 +816,6 @@ class RT_GUI_Active:
         cb.grid(row=row, column=1, sticky='ew', padx=10, pady=3, columnspan=3)
         return cb
 
-    # --- NEW: Blitting and resize handling methods ---
-    def _on_draw(self, event):
-        """Callback for draw events to cache the plot background."""
-        if self.is_resizing:
-            return
-        self.plot_bg = self.canvas.copy_from_bbox(self.figure.bbox)
-
-    def _on_resize(self, event):
-        """Handle window resize events to trigger a full redraw."""
-        self.is_resizing = True
-        self.plot_bg = None  # Invalidate background
-        if self.resize_timer:
-            self.root.after_cancel(self.resize_timer)
-        self.resize_timer = self.root.after(300, self._finalize_resize)
-
-    def _finalize_resize(self):
-        """Finalize the resize by performing a full redraw."""
-        self.is_resizing = False
-        self.resize_timer = None
-        if self.canvas:
-            self.canvas.draw_idle()
-
     def _on_closing(self):
         if self.experiment_state != 'idle' and messagebox.askyesno(
                 "Exit", "Experiment is running. Stop and exit?"):
@@ -881,10 +826,10 @@ class RT_GUI_Active:
 
 
 if __name__ == '__main__':
-    if not PYMEASURE_AVAILABLE:
+    if pyvisa is None:
         messagebox.showerror(
             "Dependency Error",
-            "Pymeasure or PyVISA is not installed. Please run 'pip install pymeasure'.")
+            "PyVISA is not installed. Please run 'pip install pyvisa'.")
     else:
         root = tk.Tk()
         app = RT_GUI_Active(root)
@@ -22,7 +22,6 @@ import traceback
 import runpy
 from multiprocessing import Process
 from datetime import datetime
-import csv
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib as mpl
@@ -35,11 +34,8 @@ except ImportError:
 
 try:
     import pyvisa
-    from pymeasure.instruments.keithley import Keithley2400
-    PYMEASURE_AVAILABLE = True
 except ImportError:
-    pyvisa, Keithley2400 = None, None
-    PYMEASURE_AVAILABLE = False
+    pyvisa = None
 
 try:
     # Dynamically find the project root and add it to the path
@@ -52,6 +48,10 @@ except Exception:
     # executables)
     pass
 
+from Instrument_Drivers import (ColumnStore, Keithley2400, Lakeshore350,
+                                LivePlot, RunFileWriter, SampleScheduler,
+                                get_resource_manager)
+
 # -------------------------------------------------------------------------------
 # --- BACKEND INSTRUMENT CONTROL ---
 # -------------------------------------------------------------------------------
@@ -62,45 +62,37 @@ class RT_Backend_Passive:
 
     def __init__(self):
         self.k2400, self.lakeshore = None, None
-        if pyvisa:
-            try:
-                self.rm = pyvisa.ResourceManager()
-            except Exception as e:
-                print(f"Could not initialize VISA: {e}")
-                self.rm = None
+        try:
+            self.rm = get_resource_manager()
+        except Exception as e:
+            print(f"Could not initialize VISA: {e}")
+            self.rm = None
 
     def connect(self, k2400_visa, ls_visa):
         if not self.rm:
             raise ConnectionError("PyVISA is not available.")
-        if not PYMEASURE_AVAILABLE:
-            raise ImportError("Pymeasure is not available.")
-        self.k2400 = Keithley2400(k2400_visa)
-        print(f"  K2400 Connected: {self.k2400.id}")
-        self.lakeshore = self.rm.open_resource(ls_visa)
-        print(
-            f"  Lakeshore Connected: {self.lakeshore.query('*IDN?').strip()}")
+        self.k2400 = Keithley2400(k2400_visa, resource_manager=self.rm)
+        print(f"  K2400 Connected: {self.k2400.identify()}")
+        self.lakeshore = Lakeshore350(ls_visa, resource_manager=self.rm)
+        print(f"  Lakeshore Connected: {self.lakeshore.identify()}")
 
     def configure_instruments(self, current_ma, compliance_v):
         # Lakeshore setup for passive monitoring
-        self.lakeshore.write('*RST')
-        time.sleep(0.5)
-        self.lakeshore.write('*CLS')
-        self.lakeshore.write('RANGE 1,0')  # Ensure heater is OFF
+        self.lakeshore.reset()
+        self.lakeshore.heater_off(1)  # Ensure heater is OFF
 
         # Keithley 2400 setup
         self.k2400.reset()
-        self.k2400.use_front_terminals()
-        self.k2400.apply_current()
-        self.k2400.source_current_range = abs(current_ma * 1e-3) * 1.05
-        self.k2400.compliance_voltage = compliance_v
-        self.k2400.source_current = current_ma * 1e-3
-        self.k2400.measure_voltage()
-        self.k2400.enable_source()
+        self.k2400.configure_current_source(
+            compliance_v, current_range=abs(current_ma * 1e-3) * 1.05)
+        self.k2400.set_current(current_ma * 1e-3)
+        self.k2400.enable_output()
 
     def get_measurement(self):
-        voltage = self.k2400.voltage
-        temperature = float(self.lakeshore.query('KRDG? A').strip())
-        return temperature, voltage
+        # The Lakeshore query runs while the K2400 is busy with its :READ?.
+        temp_future = self.lakeshore.get_temperature_async('A')
+        voltage = self.k2400.read_voltage()
+        return temp_future.result(), voltage
 
     def shutdown(self):
         if self.k2400:
@@ -110,7 +102,7 @@ class RT_Backend_Passive:
                 pass
         if self.lakeshore:
             try:
-                self.lakeshore.write("RANGE 1,0")
+                self.lakeshore.heater_off(1)
                 self.lakeshore.close()
             except BaseException:
                 pass
@@ -195,12 +187,12 @@ class RT_GUI_Passive:
         self.root.minsize(1400, 800)
         self.root.configure(bg=self.CLR_BG_DARK)
         self.is_running = False
+        self.sample_scheduler = None
+        self.data_writer = None
         self.logo_image = None
         self.backend = RT_Backend_Passive()
-        self.data_storage = {
-            'temperature': [],
-            'voltage': [],
-            'resistance': []}
+        self.data_storage = ColumnStore(
+            ['temperature', 'voltage', 'resistance'])
         self.setup_styles()
         self.create_widgets()
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
@@ -444,6 +436,9 @@ class RT_GUI_Passive:
         self.figure.tight_layout()
         self.canvas = FigureCanvasTkAgg(self.figure, container)
         self.canvas.get_tk_widget().pack(fill='both', expand=True, padx=5, pady=5)
+        self.live_plot = LivePlot(self.canvas)
+        self.live_plot.add_line(self.line_main, self.data_storage['temperature'],
+                                self.data_storage['resistance'])
         return panel
 
     def _create_params_panel(self, parent, grid_row):
@@ -543,19 +538,20 @@ class RT_GUI_Passive:
             filename = f"{self.params['name']}_{ts}_RT_Passive.csv"
             self.data_filepath = os.path.join(
                 self.params['save_path'], filename)
-            with open(self.data_filepath, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(["Temperature (K)", "Voltage (V)",
-                                "Resistance (Ohm)", "Elapsed Time (s)"])
+            self.data_writer = RunFileWriter(self.data_filepath, header_rows=[
+                ["Temperature (K)", "Voltage (V)", "Resistance (Ohm)", "Elapsed Time (s)", "Timing Jitter (s)"]])
 
             self.set_ui_state(running=True)
             for key in self.data_storage:
                 self.data_storage[key].clear()
             self.line_main.set_data([], [])
             self.ax_main.set_title(f"R-T Curve: {self.params['name']}")
-            self.canvas.draw()
+            self.live_plot.start()
             self.log("Starting passive logging...")
             self.start_time = time.time()
+            # Samples are due every delay_s on the monotonic clock, so the
+            # read and plotting time does not add to the logging period.
+            self.sample_scheduler = SampleScheduler(self.params['delay_s'])
             self.root.after(100, self._experiment_loop)
         except Exception as e:
             self.log(f"ERROR: {traceback.format_exc()}")
@@ -568,10 +564,17 @@ class RT_GUI_Passive:
         self.log(
             f"Stopping... {reason}" if reason else "Stopping by user request.")
         self.is_running = False
+        if self.sample_scheduler:
+            self.log(f"Sampling: {self.sample_scheduler.summary()}")
+            self.sample_scheduler = None
         self.backend.shutdown()
+        if self.data_writer:
+            self.data_writer.close()
+            self.data_writer = None
         self.set_ui_state(running=False)
         self.ax_main.set_title("Logging stopped.")
-        self.canvas.draw()
+        self.live_plot.stop()
+        self.log(f"Plotting: {self.live_plot.summary()}")
         if reason:
             messagebox.showinfo("Experiment Finished", f"Reason: {reason}")
 
@@ -579,7 +582,10 @@ class RT_GUI_Passive:
         if not self.is_running:
             return
         try:
+            # Lateness of this sample against its planned start, saved per row
+            jitter = self.sample_scheduler.mark_start()
             temp, voltage = self.backend.get_measurement()
+            self.sample_scheduler.mark_done()
             resistance = voltage / \
                 (self.params['current_ma'] * 1e-3) if self.params['current_ma'] != 0 else float('inf')
             elapsed = time.time() - self.start_time
@@ -588,18 +594,14 @@ class RT_GUI_Passive:
             self.data_storage['temperature'].append(temp)
             self.data_storage['voltage'].append(voltage)
             self.data_storage['resistance'].append(resistance)
-            with open(self.data_filepath, 'a', newline='') as f:
-                csv.writer(f).writerow(
-                    [f"{temp:.4f}", f"{voltage:.6e}", f"{resistance:.6e}", f"{elapsed:.2f}"])
-            self.line_main.set_data(
-                self.data_storage['temperature'],
-                self.data_storage['resistance'])
-            self.ax_main.relim()
-            self.ax_main.autoscale_view()
-            self.canvas.draw()
+            self.data_writer.write_row(
+                [f"{temp:.4f}", f"{voltage:.6e}", f"{resistance:.6e}", f"{elapsed:.2f}", f"{jitter:.4f}"])
+            # Blitted; the limits grow (with a full redraw) only when a
+            # point falls outside them
+            self.live_plot.request_redraw()
 
             self.root.after(
-                int(self.params['delay_s'] * 1000), self._experiment_loop)
+                self.sample_scheduler.delay_ms(), self._experiment_loop)
 
         except Exception as e:
             self.log(f"CRITICAL ERROR: {traceback.format_exc()}")
@@ -719,10 +721,10 @@ class RT_GUI_Passive:
 
 
 if __name__ == '__main__':
-    if not PYMEASURE_AVAILABLE:
+    if pyvisa is None:
         messagebox.showerror(
             "Dependency Error",
-            "Pymeasure or PyVISA is not installed. Please run 'pip install pymeasure'.")
+            "PyVISA is not installed. Please run 'pip install pyvisa'.")
     else:
         root = tk.Tk()
         app = RT_GUI_Passive(root)
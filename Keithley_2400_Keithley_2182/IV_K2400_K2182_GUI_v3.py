@@ -19,9 +19,9 @@ from tkinter import Canvas
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import numpy as np
 import os
+import sys
 import time
 import traceback
-import csv
 import threading
 import queue
 from datetime import datetime
@@ -39,11 +39,20 @@ except ImportError:
 # --- Instrument Control Packages ---
 try:
     import pyvisa
-    from pymeasure.instruments.keithley import Keithley2400
-    PYMEASURE_AVAILABLE = True
 except ImportError:
-    pyvisa, Keithley2400 = None, None
-    PYMEASURE_AVAILABLE = False
+    pyvisa = None
+
+try:
+    # Dynamically find the project root and add it to the path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+except Exception:
+    pass
+
+from Instrument_Drivers import (ColumnStore, Keithley2182, Keithley2400,
+                                LivePlot, RunFileWriter, get_resource_manager)
 
 import runpy
 from multiprocessing import Process
@@ -103,68 +112,69 @@ def launch_gpib_scanner():
 class IV_Backend:
     """ Manages communication with the Keithley 2400 and 2182. """
 
+    SAMPLES_PER_POINT = 2
+    TRIGGER_DELAY_S = 0.1
+
     def __init__(self):
         self.k2400, self.k2182 = None, None
-        if pyvisa:
-            try:
-                self.rm = pyvisa.ResourceManager()
-            except Exception as e:
-                print(f"Could not initialize VISA: {e}")
-                self.rm = None
+        self.trigger_link = False
+        try:
+            self.rm = get_resource_manager()
+        except Exception as e:
+            print(f"Could not initialize VISA: {e}")
+            self.rm = None
 
     def connect(self, k2400_visa, k2182_visa):
         if not self.rm:
             raise ConnectionError("PyVISA is not available.")
-        if not PYMEASURE_AVAILABLE:
-            raise ImportError("Pymeasure is not available.")
-        self.k2400 = Keithley2400(k2400_visa)
-        print(f"  K2400 Connected: {self.k2400.id}")
-        self.k2182 = self.rm.open_resource(k2182_visa)
-        print(f"  K2182 Connected: {self.k2182.query('*IDN?').strip()}")
-
-    def configure_instruments(self, compliance_v, current_range_a):
+        self.k2400 = Keithley2400(k2400_visa, resource_manager=self.rm)
+        print(f"  K2400 Connected: {self.k2400.identify()}")
+        self.k2182 = Keithley2182(k2182_visa, resource_manager=self.rm)
+        print(f"  K2182 Connected: {self.k2182.identify()}")
+
+    def configure_instruments(self, compliance_v, current_range_a,
+                              trigger_link=False):
+        """
+        Configures both instruments once per run. The 2182 trigger model and
+        trace buffer are programmed here, so a point only costs a trigger
+        and one trace fetch. With ``trigger_link`` (a Trigger Link cable
+        from the 2400 to the 2182) the 2400 triggers the 2182 in hardware
+        once the new current is applied.
+        """
         # Keithley 2400 setup
         self.k2400.reset()
-        self.k2400.apply_current()
-        self.k2400.source_current_range = current_range_a
-        self.k2400.compliance_voltage = compliance_v
-        self.k2400.source_current = 0
-        self.k2400.enable_source()
+        self.k2400.configure_current_source(
+            compliance_v, current_range=current_range_a)
+        if trigger_link:
+            self.k2400.configure_trigger_link()
+        self.k2400.enable_output()
 
         # Keithley 2182 setup
-        self.k2182.write("*rst; status:preset; *cls")
-        time.sleep(1)
+        self.k2182.reset()
+        self.k2182.configure_triggered_trace(
+            samples=self.SAMPLES_PER_POINT, trigger_delay=self.TRIGGER_DELAY_S,
+            external_trigger=trigger_link)
+        self.trigger_link = trigger_link
 
     def measure_voltage_at_current(self, current_a, delay_s):
         self.k2400.ramp_to_current(current_a, steps=10, pause=0.05)
         time.sleep(delay_s)
-
-        # K2182 measurement sequence
-        self.k2182.write("status:measurement:enable 512; *sre 1")
-        self.k2182.write("sample:count 2")
-        self.k2182.write("trigger:source bus")
-        self.k2182.write("trigger:delay 0.1")
-        self.k2182.write("trace:points 2")
-        self.k2182.write("trace:feed sense1; feed:control next")
-        self.k2182.write("initiate")
-        self.k2182.assert_trigger()
-        self.k2182.wait_for_srq(timeout=10)
-        voltages = self.k2182.query_ascii_values("trace:data?")
-        self.k2182.query("status:measurement?")
-        self.k2182.write("trace:clear; feed:control next")
-
+        if self.trigger_link:
+            self.k2400.initiate()
+        else:
+            self.k2182.trigger()
+        voltages = self.k2182.read_trace()
         return sum(voltages) / len(voltages) if voltages else float('nan')
 
     def shutdown(self):
         if self.k2400:
             try:
                 self.k2400.shutdown()
-            except Exception:
+            except BaseException:
                 pass
         if self.k2182:
             try:
-                self.k2182.write("*rst")
-                self.k2182.close()
+                self.k2182.shutdown()
             except BaseException:
                 pass
         print("  Instruments shut down and disconnected.")  # type: ignore
@@ -198,8 +208,9 @@ class IV_GUI:
         self.root.configure(bg=self.CLR_BG_DARK)
         self.is_running = False
         self.logo_image = None
+        self.data_writer = None
         self.backend = IV_Backend()
-        self.data_storage = {'current': [], 'voltage': []}
+        self.data_storage = ColumnStore(['current', 'voltage'])
         self.setup_styles()
         self.result_queue = queue.Queue()
         self.create_widgets()
@@ -436,6 +447,9 @@ class IV_GUI:
         self.figure.tight_layout()
         self.canvas = FigureCanvasTkAgg(self.figure, container)
         self.canvas.get_tk_widget().pack(fill='both', expand=True, padx=5, pady=5)
+        self.live_plot = LivePlot(self.canvas)
+        self.live_plot.add_line(self.line_main, self.data_storage['voltage'],
+                                self.data_storage['current'])
         return panel
 
     def _create_params_panel(self, parent, grid_row):
@@ -460,6 +474,13 @@ class IV_GUI:
             visa_frame, "Keithley 2400 VISA", 0)
         self.k2182_cb = self._create_combobox(
             visa_frame, "Keithley 2182 VISA", 1)
+        self.trigger_link_var = tk.BooleanVar(value=False)
+        self.trigger_link_check = ttk.Checkbutton(
+            visa_frame,
+            text="Trigger Link cable (2400 triggers 2182)",
+            variable=self.trigger_link_var)
+        self.trigger_link_check.grid(
+            row=2, column=0, columnspan=4, sticky='w', padx=10, pady=3)
 
     def _create_control_panel(self, parent, grid_row):
         frame = ttk.LabelFrame(parent, text='Experiment Control')
@@ -521,8 +542,10 @@ class IV_GUI:
                 self.params['k2400_visa'],
                 self.params['k2182_visa'])
             self.backend.configure_instruments(
-                self.params['compliance_v'], self.params['stop_i'])
-            self.log("All instruments connected and configured.")
+                self.params['compliance_v'], self.params['stop_i'],
+                trigger_link=self.params['trigger_link'])
+            self.log("All instruments connected and configured"
+                     f"{' (Trigger Link)' if self.params['trigger_link'] else ''}.")
 
             start_i, stop_i, step_i = self.params['start_i'], self.params['stop_i'], self.params['step_i']
             self.current_points = np.arange(
@@ -534,9 +557,8 @@ class IV_GUI:
             filename = f"{self.params['name']}_{ts}_IV.csv"
             self.data_filepath = os.path.join(
                 self.params['save_path'], filename)
-            with open(self.data_filepath, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(["Current (A)", "Voltage (V)"])
+            self.data_writer = RunFileWriter(
+                self.data_filepath, header_rows=[["Current (A)", "Voltage (V)"]])
 
             self.current_step_index = 0
             self.set_ui_state(running=True)
@@ -544,7 +566,7 @@ class IV_GUI:
                 self.data_storage[key].clear()
             self.line_main.set_data([], [])
             self.ax_main.set_title(f"I-V Curve: {self.params['name']}")
-            self.canvas.draw()
+            self.live_plot.start()
             self.log(
                 f"Starting sweep: {len(self.current_points)} points from {start_i:.1e} A to {stop_i:.1e} A.")
             self.root.after(100, self._experiment_loop)
@@ -560,9 +582,13 @@ class IV_GUI:
             f"Stopping... {reason}" if reason else "Stopping by user request.")
         self.is_running = False
         self.backend.shutdown()
+        if self.data_writer:
+            self.data_writer.close()
+            self.data_writer = None
         self.set_ui_state(running=False)
         self.ax_main.set_title("Experiment stopped.")
-        self.canvas.draw_idle()
+        self.live_plot.stop()
+        self.log(f"Plotting: {self.live_plot.summary()}")
         if reason:
             messagebox.showinfo("Experiment Finished", f"Reason: {reason}")
 
@@ -610,15 +636,11 @@ class IV_GUI:
             self.log(f"  Read: V = {voltage:.6e} V")
             self.data_storage['current'].append(current_setpoint)
             self.data_storage['voltage'].append(voltage)
-            with open(self.data_filepath, 'a', newline='') as f:
-                csv.writer(f).writerow(
-                    [f"{current_setpoint:.6e}", f"{voltage:.6e}"])
-            self.line_main.set_data(
-                self.data_storage['voltage'],
-                self.data_storage['current'])
-            self.ax_main.relim()
-            self.ax_main.autoscale_view()
-            self.canvas.draw_idle()
+            self.data_writer.write_row(
+                [f"{current_setpoint:.6e}", f"{voltage:.6e}"])
+            # Blitted; the limits grow (with a full redraw) only when a
+            # point falls outside them
+            self.live_plot.request_redraw()
 
             self.current_step_index += 1
             if self.is_running and self.current_step_index < len(
@@ -657,6 +679,7 @@ class IV_GUI:
                 raise ValueError("All fields must be filled.")
             if params['step_i'] == 0:
                 raise ValueError("Step Current cannot be zero.")
+            params['trigger_link'] = self.trigger_link_var.get()
             return params
         except Exception as e:
             raise ValueError(f"Invalid parameter input: {e}")
@@ -669,6 +692,7 @@ class IV_GUI:
             w.config(state=state)
         for cb in [self.k2400_cb, self.k2182_cb]:
             cb.config(state=state if state == 'normal' else 'readonly')
+        self.trigger_link_check.config(state=state)
         self.stop_button.config(state='normal' if running else 'disabled')
 
     def _scan_for_visa(self):
@@ -758,10 +782,10 @@ class IV_GUI:
 
 
 if __name__ == '__main__':
-    if not PYMEASURE_AVAILABLE:
+    if pyvisa is None:
         messagebox.showerror(
             "Dependency Error",
-            "Pymeasure or PyVISA is not installed. Please run 'pip install pymeasure'.")
+            "PyVISA is not installed. Please run 'pip install pyvisa'.")
     else:
         root = tk.Tk()
         app = IV_GUI(root)
@@ -16,10 +16,10 @@ Purpose: GUI module for RT K2400 K2182 T Control GUI v3.
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext, Canvas
 import os
+import sys
 import time
 import traceback
 from datetime import datetime
-import csv
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib as mpl
@@ -34,11 +34,21 @@ except ImportError:
 
 try:
     import pyvisa
-    from pymeasure.instruments.keithley import Keithley2400
-    PYMEASURE_AVAILABLE = True
 except ImportError:
-    pyvisa, Keithley2400 = None, None
-    PYMEASURE_AVAILABLE = False
+    pyvisa = None
+
+try:
+    # Dynamically find the project root and add it to the path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+except Exception:
+    pass
+
+from Instrument_Drivers import (ColumnStore, Keithley2182, Keithley2400,
+                                Lakeshore350, LivePlot, RunFileWriter,
+                                SampleScheduler, get_resource_manager)
 
 
 def run_script_process(script_path):
@@ -97,105 +107,73 @@ class VT_Backend:
         self.k2400 = None
         self.k2182 = None
         self.lakeshore = None
-        if pyvisa:
-            try:
-                self.rm = pyvisa.ResourceManager()
-            except Exception as e:
-                print(f"Could not initialize VISA: {e}")
-                self.rm = None
-        else:
+        try:
+            self.rm = get_resource_manager()
+        except Exception as e:
+            print(f"Could not initialize VISA: {e}")
             self.rm = None
 
     def connect(self, k2400_visa, k2182_visa, ls_visa):
         if not self.rm:
             raise ConnectionError("PyVISA is not available.")
-        if not PYMEASURE_AVAILABLE:
-            raise ImportError("Pymeasure is not available.")
-
-        self.k2400 = Keithley2400(k2400_visa)
-        print(f"  K2400 Connected: {self.k2400.id}")
-
-        self.k2182 = self.rm.open_resource(k2182_visa)
-        print(f"  K2182 Connected: {self.k2182.query('*IDN?').strip()}")
-
-        self.lakeshore = self.rm.open_resource(ls_visa)
-        print(
-            f"  Lakeshore Connected: {self.lakeshore.query('*IDN?').strip()}")
+        self.k2400 = Keithley2400(k2400_visa, resource_manager=self.rm)
+        print(f"  K2400 Connected: {self.k2400.identify()}")
+        self.k2182 = Keithley2182(k2182_visa, resource_manager=self.rm)
+        print(f"  K2182 Connected: {self.k2182.identify()}")
+        self.lakeshore = Lakeshore350(ls_visa, resource_manager=self.rm)
+        print(f"  Lakeshore Connected: {self.lakeshore.identify()}")
 
     def configure_instruments(self, current_ma, compliance_v):
         # Lakeshore setup
-        self.lakeshore.write('*RST')
-        time.sleep(0.5)
-        self.lakeshore.write('*CLS')
-        self.lakeshore.write('HTRSET 1,1,2,0,1')  # 25Ω heater, 1A max
+        self.lakeshore.reset()
+        self.lakeshore.configure_heater(1)  # 25Ω heater, 1A max
 
         # Keithley 2400/2182 setup
         self.k2400.reset()
-        self.k2400.apply_current()
-        self.k2400.source_current_range = abs(current_ma * 1e-3) * 1.05
-        self.k2400.compliance_voltage = compliance_v
-        self.k2400.source_current = current_ma * 1e-3
-        self.k2400.enable_source()
-        self.k2182.write("*rst; status:preset; *cls")
-        time.sleep(1)
+        self.k2400.configure_current_source(
+            compliance_v, current_range=abs(current_ma * 1e-3) * 1.05)
+        self.k2400.set_current(current_ma * 1e-3)
+        self.k2400.enable_output()
+        self.k2182.reset()
 
     def get_temperature(self):
         if not self.lakeshore:
             return 0.0
-        return float(self.lakeshore.query('KRDG? A').strip())
+        return self.lakeshore.get_temperature('A')
 
     def set_heater_range(self, output, heater_range):
-        range_map = {'off': 0, 'low': 2, 'medium': 4, 'high': 5}
-        range_code = range_map.get(heater_range.lower())
-        if range_code is None:
-            raise ValueError("Invalid heater range.")
-        self.lakeshore.write(f'RANGE {output},{range_code}')
+        self.lakeshore.set_heater_range(output, heater_range)
 
     def set_setpoint(self, output, temperature_k):
-        self.lakeshore.write(f'SETP {output},{temperature_k}')
+        self.lakeshore.set_setpoint(output, temperature_k)
 
     def start_ramp(self, end_temp, rate_k_min):
-        self.lakeshore.write(f'SETP 1,{end_temp}')
-        self.lakeshore.write(f'RAMP 1,1,{rate_k_min}')
-        self.lakeshore.write('RANGE 1,5')  # Heater High for ramp
+        self.lakeshore.set_setpoint(1, end_temp)
+        self.lakeshore.set_ramp(1, rate_k_min)
+        self.lakeshore.set_heater_range(1, 'high')  # Heater High for ramp
 
     def get_measurement(self):
-        # K2182 measurement sequence
-        self.k2182.write("status:measurement:enable 512; *sre 1")
-        self.k2182.write("sample:count 2")
-        self.k2182.write("trigger:source bus")
-        self.k2182.write("trigger:delay 0.1")
-        self.k2182.write("trace:points 2")
-        self.k2182.write("trace:feed sense1; feed:control next")
-        self.k2182.write("initiate")
-        self.k2182.assert_trigger()
-        self.k2182.wait_for_srq(timeout=10)
-        voltages = self.k2182.query_ascii_values("trace:data?")
-        self.k2182.query("status:measurement?")
-        self.k2182.write("trace:clear; feed:control next")
-        voltage = sum(voltages) / len(voltages) if voltages else float('nan')
-
-        # Lakeshore temperature reading
-        temperature = float(self.lakeshore.query('KRDG? A').strip())
-        return temperature, voltage
+        # The Lakeshore is read while the K2182 bus-triggered sequence runs.
+        temp_future = self.lakeshore.get_temperature_async('A')
+        voltage = self.k2182.measure_bus_triggered(samples=2, trigger_delay=0.1)
+        return temp_future.result(), voltage
 
     def shutdown(self):
         if self.k2400:
             try:
                 self.k2400.shutdown()
-            except Exception:
+            except BaseException:
                 pass
         if self.k2182:
             try:
-                self.k2182.write("*rst")
-                self.k2182.close()
-            except Exception:
+                self.k2182.shutdown()
+            except BaseException:
                 pass
         if self.lakeshore:
             try:
-                self.lakeshore.write("RANGE 1,0")
+                self.lakeshore.heater_off(1)
                 self.lakeshore.close()
-            except Exception:
+            except BaseException:
                 pass
         print("  Instruments shut down and disconnected.")
 
@@ -230,8 +208,10 @@ class VT_GUI_Active:
         self.root.configure(bg=self.CLR_BG_DARK)
         self.experiment_state = 'idle'
         self.logo_image = None
+        self.sample_scheduler = None
+        self.data_writer = None
         self.backend = VT_Backend()
-        self.data_storage = {'temperature': [], 'voltage': []}
+        self.data_storage = ColumnStore(['temperature', 'voltage'])
         self.setup_styles()
         self.create_widgets()
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
@@ -447,7 +427,6 @@ class VT_GUI_Active:
         container.pack(fill='both', expand=True)
         self.figure = Figure(dpi=100, facecolor=self.CLR_GRAPH_BG)
         self.ax_main = self.figure.add_subplot(111)
-        self.plot_background = None
         self.line_main, = self.ax_main.plot(
             [], [], color=self.CLR_ACCENT_RED, marker='o', markersize=4, linestyle='-')
         self.ax_main.set_yscale('log')
@@ -458,6 +437,9 @@ class VT_GUI_Active:
         self.figure.tight_layout()
         self.canvas = FigureCanvasTkAgg(self.figure, container)
         self.canvas.get_tk_widget().pack(fill='both', expand=True, padx=5, pady=5)
+        self.live_plot = LivePlot(self.canvas)
+        self.live_plot.add_line(self.line_main, self.data_storage['temperature'],
+                                self.data_storage['voltage'])
         return panel
 
     def _create_params_panel(self, parent, grid_row):
@@ -553,10 +535,8 @@ class VT_GUI_Active:
             filename = f"{self.params['name']}_{ts}_VT_Active.csv"
             self.data_filepath = os.path.join(
                 self.params['save_path'], filename)
-            with open(self.data_filepath, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(
-                    ["Temperature (K)", "Voltage (V)", "Elapsed Time (s)"])
+            self.data_writer = RunFileWriter(self.data_filepath, header_rows=[
+                ["Temperature (K)", "Voltage (V)", "Elapsed Time (s)", "Timing Jitter (s)"]])
 
             self.set_ui_state(running=True)
             self.experiment_state = 'stabilizing'
@@ -567,10 +547,7 @@ class VT_GUI_Active:
             self.ax_main.set_yscale('log')
 
             # --- Performance Improvement: Full draw before starting loop ---
-            self.canvas.draw()
-            self.plot_background = self.canvas.copy_from_bbox(
-                self.ax_main.bbox)
-            self.line_main.set_animated(True)
+            self.live_plot.start()
             self.log("Blitting enabled for fast graph updates.")
 
             self.log(
@@ -587,12 +564,17 @@ class VT_GUI_Active:
         self.log(
             f"Stopping... {reason}" if reason else "Stopping by user request.")
         self.experiment_state = 'idle'
+        if self.sample_scheduler:
+            self.log(f"Sampling: {self.sample_scheduler.summary()}")
+            self.sample_scheduler = None
         self.backend.shutdown()
+        if self.data_writer:
+            self.data_writer.close()
+            self.data_writer = None
         self.set_ui_state(running=False)
-        self.line_main.set_animated(False)
-        self.plot_background = None
         self.ax_main.set_title("Experiment stopped.")
-        self.canvas.draw_idle()
+        self.live_plot.stop()
+        self.log(f"Plotting: {self.live_plot.summary()}")
         if reason:
             messagebox.showinfo("Experiment Finished", f"Reason: {reason}")
 
@@ -640,11 +622,17 @@ class VT_GUI_Active:
                 self.log(f"Ramp started towards {self.params['end_temp']} K.")
                 self.experiment_state = 'ramping'
                 self.start_time = time.time()
+                # Samples are due every delay_s on the monotonic clock, so the
+                # read and plotting time does not add to the logging period.
+                self.sample_scheduler = SampleScheduler(self.params['delay_s'])
                 self.root.after(100, self._experiment_loop)
                 return
 
             elif self.experiment_state == 'ramping':
+                # Lateness of this sample against its planned start, saved per row
+                jitter = self.sample_scheduler.mark_start()
                 temp, voltage = self.backend.get_measurement()
+                self.sample_scheduler.mark_done()
                 elapsed = time.time() - self.start_time
                 resistance = voltage / \
                     (self.params['current_ma'] * 1e-3) if self.params['current_ma'] != 0 else float('inf')
@@ -652,22 +640,12 @@ class VT_GUI_Active:
 
                 self.data_storage['temperature'].append(temp)
                 self.data_storage['voltage'].append(voltage)
-                with open(self.data_filepath, 'a', newline='') as f:
-                    csv.writer(f).writerow(
-                        [f"{temp:.4f}", f"{voltage:.6e}", f"{elapsed:.2f}"])
+                self.data_writer.write_row(
+                    [f"{temp:.4f}", f"{voltage:.6e}", f"{elapsed:.2f}", f"{jitter:.4f}"])
 
                 # --- Performance Improvement: Use blitting for fast updates ---
-                if self.plot_background:
-                    self.canvas.restore_region(self.plot_background)
-                    self.line_main.set_data(
-                        self.data_storage['temperature'],
-                        self.data_storage['voltage'])
-                    self.ax_main.relim()
-                    self.ax_main.autoscale_view()
-                    self.ax_main.draw_artist(self.line_main)
-                    self.canvas.blit(self.ax_main.bbox)
-                else:
-                    self.canvas.draw_idle()
+                # (points arriving faster than the frame rate share a frame)
+                self.live_plot.request_redraw()
 
                 # Check end conditions
                 if temp >= self.params['cutoff']:
@@ -678,7 +656,7 @@ class VT_GUI_Active:
                     self.stop_experiment("End temperature reached.")
                 else:
                     self.root.after(
-                        int(self.params['delay_s'] * 1000), self._experiment_loop)
+                        self.sample_scheduler.delay_ms(), self._experiment_loop)
 
         except Exception as e:
             self.log(f"CRITICAL ERROR: {traceback.format_exc()}")
@@ -815,10 +793,10 @@ class VT_GUI_Active:
 
 
 if __name__ == '__main__':
-    if not PYMEASURE_AVAILABLE:
+    if pyvisa is None:
         messagebox.showerror(
             "Dependency Error",
-            "Pymeasure or PyVISA is not installed. Please run 'pip install pymeasure'.")
+            "PyVISA is not installed. Please run 'pip install pyvisa'.")
     else:
         root = tk.Tk()
         app = VT_GUI_Active(root)
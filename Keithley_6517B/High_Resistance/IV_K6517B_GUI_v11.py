@@ -19,8 +19,8 @@ from tkinter import ttk, Label, Entry, LabelFrame, filedialog, messagebox, scrol
 import threading
 import queue
 import numpy as np
-import csv
 import os
+import sys
 import time
 import traceback
 from datetime import datetime
@@ -41,15 +41,26 @@ except ImportError:
 # --- Packages for Back end ---
 try:
     import pyvisa
-    from pymeasure.instruments.keithley import Keithley6517B
     from pyvisa.errors import VisaIOError
-    PYMEASURE_AVAILABLE = True
+    PYVISA_AVAILABLE = True
 
 except ImportError:
     pyvisa = None
-    Keithley6517B = None
     VisaIOError = None
-    PYMEASURE_AVAILABLE = False
+    PYVISA_AVAILABLE = False
+
+try:
+    # Dynamically find the project root and add it to the path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(script_dir, os.pardir, os.pardir))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+except Exception:
+    pass
+
+from Instrument_Drivers import (BlockStatistics, ColumnStore, Keithley6517B,
+                                LivePlot, RunFileWriter, SampleScheduler,
+                                block_statistics, get_resource_manager)
 
 
 def run_script_process(script_path):
@@ -124,9 +135,9 @@ class Keithley6517B_Backend:
     def __init__(self):
         self.keithley = None
         self.is_connected = False
-        if not PYMEASURE_AVAILABLE:
+        if not PYVISA_AVAILABLE:
             raise ImportError(
-                "PyMeasure or PyVISA is not installed. Please run 'pip install pymeasure'.")
+                "PyVISA is not installed. Please run 'pip install pyvisa'.")
 
     def initialize_instruments(self, parameters):
         """
@@ -137,44 +148,24 @@ class Keithley6517B_Backend:
             f"\n--- [Backend] Initializing Instrument at {parameters['keithley_visa']} ---")
         try:
             self.keithley = Keithley6517B(
-                parameters['keithley_visa'], timeout=20000)
-            print(f"  Successfully connected to: {self.keithley.id}")
+                parameters['keithley_visa'], timeout=20000,
+                resource_manager=get_resource_manager())
+            print(f"  Successfully connected to: {self.keithley.identify()}")
 
             # --- Configure Measurement and Perform Zero Correction (V5 Core Logic) ---
             print("  Configuring instrument and performing zero correction...")
             self.keithley.reset()
             # Set the function to resistance to ensure the ammeter is
-            # configured for zero correction.
-            self.keithley.measure_resistance()
+            # configured for zero correction. NPLC 1 for noise reduction
+            # (as per V5 core script).
+            self.keithley.configure_resistance(nplc=1)
 
             # --- Perform Zero Correction Sequence ---
+            # Each step is confirmed with *OPC? by the driver.
             print("  Starting zero correction procedure...")
-            time.sleep(1)  # Reduced wait time for GUI responsiveness
-
-            # 1. Enable Zero Check
-            print("    Step 1/4: Enabling Zero Check mode...")
-            self.keithley.write(':SYSTem:ZCHeck ON')  # type: ignore
-            time.sleep(2)
-
-            # 2. Acquire the zero measurement
-            print("    Step 2/4: Acquiring zero correction value...")
-            self.keithley.write(':SYSTem:ZCORrect:ACQuire')  # type: ignore
-            time.sleep(2)  # Allow time for acquisition
-
-            # 3. Disable Zero Check
-            print("    Step 3/4: Disabling Zero Check mode...")
-            self.keithley.write(':SYSTem:ZCHeck OFF')  # type: ignore
-            time.sleep(1)
-
-            # 4. Enable Zero Correct
-            print("    Step 4/4: Enabling Zero Correction for all measurements.")
-            self.keithley.write(':SYSTem:ZCORrect ON')  # type: ignore
-            time.sleep(1)
+            self.keithley.zero_correct()
             print("  Zero Correction Complete.")
 
-            # Set integration rate for noise reduction (as per V5 core script)
-            self.keithley.current_nplc = 1
-
             self.is_connected = True
             print("--- [Backend] Instrument Initialized and Ready ---")
 
@@ -190,24 +181,32 @@ class Keithley6517B_Backend:
         """Sets the voltage source level and enables the output."""
         if not self.is_connected:
             raise ConnectionError("Instrument not connected.")
-        self.keithley.source_voltage = voltage
+        self.keithley.set_source_voltage(voltage)
         self.keithley.enable_source()
 
-    def get_measurement(self):
+    def get_measurement(self, block_size=1):
         """
         Reads current and calculates resistance, mirroring the V5 Core script's method.
+        With ``block_size`` > 1 the readings are taken into the trace buffer
+        and fetched in one transfer. Returns (R, I, V, R std, n), R being
+        the mean of the n readings.
         """
         if not self.is_connected:
             raise ConnectionError("Instrument not connected.")
 
-        # Read voltage and current from the instrument
-        voltage = self.keithley.source_voltage  # Read back the actual source voltage
-        resistance = self.keithley.resistance
+        # The source level is known from the last set_voltage(); only the
+        # resistance reading needs a bus round-trip.
+        voltage = self.keithley.source_voltage
+        if block_size > 1:
+            stats = block_statistics(self.keithley.read_buffered_block(block_size))
+        else:
+            stats = BlockStatistics(self.keithley.read(), 0.0, 1)
+        resistance = stats.mean
 
         # Calculate resistance as done in the command-line script
         current = voltage / resistance if resistance != 0 else float('inf')
 
-        return resistance, current, voltage
+        return resistance, current, voltage, stats.std, stats.n
 
     def close_instruments(self):
         """Safely shuts down the voltage source and disconnects."""
@@ -273,6 +272,7 @@ class HighResistanceIV_GUI:
 
         self.is_running = False
         self.start_time = None
+        self.data_writer = None
         self.logo_image = None  # Attribute to hold the logo image reference
         try:
             self.backend = Keithley6517B_Backend()
@@ -283,15 +283,12 @@ class HighResistanceIV_GUI:
                 "Please ensure PyMeasure and NI-VISA are installed correctly.")
             self.backend = None
         self.file_location_path = ""
-        self.data_storage = {
-            'time': [],
-            'voltage_applied': [],
-            'current_measured': [],
-            'resistance': []}
+        self.data_storage = ColumnStore(
+            ['time', 'voltage_applied', 'current_measured', 'resistance'])
         self.voltage_list = []
         self.data_queue = queue.Queue()
         self.measurement_thread = None
-        self.plot_backgrounds = None  # For blitting
+        self.live_plot = None  # Blits the live lines, see create_graph_frame
         self.setup_styles()
         self.create_widgets()
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
@@ -594,9 +591,25 @@ class HighResistanceIV_GUI:
 
         Label(
             frame,
-            text="Keithley 6517B VISA:").grid(
+            text="Readings/Step:").grid(
             row=4,
             column=0,
+            padx=(
+                10,
+                0),
+            pady=pady_val,
+            sticky='w')
+        self.entries["Readings"] = Entry(frame, font=self.FONT_BASE, width=8)
+        self.entries["Readings"].grid(
+            row=4, column=1, padx=(
+                0, 10), pady=pady_val, sticky='w')
+        self.entries["Readings"].insert(0, "1")
+
+        Label(
+            frame,
+            text="Keithley 6517B VISA:").grid(
+            row=5,
+            column=0,
             columnspan=4,
             padx=10,
             pady=(
@@ -606,7 +619,7 @@ class HighResistanceIV_GUI:
         self.keithley_combobox = ttk.Combobox(
             frame, font=self.FONT_BASE, state='readonly')
         self.keithley_combobox.grid(
-            row=5, column=0, columnspan=4, padx=10, pady=(
+            row=6, column=0, columnspan=4, padx=10, pady=(
                 0, 5), sticky='ew')
 
         self.scan_button = ttk.Button(
@@ -614,7 +627,7 @@ class HighResistanceIV_GUI:
             text="Scan for Instruments",
             command=self._scan_for_visa_instruments)
         self.scan_button.grid(
-            row=6,
+            row=7,
             column=0,
             columnspan=4,
             padx=10,
@@ -626,7 +639,7 @@ class HighResistanceIV_GUI:
             text="Browse Save Location...",
             command=self._browse_file_location)
         self.file_location_button.grid(
-            row=7,
+            row=8,
             column=0,
             columnspan=4,
             padx=10,
@@ -639,7 +652,7 @@ class HighResistanceIV_GUI:
             command=self.start_measurement,
             style='Start.TButton')
         self.start_button.grid(
-            row=8,
+            row=9,
             column=0,
             columnspan=2,
             padx=10,
@@ -652,7 +665,7 @@ class HighResistanceIV_GUI:
             style='Stop.TButton',
             state='disabled')
         self.stop_button.grid(
-            row=8,
+            row=9,
             column=2,
             columnspan=2,
             padx=10,
@@ -678,9 +691,9 @@ class HighResistanceIV_GUI:
         self.console_widget.pack(pady=5, padx=5, fill='both', expand=True)
         self.log(
             "Console initialized. Configure parameters and scan for instruments.")
-        if not PYMEASURE_AVAILABLE:
+        if not PYVISA_AVAILABLE:
             self.log(
-                "CRITICAL: PyMeasure or PyVISA not found. Please run 'pip install pymeasure'.")
+                "CRITICAL: PyVISA not found. Please run 'pip install pyvisa'.")
         return frame
 
     def create_graph_frame(self, parent):
@@ -726,6 +739,12 @@ class HighResistanceIV_GUI:
         self.canvas = FigureCanvasTkAgg(self.figure, graph_container)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
+        self.live_plot = LivePlot(self.canvas)
+        self.live_plot.add_line(self.line_iv, self.data_storage['voltage_applied'],
+                                self.data_storage['current_measured'])
+        self.live_plot.add_line(self.line_rv, self.data_storage['voltage_applied'],
+                                self.data_storage['resistance'])
+
     def log(self, message):
         timestamp = datetime.now().strftime("%H:%M:%S")
         self.console_widget.config(state='normal')
@@ -746,6 +765,7 @@ class HighResistanceIV_GUI:
             stop_v = float(self.entries["Stop V"].get())
             steps = int(self.entries["Steps"].get())
             self.delay_ms = int(float(self.entries["Delay (s)"].get()) * 1000)
+            block_size = int(self.entries["Readings"].get())
             params['keithley_visa'] = self.keithley_combobox.get()
 
             if not all([params['sample_name'], params['keithley_visa']]
@@ -754,6 +774,8 @@ class HighResistanceIV_GUI:
                     "All fields, VISA address, and a save location are required.")
             if steps < 2:
                 raise ValueError("Number of steps must be 2 or more.")
+            if block_size < 1:
+                raise ValueError("Readings per step must be 1 or more.")
 
             self.voltage_list = np.linspace(start_v, stop_v, steps)
             self.log(
@@ -768,15 +790,16 @@ class HighResistanceIV_GUI:
             self.data_filepath = os.path.join(
                 self.file_location_path, file_name)
 
-            with open(self.data_filepath, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([f"# Sample Name: {params['sample_name']}"])
-                writer.writerow(
-                    [f"# Voltage Sweep: {start_v}V to {stop_v}V, {steps} steps, {self.delay_ms/1000}s delay"])
-                writer.writerow(["Time (s)",
-                                 "Applied Voltage (V)",
-                                 "Measured Current (A)",
-                                 "Resistance (Ohms)"])
+            self.data_writer = RunFileWriter(self.data_filepath, header_rows=[
+                [f"# Sample Name: {params['sample_name']}"],
+                [f"# Voltage Sweep: {start_v}V to {stop_v}V, {steps} steps, {self.delay_ms/1000}s delay, {block_size} readings/step"],
+                ["Time (s)",
+                 "Applied Voltage (V)",
+                 "Measured Current (A)",
+                 "Resistance (Ohms)",
+                 "Resistance Std Dev (Ohms)",
+                 "Readings",
+                 "Settle Jitter (s)"]])
             self.log(
                 f"Output file created: {os.path.basename(self.data_filepath)}")
 
@@ -791,31 +814,20 @@ class HighResistanceIV_GUI:
             self.line_iv.set_data([], [])
             self.line_rv.set_data([], [])
 
-            # Perform a full redraw to clear plots and set the new title
-            for ax in [self.ax_iv, self.ax_rv]:
-                ax.relim()
-                ax.autoscale_view()
             self.ax_iv.set_title(
                 f"I-V Curve: {params['sample_name']}",
                 fontweight='bold')
             self.figure.tight_layout(pad=3.0)
-            self.canvas.draw()
             self.log("Measurement sweep started.")
 
-            # --- Performance Improvement: Capture static background for blitting ---
-            for line in [self.line_iv, self.line_rv]:
-                line.set_animated(True)
-            self.canvas.draw()
-            self.plot_backgrounds = [
-                self.canvas.copy_from_bbox(
-                    ax.bbox) for ax in [
-                    self.ax_iv, self.ax_rv]]
+            # --- Performance Improvement: Full draw, then blit the lines ---
+            self.live_plot.start()
             self.log("Blitting enabled for fast graph updates.")
 
             # Start the worker thread and the queue processor
             self.measurement_thread = threading.Thread(
                 target=self._measurement_worker, args=(
-                    self.voltage_list, self.delay_ms), daemon=True)
+                    self.voltage_list, self.delay_ms, block_size), daemon=True)
             self.measurement_thread.start()
             self.root.after(100, self._process_data_queue)
 
@@ -832,30 +844,38 @@ class HighResistanceIV_GUI:
             self.start_button.config(state='normal')
             self.stop_button.config(state='disabled')
             # Turn off animation for any final redraws
-            for line in [self.line_iv, self.line_rv]:
-                line.set_animated(False)
-            self.plot_backgrounds = None
+            self.live_plot.stop()
+            self.log(f"Plotting: {self.live_plot.summary()}")
             if self.backend:
                 self.backend.close_instruments()
+            if self.data_writer:
+                self.data_writer.close()
+                self.data_writer = None
             self.log("Instrument connection closed.")
             if from_user:
                 messagebox.showinfo(
                     "Info", "Measurement stopped and instrument disconnected.")
 
-    def _measurement_worker(self, voltage_list, delay_ms):
+    def _measurement_worker(self, voltage_list, delay_ms, block_size=1):
         """Worker thread to perform measurements and put data into a queue."""
+        # Each reading is due one settle delay after its voltage was applied,
+        # on the monotonic clock; a late start is recorded as jitter.
+        settle = SampleScheduler(delay_ms / 1000.0, SampleScheduler.FIXED_DELAY)
         for i, voltage in enumerate(voltage_list):
             if not self.is_running:
                 break
             try:
                 self.backend.set_voltage(voltage)
+                settle.mark_done()
                 self.data_queue.put(
                     f"LOG:Step {i + 1}/{len(voltage_list)}: Set V = {voltage:.3f} V. Waiting {delay_ms}ms...")
-                time.sleep(delay_ms / 1000.0)
+                settle.wait()
 
-                res, cur, volt = self.backend.get_measurement()
+                res, cur, volt, r_std, n = self.backend.get_measurement(block_size)
                 elapsed_time = time.time() - self.start_time
-                self.data_queue.put((res, cur, volt, elapsed_time))
+                # How late the reading started after its nominal settle, saved per row
+                self.data_queue.put((res, cur, volt, elapsed_time, r_std, n,
+                                     settle.last_jitter_s))
             except Exception as e:
                 self.data_queue.put(e)
                 break
@@ -882,12 +902,14 @@ class HighResistanceIV_GUI:
                         "Runtime Error", "A critical error occurred. Check console.")
                     return
                 else:
-                    res, cur, volt, elapsed_time = data
+                    res, cur, volt, elapsed_time, r_std, n, jitter = data
                     self.log(
-                        f"  Read -> V: {volt:.3e} V, I: {cur:.3e} A, R: {res:.3e} Ω")
-                    with open(self.data_filepath, 'a', newline='') as f:
-                        csv.writer(f).writerow(
-                            [f"{elapsed_time:.3f}", f"{volt:.4e}", f"{cur:.4e}", f"{res:.4e}"])
+                        f"  Read -> V: {volt:.3e} V, I: {cur:.3e} A, R: {res:.3e} Ω"
+                        + (f" (σ {r_std:.2e} Ω, n={n})" if n > 1 else ""))
+                    if self.data_writer:
+                        self.data_writer.write_row(
+                            [f"{elapsed_time:.3f}", f"{volt:.4e}", f"{cur:.4e}", f"{res:.4e}",
+                             f"{r_std:.4e}", f"{n}", f"{jitter:.4f}"])
 
                     self.data_storage['time'].append(elapsed_time)
                     self.data_storage['voltage_applied'].append(volt)
@@ -895,28 +917,8 @@ class HighResistanceIV_GUI:
                     self.data_storage['resistance'].append(res)
 
                     # --- Performance Improvement: Use blitting for fast graph updates ---
-                    if self.plot_backgrounds:
-                        # Restore the clean background
-                        self.canvas.restore_region(self.plot_backgrounds[0])
-                        self.canvas.restore_region(self.plot_backgrounds[1])
-
-                        # Update data and redraw only the artists
-                        self.line_iv.set_data(
-                            self.data_storage['voltage_applied'],
-                            self.data_storage['current_measured'])
-                        self.line_rv.set_data(
-                            self.data_storage['voltage_applied'],
-                            self.data_storage['resistance'])
-                        for ax in [self.ax_iv, self.ax_rv]:
-                            ax.relim()
-                            ax.autoscale_view()
-
-                        self.ax_iv.draw_artist(self.line_iv)
-                        self.ax_rv.draw_artist(self.line_rv)
-                        self.canvas.blit(self.figure.bbox)
-                    else:
-                        # Fallback to a full redraw if blitting isn't ready
-                        self.canvas.draw_idle()
+                    # (points arriving faster than the frame rate share a frame)
+                    self.live_plot.request_redraw()
 
         except queue.Empty:
             pass  # No data to process, which is normal
@@ -929,7 +931,7 @@ class HighResistanceIV_GUI:
             self.log("ERROR: PyVISA is not installed. Cannot scan.")
             return
         try:
-            rm = pyvisa.ResourceManager()
+            rm = get_resource_manager()
             self.log("Scanning for VISA instruments...")
             resources = rm.list_resources()
             if resources:
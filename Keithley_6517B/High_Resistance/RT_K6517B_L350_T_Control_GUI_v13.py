@@ -19,10 +19,10 @@ from tkinter import ttk, Label, Entry, LabelFrame, filedialog, messagebox, scrol
 import threading
 import queue
 import os
+import sys
 import time
 import traceback
 from datetime import datetime
-import csv
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.gridspec as gridspec
@@ -39,15 +39,26 @@ except ImportError:
 # --- Packages for Back end ---
 try:
     import pyvisa
-    from pymeasure.instruments.keithley import Keithley6517B
     from pyvisa.errors import VisaIOError
-    PYMEASURE_AVAILABLE = True
-
+    PYVISA_AVAILABLE = True
 except ImportError:
     pyvisa = None
-    Keithley6517B = None
     VisaIOError = None
-    PYMEASURE_AVAILABLE = False
+    PYVISA_AVAILABLE = False
+
+try:
+    # Dynamically find the project root and add it to the path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(script_dir, os.pardir, os.pardir))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+except Exception:
+    pass
+
+from Instrument_Drivers import (BlockStatistics, ColumnStore, Keithley6517B,
+                                Lakeshore350, LivePlot, MultiInstrumentSampler,
+                                RunFileWriter, SampleScheduler, StartupPipeline,
+                                block_statistics, get_resource_manager)
 
 import runpy
 from multiprocessing import Process
@@ -118,117 +129,146 @@ def launch_gpib_scanner():
 # -------------------------------------------------------------------------------
 
 
-class Lakeshore350_Backend:
-    """A class to control the Lakeshore Model 350 Temperature Controller."""
+class Lakeshore350_Backend(Lakeshore350):
+    """Lakeshore Model 350 driver with the method names used by this GUI."""
 
     def __init__(self, visa_address):
-        self.instrument = None
-        rm = pyvisa.ResourceManager()
-        self.instrument = rm.open_resource(visa_address)
-        self.instrument.timeout = 10000
-        print(f"Lakeshore Connected: {self.instrument.query('*IDN?').strip()}")
+        super().__init__(visa_address)
+        print(f"Lakeshore Connected: {self.identify()}")
 
     def reset_and_clear(self):
-        self.instrument.write('*RST')
-        time.sleep(0.5)
-        self.instrument.write('*CLS')
-        time.sleep(1)
+        self.reset()
 
     def setup_heater(self, output, resistance_code, max_current_code):
-        self.instrument.write(
-            f'HTRSET {output},{resistance_code},{max_current_code},0,1')
-        time.sleep(0.5)
+        self.configure_heater(output, resistance_code, max_current_code)
 
     def setup_ramp(self, output, rate_k_per_min, ramp_on=True):
         """ Configures the instrument's internal ramp generator. """
-        self.instrument.write(
-            f'RAMP {output},{1 if ramp_on else 0},{rate_k_per_min}')
-        time.sleep(0.5)
-
-    def set_setpoint(self, output, temperature_k):
-        self.instrument.write(f'SETP {output},{temperature_k}')
-
-    def set_heater_range(self, output, heater_range):
-        range_map = {'off': 0, 'low': 2, 'medium': 4, 'high': 5}
-        range_code = range_map.get(heater_range.lower())
-        if range_code is None:
-            raise ValueError("Invalid heater range.")
-        self.instrument.write(f'RANGE {output},{range_code}')
-
-    def get_temperature(self, sensor):
-        return float(self.instrument.query(f'KRDG? {sensor}').strip())
-
-    def get_heater_output(self, output):
-        return float(self.instrument.query(f'HTR? {output}').strip())
+        self.set_ramp(output, rate_k_per_min, ramp_on)
 
     def close(self):
-        if self.instrument:
+        if self.resource:
             try:
-                self.set_heater_range(1, 'off')
-                time.sleep(0.5)
-                self.instrument.close()
+                self.heater_off(1)
             except Exception as e:
                 print(f"Warning: Issue during Lakeshore shutdown: {e}")
             finally:
-                self.instrument = None
+                super().close()
 
 
 class Combined_Backend:
     """Manages both the Lakeshore 350 and Keithley 6517B."""
 
+    # Resistance acquisition per sample
+    ACQ_SINGLE = "Single reading"
+    ACQ_BUFFERED = "Buffered block"
+    ACQ_ALT_POL = "Alternating polarity"
+    # Defaults for the sequence's measure time per alternation and the
+    # number of leading readings it discards
+    ALT_POL_MEASURE_TIME_S = 15.0
+    ALT_POL_DISCARD = 3
+
     def __init__(self):
         self.lakeshore = None
         self.keithley = None
+        self.sampler = None
         self.params = {}
+        self.startup_summary = ""
 
     def initialize_instruments(self, parameters):
         self.params = parameters
         print("\n--- [Backend] Initializing Instruments ---")
+        # The Lakeshore set-up and the Keithley zero correction do not depend
+        # on each other and run concurrently; every step completes on *OPC?.
+        pipeline = StartupPipeline("Startup")
+        pipeline.add_step('lakeshore', self._setup_lakeshore)
+        pipeline.add_step('keithley', self._connect_keithley)
+        pipeline.add_step('zero correction', self._perform_keithley_zero_check,
+                          after=['keithley'])
+        pipeline.add_step('source', self._setup_source, after=['zero correction'])
+        pipeline.run()
+        self.startup_summary = pipeline.summary()
+        print(self.startup_summary)
+        self._create_sampler()
+
+    def _setup_lakeshore(self):
         self.lakeshore = Lakeshore350_Backend(self.params['lakeshore_visa'])
         self.lakeshore.reset_and_clear()
         self.lakeshore.setup_heater(1, 1, 2)
 
+    def _connect_keithley(self):
         self.keithley = Keithley6517B(self.params['keithley_visa'])
-        print(f"Keithley Connected: {self.keithley.id}")
-        self._perform_keithley_zero_check()
-
-        self.keithley.source_voltage = self.params['source_voltage']
-        self.keithley.current_nplc = 1
-        self.keithley.enable_source()
-        print(f"Keithley source enabled: {self.params['source_voltage']} V")
+        print(f"Keithley Connected: {self.keithley.identify()}")
+
+    def _setup_source(self):
+        if self.params.get('acquisition') == self.ACQ_ALT_POL:
+            # The sequence drives the source itself, alternating +/- the source voltage
+            self.keithley.configure_alternating_polarity(
+                self.params['source_voltage'],
+                measure_time_s=self.params.get('alt_measure_s', self.ALT_POL_MEASURE_TIME_S),
+                discard=self.params.get('alt_discard', self.ALT_POL_DISCARD),
+                readings=self.params['block_size'])
+            print(f"Keithley alternating polarity: +/-{self.params['source_voltage']} V")
+        else:
+            self.keithley.set_source_voltage(self.params['source_voltage'])
+            self.keithley.enable_source()
+            print(f"Keithley source enabled: {self.params['source_voltage']} V")
 
     def _perform_keithley_zero_check(self):
         print("  --- Starting Keithley Zero Correction ---")
         self.keithley.reset()
-        self.keithley.measure_resistance()
-        print("  Step 1: Enabling Zero Check (shorts the input)...")
-        self.keithley.write(':SYSTem:ZCHeck ON')
-        time.sleep(2)
-        print("  Step 2: Acquiring the zero correction value...")
-        self.keithley.write(':SYSTem:ZCORrect:ACQuire')
-        time.sleep(3)
-        print("  Step 3: Disabling Zero Check...")
-        self.keithley.write(':SYSTem:ZCHeck OFF')
-        time.sleep(1)
-        print("  Step 4: Enabling Zero Correction for all measurements...")
-        self.keithley.write(':SYSTem:ZCORrect ON')
-        time.sleep(1)
+        self.keithley.configure_resistance(nplc=1)
+        # ZCHeck ON, ZCORrect:ACQuire, ZCHeck OFF, ZCORrect ON; each step
+        # is confirmed with *OPC? instead of a fixed wait.
+        self.keithley.zero_correct()
         print("  Zero Correction Complete.")
 
+    def _create_sampler(self):
+        """The Lakeshore and the 6517B are read concurrently on each sample."""
+        self.sampler = MultiInstrumentSampler()
+        # T and heater output come back from one 'KRDG? A;HTR? 1' query.
+        self.sampler.add_channel(
+            'lakeshore', self.lakeshore,
+            lambda: self.lakeshore.get_status(outputs=(1,), sensors=('A',)))
+        self.sampler.add_channel('resistance', self.keithley, self._read_resistance)
+
+    def _read_resistance(self):
+        """One sample of resistance readings as BlockStatistics."""
+        acquisition = self.params.get('acquisition', self.ACQ_SINGLE)
+        if acquisition == self.ACQ_ALT_POL:
+            return block_statistics(self.keithley.read_alternating_polarity())
+        if acquisition == self.ACQ_BUFFERED:
+            return block_statistics(
+                self.keithley.read_buffered_block(self.params['block_size']))
+        return BlockStatistics(self.keithley.read(), 0.0, 1)
+
     def get_measurement(self):
-        time.sleep(self.params['delay'])
-        current_temp = self.lakeshore.get_temperature('A')
-        heater_output = self.lakeshore.get_heater_output(1)
-        resistance = self.keithley.resistance
+        """
+        Returns (T, heater %, I, R, R timestamp, T-R skew, R std, n). R is
+        the mean of the n readings of this sample and R std their standard
+        deviation. The skew is the time between the temperature and
+        resistance readings in seconds.
+        """
+        readings = self.sampler.sample()
+        status = readings['lakeshore'].value
+        current_temp = status.temperatures['A']
+        heater_output = status.heater_outputs[1]
+        stats = readings['resistance'].value
+        resistance = stats.mean
+        skew = self.sampler.skew_s(readings, 'lakeshore', 'resistance')
         if resistance != 0 and resistance != float(
                 'inf') and resistance == resistance:
             current = self.params['source_voltage'] / resistance
         else:
             current = 0.0
-        return current_temp, heater_output, current, resistance
+        return (current_temp, heater_output, current, resistance,
+                readings['resistance'].timestamp, skew, stats.std, stats.n)
 
     def close_instruments(self):
         print("\n--- [Backend] Closing all instrument connections. ---")
+        if self.sampler:
+            self.sampler.close()
+            self.sampler = None
         if self.keithley:
             self.keithley.shutdown()
             print("  Keithley connection closed and source OFF.")
@@ -285,19 +325,20 @@ class Integrated_RT_GUI:
         self.is_running = False
         self.is_stabilizing = False
         self.start_time = None
-        self.plot_backgrounds = None  # For blitting
+        self.live_plot = None  # Blits the live lines, see create_graph_frame
+        self.data_writer = None
         self.backend = Combined_Backend()
         self.file_location_path = ""
-        self.data_storage = {
-            'time': [],
-            'temperature': [],
-            'current': [],
-            'resistance': []}
+        self.data_storage = ColumnStore(
+            ['time', 'temperature', 'current', 'resistance'])
         self.log_scale_var = tk.BooleanVar(value=True)
+        self.binary_run_var = tk.BooleanVar(value=False)
+        self.acquisition_var = tk.StringVar(value=Combined_Backend.ACQ_SINGLE)
         self.current_heater_range = 'off'
         self.logo_image = None  # Attribute to hold the logo image reference
         self.data_queue = queue.Queue()
         self.measurement_thread = None
+        self.sample_scheduler = None
 
         self.setup_styles()
         self.create_widgets()
@@ -608,7 +649,7 @@ class Integrated_RT_GUI:
                 0, 5), sticky='ew')
         Label(
             frame,
-            text="Settling Delay (s):").grid(
+            text="Sample Period (s):").grid(
             row=6,
             column=1,
             padx=10,
@@ -648,12 +689,73 @@ class Integrated_RT_GUI:
             row=9, column=1, padx=(
                 5, 10), pady=(
                 0, 10), sticky='ew')
+        Label(
+            frame,
+            text="Acquisition:").grid(
+            row=10,
+            column=0,
+            padx=10,
+            pady=pady_val,
+            sticky='w')
+        ttk.Combobox(
+            frame,
+            textvariable=self.acquisition_var,
+            values=[Combined_Backend.ACQ_SINGLE, Combined_Backend.ACQ_BUFFERED,
+                    Combined_Backend.ACQ_ALT_POL],
+            font=self.FONT_BASE,
+            state='readonly').grid(
+            row=11, column=0, padx=(
+                10, 5), pady=(
+                0, 10), sticky='ew')
+        Label(
+            frame,
+            text="Readings per Point:").grid(
+            row=10,
+            column=1,
+            padx=10,
+            pady=pady_val,
+            sticky='w')
+        self.entries["Block Size"] = Entry(frame, font=self.FONT_BASE)
+        self.entries["Block Size"].grid(
+            row=11, column=1, padx=(
+                5, 10), pady=(
+                0, 10), sticky='ew')
+        self.entries["Block Size"].insert(0, "10")
+        Label(
+            frame,
+            text="Alt. Measure Time (s):").grid(
+            row=12,
+            column=0,
+            padx=10,
+            pady=pady_val,
+            sticky='w')
+        self.entries["Alt Measure Time"] = Entry(frame, font=self.FONT_BASE)
+        self.entries["Alt Measure Time"].grid(
+            row=13, column=0, padx=(
+                10, 5), pady=(
+                0, 10), sticky='ew')
+        self.entries["Alt Measure Time"].insert(
+            0, str(Combined_Backend.ALT_POL_MEASURE_TIME_S))
+        Label(
+            frame,
+            text="Alt. Discarded Readings:").grid(
+            row=12,
+            column=1,
+            padx=10,
+            pady=pady_val,
+            sticky='w')
+        self.entries["Alt Discard"] = Entry(frame, font=self.FONT_BASE)
+        self.entries["Alt Discard"].grid(
+            row=13, column=1, padx=(
+                5, 10), pady=(
+                0, 10), sticky='ew')
+        self.entries["Alt Discard"].insert(0, str(Combined_Backend.ALT_POL_DISCARD))
         self.scan_button = ttk.Button(
             frame,
             text="Scan for Instruments",
             command=self._scan_for_visa_instruments)
         self.scan_button.grid(
-            row=10,
+            row=14,
             column=0,
             columnspan=2,
             padx=10,
@@ -664,19 +766,29 @@ class Integrated_RT_GUI:
             text="Browse Save Location...",
             command=self._browse_file_location)
         self.file_button.grid(
-            row=11,
+            row=15,
             column=0,
             columnspan=2,
             padx=10,
             pady=4,
             sticky='ew')
+        ttk.Checkbutton(
+            frame,
+            text="Also save binary run file (.pcrun)",
+            variable=self.binary_run_var).grid(
+            row=16,
+            column=0,
+            columnspan=2,
+            padx=10,
+            pady=4,
+            sticky='w')
         self.start_button = ttk.Button(
             frame,
             text="Start Measurement",
             command=self.start_measurement,
             style='Start.TButton')
         self.start_button.grid(
-            row=13, column=0, padx=10, pady=(
+            row=17, column=0, padx=10, pady=(
                 10, 10), sticky='ew')
         self.stop_button = ttk.Button(
             frame,
@@ -685,7 +797,7 @@ class Integrated_RT_GUI:
             style='Stop.TButton',
             state='disabled')
         self.stop_button.grid(
-            row=13, column=1, padx=10, pady=(
+            row=17, column=1, padx=10, pady=(
                 10, 10), sticky='ew')
 
     def create_console_frame(self, parent):
@@ -707,8 +819,8 @@ class Integrated_RT_GUI:
         self.console_widget.pack(pady=5, padx=5, fill='both', expand=True)
         self.log(
             "Console initialized. Configure parameters and scan for instruments.")
-        if not PYMEASURE_AVAILABLE:
-            self.log("CRITICAL: PyMeasure or PyVISA not found.")
+        if not PYVISA_AVAILABLE:
+            self.log("CRITICAL: PyVISA not found.")
         return frame
 
     def create_graph_frame(self, parent):
@@ -738,7 +850,7 @@ class Integrated_RT_GUI:
         self.ax_sub1 = self.figure.add_subplot(gs[1, 0])
         self.ax_sub2 = self.figure.add_subplot(gs[1, 1])
         self.line_main, = self.ax_main.plot(
-            [], [], color=self.CLR_ACCENT_RED, marker='o', markersize=3, linestyle='-', animated=True)
+            [], [], color=self.CLR_ACCENT_RED, marker='o', markersize=3, linestyle='-')
         self.ax_main.set_title("Resistance vs. Temperature", fontweight='bold')
         self.ax_main.set_ylabel("Resistance (Ω)")
         if self.log_scale_var.get():
@@ -747,24 +859,42 @@ class Integrated_RT_GUI:
             self.ax_main.set_yscale('linear')
         self.ax_main.grid(True, which="both", linestyle='--', alpha=0.6)
         self.line_sub1, = self.ax_sub1.plot(
-            [], [], color=self.CLR_ACCENT_GOLD, marker='.', markersize=3, linestyle='-', animated=True)
+            [], [], color=self.CLR_ACCENT_GOLD, marker='.', markersize=3, linestyle='-')
         self.ax_sub1.set_xlabel("Temperature (K)")
         self.ax_sub1.set_ylabel("Current (A)")
         self.ax_sub1.grid(True, linestyle='--', alpha=0.6)
         self.line_sub2, = self.ax_sub2.plot(
-            [], [], color=self.CLR_ACCENT_GREEN, marker='.', markersize=3, linestyle='-', animated=True)
+            [], [], color=self.CLR_ACCENT_GREEN, marker='.', markersize=3, linestyle='-')
         self.ax_sub2.set_xlabel("Time (s)")
         self.ax_sub2.set_ylabel("Temperature (K)")
         self.ax_sub2.grid(True, linestyle='--', alpha=0.6)
         self.figure.tight_layout(pad=3.0)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
+        self.live_plot = LivePlot(self.canvas)
+        self.live_plot.add_line(self.line_main, self.data_storage['temperature'],
+                                self.data_storage['resistance'])
+        self.live_plot.add_line(self.line_sub1, self.data_storage['temperature'],
+                                self.data_storage['current'])
+        self.live_plot.add_line(self.line_sub2, self.data_storage['time'],
+                                self.data_storage['temperature'])
+
     def _update_y_scale(self):
         if self.log_scale_var.get():
             self.ax_main.set_yscale('log')
         else:
             self.ax_main.set_yscale('linear')
-        self.canvas.draw()
+        # Refits the limits for the new scale and re-captures the background
+        self.live_plot.redraw()
+
+    def _log_alternating_polarity_time(self, delay_s):
+        # One sequence per sample; a sequence longer than the delay sets the
+        # actual sample spacing instead
+        sample_s = self.backend.keithley.alternating_polarity_time_s()
+        self.log(f"Alternating polarity: {sample_s:.1f} s per sample.")
+        if sample_s > delay_s:
+            self.log(f"WARNING: Each sample takes longer than the {delay_s} s delay; "
+                     f"samples will be about {sample_s:.1f} s apart.")
 
     def log(self, message):
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -793,28 +923,38 @@ class Integrated_RT_GUI:
             "Runtime Error", f"A critical error occurred: {exception}")
 
     def _process_measurement_data_point(self, data):
-        temp, htr, cur, res, elapsed = data
-        self._log_measurement_data(temp, htr, cur, res)
-        self._save_measurement_to_csv(temp, htr, cur, res, elapsed)
+        temp, htr, cur, res, elapsed, skew, r_std, n, jitter = data
+        self._log_measurement_data(temp, htr, cur, res, r_std, n)
+        self._save_measurement_to_csv(temp, htr, cur, res, elapsed, skew, r_std, n, jitter)
         self._update_data_storage(temp, htr, cur, res, elapsed)
         self._update_live_plots()
 
-    def _log_measurement_data(self, temp, htr, cur, res):
+    def _log_measurement_data(self, temp, htr, cur, res, r_std=0.0, n=1):
         self.log(
-            f"T:{temp:.3f}K | R:{res:.3e}Ω | Htr:{htr:.1f}% ({self.current_heater_range})")
-
-    def _save_measurement_to_csv(self, temp, htr, cur, res, elapsed):
-        with open(self.data_filepath, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(
+            f"T:{temp:.3f}K | R:{res:.3e}Ω"
+            + (f" | σR:{r_std:.2e}Ω (n={n})" if n > 1 else "")
+            + f" | Htr:{htr:.1f}% ({self.current_heater_range})")
+
+    def _save_measurement_to_csv(self, temp, htr, cur, res, elapsed, skew,
+                                 r_std=0.0, n=1, jitter=0.0):
+        if self.data_writer:
+            self.data_writer.write_row(
                 [
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    datetime.fromtimestamp(self.start_time + elapsed).strftime(
+                        '%Y-%m-%d %H:%M:%S'),
                     f"{elapsed:.2f}",
                     f"{temp:.4f}",
                     f"{htr:.2f}",
                     f"{self.backend.params['source_voltage']:.4e}",
                     f"{cur:.4e}",
-                    f"{res:.4e}"])
+                    f"{res:.4e}",
+                    f"{skew:.4f}",
+                    f"{r_std:.4e}",
+                    f"{n}",
+                    f"{jitter:.4f}"],
+                [self.start_time + elapsed, elapsed, temp, htr,
+                 self.backend.params['source_voltage'], cur, res, skew,
+                 r_std, n, jitter])
 
     def _update_data_storage(self, temp, htr, cur, res, elapsed):
         self.data_storage['time'].append(elapsed)
@@ -823,34 +963,9 @@ class Integrated_RT_GUI:
         self.data_storage['resistance'].append(res)
 
     def _update_live_plots(self):
-        self.line_main.set_data(
-            self.data_storage['temperature'],
-            self.data_storage['resistance'])
-        self.line_sub1.set_data(
-            self.data_storage['temperature'],
-            self.data_storage['current'])
-        self.line_sub2.set_data(
-            self.data_storage['time'],
-            self.data_storage['temperature'])
-
-        if self.plot_backgrounds:
-            for bg in self.plot_backgrounds:
-                self.canvas.restore_region(bg)
-            for ax in [self.ax_main, self.ax_sub1, self.ax_sub2]:
-                ax.relim()
-                ax.autoscale_view()
-
-            self.ax_main.draw_artist(self.line_main)
-            self.ax_sub1.draw_artist(self.line_sub1)
-            self.ax_sub2.draw_artist(self.line_sub2)
-
-            self.canvas.blit(self.figure.bbox)
-        else:
-            for ax in [self.ax_main, self.ax_sub1, self.ax_sub2]:
-                ax.relim()
-                ax.autoscale_view()
-            self.figure.tight_layout(pad=3.0)
-            self.canvas.draw_idle()
+        # Blits the new point at the plot's frame rate; a full redraw only
+        # when the limits grow
+        self.live_plot.request_redraw()
 
     def start_measurement(self):
         try:
@@ -872,8 +987,21 @@ class Integrated_RT_GUI:
                     params['end_temp'] < params['cutoff']):
                 raise ValueError(
                     "Temperatures must be in order: start < end < cutoff.")
+            params['acquisition'] = self.acquisition_var.get()
+            params['block_size'] = int(self.entries["Block Size"].get())
+            if params['block_size'] < 1:
+                raise ValueError("Readings per point must be 1 or more.")
+            if params['acquisition'] == Combined_Backend.ACQ_ALT_POL:
+                params['alt_measure_s'] = float(self.entries["Alt Measure Time"].get())
+                params['alt_discard'] = int(self.entries["Alt Discard"].get())
+                if params['alt_measure_s'] <= 0 or params['alt_discard'] < 0:
+                    raise ValueError(
+                        "Alt. measure time must be positive and discarded readings 0 or more.")
 
             self.backend.initialize_instruments(params)
+            self.log(self.backend.startup_summary)
+            if params['acquisition'] == Combined_Backend.ACQ_ALT_POL:
+                self._log_alternating_polarity_time(params['delay'])
             self.log(
                 f"Backend initialized for sample: {params['sample_name']}")
 
@@ -882,17 +1010,28 @@ class Integrated_RT_GUI:
             self.data_filepath = os.path.join(
                 self.file_location_path, file_name)
 
-            with open(self.data_filepath, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(
-                    [f"# Sample: {params['sample_name']}", f"Source V: {params['source_voltage']}V"])
-                writer.writerow(["Timestamp",
-                                 "Elapsed Time (s)",
-                                 "Temperature (K)",
-                                 "Heater Output (%)",
-                                 "Applied Voltage (V)",
-                                 "Measured Current (A)",
-                                 "Resistance (Ohm)"])
+            self.data_writer = RunFileWriter(self.data_filepath, header_rows=[
+                [f"# Sample: {params['sample_name']}", f"Source V: {params['source_voltage']}V"],
+                ["Timestamp",
+                 "Elapsed Time (s)",
+                 "Temperature (K)",
+                 "Heater Output (%)",
+                 "Applied Voltage (V)",
+                 "Measured Current (A)",
+                 "Resistance (Ohm)",
+                 "T-R Skew (s)",
+                 "Resistance Std Dev (Ohm)",
+                 "Readings",
+                 "Timing Jitter (s)"]],
+                binary_columns=[
+                    "Timestamp (s since epoch)", "Elapsed Time (s)", "Temperature (K)",
+                    "Heater Output (%)", "Applied Voltage (V)", "Measured Current (A)",
+                    "Resistance (Ohm)", "T-R Skew (s)", "Resistance Std Dev (Ohm)",
+                    "Readings", "Timing Jitter (s)"]
+                if self.binary_run_var.get() else None,
+                metadata={'sample': params['sample_name'],
+                          'source_voltage_v': params['source_voltage'],
+                          'acquisition': params['acquisition']})
 
             self.log(
                 f"Output file created: {os.path.basename(self.data_filepath)}")
@@ -906,7 +1045,8 @@ class Integrated_RT_GUI:
             self.ax_main.set_title(
                 f"R-T Curve: {params['sample_name']}",
                 fontweight='bold')
-            self.canvas.draw()
+            # --- Performance Improvement: Full draw, then blit the lines ---
+            self.live_plot.start()
             self.log("Starting stabilization process...")
 
             self.measurement_thread = threading.Thread(
@@ -926,8 +1066,15 @@ class Integrated_RT_GUI:
             self.log("Measurement stopped by user.")
             self.start_button.config(state='normal')
             self.stop_button.config(state='disabled')
+            self.live_plot.stop()
+            self.log(f"Plotting: {self.live_plot.summary()}")
+            if self.sample_scheduler:
+                self.log(f"Sampling: {self.sample_scheduler.summary()}")
             # This backend call will automatically turn the heater off.
             self.backend.close_instruments()
+            if self.data_writer:
+                self.data_writer.close()
+                self.data_writer = None
             if from_user:
                 messagebox.showinfo(
                     "Info", "Measurement stopped and instruments disconnected.")
@@ -969,19 +1116,19 @@ class Integrated_RT_GUI:
                     f"LOG:Hardware ramp started towards {params['end_temp']} K at {params['rate']} K/min.")
                 self.start_time = time.time()
 
-                # --- Performance Improvement: Capture static background for blitting ---
-                # This is done here because the plot area is now stable.
-                self.canvas.draw()
-                self.plot_backgrounds = [
-                    self.canvas.copy_from_bbox(
-                        self.ax_main.bbox), self.canvas.copy_from_bbox(
-                        self.ax_sub1.bbox), self.canvas.copy_from_bbox(
-                        self.ax_sub2.bbox)]
-
+            # Samples are due every 'delay' seconds on the monotonic clock,
+            # so the read time does not add to the period.
+            self.sample_scheduler = SampleScheduler(params['delay'])
             while self.is_running:
-                temp, htr, cur, res = self.backend.get_measurement()
-                elapsed = time.time() - self.start_time
-                self.data_queue.put((temp, htr, cur, res, elapsed))
+                self.sample_scheduler.wait()
+                if not self.is_running:
+                    break
+                temp, htr, cur, res, t_read, skew, r_std, n = self.backend.get_measurement()
+                self.sample_scheduler.mark_done()
+                elapsed = t_read - self.start_time
+                # The sample's lateness against its planned start is saved per row
+                self.data_queue.put((temp, htr, cur, res, elapsed, skew, r_std, n,
+                                     self.sample_scheduler.last_jitter_s))
 
                 if temp >= params['cutoff']:
                     self.data_queue.put("CUTOFF")
@@ -1021,7 +1168,7 @@ class Integrated_RT_GUI:
             self.log("ERROR: PyVISA is not installed.")
             return
         try:
-            rm = pyvisa.ResourceManager()
+            rm = get_resource_manager()
             self.log("Scanning for VISA instruments...")
             resources = rm.list_resources()
             if resources:
@@ -16,6 +16,7 @@ Purpose: GUI module for Pyroelectric K6517B L350 GUI v4.
 import tkinter as tk
 from tkinter import ttk, Label, Entry, filedialog, messagebox, scrolledtext, Canvas
 import os
+import sys
 import time
 import traceback
 from datetime import datetime
@@ -37,11 +38,23 @@ except ImportError:
 # --- Packages for Back end ---
 try:
     import pyvisa
-    from pymeasure.instruments.keithley import Keithley6517B
     PYVISA_AVAILABLE = True
 except ImportError:
     PYVISA_AVAILABLE = False
 
+try:
+    # Dynamically find the project root and add it to the path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(script_dir, os.pardir, os.pardir))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+except Exception:
+    pass
+
+from Instrument_Drivers import (ColumnStore, Keithley6517B, Lakeshore350,
+                                LivePlot, RunFileWriter, SampleScheduler,
+                                get_resource_manager)
+
 import runpy
 
 
@@ -96,14 +109,11 @@ class PyroelectricBackend:
         self.params = {}
         self.keithley = None
         self.lakeshore = None
-        if PYVISA_AVAILABLE:
-            try:
-                self.rm = pyvisa.ResourceManager()
-            except Exception as e:
-                print(
-                    f"Could not initialize VISA resource manager. Error: {e}")
-                self.rm = None
-        else:
+        try:
+            self.rm = get_resource_manager()
+        except Exception as e:
+            print(
+                f"Could not initialize VISA resource manager. Error: {e}")
             self.rm = None
 
     def initialize_instruments(self, parameters):
@@ -116,28 +126,24 @@ class PyroelectricBackend:
             # --- Connect and Configure Lakeshore 350 ---
             print(
                 f"  Connecting to Lakeshore 350 via {self.params['lakeshore_visa']}...")
-            self.lakeshore = self.rm.open_resource(
-                self.params['lakeshore_visa'])
-            self.lakeshore.timeout = 15000
-            print(f"    Connected to: {self.lakeshore.query('*IDN?').strip()}")
-
-            self.lakeshore.write('*RST')
-            time.sleep(0.5)
-            self.lakeshore.write('*CLS')
-            time.sleep(0.5)
+            self.lakeshore = Lakeshore350(
+                self.params['lakeshore_visa'], timeout=15000,
+                resource_manager=self.rm)
+            print(f"    Connected to: {self.lakeshore.identify()}")
+            self.lakeshore.reset()
 
             # HTRSET <output>,<resistance>,<max current>,<max user current>,<display>
             # resistance=1 (25Ω), max_current=2 (1A)
-            self.lakeshore.write('HTRSET 1,1,2,0,1')
+            self.lakeshore.configure_heater(1, resistance_code=1, max_current_code=2)
             print("  Lakeshore heater configured (25Ω, 1A max).")
 
             # --- Connect and Configure Keithley 6517B ---
             print(
                 f"  Connecting to Keithley 6517B via {self.params['keithley_visa']}...")
-            self.keithley = Keithley6517B(self.params['keithley_visa'])
-            time.sleep(1)
-            print(f"    Connected to: {self.keithley.id}")
-            self.keithley.measure_current()
+            self.keithley = Keithley6517B(
+                self.params['keithley_visa'], resource_manager=self.rm)
+            print(f"    Connected to: {self.keithley.identify()}")
+            self.keithley.configure_current()
             print("  Keithley 6517B configured to measure current.")
             print("--- [Backend] Instrument Initialization Complete ---")
 
@@ -149,20 +155,19 @@ class PyroelectricBackend:
     def start_stabilization(self):
         """Begins moving to the start temperature for stabilization."""
         print(f"  Moving to start temperature: {self.params['start_temp']} K")
-        self.lakeshore.write(f"SETP 1,{self.params['start_temp']}")
+        self.lakeshore.set_setpoint(1, self.params['start_temp'])
         # Use 'medium' range for stabilization
-        self.lakeshore.write("RANGE 1,4")
+        self.lakeshore.set_heater_range(1, 'medium')
         print("  Heater range set to 'Medium' for stabilization.")
 
     def start_ramp(self):
         """Configures and starts the temperature ramp."""
         print(
             f"  Ramp starting towards {self.params['end_temp']} K at {self.params['rate']} K/min.")
-        # RAMP <output>,<on/off>,<rate>
-        self.lakeshore.write(f"RAMP 1,1,{self.params['rate']}")
-        self.lakeshore.write(f"SETP 1,{self.params['end_temp']}")
+        self.lakeshore.set_ramp(1, self.params['rate'])
+        self.lakeshore.set_setpoint(1, self.params['end_temp'])
         # Ensure heater range is sufficient for ramp
-        self.lakeshore.write("RANGE 1,4")  # 'Medium' is often a good choice
+        self.lakeshore.set_heater_range(1, 'medium')  # 'Medium' is often a good choice
         print("  Ramp configured and setpoint updated.")
 
     def get_measurement(self):
@@ -170,10 +175,10 @@ class PyroelectricBackend:
         if not self.keithley or not self.lakeshore:
             raise ConnectionError("One or more instruments are not connected.")
         try:
-            temp_str = self.lakeshore.query('KRDG? A').strip()
-            temperature = float(temp_str)
-            current = self.keithley.current
-            return temperature, current
+            # The temperature is read while the 6517B integrates.
+            temp_future = self.lakeshore.get_temperature_async('A')
+            current = self.keithley.read()
+            return temp_future.result(), current
         except (pyvisa.errors.VisaIOError, ValueError):
             return float('nan'), float('nan')  # Return NaN on error
 
@@ -190,7 +195,7 @@ class PyroelectricBackend:
                 self.keithley = None
         if self.lakeshore:
             try:
-                self.lakeshore.write("RANGE 1, 0")  # Turn off heater
+                self.lakeshore.heater_off(1)  # Turn off heater
                 self.lakeshore.close()
                 print("  Lakeshore 350 connection closed.")
             except Exception:
@@ -216,6 +221,7 @@ class PyroelectricAppGUI:
     FONT_SUB_LABEL = ('Segoe UI', FONT_SIZE_BASE - 2)
     FONT_TITLE = ('Segoe UI', FONT_SIZE_BASE + 2, 'bold')
     FONT_CONSOLE = ('Consolas', 10)
+    SAMPLE_PERIOD_S = 2.0
 
     def __init__(self, root):
         self.root = root
@@ -228,10 +234,12 @@ class PyroelectricAppGUI:
         self.experiment_state = 'idle'  # States: idle, stabilizing, ramping
         self.backend = PyroelectricBackend()
         self.file_location_path = ""
-        self.data_storage = {'time': [], 'temperature': [], 'current': []}
+        self.data_writer = None
+        self.data_storage = ColumnStore(['time', 'temperature', 'current'])
         self.data_queue = queue.Queue()
         self.measurement_thread = None
-        self.plot_backgrounds = None  # For blitting
+        self.sample_scheduler = SampleScheduler(self.SAMPLE_PERIOD_S)
+        self.live_plot = None  # Blits the live lines, see create_graph_frame
 
         self.setup_styles()
         self.create_widgets()
@@ -639,7 +647,7 @@ class PyroelectricAppGUI:
             self.log(
                 "Note: 'Pillow' not found. Logo cannot be displayed. Run 'pip install Pillow'.")
         if not PYVISA_AVAILABLE:
-            self.log("CRITICAL ERROR: pyvisa or pymeasure not found.")
+            self.log("CRITICAL ERROR: pyvisa not found.")
         else:
             self.log("Please select a save location and scan for instruments.")
         return frame
@@ -698,6 +706,14 @@ class PyroelectricAppGUI:
         self.canvas = FigureCanvasTkAgg(self.figure, graph_container)
         self.canvas.get_tk_widget().pack(fill='both', expand=True, padx=5, pady=5)
 
+        self.live_plot = LivePlot(self.canvas)
+        self.live_plot.add_line(self.line_main, self.data_storage['temperature'],
+                                self.data_storage['current'])
+        self.live_plot.add_line(self.line_sub1, self.data_storage['time'],
+                                self.data_storage['temperature'])
+        self.live_plot.add_line(self.line_sub2, self.data_storage['time'],
+                                self.data_storage['current'])
+
     def _process_logo_image(self, input_path, size=100):
         if not (PIL_AVAILABLE and os.path.exists(input_path)):
             return None
@@ -737,49 +753,29 @@ class PyroelectricAppGUI:
             self.backend.start_ramp()
             self.start_time = time.time()
 
-    def _process_ramping_state(self, current_temp, current_val, params):
+    def _process_ramping_state(self, current_temp, current_val, params, jitter=0.0):
         elapsed_time = time.time() - self.start_time
-        self._log_and_save_ramping_data(elapsed_time, current_temp, current_val)
+        self._log_and_save_ramping_data(elapsed_time, current_temp, current_val, jitter)
         self._update_data_storage_and_plots(elapsed_time, current_temp, current_val)
         self._check_ramping_completion_conditions(current_temp, params)
 
-    def _log_and_save_ramping_data(self, elapsed_time, current_temp, current_val):
+    def _log_and_save_ramping_data(self, elapsed_time, current_temp, current_val, jitter=0.0):
         log_msg = (
             f"Time: {elapsed_time:.1f}s | "
             f"Temp: {current_temp:.2f}K | "
             f"Current: {current_val:.2e}A"
         )
         self.log(log_msg)
-        with open(self.data_filepath, 'a', newline='') as f:
-            f.write(
-                f"{elapsed_time:.2f},{current_temp:.4f},{current_val}\n")
+        self.data_writer.write_row(
+            [f"{elapsed_time:.2f}", f"{current_temp:.4f}", current_val, f"{jitter:.4f}"])
 
     def _update_data_storage_and_plots(self, elapsed_time, current_temp, current_val):
         self.data_storage['time'].append(elapsed_time)
         self.data_storage['temperature'].append(current_temp)
         self.data_storage['current'].append(current_val)
-
-        if self.plot_backgrounds:
-            for bg in self.plot_backgrounds:
-                self.canvas.restore_region(bg)
-            self.line_main.set_data(
-                self.data_storage['temperature'],
-                self.data_storage['current'])
-            self.line_sub1.set_data(
-                self.data_storage['time'],
-                self.data_storage['temperature'])
-            self.line_sub2.set_data(
-                self.data_storage['time'], self.data_storage['current'])
-            for ax, line in zip(
-                self.axes, [
-                    self.line_main, self.line_sub1, self.line_sub2]):
-                ax.relim()
-                ax.autoscale_view()
-                ax.draw_artist(line)
-            self.canvas.blit(self.figure.bbox)
-        else:
-            self.figure.tight_layout(pad=3.0)
-            self.canvas.draw_idle()
+        # Blits the new point at the plot's frame rate; a full redraw only
+        # when the limits grow
+        self.live_plot.request_redraw()
 
     def _check_ramping_completion_conditions(self, current_temp, params):
         if current_temp >= params['safety_cutoff']:
@@ -823,14 +819,13 @@ class PyroelectricAppGUI:
             file_name = f"{params['sample_name']}_{timestamp}_Pyro.csv"
             self.data_filepath = os.path.join(
                 self.file_location_path, file_name)
-            with open(self.data_filepath, 'w', newline='') as f:
-                header = (
-                    f"# Sample: {params['sample_name']}\n"
-                    f"# Start: {params['start_temp']} K, End: {params['end_temp']} K, "
-                    f"Ramp: {params['rate']} K/min\n"
-                )
-                f.write(header)
-                f.write("Time (s),Temperature (K),Current (A)\n")
+            self.data_writer = RunFileWriter(
+                self.data_filepath, lineterminator='\n', header_rows=[
+                    [f"# Sample: {params['sample_name']}"],
+                    [f"# Start: {params['start_temp']} K",
+                     f" End: {params['end_temp']} K",
+                     f" Ramp: {params['rate']} K/min"],
+                    ["Time (s)", "Temperature (K)", "Current (A)", "Timing Jitter (s)"]])
             self.log(
                 f"Output file created: {os.path.basename(self.data_filepath)}")
 
@@ -846,12 +841,7 @@ class PyroelectricAppGUI:
                 fontweight='bold')
 
             # --- Performance Improvement: Capture static background for blitting ---
-            for line in [self.line_main, self.line_sub1, self.line_sub2]:
-                line.set_animated(True)
-            self.canvas.draw()
-            self.plot_backgrounds = [
-                self.canvas.copy_from_bbox(
-                    ax.bbox) for ax in self.axes]
+            self.live_plot.start()
             self.log("Blitting enabled for fast graph updates.")
             # --- End of performance improvement ---
 
@@ -876,25 +866,35 @@ class PyroelectricAppGUI:
             self.is_running = False
             self.experiment_state = 'idle'
             self.log(f"Measurement loop {reason}.")
+            self.log(f"Sampling: {self.sample_scheduler.summary()}")
             self.start_button.config(state='normal')
             self.stop_button.config(state='disabled')
             # Turn off animation for any final redraws
-            for line in [self.line_main, self.line_sub1, self.line_sub2]:
-                line.set_animated(False)
-            self.plot_backgrounds = None
+            self.live_plot.stop()
+            self.log(f"Plotting: {self.live_plot.summary()}")
             self.backend.close_instruments()
+            if self.data_writer:
+                self.data_writer.close()
+                self.data_writer = None
             self.log("Instrument connections closed.")
             messagebox.showinfo(
                 "Info", f"Measurement stopped.\nReason: {reason}")
 
     def _measurement_worker(self):
         """Worker thread to perform measurements and put data into a queue."""
+        # Samples are due every SAMPLE_PERIOD_S on the monotonic clock, so
+        # the read time does not add to the period.
+        self.sample_scheduler.reset()
         while self.is_running:
+            self.sample_scheduler.wait()
+            if not self.is_running:
+                break
             try:
                 current_temp, current_val = self.backend.get_measurement()
-                self.data_queue.put(
-                    (current_temp, current_val, self.experiment_state))
-                time.sleep(2)  # Control the measurement frequency
+                self.sample_scheduler.mark_done()
+                # The sample's lateness against its planned start is saved per row
+                self.data_queue.put((current_temp, current_val, self.experiment_state,
+                                     self.sample_scheduler.last_jitter_s))
             except Exception as e:
                 self.data_queue.put(e)
                 break
@@ -912,13 +912,13 @@ class PyroelectricAppGUI:
                     self._handle_worker_thread_error(data)
                     return
 
-                current_temp, current_val, state = data
+                current_temp, current_val, state, jitter = data
                 params = self.backend.params
 
                 if state == 'stabilizing':
                     self._process_stabilizing_state(current_temp, params)
                 elif state == 'ramping':
-                    self._process_ramping_state(current_temp, current_val, params)
+                    self._process_ramping_state(current_temp, current_val, params, jitter)
 
         except queue.Empty:
             pass  # No data to process, which is normal
@@ -21,10 +21,11 @@
 import tkinter as tk
 from tkinter import ttk, Label, Entry, LabelFrame, filedialog, messagebox, scrolledtext, Canvas
 import os
+import sys
 import time
 import traceback
 from datetime import datetime
-import csv
+import itertools
 import numpy as np
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
@@ -42,11 +43,22 @@ except ImportError:
 # --- Packages for Back end ---
 try:
     import pyvisa
-    from pymeasure.instruments.agilent import AgilentE4980
-    PYMEASURE_AVAILABLE = True
+    PYVISA_AVAILABLE = True
 except ImportError:
-    pyvisa, AgilentE4980 = None, None
-    PYMEASURE_AVAILABLE = False
+    pyvisa = None
+    PYVISA_AVAILABLE = False
+
+try:
+    # Dynamically find the project root and add it to the path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+except Exception:
+    pass
+
+from Instrument_Drivers import (AcquisitionEngine, ColumnStore, KeysightE4980A,
+                                LivePlot, RunFileWriter, get_resource_manager)
 
 
 def run_script_process(script_path):
@@ -112,54 +124,40 @@ def launch_gpib_scanner():
 
 class LCR_Backend:
     """A dedicated class to handle backend communication with the Keysight E4980A."""
+    # Upper bound on extra readings taken while waiting for C to settle.
+    MAX_SETTLE_READS = 10
+    # The E4980A list sweep table holds at most 201 points.
+    LIST_SWEEP_CHUNK = KeysightE4980A.LIST_SWEEP_MAX_POINTS
 
     def __init__(self):
-        self.instrument = None
         self.lcr = None
         self.params = {}
-        if pyvisa:
-            try:
-                self.rm = pyvisa.ResourceManager()
-            except Exception as e:
-                print(
-                    f"Could not initialize VISA resource manager. Error: {e}")
-                self.rm = None
+        self.settle_times = []
+        try:
+            self.rm = get_resource_manager()
+        except Exception as e:
+            print(
+                f"Could not initialize VISA resource manager. Error: {e}")
+            self.rm = None
 
     def initialize_instrument(self, parameters):
         """Receives all parameters from the GUI and configures the instrument."""
         print("\n--- [Backend] Initializing Keysight E4980A ---")
         self.params = parameters
+        self.settle_times = []
         if not self.rm:
             raise ConnectionError("VISA Resource Manager is not available.")
-        if not PYMEASURE_AVAILABLE:
-            raise ImportError(
-                "Pymeasure library is required. Please run 'pip install pymeasure'.")
 
         try:
             print(f"  Connecting to E4980A at {self.params['lcr_visa']}...")
-            self.instrument = self.rm.open_resource(self.params['lcr_visa'])
-            self.lcr = AgilentE4980(self.params['lcr_visa'])
-
-            self.instrument.timeout = 100000
-            self.instrument.read_termination = '\n'
-            self.instrument.write_termination = '\n'
-
-            self.instrument.write('*RST; *CLS')
-            self.instrument.write(':DISP:ENAB')
-            time.sleep(2)
-            self.instrument.write(':INIT:CONT')
-            self.instrument.write(':TRIG:SOUR EXT')
-            time.sleep(2)
-            self.instrument.write(':APER MED')
-            self.instrument.write(':FUNC:IMP:RANGE:AUTO ON')
-            time.sleep(2)
-            self.instrument.write(f":FREQ {self.params['freq']}")
-            self.instrument.write(f":VOLT:LEVEL {self.params['v_ac']}")
-            self.instrument.write(':BIAS:STATe ON')
-            time.sleep(2)
-
-            print(
-                f"    Connected to: {self.instrument.query('*IDN?').strip()}")
+            self.lcr = KeysightE4980A(
+                self.params['lcr_visa'], resource_manager=self.rm)
+            # Reset, bus trigger, aperture, auto-range, frequency, AC level
+            # and DC bias; completion is confirmed with *OPC?.
+            self.lcr.configure(self.params['freq'], self.params['v_ac'],
+                               aperture=self.params.get('aperture', 'MED'))
+
+            print(f"    Connected to: {self.lcr.identify()}")
             print("--- [Backend] Instrument Initialization Complete ---")
             return True
         except pyvisa.errors.VisaIOError as e:
@@ -167,40 +165,66 @@ class LCR_Backend:
             raise e
 
     def perform_measurement(self, voltage):
-        """Sets a voltage and performs a single C-V measurement."""
-        if not self.instrument or not self.lcr:
+        """
+        Sets a voltage and performs a single C-V measurement.
+
+        Each reading is synchronised with *OPC?, so its duration is set by the
+        aperture rather than a fixed delay. An optional fixed settle time
+        ('settle_s') is applied after the bias change; with a settle tolerance
+        ('settle_tol', in %) the point is re-measured until two consecutive
+        readings agree. The time from the bias change to the accepted reading
+        is stored in settle_times.
+        """
+        if not self.lcr:
             raise ConnectionError("Instrument is not connected.")
 
-        self.instrument.write(f':BIAS:VOLTage:LEVel {voltage}')
-        time.sleep(1)  # Settling time
-        self.instrument.write(':INITiate[:IMMediate]')
-        time.sleep(1)  # Measurement time
-
-        # Using pymeasure's values method is cleaner
-        values = self.lcr.values(":FETCh:IMPedance:FORMatted?")
-        capacitance = values[0]
-
-        # Query the actual voltage back for verification
-        actual_voltage_str = self.instrument.query(':BIAS:VOLTage:LEVel?')
-        actual_voltage = float(actual_voltage_str)
+        t_start = time.perf_counter()
+        self.lcr.set_bias(voltage)
+        settle_s = self.params.get('settle_s', 0)
+        if settle_s > 0:
+            time.sleep(settle_s)
+
+        capacitance = self.lcr.measure()[0]
+        settle_tol = self.params.get('settle_tol', 0)
+        if settle_tol > 0:
+            for _ in range(self.MAX_SETTLE_READS):
+                previous = capacitance
+                capacitance = self.lcr.measure()[0]
+                if abs(capacitance - previous) <= abs(previous) * settle_tol / 100:
+                    break
+        self.settle_times.append(time.perf_counter() - t_start)
+
+        # The bias level is cached by the driver, no read-back query needed
+        return self.lcr.bias_voltage, capacitance
+
+    def measure_list_chunk(self, voltages):
+        """
+        Measures a chunk of bias levels with one E4980A list sweep and
+        returns the capacitance at each point. The settle time is applied as
+        the per-point trigger delay.
+        """
+        if not self.lcr:
+            raise ConnectionError("Instrument is not connected.")
+        capacitances, _ = self.lcr.list_sweep(
+            bias_values=voltages, step_delay_s=self.params.get('settle_s', 0))
+        return capacitances
 
-        return actual_voltage, capacitance
+    def end_list_sweep(self):
+        """Returns the E4980A to single-point measurements at 0 V bias after a list sweep."""
+        if self.lcr:
+            self.lcr.end_list_sweep()
 
     def close_instrument(self):
         """Safely shuts down the instrument."""
         print("--- [Backend] Closing instrument connection. ---")
-        if self.instrument:
+        if self.lcr:
             try:
                 print("  Turning off bias and resetting display...")
-                self.instrument.write(':BIAS:STATe OFF')
-                self.instrument.write(':DISP:PAGE MEAS')
-                time.sleep(1)
-                self.instrument.close()
+                self.lcr.shutdown()
                 print("  E4980A connection closed.")
             except pyvisa.errors.VisaIOError as e:
                 print(f"  Warning: Error during instrument shutdown. {e}")
             finally:
-                self.instrument = None
                 self.lcr = None
 
 # ===============================================================================
@@ -211,6 +235,8 @@ class LCR_Backend:
 class LCR_CV_GUI:
     """The main GUI application class for C-V measurements."""
     PROGRAM_VERSION = "1.0"
+    SWEEP_MODE_POINT = "Point-by-Point"
+    SWEEP_MODE_LIST = "List Sweep (Buffered)"
     LOGO_SIZE = 110
     try:
         SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -246,13 +272,15 @@ class LCR_CV_GUI:
         self.root.minsize(1300, 850)
 
         self.is_running = False
+        self.engine = None
+        self.sweep_gen = None
+        self.close_requested = False
+        self.data_writer = None
         self.backend = LCR_Backend()
         self.file_location_path = ""
-        self.data_storage = {
-            'voltage': [],
-            'capacitance': [],
-            'loop': [],
-            'protocol': []}
+        self.data_storage = ColumnStore(
+            ['voltage', 'capacitance', 'loop', 'protocol'],
+            dtypes={'loop': int, 'protocol': 'U1'})
         self.logo_image = None
 
         self.setup_styles()
@@ -496,12 +524,66 @@ class LCR_CV_GUI:
         self._add_entry(frame, "Frequency (Hz)", 4, 0, default="1000")
         self._add_entry(frame, "AC Voltage (V)", 4, 1, default="0.5")
         self._add_entry(frame, "Number of Loops", 6, 0, default="1")
+        self._add_entry(frame, "Settle Time (s)", 6, 1, default="0")
+        self._add_entry(frame, "Settle Tolerance (%)", 8, 0, default="0")
 
         Label(
             frame,
-            text="LCR Meter VISA:",
+            text="Aperture:",
             font=self.FONT_BASE).grid(
             row=8,
+            column=1,
+            padx=padx,
+            pady=(
+                5,
+                0),
+            sticky='w')
+        self.aperture_combobox = ttk.Combobox(
+            frame,
+            font=self.FONT_BASE,
+            state='readonly',
+            values=list(KeysightE4980A.APERTURE_TIMES_S))
+        self.aperture_combobox.grid(
+            row=9,
+            column=1,
+            padx=padx,
+            pady=(
+                0,
+                10),
+            sticky='ew')
+        self.aperture_combobox.set('MED')
+
+        Label(
+            frame,
+            text="Acquisition Mode:",
+            font=self.FONT_BASE).grid(
+            row=10,
+            column=0,
+            columnspan=2,
+            padx=padx,
+            pady=pady,
+            sticky='w')
+        self.sweep_mode_combobox = ttk.Combobox(
+            frame,
+            font=self.FONT_BASE,
+            state='readonly',
+            values=[self.SWEEP_MODE_POINT, self.SWEEP_MODE_LIST])
+        self.sweep_mode_combobox.grid(
+            row=11,
+            column=0,
+            columnspan=2,
+            padx=padx,
+            pady=(
+                0,
+                10),
+            sticky='ew')
+        self.sweep_mode_combobox.set(self.SWEEP_MODE_POINT)
+
+        Label(
+            frame,
+            text="LCR Meter VISA:",
+            font=self.FONT_BASE).grid(
+            row=12,
             column=0,
             columnspan=2,
             padx=padx,
@@ -510,7 +592,7 @@ class LCR_CV_GUI:
         self.lcr_combobox = ttk.Combobox(
             frame, font=self.FONT_BASE, state='readonly')
         self.lcr_combobox.grid(
-            row=9,
+            row=13,
             column=0,
             columnspan=2,
             padx=padx,
@@ -523,7 +605,7 @@ class LCR_CV_GUI:
             frame,
             text="Scan for Instruments",
             command=self._scan_for_visa).grid(
-            row=10,
+            row=14,
             column=0,
             columnspan=2,
             padx=padx,
@@ -533,7 +615,7 @@ class LCR_CV_GUI:
             frame,
             text="Browse Save Location...",
             command=self._browse_file_location).grid(
-            row=11,
+            row=15,
             column=0,
             columnspan=2,
             padx=padx,
@@ -546,7 +628,7 @@ class LCR_CV_GUI:
             command=self.start_sweep,
             style='Start.TButton')
         self.start_button.grid(
-            row=12, column=0, padx=(
+            row=16, column=0, padx=(
                 padx, 5), pady=15, sticky='ew')
         self.stop_button = ttk.Button(
             frame,
@@ -555,7 +637,7 @@ class LCR_CV_GUI:
             style='Stop.TButton',
             state='disabled')
         self.stop_button.grid(
-            row=12, column=1, padx=(
+            row=16, column=1, padx=(
                 5, padx), pady=15, sticky='ew')
 
         self.progress_bar = ttk.Progressbar(
@@ -564,7 +646,7 @@ class LCR_CV_GUI:
             mode='determinate',
             style='green.Horizontal.TProgressbar')
         self.progress_bar.grid(
-            row=13,
+            row=17,
             column=0,
             columnspan=2,
             padx=padx,
@@ -610,6 +692,9 @@ class LCR_CV_GUI:
         self.figure.tight_layout(pad=2.5)
         self.canvas = FigureCanvasTkAgg(self.figure, graph_container)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.live_plot = LivePlot(self.canvas)
+        self.live_plot.add_line(self.line_main, self.data_storage['voltage'],
+                                self.data_storage['capacitance'])
 
     def log(self, message):
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -621,12 +706,16 @@ class LCR_CV_GUI:
     def start_sweep(self):
         try:
             params = {
-                'sample_name': self.entries["Sample Name:"].get(),
-                'v_max': float(self.entries["Max Voltage (V):"].get()),
-                'v_step': float(self.entries["Voltage Step (V):"].get()),
-                'freq': float(self.entries["Frequency (Hz):"].get()),
-                'v_ac': float(self.entries["AC Voltage (V):"].get()),
-                'loops': int(self.entries["Number of Loops:"].get()),
+                'sample_name': self.entries["Sample Name"].get(),
+                'v_max': float(self.entries["Max Voltage (V)"].get()),
+                'v_step': float(self.entries["Voltage Step (V)"].get()),
+                'freq': float(self.entries["Frequency (Hz)"].get()),
+                'v_ac': float(self.entries["AC Voltage (V)"].get()),
+                'loops': int(self.entries["Number of Loops"].get()),
+                'settle_s': float(self.entries["Settle Time (s)"].get()),
+                'settle_tol': float(self.entries["Settle Tolerance (%)"].get()),
+                'aperture': self.aperture_combobox.get(),
+                'list_sweep': self.sweep_mode_combobox.get() == self.SWEEP_MODE_LIST,
                 'lcr_visa': self.lcr_combobox.get()
             }
             if not all([params['sample_name'], params['lcr_visa'],
@@ -636,6 +725,9 @@ class LCR_CV_GUI:
             if params['v_step'] <= 0 or params['loops'] <= 0:
                 raise ValueError(
                     "Voltage Step and Number of Loops must be positive.")
+            if params['settle_s'] < 0 or params['settle_tol'] < 0:
+                raise ValueError(
+                    "Settle Time and Settle Tolerance cannot be negative.")
 
             self.backend.initialize_instrument(params)
             self.log(
@@ -646,12 +738,10 @@ class LCR_CV_GUI:
             self.data_filepath = os.path.join(
                 self.file_location_path, file_name)
 
-            with open(self.data_filepath, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(
-                    [f"# Sample: {params['sample_name']}", f"Freq: {params['freq']} Hz"])
-                writer.writerow(
-                    ["Voltage (V)", "Capacitance (F)", "Loop", "Protocol"])
+            self.data_writer = RunFileWriter(self.data_filepath, header_rows=[
+                [f"# Sample: {params['sample_name']}", f"Freq: {params['freq']} Hz",
+                 f"Aperture: {params['aperture']}"],
+                ["Voltage (V)", "Capacitance (F)", "Loop", "Protocol"]])
             self.log(
                 f"Output file created: {os.path.basename(self.data_filepath)}")
 
@@ -664,13 +754,21 @@ class LCR_CV_GUI:
             self.ax_main.set_title(
                 f"C-V Curve for: {params['sample_name']}",
                 fontweight='bold')
-            self.canvas.draw()
+            self.live_plot.start()
 
             self.progress_bar['value'] = 0
             self.progress_bar['maximum'] = self._get_total_sweep_points(params)
 
+            if params['list_sweep'] and params['settle_tol'] > 0:
+                self.log("Note: Settle Tolerance is not used in list sweep mode.")
             self.log("Starting C-V sweep...")
-            self.root.after(100, self._sweep_loop)
+            # Instrument I/O runs on the acquisition thread; the GUI only
+            # records finished points from its queue.
+            self.sweep_gen = self._create_sweep_generator(params)
+            self.engine = AcquisitionEngine(
+                self._acquire_sweep_step, name="E4980A-CV-Acquisition")
+            self.engine.start()
+            self.root.after(100, self._process_data_queue)
 
         except Exception as e:
             self.log(f"ERROR during startup: {traceback.format_exc()}")
@@ -685,13 +783,38 @@ class LCR_CV_GUI:
                 self.log(f"Sweep stopped: {reason}")
             else:
                 self.log("Sweep stopped by user.")
-            self.start_button.config(state='normal')
             self.stop_button.config(state='disabled')
-            self.backend.close_instrument()
-            self.log("Instrument connection closed.")
-            if not reason:
-                messagebox.showinfo(
-                    "Info", "Sweep stopped and instrument disconnected.")
+            if self.engine:
+                self.engine.request_stop()
+            self._finish_stop(reason)
+
+    def _finish_stop(self, reason):
+        """Ends the list sweep and releases the instrument once the acquisition thread has exited."""
+        # A list table in progress returns only when it has run to the end,
+        # so the thread is polled from Tk instead of joined.
+        if self.engine and self.engine.is_running:
+            self.root.after(100, self._finish_stop, reason)
+            return
+        self.engine = None
+        self.sweep_gen = None
+        if self.backend.params.get('list_sweep'):
+            try:
+                self.backend.end_list_sweep()
+            except Exception as e:
+                self.log(f"WARNING: Could not end the list sweep: {e}")
+        self.live_plot.stop()
+        self.log(f"Plotting: {self.live_plot.summary()}")
+        self.start_button.config(state='normal')
+        self.backend.close_instrument()
+        if self.data_writer:
+            self.data_writer.close()
+            self.data_writer = None
+        self.log("Instrument connection closed.")
+        if not reason:
+            messagebox.showinfo(
+                "Info", "Sweep stopped and instrument disconnected.")
+        if self.close_requested:
+            self.root.destroy()
 
     def _get_total_sweep_points(self, params):
         """Calculates the total number of points in a full sweep."""
@@ -699,37 +822,55 @@ class LCR_CV_GUI:
         points_per_segment = len(np.arange(0, v_max + v_step, v_step))
         return (points_per_segment * 4 - 4) * params['loops']
 
-    def _sweep_loop(self):
-        """Manages the C-V sweep process, advancing through generated points."""
-        if not self.is_running:
+    def _acquire_sweep_step(self):
+        """
+        Acquisition thread: measures the next point, or the next list table in
+        list sweep mode, and returns [(voltage, capacitance, loop, protocol)].
+        """
+        if self.backend.params['list_sweep']:
+            # Up to one full list table per pass, fetched in one read
+            points = list(itertools.islice(
+                self.sweep_gen, self.backend.LIST_SWEEP_CHUNK))
+            if not points:
+                raise StopIteration
+            caps = self.backend.measure_list_chunk(
+                voltages=[p[0] for p in points])
+            return [(target_v, cap, loop_n, proto)
+                    for (target_v, loop_n, proto), cap in zip(points, caps)]
+
+        target_v, loop_n, proto = next(self.sweep_gen)
+        actual_v, cap = self.backend.perform_measurement(target_v)
+        return [(actual_v, cap, loop_n, proto)]
+
+    def _process_data_queue(self):
+        """Records every point queued since the last call and redraws once."""
+        if not self.is_running or not self.engine:
             return
-
-        params = self.backend.params
-
-        if not hasattr(self, 'sweep_gen'):
-            self.sweep_gen = self._create_sweep_generator(params)
-
-        try:
-            target_v, loop_n, proto = next(self.sweep_gen)
-
-            if not self.is_running:
-                return
-
-            actual_v, cap = self.backend.perform_measurement(target_v)
-            self._process_sweep_point(actual_v, cap, loop_n, proto)
-            self._update_sweep_plot()
-
-            # Short delay before next point
-            self.root.after(50, self._sweep_loop)
-
-        except StopIteration:
+        points, finished, error = 0, False, None
+        for item in self.engine.drain():
+            if isinstance(item, Exception):
+                error = item
+                break
+            if item == AcquisitionEngine.COMPLETE:
+                finished = True
+                break
+            for actual_v, cap, loop_n, proto in item:
+                self._process_sweep_point(actual_v, cap, loop_n, proto)
+            points += len(item)
+
+        if points:
+            self._update_sweep_plot(points)
+
+        if error is not None:
+            self._handle_sweep_error(error)
+        elif finished:
             self._handle_sweep_completion()
-        except Exception as e:
-            self._handle_sweep_error(e)
+        else:
+            self.root.after(100, self._process_data_queue)
 
     def _scan_for_visa(self):
-        if not PYMEASURE_AVAILABLE:
-            self.log("ERROR: PyVISA/Pymeasure not found.")
+        if not PYVISA_AVAILABLE:
+            self.log("ERROR: PyVISA not found.")
             return
         if self.backend.rm is None:
             self.log("ERROR: VISA manager failed. Is NI-VISA installed?")
@@ -760,8 +901,9 @@ class LCR_CV_GUI:
     def _on_closing(self):
         if self.is_running:
             if messagebox.askyesno("Exit", "Sweep is running. Stop and exit?"):
+                # The window closes once the pending measurement has returned
+                self.close_requested = True
                 self.stop_sweep()
-                self.root.destroy()
         else:
             self.root.destroy()
 
@@ -808,49 +950,47 @@ class LCR_CV_GUI:
 
     def _process_sweep_point(self, actual_v, cap, loop_n, proto):
         self.log(f"V: {actual_v:.3f}V | C: {cap:.4e}F | Loop: {loop_n} ({proto})")
+        if self.data_storage['loop'] and loop_n != self.data_storage['loop'][-1]:
+            # Each completed loop is forced to disk
+            self.data_writer.checkpoint()
         self.data_storage['voltage'].append(actual_v)
         self.data_storage['capacitance'].append(cap)
         self.data_storage['loop'].append(loop_n)
         self.data_storage['protocol'].append(proto)
-        with open(self.data_filepath, 'a', newline='') as f:
-            csv.writer(f).writerow(
-                [f"{actual_v:.6f}", f"{cap:.6e}", loop_n, proto])
-
-    def _update_sweep_plot(self):
-        self.line_main.set_data(
-            self.data_storage['voltage'],
-            self.data_storage['capacitance'])
-        self.ax_main.relim()
-        self.ax_main.autoscale_view()
-        self.figure.tight_layout(pad=2.5)
-        self.canvas.draw()
-        self.progress_bar.step()
+        self.data_writer.write_row(
+            [f"{actual_v:.6f}", f"{cap:.6e}", loop_n, proto])
+
+    def _update_sweep_plot(self, points=1):
+        # Blitted at a capped frame rate; the limits grow (with a full
+        # redraw) only when a point falls outside them
+        self.live_plot.request_redraw()
+        self.progress_bar.step(points)
 
     def _handle_sweep_completion(self):
         self.log("Sweep finished successfully.")
+        if self.backend.settle_times:
+            mean_settle = np.mean(self.backend.settle_times)
+            self.log(f"Mean time per point: {mean_settle * 1000:.0f} ms")
         messagebox.showinfo("Finished", "C-V sweep is complete.")
         self.stop_sweep("Sweep complete.")
-        if hasattr(self, 'sweep_gen'):
-            del self.sweep_gen
 
     def _handle_sweep_error(self, exception):
-        self.log(f"RUNTIME ERROR: {traceback.format_exc()}")
+        self.log("RUNTIME ERROR: " + "".join(traceback.format_exception(
+            type(exception), exception, exception.__traceback__)))
         self.stop_sweep("A critical error occurred.")
         messagebox.showerror(
             "Runtime Error",
             "An error occurred during the sweep. Check console.")
-        if hasattr(self, 'sweep_gen'):
-            del self.sweep_gen
 
 
 def main():
     """Initializes and runs the main application."""
-    if not PYMEASURE_AVAILABLE:
+    if not PYVISA_AVAILABLE:
         root = tk.Tk()
         root.withdraw()
         messagebox.showerror(
             "Dependency Error",
-            "Pymeasure or PyVISA is not installed.\n\nPlease run:\npip install pymeasure")
+            "PyVISA is not installed.\n\nPlease run:\npip install pyvisa")
         return
 
     root = tk.Tk()
@@ -16,6 +16,7 @@ Purpose: GUI module for T Control L350 RangeControl GUI v8.
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, Canvas
 import os
+import sys
 import time
 import traceback
 from datetime import datetime
@@ -37,6 +38,18 @@ try:
 except ImportError:
     pyvisa = None
 
+try:
+    # Dynamically find the project root and add it to the path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+except Exception:
+    pass
+
+from Instrument_Drivers import (ColumnStore, Lakeshore350, LivePlot,
+                                get_resource_manager)
+
 
 def run_script_process(script_path):
     """
@@ -100,49 +113,38 @@ def launch_gpib_scanner():
 class Lakeshore_Backend:
     def __init__(self):
         self.lakeshore = None
-        if pyvisa:
-            try:
-                self.rm = pyvisa.ResourceManager()
-            except Exception as e:
-                print(f"Could not initialize VISA: {e}")
-                self.rm = None
-        else:
+        try:
+            self.rm = get_resource_manager()
+        except Exception as e:
+            print(f"Could not initialize VISA: {e}")
             self.rm = None
 
     def connect(self, visa_address):
         if not self.rm:
             raise ConnectionError("PyVISA is not available.")
-        self.lakeshore = self.rm.open_resource(visa_address)
-        self.lakeshore.timeout = 10000
-        idn = self.lakeshore.query('*IDN?').strip()
+        self.lakeshore = Lakeshore350(visa_address, resource_manager=self.rm)
+        idn = self.lakeshore.identify()
         print(f"  Lakeshore Connected: {idn}")
         return idn
 
     def configure_ramp(self, setpoint, rate, heater_range):
-        self.lakeshore.write('*RST')
-        time.sleep(0.5)
-        self.lakeshore.write('*CLS')
+        self.lakeshore.reset()
         self.set_heater_range(1, heater_range)
-        self.lakeshore.write(f'SETP 1,{setpoint}')
-        self.lakeshore.write(f'RAMP 1,1,{rate}')  # Ramp ON
+        self.lakeshore.set_setpoint(1, setpoint)
+        self.lakeshore.set_ramp(1, rate)  # Ramp ON
 
     def set_heater_range(self, output, heater_range):
-        range_map = {'off': 0, 'low': 2, 'medium': 4, 'high': 5}
-        range_code = range_map.get(heater_range.lower())
-        if range_code is None:
-            raise ValueError("Invalid heater range.")
-        self.lakeshore.write(f'RANGE {output},{range_code}')
+        self.lakeshore.set_heater_range(output, heater_range)
 
     def get_status(self):
-        temp = float(self.lakeshore.query('KRDG? A').strip())
-        htr_output = float(self.lakeshore.query('HTR? 1').strip())
-        return temp, htr_output
+        # T and heater output in one 'KRDG? A;HTR? 1' transaction.
+        status = self.lakeshore.get_status(outputs=(1,), sensors=('A',))
+        return status.temperatures['A'], status.heater_outputs[1]
 
     def stop_ramp(self):
         if self.lakeshore:
             try:
-                self.lakeshore.write('RAMP 1,0,0')  # Ramp OFF
-                self.set_heater_range(1, 'off')
+                self.lakeshore.stop_ramp(1)  # Ramp OFF, heater off
                 print("  Lakeshore ramp stopped and heater turned off.")
             except Exception as e:
                 print(f"  Warning: Could not fully stop ramp. {e}")
@@ -188,7 +190,7 @@ class TempControlGUI:
         self.is_running = False
         self.logo_image = None
         self.backend = Lakeshore_Backend()
-        self.data_storage = {'time': [], 'temperature': [], 'heater': []}
+        self.data_storage = ColumnStore(['time', 'temperature', 'heater'])
 
         self.setup_styles()
         self.create_widgets()
@@ -470,6 +472,11 @@ class TempControlGUI:
         self.figure.tight_layout()
         self.canvas = FigureCanvasTkAgg(self.figure, container)
         self.canvas.get_tk_widget().pack(fill='both', expand=True, padx=5, pady=5)
+        self.live_plot = LivePlot(self.canvas)
+        self.live_plot.add_line(self.line_temp, self.data_storage['time'],
+                                self.data_storage['temperature'])
+        self.live_plot.add_line(self.line_heater, self.data_storage['time'],
+                                self.data_storage['heater'])
 
     def log(self, message):
         ts = datetime.now().strftime("%H:%M:%S")
@@ -498,7 +505,7 @@ class TempControlGUI:
             self.line_temp.set_data([], [])
             self.line_heater.set_data([], [])
             self.ax_temp.set_title(f"Ramping to {self.params['setpoint']} K")
-            self.canvas.draw()
+            self.live_plot.start()
 
             self.start_time = time.time()
             self.root.after(100, self._monitoring_loop)
@@ -515,7 +522,8 @@ class TempControlGUI:
         self.backend.stop_ramp()
         self.set_ui_state(running=False)
         self.ax_temp.set_title("Ramp stopped.")
-        self.canvas.draw_idle()
+        self.live_plot.stop()
+        self.log(f"Plotting: {self.live_plot.summary()}")
         messagebox.showinfo(
             "Ramp Stopped",
             "The temperature ramp has been stopped and the heater is off.")
@@ -532,18 +540,9 @@ class TempControlGUI:
             self.data_storage['temperature'].append(temp)
             self.data_storage['heater'].append(htr_output)
 
-            self.line_temp.set_data(
-                self.data_storage['time'],
-                self.data_storage['temperature'])
-            self.line_heater.set_data(
-                self.data_storage['time'],
-                self.data_storage['heater'])
-
-            for ax in [self.ax_temp, self.ax_heater]:
-                ax.relim()
-                ax.autoscale_view()
-
-            self.canvas.draw_idle()
+            # Blitted; the limits grow (with a full redraw) only when a
+            # point falls outside them
+            self.live_plot.request_redraw()
 
             # Check end condition
             if (self.params['rate'] > 0 and temp >= self.params['setpoint']) or (
@@ -18,12 +18,12 @@ Purpose: GUI module for T Sensing L350 GUI v4.
 import tkinter as tk
 from tkinter import ttk, Label, filedialog, messagebox, scrolledtext, Canvas
 import os
+import sys
 import time
 import traceback
 import threading
 import queue
 from datetime import datetime
-import csv
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib as mpl
@@ -43,6 +43,19 @@ except ImportError:
     pyvisa = None
     PYVISA_AVAILABLE = False
 
+try:
+    # Dynamically find the project root and add it to the path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+except Exception:
+    pass
+
+from Instrument_Drivers import (ColumnStore, Lakeshore350, LivePlot,
+                                RunFileWriter, SampleScheduler,
+                                get_resource_manager)
+
 import runpy
 from multiprocessing import Process
 
@@ -105,32 +118,28 @@ class Lakeshore350_Backend:
 
     def __init__(self, visa_address):
         self.instrument = None
-        rm = pyvisa.ResourceManager()
-        self.instrument = rm.open_resource(visa_address)
-        self.instrument.timeout = 10000
-        print(f"Lakeshore Connected: {self.instrument.query('*IDN?').strip()}")
+        self.instrument = Lakeshore350(visa_address)
+        print(f"Lakeshore Connected: {self.instrument.identify()}")
 
     def configure_for_monitoring(self):
         """Resets the instrument's event registers without changing settings."""
-        self.instrument.write('*RST')
-        time.sleep(0.5)
-        self.instrument.write('*CLS')
-        time.sleep(1)
-        # The following line is commented out to ensure the heater state is not changed.
-        # self.instrument.write('RANGE 1,0')
+        self.instrument.reset()
+        # The heater range is deliberately not written, so the heater state is not changed.
         print("Lakeshore connected for passive monitoring. Heater state is unchanged.")
 
     def get_temperature(self, sensor='A'):
         """Reads the temperature from a specified sensor."""
-        return float(self.instrument.query(f'KRDG? {sensor}').strip())
+        return self.instrument.get_temperature(sensor)
+
+    def get_all_temperatures(self):
+        """Reads every sensor input with a single 'KRDG? 0' query."""
+        return self.instrument.get_status(outputs=()).temperatures
 
     def close(self):
         """Closes the connection to the instrument."""
         if self.instrument:
             try:
-                # The following line is commented out to leave the heater in its current state.
-                # self.instrument.write('RANGE 1,0')
-                time.sleep(0.5)
+                # The heater is left in its current state.
                 self.instrument.close()
             except Exception as e:
                 print(f"Warning: Issue during Lakeshore shutdown: {e}")
@@ -183,9 +192,11 @@ class TempMonitorGUI:
 
         self.is_running = False
         self.start_time = None
+        self.sample_scheduler = None
         self.backend = None
+        self.data_writer = None
         self.file_location_path = ""
-        self.data_storage = {'time': [], 'temperature': []}
+        self.data_storage = ColumnStore(['time', 'temperature'])
         self.logo_image = None
         self.data_queue = queue.Queue()
 
@@ -596,6 +607,9 @@ class TempMonitorGUI:
 
         self.figure.tight_layout(pad=3.0)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.live_plot = LivePlot(self.canvas)
+        self.live_plot.add_line(self.line_main, self.data_storage['time'],
+                                self.data_storage['temperature'])
 
     def log(self, message):
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -624,11 +638,11 @@ class TempMonitorGUI:
             self.data_filepath = os.path.join(
                 self.file_location_path, file_name)
 
-            with open(self.data_filepath, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([f"# Log File: {params['sample_name']}"])
-                writer.writerow(
-                    ["Timestamp", "Elapsed Time (s)", "Temperature (K)"])
+            self.data_writer = RunFileWriter(self.data_filepath, header_rows=[
+                [f"# Log File: {params['sample_name']}"],
+                ["Timestamp", "Elapsed Time (s)", "Temperature (K)"]
+                + [f"Input {s} (K)" for s in Lakeshore350.INPUTS[1:]]
+                + ["Timing Jitter (s)"]])
             self.log(
                 f"Output file created: {os.path.basename(self.data_filepath)}")
 
@@ -641,10 +655,13 @@ class TempMonitorGUI:
             self.ax_main.set_title(
                 f"Temperature Log: {params['sample_name']}",
                 fontweight='bold')
-            self.canvas.draw()
+            self.live_plot.start()
 
             self.log("Starting passive data logging...")
             self.start_time = time.time()
+            # Samples are due every 'delay' seconds on the monotonic clock, so
+            # the read time does not add to the period.
+            self.sample_scheduler = SampleScheduler(params['delay'])
 
             self.measurement_thread = threading.Thread(
                 target=self._measurement_worker, daemon=True)
@@ -663,22 +680,32 @@ class TempMonitorGUI:
         if self.is_running:
             self.is_running = False
             self.log("Measurement stopped by user.")
+            self.live_plot.stop()
+            self.log(f"Plotting: {self.live_plot.summary()}")
             self.start_button.config(state='normal')
             self.stop_button.config(state='disabled')
+            if self.sample_scheduler:
+                self.log(f"Sampling: {self.sample_scheduler.summary()}")
             if self.backend:
                 self.backend.close()
+            if self.data_writer:
+                self.data_writer.close()
+                self.data_writer = None
             messagebox.showinfo(
                 "Info", "Logging stopped and instrument disconnected.")
 
     def _measurement_worker(self):
         """Worker thread for handling blocking instrument calls."""
-        delay_s = float(self.entries["Delay"].get())
         while self.is_running:
+            self.sample_scheduler.wait()
+            if not self.is_running:
+                break
             try:
-                temp = self.backend.get_temperature()
+                temps = self.backend.get_all_temperatures()
+                self.sample_scheduler.mark_done()
                 elapsed = time.time() - self.start_time
-                self.data_queue.put((elapsed, temp))
-                time.sleep(delay_s)
+                # The sample's lateness against its planned start is saved per row
+                self.data_queue.put((elapsed, temps, self.sample_scheduler.last_jitter_s))
             except Exception as e:
                 self.data_queue.put(e)
                 break
@@ -696,25 +723,23 @@ class TempMonitorGUI:
                         "Runtime Error", "A critical error occurred. Check console.")
                     return
 
-                elapsed, temp = data
+                elapsed, temps, jitter = data
+                temp = temps['A']
                 self.temp_label_var.set(f"{temp:.4f} K")
                 self.log(f"T:{temp:.3f} K")
 
-                with open(self.data_filepath, 'a', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow([datetime.now().strftime(
-                        '%Y-%m-%d %H:%M:%S'), f"{elapsed:.2f}", f"{temp:.4f}"])
+                if self.data_writer:
+                    self.data_writer.write_row([datetime.now().strftime(
+                        '%Y-%m-%d %H:%M:%S'), f"{elapsed:.2f}", f"{temp:.4f}"]
+                        + [f"{temps.get(s, float('nan')):.4f}"
+                           for s in Lakeshore350.INPUTS[1:]] + [f"{jitter:.4f}"])
 
                 self.data_storage['time'].append(elapsed)
                 self.data_storage['temperature'].append(temp)
 
-                self.line_main.set_data(
-                    self.data_storage['time'],
-                    self.data_storage['temperature'])
-                self.ax_main.relim()
-                self.ax_main.autoscale_view()
-                self.figure.tight_layout(pad=3.0)
-                self.canvas.draw_idle()
+                # Blitted; the limits grow (with a full redraw) only when a
+                # point falls outside them. The layout is fixed at start.
+                self.live_plot.request_redraw()
 
         except queue.Empty:
             pass  # This is normal
@@ -727,7 +752,7 @@ class TempMonitorGUI:
             self.log("ERROR: PyVISA not installed.")
             return
         try:
-            rm = pyvisa.ResourceManager()
+            rm = get_resource_manager()
             self.log("Scanning for VISA instruments...")
             resources = rm.list_resources()
             if resources:
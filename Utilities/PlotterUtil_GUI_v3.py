@@ -14,8 +14,12 @@ Purpose: GUI module for PlotterUtil GUI v3.
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext, Canvas
 import os
-import csv
+import queue
+import threading
 import traceback
+from collections import OrderedDict, namedtuple
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
@@ -34,6 +38,126 @@ try:
 except ImportError:
     PIL_AVAILABLE = False
 
+try:
+    # Dynamically find the project root and add it to the path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.abspath(os.path.join(script_dir, os.pardir))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+except Exception:
+    # Path manipulation can fail in some environments (e.g., frozen
+    # executables)
+    pass
+
+from Instrument_Drivers import (DataColumn, LevelOfDetail, is_binary_run,
+                                load_text_run, parse_text_rows, read_binary_run)
+
+
+# A file being parsed on the load pool: ``cancel`` is set to abandon it;
+# ``activate`` shows its columns when it arrives (the file was selected).
+_PendingLoad = namedtuple('_PendingLoad', ['cancel', 'activate'])
+
+
+class _LoadCancelled(Exception):
+    pass
+
+
+class FileDataCache(MutableMapping):
+    """
+    The ``file_info`` dicts of the listed files, least recently used first.
+
+    A file that is listed but not loaded (or was evicted) holds only its
+    path. ``trim`` evicts the least recently used files until the text
+    columns in memory fit in ``budget_bytes``; binary runs are memory-mapped
+    and paged by the OS, so they do not count. ``lookup`` returns an entry
+    only while its mtime and size still match the file on disk; lookups and
+    uses of evicted entries are counted as hits and misses.
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __getitem__(self, path):
+        return self._entries[path]
+
+    def __setitem__(self, path, file_info):
+        self._entries[path] = file_info
+        self._entries.move_to_end(path)
+
+    def __delitem__(self, path):
+        del self._entries[path]
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def entry_bytes(file_info):
+        return sum(column.nbytes for column in file_info.get('columns', {}).values())
+
+    @property
+    def memory_bytes(self):
+        return sum(self.entry_bytes(file_info) for file_info in self._entries.values())
+
+    def lookup(self, path):
+        """Returns the loaded entry of ``path`` if it is still current, else None."""
+        file_info = self._entries.get(path)
+        current = bool(file_info and file_info.get('headers'))
+        if current:
+            try:
+                stat = os.stat(path)
+                current = (stat.st_mtime, stat.st_size) == (
+                    file_info.get('mod_time'), file_info.get('size'))
+            except OSError:
+                current = False
+        if not current:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(path)
+        return file_info
+
+    def touch(self, path):
+        """Marks ``path`` as used; returns its entry (a miss if it was evicted)."""
+        file_info = self._entries.get(path)
+        if file_info is not None:
+            self._entries.move_to_end(path)
+            if file_info.get('evicted'):
+                self.misses += 1
+        return file_info
+
+    def trim(self, keep=()):
+        """
+        Evicts least recently used files, except those in ``keep`` and the
+        newest entry, until the budget is met. Returns the evicted paths.
+        """
+        used = self.memory_bytes
+        newest = next(reversed(self._entries), None)
+        evicted = []
+        for path, file_info in list(self._entries.items()):
+            if used <= self.budget_bytes:
+                break
+            size = self.entry_bytes(file_info)
+            if not size or path in keep or path == newest:
+                continue
+            self._entries[path] = {"path": path, "evicted": True}
+            used -= size
+            evicted.append(path)
+        self.evictions += len(evicted)
+        return evicted
+
+    def stats_text(self):
+        loaded = sum(1 for file_info in self._entries.values() if file_info.get('headers'))
+        return (f"Cache: {loaded} of {len(self)} files in memory, "
+                f"{self.memory_bytes / 2**20:.1f} of {self.budget_bytes / 2**20:.0f} MB; "
+                f"{self.hits} hits, {self.misses} misses, {self.evictions} evicted.")
+
 
 def _dummy_process_target():
     """A picklable top-level function to satisfy multiprocessing on Windows."""
@@ -68,6 +192,9 @@ def run_script_process(script_path):
 
 class PlotterApp:
     PROGRAM_VERSION = "2.1"
+    LOAD_WORKERS = 4
+    LOAD_POLL_MS = 100
+    CACHE_BUDGET_MB = 1024
     CLR_BG = '#2B3D4F'
     CLR_HEADER = '#3A506B'
     CLR_FG = '#EDF2F4'
@@ -108,8 +235,10 @@ class PlotterApp:
         self.active_filepath = None
         # New data structure to hold data for multiple files
         # Format: { "filepath": {"headers": [...], "data": {...}, "mod_time": ..., "size": ...} }
+        # Files unused for longest are unloaded once the budget is used;
+        # CACHE_BUDGET_MB is the default of the "Cache Budget (MB)" spinbox.
         # --- Checkbox UI Change ---
-        self.file_data_cache = {}
+        self.file_data_cache = FileDataCache(self.CACHE_BUDGET_MB * 2**20)
         # Stores {filepath: {'var': tk.BooleanVar, 'chk': ttk.Checkbutton,
         # 'lbl': ttk.Label}}
         self.file_ui_elements = {}
@@ -117,8 +246,17 @@ class PlotterApp:
 
         self.file_watcher_job = None
 
+        # Files are parsed on a worker pool; results come back through
+        # load_queue and are picked up on the Tk thread.
+        self.load_executor = ThreadPoolExecutor(
+            max_workers=self.LOAD_WORKERS, thread_name_prefix="PlotterLoad")
+        self.load_queue = queue.Queue()
+        self.pending_loads = {}
+        self.load_poll_job = None
+
         self.setup_styles()
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
         self.log(
             "Welcome to the PICA Plotter Utility. Please select a file to begin.")
 
@@ -298,6 +436,31 @@ class PlotterApp:
             padx=(
                 5,
                 0))
+        ttk.Button(
+            file_buttons_frame,
+            text="Cancel Loading",
+            command=self.cancel_loading).grid(
+            row=1,
+            column=0,
+            columnspan=2,
+            sticky='ew',
+            pady=(
+                5,
+                0))
+
+        ttk.Label(file_buttons_frame, text="Cache Budget (MB):").grid(
+            row=2, column=0, sticky='w', pady=(5, 0))
+        self.cache_budget_var = tk.StringVar(value=str(self.CACHE_BUDGET_MB))
+        cache_budget_sb = ttk.Spinbox(
+            file_buttons_frame,
+            from_=64,
+            to=65536,
+            increment=64,
+            textvariable=self.cache_budget_var,
+            command=self.apply_cache_budget)
+        cache_budget_sb.bind("<Return>", self.apply_cache_budget)
+        cache_budget_sb.bind("<FocusOut>", self.apply_cache_budget)
+        cache_budget_sb.grid(row=2, column=1, sticky='ew', padx=(5, 0), pady=(5, 0))
 
         # --- New Instance Button ---
         # This button is placed here for easy access to open another plotter.
@@ -505,6 +668,8 @@ class PlotterApp:
         self.ax_main.set_ylabel("Y-Axis")
         self.ax_main.grid(True, linestyle='--', alpha=0.6)
         self.figure.tight_layout()
+        # Large files are drawn decimated to the zoomed view
+        self.lod = LevelOfDetail(self.ax_main)
 
         self.canvas = FigureCanvasTkAgg(self.figure, container)
         self.canvas.get_tk_widget().pack(fill='both', expand=True, padx=5, pady=5)
@@ -553,27 +718,24 @@ class PlotterApp:
     def browse_files(self):
         filepaths = filedialog.askopenfilenames(
             title="Select a data file",
-            filetypes=(("Data Files", "*.csv *.dat"), ("All files", "*.*"))
+            filetypes=(("Data Files", "*.csv *.dat *.pcrun"),
+                       ("Binary Run Files", "*.pcrun"),
+                       ("All files", "*.*"))
         )
         if not filepaths:
             return
 
-        new_files_added = False
         for fp in filepaths:
             if fp not in self.file_data_cache:
-                new_files_added = True
                 self.file_data_cache[fp] = {"path": fp}  # Add placeholder
                 self._add_file_to_ui(fp)
                 self.log(f"Added file: {os.path.basename(fp)}")
-                # Load data for the new file without making it active
-                self._load_file_data_into_cache(fp)
+                # Parse in the background; the plot updates as files arrive
+                self._start_loading(fp)
 
         # If this is the first file added, make it active
         if filepaths and self.active_filepath is None:
             self._set_active_file(filepaths[0])
-        elif new_files_added:
-            # If new files were added to an existing list, just replot
-            self.plot_data()
 
     def _add_file_to_ui(self, filepath):
         """Creates and adds a checkbox and label for a new file to the UI."""
@@ -617,6 +779,7 @@ class PlotterApp:
             return
 
         for path in paths_to_remove:
+            self._cancel_loading(path)
             if path in self.file_ui_elements:
                 self.file_ui_elements[path]['frame'].destroy()
                 del self.file_ui_elements[path]
@@ -662,125 +825,229 @@ class PlotterApp:
             self.active_filepath = filepath
             self.load_file_data(filepath)
 
-    def _load_file_data_into_cache(self, filepath):
-        """Loads file data into the cache without affecting the UI state (e.g., active file)."""
-        if not filepath or not os.path.exists(filepath):
-            return False
+    def _read_file_info(self, filepath, progress=None):
+        """
+        Reads a text or binary run file into a new cache entry. Touches no
+        Tk state, so it runs on the load workers.
+        """
+        # Taken before reading: rows written meanwhile are picked up by the
+        # next live update.
+        file_info = {'mod_time': os.path.getmtime(filepath),
+                     'size': os.path.getsize(filepath)}
+        if is_binary_run(filepath):
+            self._cache_binary_run(file_info, self._read_binary_run(filepath))
+        else:
+            self._cache_text_run(file_info, load_text_run(filepath, progress=progress))
+        return file_info
+
+    def _start_loading(self, filepath, activate=False):
+        """
+        Parses a file on the load pool. The result is cached by
+        _process_load_queue; with ``activate`` its columns are also offered
+        for plotting if it is still the active file by then.
+        """
+        pending = self.pending_loads.get(filepath)
+        if pending is not None:
+            # Already being parsed: just remember that it was selected
+            self.pending_loads[filepath] = pending._replace(
+                activate=pending.activate or activate)
+            return
+        cancel = threading.Event()
+        self.pending_loads[filepath] = _PendingLoad(cancel, activate)
+        self._set_load_progress(filepath, 0.0)
+        self.load_executor.submit(self._load_worker, filepath, cancel)
+        if self.load_poll_job is None:
+            self.load_poll_job = self.root.after(
+                self.LOAD_POLL_MS, self._process_load_queue)
+
+    def _load_worker(self, filepath, cancel):
+        """Runs on a load worker; reports progress and the result through load_queue."""
+        def progress(fraction):
+            if cancel.is_set():
+                raise _LoadCancelled()
+            self.load_queue.put(('progress', filepath, cancel, fraction))
 
         try:
-            # Find the header row
-            header_line_index = -1
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                for i, line in enumerate(f):
-                    line = line.strip()
-                    if line and not line.startswith('#') and (
-                            ',' in line or '\t' in line):
-                        header_line_index = i
-                        break
-
-            if header_line_index == -1:
-                raise ValueError("No valid data header row found.")
-
-            # Use genfromtxt to parse the data
-            data_array = np.genfromtxt(
-                filepath,
-                delimiter=',',
-                names=True,
-                comments='#',
-                autostrip=True,
-                invalid_raise=False,
-                skip_header=header_line_index)
-
-            if not isinstance(
-                    data_array,
-                    np.ndarray) or data_array.dtype is None or data_array.dtype.names is None:
-                raise ValueError("Could not parse data from file.")
-
-            if data_array.size == 0:
-                self.log(
-                    f"Warning: File '{os.path.basename(filepath)}' contains no valid data rows.")
-
-            headers = [name.strip() for name in data_array.dtype.names]
-
-            # Store data in our cache
-            file_info = self.file_data_cache[filepath]
-            file_info['headers'] = headers
-            file_info['data'] = {name: data_array[name] for name in headers}
-            file_info['mod_time'] = os.path.getmtime(filepath)
-            file_info['size'] = os.path.getsize(filepath)
+            progress(0.0)
+            file_info = self._read_file_info(filepath, progress)
+        except _LoadCancelled:
+            return
+        except Exception as e:
+            self.load_queue.put(('error', filepath, cancel, e))
+        else:
+            self.load_queue.put(('loaded', filepath, cancel, file_info))
 
-            self.log(
-                f"Cached {len(data_array)} data points from '{os.path.basename(filepath)}'.")
-            return True
+    def _process_load_queue(self):
+        """Picks up the messages of the load workers on the Tk thread."""
+        self.load_poll_job = None
+        replot = False
+        while True:
+            try:
+                kind, filepath, cancel, result = self.load_queue.get_nowait()
+            except queue.Empty:
+                break
+            pending = self.pending_loads.get(filepath)
+            if pending is None or pending.cancel is not cancel:
+                continue  # Cancelled, or the file was removed
+            if kind == 'progress':
+                self._set_load_progress(filepath, result)
+                continue
+            del self.pending_loads[filepath]
+            self._set_load_progress(filepath, None)
+            if kind == 'loaded':
+                self._finish_loading(filepath, result, pending.activate)
+                replot = True
+            else:
+                replot = self._fail_loading(filepath, result, pending.activate) or replot
+        if replot:
+            self.plot_data()
+        if self.pending_loads:
+            self.load_poll_job = self.root.after(
+                self.LOAD_POLL_MS, self._process_load_queue)
 
-        except Exception as e:
-            # If loading fails, create an empty but valid cache entry to
-            # prevent errors.
-            if filepath in self.file_data_cache:
-                self.file_data_cache[filepath].update(
-                    {"headers": [], "data": {}})
-
-            self.log(f"Error caching file '{os.path.basename(filepath)}': {e}")
-            # We don't show a messagebox here to avoid spamming the user if they select multiple bad files.
-            # The log message is sufficient.
+    def _finish_loading(self, filepath, file_info, activate):
+        self.file_data_cache[filepath] = {"path": filepath, **file_info}
+        filename = os.path.basename(filepath)
+        num_points = len(next(iter(file_info['data'].values()), []))
+        if num_points == 0:
+            self.log(f"Warning: File '{filename}' contains no valid data rows.")
+        if activate and filepath == self.active_filepath:
+            self._show_file_columns(filepath)
+            self.log(f"Loaded {num_points} data points from '{filename}'.")
+            self.start_file_watcher()
+        else:
+            self.log(f"Cached {num_points} data points from '{filename}'.")
+        self._trim_cache()
+        self.log(self.file_data_cache.stats_text())
+
+    def _trim_cache(self):
+        """Unloads the least recently used files that are neither plotted nor active."""
+        keep = {fp for fp, ui in self.file_ui_elements.items() if ui['var'].get()}
+        keep.add(self.active_filepath)
+        evicted = self.file_data_cache.trim(keep)
+        if evicted:
+            names = ", ".join(os.path.basename(fp) for fp in evicted)
+            self.log(f"Cache budget reached: unloaded {names} (reloaded when plotted again).")
+
+    def apply_cache_budget(self, event=None):
+        """Sets the file cache budget from the spinbox and unloads files past it."""
+        current_mb = self.file_data_cache.budget_bytes // 2**20
+        try:
+            budget_mb = int(self.cache_budget_var.get())
+        except ValueError:
+            budget_mb = 0
+        if budget_mb < 1:
+            self.log(f"Invalid cache budget '{self.cache_budget_var.get()}'; keeping {current_mb} MB.")
+            self.cache_budget_var.set(str(current_mb))
+            return
+        if budget_mb == current_mb:
+            return
+        self.file_data_cache.budget_bytes = budget_mb * 2**20
+        self._trim_cache()
+        self.log(self.file_data_cache.stats_text())
+
+    def _fail_loading(self, filepath, error, activate):
+        """Returns True if the plot still has to be redrawn."""
+        if activate and filepath == self.active_filepath:
+            self._handle_load_error(filepath, error)  # Redraws the plot
             return False
+        # An empty but valid cache entry keeps plotting from failing
+        self.file_data_cache[filepath] = {"path": filepath, "headers": [], "data": {}}
+        self.log(f"Error caching file '{os.path.basename(filepath)}': {error}")
+        return True
+
+    def _set_load_progress(self, filepath, fraction):
+        """Shows the load progress next to the file name (None when done)."""
+        ui = self.file_ui_elements.get(filepath)
+        if ui is None:
+            return
+        filename = os.path.basename(filepath)
+        ui['lbl'].configure(
+            text=filename if fraction is None else f"{filename} [{fraction:.0%}]")
 
-    def _find_header_row(self, filepath):
-        """Finds the header row index in a file."""
-        header_line_index = -1
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            for i, line in enumerate(f):
-                line = line.strip()
-                if line and not line.startswith('#') and (',' in line or '\t' in line):
-                    header_line_index = i
-                    break
-        return header_line_index
-
-    def _read_data_from_file(self, filepath, header_line_index):
-        """Reads data from a file using numpy.genfromtxt."""
-        if header_line_index == -1:
-            raise ValueError(
-                "No valid data header row found. Ensure the file has a "
-                "non-commented header with comma or tab-separated columns.")
-
-        data_array = np.genfromtxt(
-            filepath,
-            delimiter=',',
-            names=True,
-            comments='#',
-            autostrip=True,
-            invalid_raise=False,
-            skip_header=header_line_index)
-
-        if (not isinstance(data_array, np.ndarray) or 
-                data_array.dtype is None or 
-                data_array.dtype.names is None):
-            raise ValueError(
-                "Could not parse data. The file may be empty, have an invalid format, or contain only comments.")
-        
-        return data_array
-
-    def _update_cache_and_ui(self, filepath, data_array):
-        """Updates the file data cache and UI elements with new data."""
-        if data_array.size == 0:
-            self.log(
-                f"Warning: File '{os.path.basename(filepath)}' was loaded, but contains no valid data rows.")
-            if filepath in self.file_data_cache:
-                file_info = self.file_data_cache[filepath]
-                file_info['headers'] = [
-                    name.strip() for name in data_array.dtype.names] if data_array.dtype.names else []
-                file_info['data'] = {h: np.array(
-                    []) for h in file_info['headers']}
-            data_array = np.array([])
-
-        headers = [name.strip() for name in data_array.dtype.names]
-
-        file_info = self.file_data_cache[filepath]
-        file_info['headers'] = headers
-        file_info['data'] = {name: data_array[name] for name in headers}
-        file_info['mod_time'] = os.path.getmtime(filepath)
-        file_info['size'] = os.path.getsize(filepath)
+    def _cancel_loading(self, filepath):
+        """Abandons the load of a file; the worker stops at its next chunk."""
+        pending = self.pending_loads.pop(filepath, None)
+        if pending is None:
+            return False
+        pending.cancel.set()
+        self._set_load_progress(filepath, None)
+        return True
 
+    def cancel_loading(self):
+        if not self.pending_loads:
+            self.log("No files are being loaded.")
+            return
+        active_cancelled = False
+        for filepath in list(self.pending_loads):
+            self._cancel_loading(filepath)
+            active_cancelled = active_cancelled or filepath == self.active_filepath
+            self.log(f"Cancelled loading '{os.path.basename(filepath)}'.")
+        if active_cancelled:
+            # Selecting the file again restarts its load
+            self._set_active_file(None)
+
+    def _on_closing(self):
+        for filepath in list(self.pending_loads):
+            self._cancel_loading(filepath)
+        self.load_executor.shutdown(wait=False, cancel_futures=True)
+        self.stop_file_watcher()
+        if self.load_poll_job:
+            self.root.after_cancel(self.load_poll_job)
+            self.load_poll_job = None
+        self.root.destroy()
+
+    def _read_complete_lines(self, filepath, offset=0):
+        """Reads from a byte offset to the end of the last complete line."""
+        with open(filepath, 'rb') as f:
+            f.seek(offset)
+            raw = f.read()
+        end = raw.rfind(b'\n') + 1
+        lines = raw[:end].decode('utf-8', errors='ignore').splitlines()
+        partial_line = raw[end:].decode('utf-8', errors='ignore').strip()
+        return lines, partial_line, offset + end
+
+    def _read_new_lines(self, filepath, file_info):
+        """Returns the lines completed since the last read and advances the offset."""
+        lines, _, offset = self._read_complete_lines(filepath, file_info['offset'])
+        file_info['offset'] = offset
+        return lines
+
+    def _cache_text_run(self, file_info, run):
+        """
+        Caches a loaded text file in growable columns, with the byte offset
+        where live updates resume.
+        """
+        file_info['headers'] = list(run.columns)
+        capacity = max(1024, 2 * len(run.data))
+        file_info['columns'] = {h: DataColumn(capacity=capacity, max_rows=None)
+                                for h in run.columns}
+        file_info['data'] = {}
+        file_info['offset'] = run.offset
+        file_info['delimiter'] = run.delimiter
+        file_info['numeric_columns'] = run.numeric_columns
+        self._append_rows(file_info, run.data)
+        # A last line without a newline may still be being written: its row
+        # is replaced when the line is read again on the next update.
+        file_info['partial_rows'] = self._append_rows(
+            file_info, self._parse_rows([run.partial_line], file_info)) if run.partial_line else 0
+
+    def _cache_binary_run(self, file_info, data_array):
+        """Caches the memory-mapped columns of a binary run file."""
+        file_info['headers'] = list(data_array.dtype.names)
+        file_info['data'] = {name: data_array[name] for name in data_array.dtype.names}
+        for key in ('columns', 'offset'):
+            file_info.pop(key, None)
+
+    def _read_binary_run(self, filepath):
+        """Memory-maps a .pcrun binary run file as a structured array (no parsing, no copy)."""
+        run = read_binary_run(filepath)
+        fields = np.dtype([(name, run.data.dtype) for name in run.columns])
+        return run.data.view(fields).reshape(-1)
+
+    def _show_file_columns(self, filepath):
+        """Offers the columns of a loaded file for plotting."""
+        headers = self.file_data_cache[filepath]['headers']
         self.x_col_cb['values'] = headers
         self.y_col_cb['values'] = headers
 
@@ -790,28 +1057,23 @@ class PlotterApp:
         elif headers:
             self.x_col_cb.set(headers[0])
 
-        num_points = len(data_array)
-        self.log(
-            f"Loaded {num_points} data points from '{os.path.basename(filepath)}'.")
-
     def load_file_data(self, filepath):
         if not filepath:
             self.log("Cannot load data: No file selected.")
             return
 
         self.stop_file_watcher()
-
-        try:
-            header_line_index = self._find_header_row(filepath)
-            data_array = self._read_data_from_file(filepath, header_line_index)
-            self._update_cache_and_ui(filepath, data_array)
-
-        except Exception as e:
-            self._handle_load_error(filepath, e)
-        finally:
-            if self.active_filepath == filepath:
-                self.start_file_watcher()
+        if (filepath not in self.pending_loads
+                and self.file_data_cache.lookup(filepath) is not None):
+            self._show_file_columns(filepath)
+            self.log(f"Using cached data for '{os.path.basename(filepath)}'. "
+                     f"{self.file_data_cache.stats_text()}")
+            self.start_file_watcher()
             self.plot_data()
+            return
+
+        # The watcher restarts once the file has been loaded
+        self._start_loading(filepath, activate=True)
 
     def append_file_data(self):
         """Efficiently reads and appends only new data from the file."""
@@ -822,20 +1084,25 @@ class PlotterApp:
         self.stop_file_watcher()
         file_info = self.file_data_cache.get(self.active_filepath)
 
-        if not file_info or 'size' not in file_info:
+        if not file_info or 'size' not in file_info or (
+                'offset' not in file_info and not is_binary_run(self.active_filepath)):
             self.log(
                 "Cannot append data: file information is incomplete. Performing full reload.")
             self.load_file_data(self.active_filepath)
             return
 
         try:
-            new_lines = self._read_new_lines(self.active_filepath, file_info)
-            appended_count = self._parse_and_append_new_data(new_lines, file_info)
+            if is_binary_run(self.active_filepath):
+                appended_count = self._remap_binary_data(self.active_filepath, file_info)
+            else:
+                new_lines = self._read_new_lines(self.active_filepath, file_info)
+                appended_count = self._parse_and_append_new_data(new_lines, file_info)
 
             if appended_count > 0:
                 file_info['mod_time'] = os.path.getmtime(self.active_filepath)
                 file_info['size'] = os.path.getsize(self.active_filepath)
                 self.log(f"Appended {appended_count} new data points.")
+                self._trim_cache()
                 self.plot_data()
                 
         except Exception:
@@ -845,29 +1112,38 @@ class PlotterApp:
         finally:
             # Always restart the watcher after an append operation.
             self.start_file_watcher()
+
+    def _remap_binary_data(self, filepath, file_info):
+        """Re-maps a growing binary run file; returns the number of new rows."""
+        data_array = self._read_binary_run(filepath)
+        old_count = len(next(iter(file_info['data'].values()), []))
+        file_info['data'] = {name: data_array[name] for name in file_info['headers']}
+        return len(data_array) - old_count
+
     def _parse_and_append_new_data(self, new_lines, file_info):
         """Parses new lines and appends them to the data cache."""
         if not new_lines:
             return 0
 
-        reader = csv.reader(new_lines)
-        new_data = {h: [] for h in file_info['headers']}
-        appended_count = 0
-        for row in reader:
-            if len(row) != len(file_info['headers']):
-                continue
-            for i, header in enumerate(file_info['headers']):
-                try:
-                    new_data[header].append(float(row[i]))
-                except (ValueError, TypeError):
-                    new_data[header].append(np.nan)
-            appended_count += 1
-
-        for header in file_info['headers']:
-            file_info['data'][header] = np.concatenate(
-                (file_info['data'][header], np.array(new_data[header], dtype=float)))
-        
-        return appended_count
+        rows = self._parse_rows(new_lines, file_info)
+        if file_info.get('partial_rows'):
+            # The unterminated line seen at load time has now been read in full
+            for column in file_info['columns'].values():
+                column.truncate(len(column) - file_info['partial_rows'])
+            file_info['partial_rows'] = 0
+        return self._append_rows(file_info, rows)
+
+    def _parse_rows(self, lines, file_info):
+        """Parses data lines into a (rows, columns) float array in one bulk call."""
+        return parse_text_rows(lines, len(file_info['headers']),
+                               file_info['delimiter'], file_info['numeric_columns'])
+
+    def _append_rows(self, file_info, rows):
+        for i, header in enumerate(file_info['headers']):
+            column = file_info['columns'][header]
+            column.extend(rows[:, i])
+            file_info['data'][header] = column.values
+        return len(rows)
 
     def plot_data(self, event=None):
         x_col, y_col, selected_filepaths = self._get_plot_parameters()
@@ -914,9 +1190,16 @@ class PlotterApp:
 
     def _plot_file_data(self, filepath, x_col, y_col):
         """Plots data for a single file."""
-        file_info = self.file_data_cache.get(filepath)
+        file_info = self.file_data_cache.touch(filepath)
         filename = os.path.basename(filepath)
 
+        if filepath in self.pending_loads:
+            return False  # Plotted once it has been loaded
+
+        if file_info and file_info.get('evicted'):
+            self._start_loading(filepath)
+            return False
+
         if not file_info or 'headers' not in file_info or not file_info['headers']:
             self.log(f"Skipping '{filename}': Data is missing or invalid.")
             return False
@@ -928,17 +1211,14 @@ class PlotterApp:
         raw_x = file_info['data'][x_col]
         raw_y = file_info['data'][y_col]
 
-        finite_mask = np.isfinite(raw_x) & np.isfinite(raw_y)
-        plot_x = raw_x[finite_mask]
-        plot_y = raw_y[finite_mask]
-
-        if plot_x.size > 0:
+        if (np.isfinite(raw_x) & np.isfinite(raw_y)).any():
             label_text = (f"{y_col} vs {x_col} ({filename})"
                           if len(self.file_ui_elements) > 1
                           else f"{y_col} vs {x_col}")
-            self.ax_main.plot(
-                plot_x,
-                plot_y,
+            # Non-finite points are skipped by the decimation
+            self.lod.plot(
+                raw_x,
+                raw_y,
                 marker='o',
                 markersize=4,
                 linestyle='-',
@@ -987,7 +1267,8 @@ class PlotterApp:
         self.y_col_cb['values'] = []
         self.live_update_var.set(False)
         self.toggle_live_update()
-        self.log(f"Error loading file: {traceback.format_exc()}")
+        details = ''.join(traceback.format_exception(type(e), e, e.__traceback__))
+        self.log(f"Error loading file: {details}")
         messagebox.showerror(
             "File Load Error",
             f"Could not read the data file. It may be empty, malformed, or in use.\n\nDetails: {e}")
@@ -0,0 +1,241 @@
+"""
+Purpose: Background acquisition behaviour.
+
+What it does: Runs the shared AcquisitionEngine with plain Python callables in place of instrument reads and checks that samples arrive in order through the bounded queue, that a full queue holds the producer back instead of dropping samples, and that completion and errors are handed to the GUI side as queue items. Drives the SampleScheduler on a fake monotonic clock to check drift-free fixed-rate timing, fixed-delay timing (including a settle delay timed from a source change), overrun counting and jitter recording, and that a logging loop saves each sample's jitter in its data row. Reads two slow fake instruments through the MultiInstrumentSampler to check that they overlap, that every reading carries its own timestamp and that channels on one instrument stay in order. Runs StartupPipeline steps on slow fake instruments to check that independent set-up steps overlap, that a step waits for the steps it depends on and that an error stops the start-up.
+"""
+import importlib
+import os
+import sys
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from Instrument_Drivers import (AcquisitionEngine,  # noqa: E402
+                                MultiInstrumentSampler, SampleScheduler,
+                                StartupPipeline)
+from Instrument_Drivers import Sample_Scheduler  # noqa: E402
+
+
+def _drain_until(engine, count, timeout=2.0):
+    items = []
+    deadline = time.monotonic() + timeout
+    while len(items) < count and time.monotonic() < deadline:
+        items.extend(engine.drain())
+        time.sleep(0.005)
+    return items
+
+
+def test_samples_are_queued_in_order_then_complete():
+    samples = iter(range(5))
+    engine = AcquisitionEngine(lambda: next(samples))
+    engine.start()
+    items = _drain_until(engine, 6)
+    assert items == [0, 1, 2, 3, 4, AcquisitionEngine.COMPLETE]
+    assert engine.stop()
+
+
+def test_full_queue_applies_backpressure_without_dropping():
+    counter = iter(range(1000))
+    engine = AcquisitionEngine(lambda: next(counter), maxsize=3)
+    engine.start()
+    time.sleep(0.05)
+    # The producer is blocked on the full queue, not discarding samples
+    assert engine.data_queue.qsize() == 3
+    first = engine.drain()
+    more = _drain_until(engine, 3)
+    engine.stop()
+    assert first + more[:3] == [0, 1, 2, 3, 4, 5]
+
+
+def test_acquisition_error_is_queued_and_ends_the_thread():
+    def acquire():
+        raise IOError("VISA timeout")
+    engine = AcquisitionEngine(acquire)
+    engine.start()
+    items = _drain_until(engine, 1)
+    assert isinstance(items[0], IOError)
+    assert engine.stop()
+    assert not engine.is_running
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _run_samples(scheduler, clock, read_times):
+    with patch.object(Sample_Scheduler.time, "monotonic", clock.monotonic), \
+            patch.object(Sample_Scheduler.time, "sleep", clock.sleep):
+        starts = []
+        for read_s in read_times:
+            scheduler.wait()
+            starts.append(clock.now)
+            clock.now += read_s
+            scheduler.mark_done()
+    return starts
+
+
+def test_fixed_rate_does_not_drift_with_read_time():
+    clock = _FakeClock()
+    scheduler = SampleScheduler(1.0)
+    starts = _run_samples(scheduler, clock, [0.3] * 5)
+    assert starts == pytest.approx([100.0, 101.0, 102.0, 103.0, 104.0])
+    assert scheduler.overruns == 0
+    assert scheduler.max_jitter_s == pytest.approx(0.0)
+
+
+def test_fixed_rate_counts_overruns_and_skips_missed_slots():
+    clock = _FakeClock()
+    scheduler = SampleScheduler(1.0)
+    starts = _run_samples(scheduler, clock, [0.2, 2.5, 0.2])
+    # The 2.5 s read overruns; the slots at 102 and 103 are skipped
+    assert starts == pytest.approx([100.0, 101.0, 104.0])
+    assert scheduler.overruns == 1
+    assert scheduler.samples == 3
+
+
+def test_fixed_delay_waits_one_period_after_each_read():
+    clock = _FakeClock()
+    scheduler = SampleScheduler(1.0, mode=SampleScheduler.FIXED_DELAY)
+    starts = _run_samples(scheduler, clock, [0.5, 0.5, 0.5])
+    assert starts == pytest.approx([100.0, 101.5, 103.0])
+
+
+def test_fixed_delay_times_a_settle_from_the_source_change():
+    clock = _FakeClock()
+    scheduler = SampleScheduler(2.0, mode=SampleScheduler.FIXED_DELAY)
+    reads = []
+    with patch.object(Sample_Scheduler.time, "monotonic", clock.monotonic), \
+            patch.object(Sample_Scheduler.time, "sleep", clock.sleep):
+        for set_s in (0.1, 0.4):
+            clock.now += set_s  # e.g. a voltage step that takes a while to apply
+            scheduler.mark_done()
+            scheduler.wait()
+            reads.append(clock.now)
+            clock.now += 0.5
+    # Even the first reading waits the full settle after its source change
+    assert reads == pytest.approx([102.1, 105.0])
+
+
+def test_late_start_is_recorded_as_jitter():
+    clock = _FakeClock()
+    scheduler = SampleScheduler(1.0)
+    with patch.object(Sample_Scheduler.time, "monotonic", clock.monotonic):
+        scheduler.mark_start()
+        scheduler.mark_done()
+        clock.now = 101.04  # e.g. a Tk callback that fired 40 ms late
+        assert scheduler.mark_start() == pytest.approx(0.04)
+    assert list(scheduler.jitter_s) == pytest.approx([0.0, 0.04])
+
+
+@pytest.mark.usefixtures("mock_tkinter")
+def test_logging_loop_saves_each_sample_jitter_in_its_row():
+    sys.modules.pop("Keithley_2400.RT_K2400_L350_T_Sensing_GUI_v4", None)
+    mod = importlib.import_module("Keithley_2400.RT_K2400_L350_T_Sensing_GUI_v4")
+    gui = mod.RT_GUI_Passive.__new__(mod.RT_GUI_Passive)
+    clock = _FakeClock()
+    gui.is_running, gui.start_time = True, time.time()
+    gui.params = {'current_ma': 1.0}
+    gui.backend = MagicMock(get_measurement=MagicMock(return_value=(300.0, 1.0)))
+    gui.sample_scheduler = SampleScheduler(1.0)
+    gui.data_storage = {k: [] for k in ('temperature', 'voltage', 'resistance')}
+    gui.data_writer, gui.live_plot = MagicMock(), MagicMock()
+    gui.root, gui.log = MagicMock(), MagicMock()
+
+    with patch.object(Sample_Scheduler.time, "monotonic", clock.monotonic):
+        gui._experiment_loop()
+        clock.now = 101.25  # the next Tk callback fires 250 ms late
+        gui._experiment_loop()
+
+    rows = [c.args[0] for c in gui.data_writer.write_row.call_args_list]
+    assert [row[-1] for row in rows] == ["0.0000", "0.2500"]
+
+
+class _SlowInstrument:
+    def __init__(self, read_s, value):
+        self._io_lock = threading.RLock()
+        self.read_s = read_s
+        self.value = value
+        self.calls = []
+
+    def read(self, label=None):
+        time.sleep(self.read_s)
+        self.calls.append(label)
+        return self.value
+
+
+def test_multi_sampler_reads_instruments_concurrently():
+    lakeshore = _SlowInstrument(0.2, 300.0)
+    keithley = _SlowInstrument(0.2, 1.0e9)
+    sampler = MultiInstrumentSampler()
+    sampler.add_channel('temperature', lakeshore, lakeshore.read)
+    sampler.add_channel('resistance', keithley, keithley.read)
+    t0 = time.monotonic()
+    readings = sampler.sample()
+    elapsed = time.monotonic() - t0
+    sampler.close()
+    # Two 0.2 s reads overlap instead of taking 0.4 s
+    assert elapsed < 0.35
+    assert readings['temperature'].value == 300.0
+    assert readings['resistance'].value == 1.0e9
+    assert readings['resistance'].duration >= 0.19
+    assert abs(sampler.skew_s(readings, 'temperature', 'resistance')) < 0.1
+
+
+def test_multi_sampler_keeps_channel_order_on_one_instrument():
+    lakeshore = _SlowInstrument(0.01, 0.0)
+    sampler = MultiInstrumentSampler()
+    sampler.add_channel('temperature', lakeshore, lambda: lakeshore.read('KRDG'))
+    sampler.add_channel('heater', lakeshore, lambda: lakeshore.read('HTR'))
+    readings = sampler.sample()
+    assert sampler.channels == ['temperature', 'heater']
+    assert lakeshore.calls == ['KRDG', 'HTR']
+    assert readings['heater'].timestamp > readings['temperature'].timestamp
+
+
+def test_startup_pipeline_overlaps_independent_steps_and_orders_dependent_ones():
+    lakeshore = _SlowInstrument(0.2, 'configured')
+    keithley = _SlowInstrument(0.1, 'connected')
+    pipeline = StartupPipeline()
+    pipeline.add_step('lakeshore', lakeshore.read)
+    pipeline.add_step('keithley', keithley.read)
+    pipeline.add_step('zero correction', lambda: keithley.read('ZCOR'),
+                      after=['keithley'])
+    t0 = time.monotonic()
+    results = pipeline.run()
+    elapsed = time.monotonic() - t0
+    # The 0.2 s Lakeshore set-up overlaps the two 0.1 s Keithley steps
+    assert elapsed < 0.35
+    assert results == {'lakeshore': 'configured', 'keithley': 'connected',
+                       'zero correction': 'connected'}
+    start, _ = pipeline.timings['zero correction']
+    assert start >= sum(pipeline.timings['keithley'])
+    assert pipeline.summary().startswith("Startup took")
+
+
+def test_startup_pipeline_stops_on_the_first_error():
+    ran = []
+
+    def fail():
+        raise IOError("no response")
+
+    pipeline = StartupPipeline()
+    pipeline.add_step('keithley', fail)
+    pipeline.add_step('source', lambda: ran.append('source'), after=['keithley'])
+    with pytest.raises(IOError):
+        pipeline.run()
+    assert ran == []
+    with pytest.raises(ValueError):
+        pipeline.add_step('heater', lambda: None, after=['lakeshore'])
@@ -0,0 +1,307 @@
+"""
+Purpose: Measurement data file handling.
+
+What it does: Writes rows through the shared RunFileWriter and checks that the header is on disk as soon as the file is created, that rows are flushed by the row-count and time policies (including the background timer when acquisition pauses), and that closing the writer leaves a complete, readable CSV file. Writes the optional .pcrun binary run file next to the text file and checks that it memory-maps back with full-precision columns and its metadata, that an interrupted last row is dropped when a run is continued, and that the plotter opens it as named columns. Loads a text file on the plotter's background load pool and follows it as it grows with the tail reader and checks that only the appended bytes are parsed, that a half-written last line is completed rather than duplicated and that malformed rows are skipped. Loads comma- and tab-delimited files with the bulk text loader, with and without pandas, and checks delimiter sniffing, '#' metadata, NaN for timestamp columns and that chunked reads give the same data. Loads several files on the plotter's background load pool and checks that results reach the cache through the queue, that a file selected again is parsed only once, and that cancelled loads and unreadable files leave no half-loaded data. Fills the plotter's file cache past its memory budget and checks that the least recently used unplotted file is unloaded, that files changed on disk are not served from the cache, and the hit/miss counts. Changes the cache budget from the plotter's spinbox setting and checks that lowering it unloads files past the new budget and that invalid values are rejected.
+"""
+import csv
+import math
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from Instrument_Drivers import (BinaryRunWriter, RunFileWriter,  # noqa: E402
+                                is_binary_run, load_text_run, read_binary_run)
+from Instrument_Drivers import Text_Run_File  # noqa: E402
+
+
+def _background_plotter(plotter):
+    """A PlotterApp with just the state its background load pool needs."""
+    app = plotter.PlotterApp.__new__(plotter.PlotterApp)
+    app.log = lambda message: None
+    app.plot_data = lambda: None
+    app.root = SimpleNamespace(after=lambda ms, callback: "poll",
+                               after_cancel=lambda job: None)
+    app.active_filepath = None
+    app.file_data_cache = plotter.FileDataCache(2**30)
+    app.file_ui_elements = {}
+    app.pending_loads = {}
+    app.load_queue = queue.Queue()
+    app.load_poll_job = None
+    app.load_executor = ThreadPoolExecutor(max_workers=2)
+    return app
+
+
+def _tk_var(value):
+    """A stand-in for a Tk variable holding ``value``."""
+    var = SimpleNamespace(value=value)
+    var.get = lambda: var.value
+    var.set = lambda new: setattr(var, "value", new)
+    return var
+
+
+def _read_rows(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_header_is_written_immediately(tmp_path):
+    path = tmp_path / "run.dat"
+    writer = RunFileWriter(path, header_rows=[["# Sample: S1"], ["I (A)", "V (V)"]])
+    assert _read_rows(path) == [["# Sample: S1"], ["I (A)", "V (V)"]]
+    writer.close()
+
+
+def test_rows_are_flushed_every_n_rows(tmp_path):
+    path = tmp_path / "run.dat"
+    writer = RunFileWriter(path, flush_rows=3, flush_interval_s=60)
+    writer.write_row([1, 2])
+    writer.write_row([3, 4])
+    assert _read_rows(path) == []
+    writer.write_row([5, 6])
+    assert len(_read_rows(path)) == 3
+    writer.close()
+    assert writer.closed
+    with pytest.raises(ValueError):
+        writer.write_row([7, 8])
+
+
+def test_pending_rows_are_flushed_after_the_interval(tmp_path):
+    path = tmp_path / "run.dat"
+    writer = RunFileWriter(path, flush_rows=100, flush_interval_s=0.05)
+    writer.write_row(["a"])
+    assert _read_rows(path) == []
+    time.sleep(0.3)  # no further rows: the timer flushes the pending one
+    assert _read_rows(path) == [["a"]]
+    writer.close()
+
+
+def test_writer_options_and_append(tmp_path):
+    path = tmp_path / "run.dat"
+    with RunFileWriter(path, delimiter='\t', header_rows=[["x", "y"]]) as writer:
+        writer.write_rows([[1, 2], [3, 4]])
+        writer.checkpoint()
+    with RunFileWriter(path, delimiter='\t', append=True) as writer:
+        writer.write_row([5, 6])
+    assert path.read_text().splitlines() == ["x\ty", "1\t2", "3\t4", "5\t6"]
+    assert writer.rows_written == 1
+
+
+def test_binary_run_is_written_alongside_the_text_file(tmp_path):
+    path = tmp_path / "run.dat"
+    with RunFileWriter(path, header_rows=[["Timestamp", "T (K)", "R (Ohm)"]],
+                       binary_columns=["Time (s)", "T (K)", "R (Ohm)"],
+                       metadata={'sample': 'S1'}) as writer:
+        writer.write_row(["12:00:00", "300.1235", "1.2346e+09"],
+                         [1.0, 300.123456789, 1234567890.123])
+        writer.write_rows([["12:00:01", "301", "2e9"]])
+    assert len(_read_rows(path)) == 3
+    assert writer.binary_filepath == str(tmp_path / "run.pcrun")
+    assert is_binary_run(writer.binary_filepath) and not is_binary_run(path)
+
+    run = read_binary_run(writer.binary_filepath)
+    assert isinstance(run.data, np.memmap)
+    assert run.columns == ["Time (s)", "T (K)", "R (Ohm)"]
+    assert run.metadata == {'sample': 'S1'}
+    # Full float64 precision, not the text formatting
+    assert run.data[0].tolist() == [1.0, 300.123456789, 1234567890.123]
+    # Without explicit values the text cells are stored, non-numeric as NaN
+    assert math.isnan(run.data[1, 0])
+    assert run.data[1, 1:].tolist() == [301.0, 2e9]
+
+
+def test_binary_run_append_drops_a_partial_last_row(tmp_path):
+    path = tmp_path / "run.pcrun"
+    with BinaryRunWriter(path, ["x", "y"]) as writer:
+        writer.write_rows([[1, 2], [3, 4]])
+    with open(path, 'ab') as f:
+        f.write(b'\x00' * 5)  # a row cut short when the program died
+    assert len(read_binary_run(path, mmap=False).data) == 2
+
+    with BinaryRunWriter(path, ["x", "y"], append=True) as writer:
+        writer.write_row([5, 6])
+        with pytest.raises(ValueError):
+            writer.write_row([7])
+    assert read_binary_run(path).data[:, 1].tolist() == [2.0, 4.0, 6.0]
+    with pytest.raises(ValueError):
+        BinaryRunWriter(path, ["x", "z"], append=True)
+
+
+def test_plotter_maps_binary_run_as_named_columns(tmp_path):
+    plotter = pytest.importorskip("Utilities.PlotterUtil_GUI_v3")
+    path = tmp_path / "run.pcrun"
+    with BinaryRunWriter(path, ["Temperature (K)", "Resistance (Ohm)"]) as writer:
+        writer.write_rows([[300.0, 10.0], [301.0, 11.0]])
+    data_array = plotter.PlotterApp._read_binary_run(None, path)
+    assert data_array.dtype.names == ("Temperature (K)", "Resistance (Ohm)")
+    assert data_array["Resistance (Ohm)"].tolist() == [10.0, 11.0]
+
+
+def test_plotter_tail_reader_appends_only_new_complete_lines(tmp_path):
+    plotter = pytest.importorskip("Utilities.PlotterUtil_GUI_v3")
+    path = str(tmp_path / "run.dat")
+    with open(path, 'w') as f:
+        f.write("# Sample: S1\nTimestamp,Elapsed (s),T (K)\n"
+                "12:00:00,0.0,300.0\n12:00:01,1.0,301.0\n12:00:02,2.0,3")
+    app = _background_plotter(plotter)
+    app.file_data_cache[path] = {"path": path}
+    app._start_loading(path)
+    app.load_executor.shutdown(wait=True)
+    app._process_load_queue()
+    file_info = app.file_data_cache[path]
+    assert file_info['data']['T (K)'].tolist() == [300.0, 301.0, 3.0]
+
+    with open(path, 'a') as f:
+        f.write("02.0\n12:00:03,3.0,303.0\n12:00:04,4")
+    offset = file_info['offset']
+    new_lines = app._read_new_lines(path, file_info)
+    assert new_lines == ["12:00:02,2.0,302.0", "12:00:03,3.0,303.0"]
+    assert file_info['offset'] == offset + len("12:00:02,2.0,302.0\n12:00:03,3.0,303.0\n")
+    app._parse_and_append_new_data(new_lines, file_info)
+    assert file_info['data']['T (K)'].tolist() == [300.0, 301.0, 302.0, 303.0]
+
+    with open(path, 'a') as f:
+        f.write(".0,304.0\nbad,row\n")
+    app._parse_and_append_new_data(app._read_new_lines(path, file_info), file_info)
+    assert file_info['data']['Elapsed (s)'].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert np.isnan(file_info['data']['Timestamp']).all()
+
+
+@pytest.mark.parametrize("use_pandas", [True, False])
+def test_text_loader_sniffs_layout_and_parses_in_chunks(tmp_path, monkeypatch, use_pandas):
+    if not use_pandas:
+        monkeypatch.setattr(Text_Run_File, "_pandas", lambda: None)
+    path = tmp_path / "run.dat"
+    with RunFileWriter(path, header_rows=[["# Sample: S1", "Applied Current: 1e-06 A"],
+                                          ["Timestamp", "Elapsed Time (s)", "Resistance (Ohm)"]]) as writer:
+        writer.write_rows([[f"2026-10-17 12:00:{i:02d}", f"{i:.2f}", f"{100 + i:.6e}"]
+                           for i in range(50)])
+    with open(path, 'a') as f:
+        f.write("2026-10-17 12:00:50,50.0")  # still being written
+
+    run = load_text_run(path)
+    assert run.columns == ["Timestamp", "Elapsed Time (s)", "Resistance (Ohm)"]
+    assert run.metadata == ["# Sample: S1,Applied Current: 1e-06 A"]
+    assert run.delimiter == ',' and run.numeric_columns == [1, 2]
+    assert run.data.shape == (50, 3)
+    assert np.isnan(run.data[:, 0]).all()
+    assert run.data[-1, 1:].tolist() == [49.0, 149.0]
+    assert run.partial_line == "2026-10-17 12:00:50,50.0"
+    assert run.offset == os.path.getsize(path) - len(run.partial_line)
+
+    progress = []
+    chunked = load_text_run(path, chunk_bytes=100, progress=progress.append)
+    assert np.array_equal(chunked.data, run.data, equal_nan=True)
+    assert progress[-1] == 1.0 and len(progress) > 10
+
+
+def test_text_loader_reads_tab_delimited_files(tmp_path):
+    path = tmp_path / "iv.dat"
+    with RunFileWriter(path, delimiter='\t', header_rows=[
+            ["# Sample: S1", "Compliance: 10 V"],
+            ["Current (A)", "Voltage (V)", "Resistance (Ohm)"]]) as writer:
+        writer.write_rows([["1e-3", "0.1", "100"], ["2e-3", "0.2", "100"]])
+    run = load_text_run(path)
+    assert run.delimiter == '\t'
+    assert run.data.tolist() == [[1e-3, 0.1, 100.0], [2e-3, 0.2, 100.0]]
+    assert run.partial_line == ""
+
+
+def test_plotter_loads_files_in_background(tmp_path):
+    plotter = pytest.importorskip("Utilities.PlotterUtil_GUI_v3")
+    app = _background_plotter(plotter)
+
+    paths = [str(tmp_path / f"run{i}.dat") for i in range(3)]
+    for i, path in enumerate(paths):
+        with RunFileWriter(path, header_rows=[["T (K)", "R (Ohm)"]]) as writer:
+            writer.write_rows([[j, 10 * i + j] for j in range(1000)])
+    bad = str(tmp_path / "notes.dat")
+    with open(bad, 'w') as f:
+        f.write("no header here\n")
+
+    for path in paths + [bad]:
+        app.file_data_cache[path] = {"path": path}
+        app._start_loading(path)
+    app._start_loading(paths[0], activate=True)
+    assert len(app.pending_loads) == 4 and app.pending_loads[paths[0]].activate
+    assert app._cancel_loading(paths[2])
+    app.load_executor.shutdown(wait=True)
+    app._process_load_queue()
+
+    assert not app.pending_loads and app.load_poll_job is None
+    assert app.file_data_cache[paths[1]]['data']['R (Ohm)'][-1] == 1009.0
+    assert app.file_data_cache[paths[0]]['offset'] == os.path.getsize(paths[0])
+    assert app.file_data_cache[paths[2]] == {"path": paths[2]}
+    assert app.file_data_cache[bad]['headers'] == []
+
+    cancel = threading.Event()
+    cancel.set()
+    app._load_worker(paths[0], cancel)
+    assert app.load_queue.empty()
+
+
+def test_plotter_cache_evicts_least_recently_used_files(tmp_path):
+    plotter = pytest.importorskip("Utilities.PlotterUtil_GUI_v3")
+    app = plotter.PlotterApp.__new__(plotter.PlotterApp)
+    paths = [str(tmp_path / f"run{i}.dat") for i in range(3)]
+    for path in paths:
+        with RunFileWriter(path, header_rows=[["T (K)", "R (Ohm)"]]) as writer:
+            writer.write_rows([[j, j] for j in range(100)])
+    entry_bytes = plotter.FileDataCache.entry_bytes(app._read_file_info(paths[0]))
+    cache = plotter.FileDataCache(budget_bytes=2 * entry_bytes)
+    for path in paths:
+        cache[path] = {"path": path, **app._read_file_info(path)}
+    cache.touch(paths[0])
+
+    assert cache.memory_bytes == 3 * entry_bytes
+    assert cache.trim(keep={paths[2]}) == [paths[1]]
+    assert cache[paths[1]] == {"path": paths[1], "evicted": True}
+    assert cache.memory_bytes == 2 * entry_bytes
+    assert list(cache) == [paths[1], paths[2], paths[0]]
+
+    assert cache.lookup(paths[2]) is cache[paths[2]]
+    assert cache.lookup(paths[1]) is None
+    cache.touch(paths[1])
+    with open(paths[0], 'a') as f:
+        f.write("100,100\n")
+    assert cache.lookup(paths[0]) is None
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 3, 1)
+    assert "2 of 3 files in memory" in cache.stats_text()
+
+
+def test_plotter_cache_budget_setting_unloads_files(tmp_path):
+    plotter = pytest.importorskip("Utilities.PlotterUtil_GUI_v3")
+    app = _background_plotter(plotter)
+    messages = []
+    app.log = messages.append
+    app.load_executor.shutdown()
+    # Each file holds about 0.6 MB of columns, so a 1 MB budget fits one
+    paths = [str(tmp_path / f"run{i}.dat") for i in range(2)]
+    for path in paths:
+        with RunFileWriter(path, header_rows=[["T (K)", "R (Ohm)"]]) as writer:
+            writer.write_rows([[j, j] for j in range(40000)])
+        app.file_data_cache[path] = {"path": path, **app._read_file_info(path)}
+    app.file_ui_elements = {path: {"var": _tk_var(False)} for path in paths}
+    app.active_filepath = paths[1]
+
+    app.cache_budget_var = _tk_var("none")
+    app.apply_cache_budget()
+    assert app.file_data_cache.budget_bytes == 2**30
+    assert app.cache_budget_var.get() == "1024"
+
+    app.cache_budget_var.set("1")
+    app.apply_cache_budget()
+    assert app.file_data_cache.budget_bytes == 2**20
+    assert app.file_data_cache[paths[0]] == {"path": paths[0], "evicted": True}
+    assert "data" in app.file_data_cache[paths[1]]
+    assert "1 of 2 files in memory" in messages[-1]
@@ -0,0 +1,337 @@
+"""
+Purpose: Buffered / hardware-sequenced acquisition checks.
+
+What it does: Drives the instrument-side sweep and buffer paths of the GUI backends against the shared drivers on mocked VISA sessions and verifies that the right SCPI sequence is sent and the bulk readback is parsed into one value per point. Stopping a K2400 list sweep is checked to return to Tk at once, wait out the pending chunk on a Tk timer and then return the source to fixed mode, and the E4980A list sweep is checked to run on the acquisition thread and to be ended at 0 V bias once a stop has waited out the pending table. A 6221 sweep rejected by validation is checked to leave no data file and to restore the UI once, and a Delta-family sweep that stops one reading short is checked to end with a warning. The 6517B R-T GUIs are checked to configure alternating polarity from the entered measure time and discard count and to warn when a sequence outlasts the sample delay.
+"""
+import importlib
+import os
+import sys
+import threading
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+def _fresh_import(module_name):
+    if module_name in sys.modules:
+        del sys.modules[module_name]
+    return importlib.import_module(module_name)
+
+
+def _driver(cls, **kwargs):
+    """Builds a shared driver on top of a mocked VISA session."""
+    return cls("GPIB0::1::INSTR", resource_manager=MagicMock(), **kwargs)
+
+
+@pytest.mark.usefixtures("mock_tkinter")
+def test_k2400_list_sweep_chunk():
+    mod = _fresh_import("Keithley_2400.IV_K2400_GUI_v5")
+    backend = mod.Keithley2400_IV_Backend()
+    backend.keithley = _driver(mod.Keithley2400)
+    session = backend.keithley.resource
+    session.query.return_value = "1.0E-1,2.0E-1,3.0E-1\n"
+
+    voltages = backend.measure_list_chunk([1e-6, 2e-6, 3e-6], 0.01)
+
+    assert np.allclose(voltages, [0.1, 0.2, 0.3])
+    # The whole list configuration goes out as one batched transfer.
+    session.write.assert_called_once()
+    commands = session.write.call_args.args[0].split(';')
+    assert ":SOUR:CURR:MODE LIST" in commands
+    assert ":TRIG:COUN 3" in commands
+    assert any(c.startswith(":SOUR:LIST:CURR 1.000000e-06,") for c in commands)
+    session.query.assert_called_once_with(":READ?")
+
+
+@pytest.mark.usefixtures("mock_tkinter")
+def test_k2400_list_sweep_rejects_oversized_chunk():
+    mod = _fresh_import("Keithley_2400.IV_K2400_GUI_v5")
+    backend = mod.Keithley2400_IV_Backend()
+    backend.keithley = _driver(mod.Keithley2400)
+    with pytest.raises(ValueError):
+        backend.measure_list_chunk(np.zeros(backend.HARDWARE_LIST_CHUNK + 1), 0.0)
+
+
+@pytest.mark.usefixtures("mock_tkinter")
+def test_k2400_stop_ends_the_list_sweep_after_the_pending_chunk():
+    mod = _fresh_import("Keithley_2400.IV_K2400_GUI_v5")
+    gui = mod.MeasurementAppGUI.__new__(mod.MeasurementAppGUI)
+    gui.backend = mod.Keithley2400_IV_Backend()
+    gui.backend.keithley = _driver(mod.Keithley2400)
+    session = gui.backend.keithley.resource
+    chunk_read = threading.Event()
+    engine = mod.AcquisitionEngine(chunk_read.wait)
+    engine.start()
+    gui.engine, gui.hardware_sweep, gui.is_running = engine, True, True
+    gui.close_requested = False
+    gui.data_writer, gui.live_plot = None, MagicMock(running=False)
+    gui.root, gui.log = MagicMock(), MagicMock()
+    gui.start_button, gui.stop_button = MagicMock(), MagicMock()
+
+    # Stop returns at once while the chunk's :READ? is still pending
+    gui.stop_measurement()
+    assert engine.is_running
+    gui.root.after.assert_called_once_with(100, gui._finish_stop)
+    session.write.assert_not_called()
+
+    chunk_read.set()
+    engine._thread.join(1.0)
+    gui._finish_stop()
+    commands = ";".join(call.args[0] for call in session.write.call_args_list)
+    assert ":SOUR:CURR:MODE FIX" in commands
+    assert gui.hardware_sweep is False and gui.engine is None
+
+
+@pytest.mark.usefixtures("mock_tkinter")
+def test_delta_buffer_drain_and_temperature_interpolation():
+    with patch.dict('sys.modules', {'matplotlib.gridspec': MagicMock()}):
+        mod = _fresh_import(
+            "Delta_mode_Keithley_6221_2182.Delta_RT_K6221_K2182_L350_Sensing_GUI_v5")
+    backend = mod.Combined_Backend()
+    backend.params = {'apply_current': 1e-6}
+    backend.keithley = _driver(mod.Keithley6221)
+    backend.lakeshore = _driver(mod.Lakeshore350)
+    backend.keithley.buffer_arm_time = 1000.0
+    backend.temp_history = [(1000.0, 10.0)]
+    k6221 = backend.keithley.resource
+    k6221.query.return_value = "3\n"
+    # Interleaved READ,TST pairs
+    k6221.query_ascii_values.return_value = [
+        1e-3, 0.5, 2e-3, 1.0, 3e-3, 1.5]
+
+    with patch('time.time', return_value=1002.0):
+        backend.lakeshore.resource.query.return_value = "12.0\n"
+        block = backend.get_buffered_measurement()
+
+    k6221.query_ascii_values.assert_called_once_with(
+        "TRAC:DATA:SEL? 0,3")
+    assert backend.keithley.buffer_cursor == 3
+    assert [round(b[0]) for b in block] == [1000, 2000, 3000]
+    assert np.allclose([b[2] for b in block], [10.5, 11.0, 11.5])
+
+    # Nothing new in the buffer: no data query, empty block
+    k6221.query_ascii_values.reset_mock()
+    assert backend.drain_delta_buffer() == ([], [])
+    k6221.query_ascii_values.assert_not_called()
+
+
+@pytest.mark.usefixtures("mock_tkinter")
+def test_pulse_delta_mode_arms_the_pulse_delta_buffer():
+    with patch.dict('sys.modules', {'matplotlib.gridspec': MagicMock()}):
+        mod = _fresh_import(
+            "Delta_mode_Keithley_6221_2182.Delta_RT_K6221_K2182_L350_T_Control_GUI_v5")
+    backend = mod.Active_Delta_Backend()
+    backend.keithley = _driver(mod.Keithley6221)
+    backend.setup_keithley_delta(1e-6, 10, buffered=True,
+                                 mode=mod.Keithley6221.PULSE_DELTA)
+
+    commands = [c for w in backend.keithley.resource.write.call_args_list
+                for c in w.args[0].split(';')]
+    assert "SOUR:PDEL:HIGH 1e-06" in commands
+    assert "SOUR:PDEL:COUN 65000" in commands
+    assert commands[-2:] == ["SOUR:PDEL:ARM", "INIT:IMM"]
+    assert not any(c.startswith("SOUR:DELT") for c in commands)
+    assert backend.keithley.buffer_mode == mod.Keithley6221.PULSE_DELTA
+
+
+def _k6221_sweep_gui(mod, scale, save_path):
+    gui = mod.Passthrough_IV_GUI.__new__(mod.Passthrough_IV_GUI)
+    gui.root, gui.backend, gui.log = MagicMock(), MagicMock(), MagicMock()
+    gui.sweep_scale_var = MagicMock(get=MagicMock(return_value=scale))
+    gui.save_path, gui.is_running, gui.data_writer = str(save_path), True, None
+    return gui
+
+
+@pytest.mark.usefixtures("mock_tkinter")
+def test_k6221_rejected_sweep_cleans_up_once_and_writes_no_file(tmp_path):
+    with patch.dict('sys.modules', {'matplotlib.gridspec': MagicMock()}):
+        mod = _fresh_import("Delta_mode_Keithley_6221_2182.IV_K6221_DC_Sweep_GUI_V10")
+    gui = _k6221_sweep_gui(mod, 'Log', tmp_path)
+    gui._sweep_worker({'name': 'S1', 'start_i': 1e-6, 'stop_i': 1e-3, 'points': 10,
+                       'acquisition': mod.Passthrough_IV_GUI.ACQ_DCON})
+
+    gui.backend.connect.assert_not_called()
+    assert list(tmp_path.iterdir()) == []
+    cleanups = [c for c in gui.root.after.call_args_list
+                if c.args[1] == gui._sweep_cleanup_ui]
+    assert len(cleanups) == 1
+
+
+@pytest.mark.usefixtures("mock_tkinter")
+def test_k6221_delta_sweep_stops_when_readings_stop_arriving(tmp_path):
+    with patch.dict('sys.modules', {'matplotlib.gridspec': MagicMock()}):
+        mod = _fresh_import("Delta_mode_Keithley_6221_2182.IV_K6221_DC_Sweep_GUI_V10")
+    gui = _k6221_sweep_gui(mod, 'Linear', tmp_path)
+    gui.DRAIN_INTERVAL_S, gui.DELTA_SWEEP_GRACE_S = 0.0, 0.05
+    gui.backend.delta_reading_time_s.return_value = 0.001
+    # One step short, as a rounded differential conductance sweep can be
+    gui.backend.drain_readings.side_effect = [[1.0, 2.0], [3.0, 4.0]] + [[]] * 100000
+
+    gui._run_delta_sweep(np.linspace(0, 4e-6, 5),
+                         {'acquisition': mod.Passthrough_IV_GUI.ACQ_DCON, 'compliance': 1})
+
+    messages = [c.args[0] for c in gui.log.call_args_list]
+    assert "WARNING: The K6221 sweep ended with 4 of 5 readings." in messages
+    assert "Sweep completed successfully." not in messages
+
+
+@pytest.mark.usefixtures("mock_tkinter")
+def test_k6517b_block_modes_reduce_the_buffer_to_statistics():
+    with patch.dict('sys.modules', {'matplotlib.gridspec': MagicMock()}):
+        mod = _fresh_import(
+            "Keithley_6517B.High_Resistance.RT_K6517B_L350_T_Sensing_GUI_v14")
+    backend = mod.Combined_Backend()
+    backend.keithley = _driver(mod.Keithley6517B)
+    session = backend.keithley.resource
+    replies = {'*OPC?': '1', ':TRAC:POIN:ACT?': '3',
+               ':TRAC:DATA?': '+1.0E+12NOHM,+1.2E+12NOHM,+9.9E+37NOHM'}
+    session.query.side_effect = lambda command: replies[command]
+
+    backend.params = {'acquisition': backend.ACQ_BUFFERED, 'block_size': 3}
+    stats = backend._read_resistance()
+    # The overflow reading is left out of the statistics
+    assert stats.n == 2
+    assert stats.mean == pytest.approx(1.1e12)
+    assert stats.std == pytest.approx(np.std([1.0e12, 1.2e12], ddof=1))
+    commands = session.write.call_args.args[0].split(';')
+    assert ":TRIG:COUN 3" in commands and commands[-1] == ":INIT"
+
+    backend.params = {'acquisition': backend.ACQ_ALT_POL, 'block_size': 3}
+    backend.keithley.configure_alternating_polarity(100, readings=3)
+    assert backend._read_resistance().n == 2
+    assert session.write.call_args.args[0] == ":TRAC:CLE;:TSEQ:ARM"
+    # *OPC? outlasts the (3 discarded + 3 stored) 15 s alternations
+    assert session.timeout >= 6 * 15 * 1000
+
+
+@pytest.mark.usefixtures("mock_tkinter")
+@pytest.mark.parametrize("module_name", [
+    "Keithley_6517B.High_Resistance.RT_K6517B_L350_T_Sensing_GUI_v14",
+    "Keithley_6517B.High_Resistance.RT_K6517B_L350_T_Control_GUI_v13"])
+def test_k6517b_alternating_polarity_uses_the_entered_timing(module_name):
+    with patch.dict('sys.modules', {'matplotlib.gridspec': MagicMock()}):
+        mod = _fresh_import(module_name)
+    backend = mod.Combined_Backend()
+    backend.keithley = _driver(mod.Keithley6517B)
+    backend.params = {'acquisition': backend.ACQ_ALT_POL, 'source_voltage': 50,
+                      'block_size': 4, 'alt_measure_s': 2.0, 'alt_discard': 1}
+    backend._setup_source()
+    assert backend.keithley.alt_polarity == (2.0, 1, 4)
+
+    gui = mod.Integrated_RT_GUI.__new__(mod.Integrated_RT_GUI)
+    gui.backend, gui.log = backend, MagicMock()
+    # (1 discarded + 4 stored + 1) alternations of 2 s each
+    gui._log_alternating_polarity_time(delay_s=5)
+    messages = [c.args[0] for c in gui.log.call_args_list]
+    assert messages[0] == "Alternating polarity: 12.0 s per sample."
+    assert messages[1].startswith("WARNING: Each sample takes longer than the 5 s delay")
+    gui.log.reset_mock()
+    gui._log_alternating_polarity_time(delay_s=20)
+    assert gui.log.call_count == 1
+
+
+@pytest.mark.usefixtures("mock_tkinter")
+def test_e4980a_opc_synchronised_measurement_settles():
+    mod = _fresh_import("LCR_Keysight_E4980A.CV_KE4980A_GUI_v3")
+    backend = mod.LCR_Backend()
+    backend.lcr = _driver(mod.KeysightE4980A)
+    backend.params = {'settle_s': 0, 'settle_tol': 1.0}
+    session = backend.lcr.resource
+    # *OPC? and :FETC? alternate; the second and third readings agree to 0.5 %
+    session.query.side_effect = ["1", "+2.0E-10,+0,+0", "1", "+1.0E-10,+0,+0",
+                                 "1", "+1.005E-10,+0,+0"]
+
+    with patch.object(mod.time, "sleep") as sleep:
+        voltage, cap = backend.perform_measurement(0.5)
+
+    sleep.assert_not_called()
+    assert voltage == 0.5
+    assert cap == pytest.approx(1.005e-10)
+    queries = [c.args[0] for c in session.query.call_args_list]
+    assert queries.count("*OPC?") == 3
+    assert not any(q.startswith(":BIAS") for q in queries)
+    assert len(backend.settle_times) == 1
+
+
+@pytest.mark.usefixtures("mock_tkinter")
+def test_e4980a_list_sweep_chunk():
+    mod = _fresh_import("LCR_Keysight_E4980A.CV_KE4980A_GUI_v3")
+    backend = mod.LCR_Backend()
+    backend.lcr = _driver(mod.KeysightE4980A)
+    backend.params = {'settle_s': 0.05}
+    session = backend.lcr.resource
+    session.query.return_value = "1"
+    session.query_ascii_values.return_value = [1e-10, 0.01, 0, 0,
+                                               2e-10, 0.02, 0, 0]
+
+    caps = backend.measure_list_chunk(voltages=[0.0, 0.5])
+
+    assert np.allclose(caps, [1e-10, 2e-10])
+    commands = session.write.call_args_list[0].args[0].split(';')
+    assert ":LIST:MODE SEQ" in commands
+    assert ":TRIG:TDEL 0.05" in commands
+    assert ":LIST:BIAS:VOLT 0,0.5" in commands
+    session.query_ascii_values.assert_called_once_with(":FETC?")
+    with pytest.raises(ValueError):
+        backend.measure_list_chunk(np.zeros(backend.LIST_SWEEP_CHUNK + 1))
+
+
+@pytest.mark.usefixtures("mock_tkinter")
+def test_e4980a_stop_ends_the_list_sweep_after_the_pending_table():
+    mod = _fresh_import("LCR_Keysight_E4980A.CV_KE4980A_GUI_v3")
+    gui = mod.LCR_CV_GUI.__new__(mod.LCR_CV_GUI)
+    gui.backend = mod.LCR_Backend()
+    gui.backend.lcr = _driver(mod.KeysightE4980A)
+    gui.backend.params = {'list_sweep': True}
+    session = gui.backend.lcr.resource
+    table_read = threading.Event()
+    engine = mod.AcquisitionEngine(table_read.wait)
+    engine.start()
+    gui.engine, gui.is_running, gui.close_requested = engine, True, False
+    gui.data_writer, gui.live_plot = None, MagicMock()
+    gui.root, gui.log = MagicMock(), MagicMock()
+    gui.start_button, gui.stop_button = MagicMock(), MagicMock()
+
+    # Stop returns at once while the table's *OPC? is still pending
+    gui.stop_sweep()
+    gui.root.after.assert_called_once_with(100, gui._finish_stop, "")
+    session.write.assert_not_called()
+
+    table_read.set()
+    engine._thread.join(1.0)
+    gui._finish_stop("")
+    writes = [call.args[0] for call in session.write.call_args_list]
+    assert writes[:2] == [':DISP:PAGE MEAS;:TRIG:TDEL 0', ':BIAS:VOLTage:LEVel 0']
+    assert gui.engine is None and gui.backend.lcr is None
+
+
+@pytest.mark.usefixtures("mock_tkinter")
+def test_e4980a_list_sweep_runs_on_the_acquisition_thread():
+    mod = _fresh_import("LCR_Keysight_E4980A.CV_KE4980A_GUI_v3")
+    gui = mod.LCR_CV_GUI.__new__(mod.LCR_CV_GUI)
+    gui.backend = mod.LCR_Backend()
+    gui.backend.params = {'list_sweep': True}
+    threads = []
+
+    def measure_list_chunk(voltages):
+        threads.append(threading.current_thread())
+        return [1e-10] * len(voltages)
+
+    gui.backend.measure_list_chunk = measure_list_chunk
+    gui.sweep_gen = gui._create_sweep_generator(
+        {'v_max': 0.5, 'v_step': 0.5, 'loops': 1})
+    engine = mod.AcquisitionEngine(gui._acquire_sweep_step)
+    engine.start()
+    engine._thread.join(5)
+
+    items = engine.drain()
+    assert items[-1] == mod.AcquisitionEngine.COMPLETE
+    # One list table covers the whole 8-point loop
+    assert len(items) == 2 and len(items[0]) == 8
+    assert items[0][1] == (0.5, 1e-10, 1, "A")
+    assert threads and threading.main_thread() not in threads
@@ -0,0 +1,216 @@
+"""
+Purpose: Shared instrument driver behaviour.
+
+What it does: Opens each Instrument_Drivers class on a mocked VISA session and checks the common driver features: repeated settings are not re-sent, batched commands go out as one transfer, *OPC? replaces fixed waits, a long list-sweep read extends the bus timeout only while it runs, an E4980A list sweep takes either a bias or a frequency list and is ended back at 0 V bias, non-blocking reads return Futures, a configure-once 2182 trace costs only a trigger and one fetch per point, a bulk 2182A reply read through the 6221 serial passthrough is reassembled from its chunks, compound Lakeshore status queries are parsed into one record, and readings are parsed from the raw responses.
+"""
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from Instrument_Drivers import (  # noqa: E402
+    Keithley2182, Keithley2400, Keithley6221, Keithley6517B, KeysightE4980A,
+    Lakeshore350, SR830)
+from Instrument_Drivers.Keithley_6517B import parse_reading  # noqa: E402
+
+
+def _open(cls, **kwargs):
+    rm = MagicMock()
+    instrument = cls("GPIB0::1::INSTR", resource_manager=rm, **kwargs)
+    return instrument, instrument.resource
+
+
+def _writes(session):
+    return [c.args[0] for c in session.write.call_args_list]
+
+
+def test_unchanged_settings_are_not_rewritten():
+    ls, session = _open(Lakeshore350)
+    ls.set_setpoint(1, 300)
+    ls.set_setpoint(1, 300)
+    ls.set_setpoint(1, 310)
+    assert _writes(session) == ['SETP 1,300', 'SETP 1,310']
+
+
+def test_safety_writes_bypass_the_cache():
+    ls, session = _open(Lakeshore350)
+    ls.heater_off(1)
+    ls.heater_off(1)
+    assert _writes(session) == ['RANGE 1,0', 'RANGE 1,0']
+    with pytest.raises(ValueError):
+        ls.set_heater_range(1, 'maximum')
+
+
+def test_reset_waits_on_opc_and_clears_cache():
+    k2400, session = _open(Keithley2400)
+    k2400.set_current(1e-6)
+    k2400.reset()
+    session.query.assert_called_with('*OPC?')
+    k2400.set_current(1e-6)
+    assert _writes(session).count(':SOUR:CURR 1.000000e-06') == 2
+
+
+def test_configuration_is_batched():
+    k2400, session = _open(Keithley2400)
+    k2400.configure_current_source(21, current_range=1e-3)
+    batch = _writes(session)[0].split(';')
+    assert ':SOUR:FUNC CURR' in batch
+    assert ':SENS:VOLT:PROT 21' in batch
+    assert ':SOUR:CURR:RANG 0.001' in batch
+
+
+def test_list_sweep_extends_the_bus_timeout_only_while_it_runs():
+    k2400, session = _open(Keithley2400)
+    session.timeout = 10000
+    seen = []
+
+    def read(command):
+        seen.append(session.timeout)
+        return "1.0E-1,2.0E-1"
+    session.query.side_effect = read
+    k2400.list_sweep([1e-6, 2e-6], 30.0)
+    # (2 points x 30.05 s) x 2, then back to 10 s for the next read
+    assert seen == [120200] and session.timeout == 10000
+
+    session.query.side_effect = IOError("VISA timeout")
+    with pytest.raises(IOError):
+        k2400.list_sweep([1e-6, 2e-6], 30.0)
+    assert session.timeout == 10000
+
+    k6221, session = _open(Keithley6221)
+    seen.clear()
+
+    def passthrough(command):
+        if command == "*OPC?":
+            seen.append(session.timeout)
+            return "1"
+        return next(serial_replies)
+    session.query.side_effect = passthrough
+    for _ in range(2):
+        serial_replies = iter(["1.0E-3,2.0E-3", ""])
+        assert k6221.buffered_list_sweep([1e-6, 2e-6], 30.0) == [1e-3, 2e-3]
+        # Segments do not ratchet the timeout up
+        assert max(seen) > 100000 and session.timeout == 25000
+
+
+def test_e4980a_list_sweep_takes_one_list_and_is_ended_at_zero_bias():
+    lcr, session = _open(KeysightE4980A)
+    seen = []
+
+    def opc(command):
+        seen.append(session.timeout)
+        return "1"
+    session.query.side_effect = opc
+    session.query_ascii_values.return_value = [1e-10, 0.01, 0, 0] * 2
+    cp, _ = lcr.list_sweep(bias_values=[0.0, 0.5], step_delay_s=600)
+    assert list(cp) == [1e-10, 1e-10]
+    assert seen == [2 * 600.15 * 2000] and session.timeout == 100000
+    with pytest.raises(ValueError):
+        lcr.list_sweep(bias_values=[0.0], frequencies=[1e3])
+
+    lcr.set_bias(0)
+    lcr.end_list_sweep()
+    assert _writes(session)[-2:] == [':DISP:PAGE MEAS;:TRIG:TDEL 0',
+                                     ':BIAS:VOLTage:LEVel 0']
+
+
+def test_async_read_returns_future():
+    ls, session = _open(Lakeshore350)
+    session.query.return_value = "+77.350\r\n"
+    future = ls.get_temperature_async('A')
+    assert future.result(timeout=5) == pytest.approx(77.35)
+    session.query.assert_called_once_with('KRDG? A')
+    ls.close()
+    session.close.assert_called_once()
+
+
+def test_lakeshore_status_is_one_compound_query():
+    ls, session = _open(Lakeshore350)
+    session.query.return_value = "+77.350,+80.100,+0.000,+295.00;+42.5\r\n"
+    status = ls.get_status(outputs=(1,))
+    session.query.assert_called_once_with('KRDG? 0;HTR? 1')
+    assert status.temperatures == pytest.approx(
+        {'A': 77.35, 'B': 80.1, 'C': 0.0, 'D': 295.0})
+    assert status.heater_outputs == {1: 42.5}
+
+    session.query.reset_mock()
+    session.query.return_value = "+10.0;+11.0;+5.0;+0.0"
+    status = ls.get_status(outputs=(1, 2), sensors=('A', 'B'))
+    session.query.assert_called_once_with('KRDG? A;KRDG? B;HTR? 1;HTR? 2')
+    assert status.temperatures == {'A': 10.0, 'B': 11.0}
+    assert status.heater_outputs == {1: 5.0, 2: 0.0}
+
+    session.query.return_value = "+10.0"
+    with pytest.raises(IOError):
+        ls.get_status(outputs=(1,), sensors=('A',))
+
+
+def test_k2182_bus_triggered_mean():
+    k2182, session = _open(Keithley2182)
+    session.assert_trigger = MagicMock()
+    session.query_ascii_values.return_value = [1e-6, 3e-6]
+    assert k2182.measure_bus_triggered() == pytest.approx(2e-6)
+    session.assert_trigger.assert_called_once()
+    session.wait_for_srq.assert_called_once_with(timeout=10000)
+
+
+def test_k2182_configure_once_trace_costs_a_trigger_and_a_fetch_per_point():
+    k2182, session = _open(Keithley2182)
+    session.assert_trigger = MagicMock()
+    k2182.configure_triggered_trace(samples=3, trigger_delay=0.05)
+    setup = _writes(session)
+    assert len(setup) == 1 and "trigger:source bus" in setup[0]
+    assert setup[0].endswith("initiate")
+
+    session.write.reset_mock()
+    session.query.return_value = "+1.0E-6,+2.0E-6,+3.0E-6;+512\n"
+    for _ in range(3):
+        k2182.trigger()
+        assert k2182.read_trace() == pytest.approx([1e-6, 2e-6, 3e-6])
+    session.write.assert_not_called()
+    assert session.assert_trigger.call_count == 3
+    # The fetch re-arms the meter for the next point in the same transfer
+    assert session.query.call_args.args[0].startswith("trace:data?")
+    assert session.query.call_args.args[0].endswith(":initiate")
+
+    k2182.configure_triggered_trace(external_trigger=True)
+    assert "trigger:source external" in session.write.call_args.args[0]
+
+
+def test_k6221_serial_passthrough_returns_last_line():
+    k6221, session = _open(Keithley6221)
+    session.query.side_effect = ["", "+1.0E-3\n+2.5E-3"]
+    assert k6221.read_2182_voltage() == pytest.approx(2.5e-3)
+
+
+def test_k6221_serial_bulk_reply_is_collected_across_chunks():
+    k6221, session = _open(Keithley6221)
+    # The reply arrives in pieces, split inside a number
+    session.query.side_effect = ["1.0E-3,2.", "5E-3,3.0E-3", ""]
+    assert k6221.serial_query_values("TRAC:DATA?", 3) == pytest.approx(
+        [1e-3, 2.5e-3, 3e-3])
+    assert _writes(session) == ["SYST:COMM:SER:SEND 'TRAC:DATA?'"]
+
+
+def test_6517b_reading_parser_strips_units():
+    assert parse_reading("+1.234E+09NOHM,+0.0SECS") == pytest.approx(1.234e9)
+    assert parse_reading("-4.5e-12NADC") == pytest.approx(-4.5e-12)
+    k6517b, session = _open(Keithley6517B)
+    k6517b.set_source_voltage(10)
+    assert k6517b.source_voltage == 10.0
+    session.query.assert_not_called()
+
+
+def test_e4980a_and_sr830_readings():
+    lcr, session = _open(KeysightE4980A)
+    session.query.return_value = "+1.2E-10,+3.4E-02,+0"
+    assert lcr.fetch_impedance()[0] == pytest.approx(1.2e-10)
+    lockin, session = _open(SR830)
+    session.query.return_value = "1.23,4.56"
+    assert lockin.read_r_theta() == (1.23, 4.56)
+    session.query.assert_called_with('SNAP? 3,4')
@@ -0,0 +1,259 @@
+"""
+Purpose: Live plot data storage.
+
+What it does: Fills the shared ColumnStore the way the measurement GUIs do and checks that columns grow by doubling without losing points, behave like the lists they replaced (len, [-1], truthiness, clear), keep per-column dtypes, and are decimated in step once the row cap is reached, with the newest point kept across every decimation. Hands a column to a real matplotlib Line2D to check that the line keeps a snapshot that later appends do not change. Decimates a 10^6 point R-T sweep for plotting and checks that a one-point spike and both ends of a back-and-forth sweep survive, that a zoomed view keeps only the visible points and their neighbours, and that LevelOfDetail re-decimates on zoom and after the Axes is cleared, while a growing line keeps its completed buckets and only decimates the new points. Streams points through LivePlot on an Agg canvas and checks that limits only grow, with headroom, when a point leaves them, that only those changes cost a full draw while other points are blitted, that a log-scale switch refits the axis and that an axis the user zoomed is left alone. Requests a redraw after every point of a fast stream through a fake Tk scheduler and checks that the requests are merged into a few frames, that the last points are drawn at stop, that a log switch on a zoomed axis invalidates the background, that a long line is drawn decimated and that render times are recorded.
+"""
+import copy
+import os
+import sys
+
+import numpy as np
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from Instrument_Drivers import (ColumnStore, DataColumn,  # noqa: E402
+                                LevelOfDetail, LivePlot, decimate_indices)
+
+
+def test_column_grows_by_doubling_and_acts_like_a_list():
+    column = DataColumn(capacity=4)
+    assert not column and len(column) == 0
+    for i in range(10):
+        column.append(i * 0.5)
+    assert column.capacity == 16
+    assert len(column) == 10 and column[-1] == 4.5
+    assert np.asarray(column).tolist() == [i * 0.5 for i in range(10)]
+    column.extend([5.0, 5.5])
+    assert list(column)[-2:] == [5.0, 5.5]
+    column.clear()
+    assert len(column) == 0 and column.capacity == 16
+
+
+def test_store_columns_keep_their_dtype_and_clear_together():
+    store = ColumnStore(['voltage', 'loop', 'protocol'],
+                        dtypes={'loop': int, 'protocol': 'U1'})
+    store.append(voltage=0.1, loop=1, protocol='A')
+    store['voltage'].append(0.2)
+    store['loop'].append(2)
+    store['protocol'].append('B')
+    assert list(store) == ['voltage', 'loop', 'protocol']
+    assert store.rows == 2
+    assert store['loop'][-1] == 2 and store['loop'].dtype.kind == 'i'
+    assert store['protocol'].values.tolist() == ['A', 'B']
+    for key in store:
+        store[key].clear()
+    assert store.rows == 0
+
+
+def test_row_cap_decimates_all_columns_in_step():
+    store = ColumnStore(['time', 'temperature'], capacity=2, max_rows=8)
+    for i in range(20):
+        store['time'].append(i)
+        store['temperature'].append(300 + i)
+    assert len(store['time']) <= 8
+    assert store['time'].capacity == 8
+    assert (store['temperature'].values - store['time'].values == 300).all()
+    # Uniform stride over the whole run, with the newest point at the end
+    stride = store['time'].decimation
+    assert stride > 1
+    assert (np.diff(store['time'].values[:-1]) == stride).all()
+    assert store['time'][0] == 0 and store['time'][-1] == 19
+
+
+def test_newest_point_survives_every_decimation():
+    column = DataColumn(capacity=2, max_rows=8)
+    for i in range(100):
+        column.append(i)
+        assert column[-1] == i
+        # Everything before the newest point stays on the current stride
+        assert (column.values[:-1] % column.decimation == 0).all()
+    assert column.decimation > 1 and len(column) <= 8
+
+
+def test_line_keeps_a_snapshot_of_the_column():
+    Line2D = pytest.importorskip("matplotlib.lines").Line2D
+    x, y = DataColumn(), DataColumn()
+    x.extend([1, 2, 3])
+    y.extend([10, 20, 30])
+    snapshot = copy.copy(x)
+    assert isinstance(snapshot, np.ndarray)
+    line = Line2D([], [])
+    line.set_data(x, y)
+    x.clear()
+    x.extend([7, 8, 9])
+    assert line.get_xdata().tolist() == [1, 2, 3]
+    assert line.get_ydata().tolist() == [10, 20, 30]
+
+
+def _rt_sweep(points):
+    temperature = np.concatenate([np.linspace(300, 5, points // 2),
+                                  np.linspace(5, 300, points - points // 2)])
+    resistance = np.where(temperature > 90, 100 + temperature, 1e-3)
+    resistance[points // 3] = 1e4  # a single-point glitch
+    return temperature, resistance
+
+
+def test_decimation_keeps_peaks_and_the_visible_range():
+    temperature, resistance = _rt_sweep(1_000_000)
+    resistance[10] = np.nan
+    index = decimate_indices(temperature, resistance, buckets=500)
+    assert len(index) <= 6 * 500
+    assert np.all(np.diff(index) > 0) and 10 not in index
+    assert resistance[index].max() == 1e4
+    assert temperature[index].min() == 5 and {0, 999_999} <= set(index.tolist())
+
+    index = decimate_indices(temperature, resistance, buckets=500, x_range=(80, 100))
+    inside = (temperature[index] >= 80) & (temperature[index] <= 100)
+    assert inside.sum() >= len(index) - 4  # plus one neighbour per edge crossing
+    assert resistance[index].min() == 1e-3 and resistance[index].max() > 190
+
+
+def test_level_of_detail_redecimates_on_zoom():
+    matplotlib = pytest.importorskip("matplotlib")
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+
+    ax = Figure(figsize=(4, 3), dpi=100).add_subplot(111)
+    lod = LevelOfDetail(ax)
+    temperature, resistance = _rt_sweep(200_000)
+    line = lod.plot(temperature, resistance, marker='o')
+    full_view = len(line.get_xdata())
+    assert full_view <= 6 * 400 and lod.points_drawn == full_view
+
+    ax.set_xlim(100, 110)
+    assert 0 < len(line.get_xdata()) < full_view
+    assert line.get_xdata().min() > 99.99 and line.get_xdata().max() < 110.01
+
+    ax.clear()
+    line = lod.plot(temperature[:1000], resistance[:1000])
+    assert len(line.get_xdata()) == 1000 and lod.points_drawn == 1000
+
+
+def test_level_of_detail_decimates_a_growing_line_incrementally():
+    matplotlib = pytest.importorskip("matplotlib")
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+
+    ax = Figure(figsize=(4, 3), dpi=100).add_subplot(111)
+    lod = LevelOfDetail(ax)
+    temperature, resistance = _rt_sweep(200_000)
+    line = lod.plot([], [])
+    for count in range(1000, 200_001, 1000):
+        lod.set_data(line, temperature[:count], resistance[:count])
+    drawn = line.get_xdata().copy()
+    buckets = lod._buckets()
+    assert len(drawn) <= 6 * (2 * buckets + 1)
+    assert resistance[np.isin(temperature, drawn)].max() == 1e4
+    assert drawn[0] == temperature[0] and drawn[-1] == temperature[-1]
+
+    # One more point leaves the completed buckets as they were
+    lod.set_data(line, np.append(temperature, 300.5), np.append(resistance, 400.5))
+    stable = len(drawn) - 12
+    assert np.array_equal(line.get_xdata()[:stable], drawn[:stable])
+
+    # A view change decimates everything again, to the view
+    ax.set_xlim(100, 110)
+    assert line.get_xdata().min() > 99.99 and line.get_xdata().max() < 110.01
+
+
+def test_live_plot_grows_limits_only_when_points_leave_them():
+    pytest.importorskip("matplotlib")
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    canvas = FigureCanvasAgg(Figure(figsize=(4, 3), dpi=50))
+    ax_rt, ax_time = canvas.figure.subplots(2, 1)
+    data = ColumnStore(['time', 'temperature', 'resistance'])
+    live_plot = LivePlot(canvas)
+    live_plot.add_line(ax_rt.plot([], [])[0], data['temperature'], data['resistance'])
+    live_plot.add_line(ax_time.plot([], [])[0], data['time'], data['temperature'])
+    full_draws = []
+    canvas.mpl_connect('draw_event', full_draws.append)
+    live_plot.start()
+
+    changes = 0
+    for i in range(500):
+        data.append(time=float(i), temperature=10 + 0.4 * i, resistance=100.0 + i % 7)
+        changes += live_plot.redraw()
+    # One full draw per change, the other points are blitted
+    assert changes < 30 and len(full_draws) == changes + 1
+    assert ax_time.get_xlim()[0] < 0 and ax_time.get_xlim()[1] >= 499
+    low, high = ax_rt.get_ylim()
+    assert low < 100 and 106 < high < 110
+    assert live_plot.redraw() is False  # Nothing new: blitted
+
+    ax_rt.set_yscale('log')
+    assert live_plot.redraw() is True
+    assert ax_rt.get_ylim()[0] > 0
+
+    ax_time.set_xlim(0, 10)  # Zoomed by the user: autoscaling off
+    data.append(time=5000.0, temperature=600.0, resistance=100.0)
+    live_plot.redraw()
+    assert ax_time.get_xlim() == (0, 10)
+    assert ax_rt.get_xlim()[1] >= 600
+
+    live_plot.stop()
+    assert not ax_rt.get_lines()[0].get_animated()
+
+
+class _FakeTkWidget:
+    """Collects ``after`` jobs; the test runs them when it wants a frame."""
+
+    def __init__(self):
+        self.jobs = {}
+
+    def after(self, delay_ms, callback):
+        job = len(self.jobs) + 1
+        self.jobs[job] = callback
+        return job
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def run_pending(self):
+        jobs, self.jobs = self.jobs, {}
+        for callback in jobs.values():
+            callback()
+
+
+def test_live_plot_merges_redraw_requests_into_capped_frames():
+    pytest.importorskip("matplotlib")
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    canvas = FigureCanvasAgg(Figure(figsize=(4, 3), dpi=50))
+    widget = _FakeTkWidget()
+    canvas.get_tk_widget = lambda: widget
+    ax = canvas.figure.subplots()
+    data = ColumnStore(['temperature', 'resistance'])
+    live_plot = LivePlot(canvas, max_fps=10)
+    line = ax.plot([], [])[0]
+    live_plot.add_line(line, data['temperature'], data['resistance'])
+    live_plot.start()
+
+    for frame in range(5):
+        for i in range(2000):
+            n = frame * 2000 + i
+            data.append(temperature=float(n), resistance=100.0 + np.sin(n / 50))
+            live_plot.request_redraw()
+        assert len(widget.jobs) == 1
+        widget.run_pending()
+    assert live_plot.requests == 10000 and live_plot.frames == 5
+    assert live_plot.max_render_s >= live_plot.mean_render_s > 0
+    assert "5 frames for 10000 redraw requests" in live_plot.summary()
+    # 10^4 points, but only a few per pixel column are drawn
+    assert ax.get_xlim()[1] >= 9999 and len(line.get_xdata()) < 5000
+
+    ax.set(xlim=(0, 100), ylim=(50, 200))
+    ax.set_yscale('log')  # Zoomed, so no limit changes: still a full draw
+    full_draws = live_plot.full_draws
+    assert live_plot.redraw() is False
+    assert live_plot.full_draws == full_draws + 1
+
+    data.append(temperature=50.0, resistance=2.0)
+    live_plot.request_redraw()
+    live_plot.stop()  # Draws the waiting point without waiting for the frame
+    assert not widget.jobs and line.get_xdata()[-1] == 50.0
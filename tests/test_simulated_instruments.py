@@ -0,0 +1,221 @@
+"""
+Purpose: Simulated-instrument VISA backend.
+
+What it does: Opens the shared Instrument_Drivers classes on a SimulatedLab instead of a MagicMock session and runs real driver calls end to end: compound Lakeshore status reads, a heater ramp on an accelerated clock, K2400 source-list sweeps and 2182 bus-triggered readings across a temperature-dependent sample, a 2182 trace configured once and triggered per point over the bus or by the 2400 over Trigger Link, 6221 Delta buffering and 2182A passthrough, buffered Pulse Delta (free-running and swept) and differential conductance sweeps, 6221 built-in list sweeps that trigger the 2182A over Trigger Link and are read back from its buffer in one transfer, 6517B readings with unit suffixes, buffered blocks and alternating-polarity sequences (waited out by polling the stored-reading count) reduced to block statistics, E4980A list sweeps and SR830 snapshots. Checks that *OPC? waits for the modelled integration time and that install() routes direct pyvisa.ResourceManager() calls to the simulation.
+"""
+import os
+import sys
+import time
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from Instrument_Drivers import (  # noqa: E402
+    Keithley2182, Keithley2400, Keithley6221, Keithley6517B, KeysightE4980A,
+    Lakeshore350, SR830, SimulatedLab, SimulatedResourceManager,
+    SimulatedSample, block_statistics, get_resource_manager)
+from Instrument_Drivers import Simulated_Instruments  # noqa: E402
+from Instrument_Drivers.Simulated_Instruments import DEFAULT_ADDRESSES  # noqa: E402
+
+ADDRESS = {model: address for address, model in DEFAULT_ADDRESSES.items()}
+
+
+@pytest.fixture
+def lab():
+    return SimulatedLab(latency_s=0.0, noise=0.0)
+
+
+def _open(lab, cls):
+    return cls(ADDRESS[cls.NAME], resource_manager=SimulatedResourceManager(lab))
+
+
+def test_lakeshore_ramp_follows_heater_and_setpoint():
+    lab = SimulatedLab(latency_s=0.0, noise=0.0, time_scale=10.0,
+                       bath_temperature_k=77.0)
+    ls = _open(lab, Lakeshore350)
+    assert ls.identify().startswith("LSCI,MODEL350")
+    ls.set_heater_range(1, 'high')
+    ls.set_setpoint(1, 310)
+    ls.set_ramp(1, 60)  # 60 K/min, i.e. 10 K/s of real time at this time scale
+    time.sleep(0.5)
+    status = ls.get_status(outputs=(1,))
+    assert set(status.temperatures) == {'A', 'B', 'C', 'D'}
+    assert 300.0 < status.temperatures['A'] < 310.0
+    assert status.temperatures['D'] == pytest.approx(lab.bath_temperature_k)
+    assert status.heater_outputs[1] > 0
+    ls.heater_off(1)
+    assert ls.get_heater_output(1) == 0.0
+
+
+def test_k2400_list_sweep_measures_the_sample(lab):
+    k2400 = _open(lab, Keithley2400)
+    k2400.configure_current_source(21)
+    voltages = k2400.list_sweep([1e-3, 2e-3, 3e-3], source_delay=0.0)
+    # Default sample: 100 ohm at the 300 K start temperature
+    assert list(voltages) == pytest.approx([0.1, 0.2, 0.3])
+
+
+def test_k2182_bus_trigger_reads_current_from_the_k2400(lab):
+    k2400 = _open(lab, Keithley2400)
+    k2182 = _open(lab, Keithley2182)
+    k2400.set_current(1e-3)
+    k2400.enable_output()
+    assert k2182.measure_bus_triggered(samples=2, trigger_delay=0.0) == pytest.approx(0.1)
+
+
+@pytest.mark.parametrize("trigger_link", [False, True])
+def test_k2182_configured_once_follows_each_new_current(lab, trigger_link):
+    k2400 = _open(lab, Keithley2400)
+    k2182 = _open(lab, Keithley2182)
+    k2400.configure_current_source(21)
+    if trigger_link:
+        k2400.configure_trigger_link()
+    k2400.enable_output()
+    k2182.configure_triggered_trace(samples=2, trigger_delay=0.0,
+                                    external_trigger=trigger_link)
+    for current in (1e-3, 2e-3, 3e-3):
+        k2400.set_current(current)
+        if trigger_link:
+            k2400.initiate()  # The 2400 triggers the 2182 over the link
+        else:
+            k2182.trigger()
+        assert k2182.read_trace() == pytest.approx([current * 100] * 2)
+    if trigger_link:
+        # A bus trigger does not start an externally triggered acquisition
+        k2182.trigger()
+        assert k2182.read_trace() == []
+
+
+def test_k6221_delta_buffer_and_passthrough(lab):
+    lab.sample = SimulatedSample(r_300k=5.0)
+    k6221 = _open(lab, Keithley6221)
+    k6221.configure_delta(1e-3, 10)
+    k6221.arm_delta_buffer()
+    time.sleep(0.35)
+    voltages, timestamps = k6221.drain_delta_buffer()
+    assert len(voltages) >= 3
+    assert voltages[0] == pytest.approx(5e-3)
+    assert timestamps == sorted(timestamps)
+    assert k6221.fetch_fresh_delta() == pytest.approx(5e-3)
+    k6221.configure_2182_free_running()
+    assert k6221.read_2182_voltage() == pytest.approx(0.0)
+
+
+def test_k6221_pulse_delta_and_diff_conductance_buffers(lab):
+    lab.sample = SimulatedSample(r_300k=5.0)
+    k6221 = _open(lab, Keithley6221)
+    k6221.configure_pulse_delta(1e-3, 10)
+    k6221.arm_delta_buffer(mode=Keithley6221.PULSE_DELTA)
+    time.sleep(0.35)
+    voltages, _ = k6221.drain_delta_buffer()
+    assert len(voltages) >= 10  # Plain Delta has only three readings by now
+    assert voltages == pytest.approx([5e-3] * len(voltages))
+    assert k6221.fetch_fresh_delta() == pytest.approx(5e-3)
+
+    k6221.configure_pulse_delta_sweep([1e-3, 2e-3, 3e-3], 10)
+    k6221.arm_delta_buffer(mode=Keithley6221.PULSE_DELTA, count=1)
+    time.sleep(0.15)
+    assert k6221.drain_delta_buffer()[0] == pytest.approx([5e-3, 1e-2, 1.5e-2])
+
+    k6221.configure_diff_conductance(-2e-3, 2e-3, 1e-3, 5e-4, 10)
+    k6221.arm_delta_buffer(mode=Keithley6221.DIFF_CONDUCTANCE)
+    time.sleep(0.6)
+    # An ohmic sample: dV/dI equals R at every step, and the sweep stops after five
+    assert k6221.drain_delta_buffer()[0] == pytest.approx([5.0] * 5)
+
+
+def test_k6221_built_in_sweep_fills_the_2182_buffer(lab):
+    k6221 = _open(lab, Keithley6221)
+    k6221.configure_dc_source(10)
+    k6221.serial_send("SENS:VOLT:NPLC 0.5")
+    k6221.configure_2182_triggered_buffer()
+    currents = [-2e-3, -1e-3, 0.0, 1e-3, 2e-3]
+    for _ in range(2):  # Segments follow each other without reconfiguring
+        started = time.monotonic()
+        voltages = k6221.buffered_list_sweep(currents, step_delay=0.01)
+        # Default sample: 100 ohm; *OPC? waited for every step and reading
+        assert voltages == pytest.approx([c * 100 for c in currents])
+        assert time.monotonic() - started >= len(currents) * 0.02
+    with pytest.raises(ValueError):
+        k6221.buffered_list_sweep([0.0] * (k6221.SWEEP_SEGMENT_POINTS + 1), 0.0)
+
+
+def test_k6517b_resistance_reading_has_unit_suffix(lab):
+    lab.sample = SimulatedSample(r_300k=1e9)
+    k6517b = _open(lab, Keithley6517B)
+    k6517b.configure_resistance()
+    k6517b.set_source_voltage(10)
+    k6517b.enable_source()
+    assert k6517b.query(':READ?').endswith('NOHM')
+    assert k6517b.read() == pytest.approx(1e9)
+
+
+def test_k6517b_buffered_and_alternating_polarity_blocks(lab):
+    lab.sample = SimulatedSample(r_300k=1e13)
+    k6517b = _open(lab, Keithley6517B)
+    k6517b.configure_resistance(nplc=0.5)
+    k6517b.set_source_voltage(10)
+    k6517b.enable_source()
+    started = time.monotonic()
+    stats = block_statistics(k6517b.read_buffered_block(20))
+    # *OPC? waits out the 20 modelled integrations
+    assert time.monotonic() - started >= 0.9 * 20 * 0.5 / 50
+    assert stats.n == 20
+    assert stats.mean == pytest.approx(1e13)
+
+    k6517b.configure_alternating_polarity(50, measure_time_s=0.01, discard=2, readings=5)
+    started = time.monotonic()
+    stats = block_statistics(k6517b.read_alternating_polarity())
+    # *OPC? returns once the sequence is armed; the stored-reading count is polled
+    assert time.monotonic() - started >= 0.9 * (2 + 5) * 0.01
+    assert (stats.mean, stats.std, stats.n) == pytest.approx((1e13, 0.0, 5))
+
+
+def test_e4980a_opc_waits_for_the_aperture_time(lab):
+    lcr = _open(lab, KeysightE4980A)
+    lcr.configure(1000, 0.5, aperture='LONG')
+    lcr.set_bias(0.0)
+    t0 = time.monotonic()
+    primary, secondary, _ = lcr.measure()
+    assert time.monotonic() - t0 >= 0.9 * lcr.measurement_time_s
+    assert primary == pytest.approx(lab.sample.c0_f)
+    assert secondary == pytest.approx(lab.sample.loss_tangent)
+
+    lcr.configure(1000, 0.5, aperture='SHOR')
+    cp, _ = lcr.list_sweep(bias_values=[-1.0, 0.0, 1.0])
+    assert cp[0] > cp[1] > cp[2]
+
+
+def test_sr830_snap(lab):
+    lockin = _open(lab, SR830)
+    lockin.set_reference(amplitude_v=1.0)
+    r, theta = lockin.read_r_theta()
+    assert r == pytest.approx(1e-6 * lab.sample.resistance_ohm(300.0))
+    assert theta == pytest.approx(Simulated_Instruments.SimSR830.PHASE_DEG)
+    assert lockin.get_sensitivity_code() == 22
+
+
+def test_latency_is_charged_per_transaction():
+    lab = SimulatedLab(latency_s=0.01, noise=0.0)
+    ls = _open(lab, Lakeshore350)
+    t0 = time.monotonic()
+    for _ in range(5):
+        ls.get_temperature('A')
+    assert time.monotonic() - t0 >= 0.05
+
+
+def test_install_routes_direct_resource_manager_calls():
+    pyvisa = pytest.importorskip("pyvisa")
+    original = pyvisa.ResourceManager
+    manager = Simulated_Instruments.install(SimulatedLab(latency_s=0.0))
+    try:
+        assert get_resource_manager() is manager
+        assert pyvisa.ResourceManager() is manager
+        session = pyvisa.ResourceManager().open_resource(ADDRESS['SR830'])
+        assert session.query('*IDN?').startswith("Stanford_Research_Systems")
+    finally:
+        Simulated_Instruments.uninstall()
+    assert pyvisa.ResourceManager is original